@@ -11,8 +11,17 @@ from channels.routing import ProtocolTypeRouter, URLRouter  # noqa: E402
 from channels.auth import AuthMiddlewareStack             # noqa: E402
 from services.workspace.routing import websocket_urlpatterns as ws_workspace  # noqa: E402
 from services.docs.routing import websocket_urlpatterns as ws_docs            # noqa: E402
+from services.kubernetes_integration.routing import websocket_urlpatterns as ws_kube  # noqa: E402
+from services.marketing.service import start_import_worker  # noqa: E402
+from services.provisioning.jobs import get_engine  # noqa: E402
 
-websocket_urlpatterns = ws_workspace + ws_docs
+# Start the provisioning engine and the contact import worker in every server
+# process so work left behind by a previous process is picked up (see
+# services/provisioning/jobs.py and services/marketing/service.py).
+get_engine().start()
+start_import_worker()
+
+websocket_urlpatterns = ws_workspace + ws_docs + ws_kube
 
 application = ProtocolTypeRouter({
     'http': django_asgi_app,
@@ -132,6 +132,76 @@ else:
         }
     }
 
+# Workspace binding cache (seconds) — see services/workspace/cache.py
+WORKSPACE_BINDING_CACHE_TTL    = int(os.environ.get('WORKSPACE_BINDING_CACHE_TTL', '300'))
+WORKSPACE_BINDING_NEGATIVE_TTL = int(os.environ.get('WORKSPACE_BINDING_NEGATIVE_TTL', '30'))
+WORKSPACE_BINDING_LOCAL_TTL    = int(os.environ.get('WORKSPACE_BINDING_LOCAL_TTL', '5'))
+
+# OpenStack catalog cache (seconds) — see services/openstack/catalog_cache.py
+OPENSTACK_CATALOG_CACHE_TTL = int(os.environ.get('OPENSTACK_CATALOG_CACHE_TTL', '3600'))
+OPENSTACK_CATALOG_STALE_TTL = int(os.environ.get('OPENSTACK_CATALOG_STALE_TTL', '86400'))
+
+# Kubernetes monitor snapshot cache (seconds) — see services/kubernetes_integration/kube_monitor.py
+KUBE_MONITOR_CACHE_TTL = int(os.environ.get('KUBE_MONITOR_CACHE_TTL', '5'))
+# GitOps repository mirror cache — see services/kubernetes_integration/git_mirror.py
+KUBE_GIT_CACHE_ENABLED   = os.environ.get('KUBE_GIT_CACHE_ENABLED', 'true').lower() == 'true'
+KUBE_GIT_CACHE_DIR       = os.environ.get('KUBE_GIT_CACHE_DIR', str(BASE_DIR / 'git_cache'))
+KUBE_GIT_CACHE_MAX_BYTES = int(os.environ.get('KUBE_GIT_CACHE_MAX_BYTES', str(5 * 1024 ** 3)))
+
+# Manifest scan engine — see services/kubernetes_integration/scan_engine.py
+KUBE_SCAN_WORKERS            = int(os.environ.get('KUBE_SCAN_WORKERS', str(min(os.cpu_count() or 1, 8))))
+KUBE_SCAN_PARALLEL_THRESHOLD = int(os.environ.get('KUBE_SCAN_PARALLEL_THRESHOLD', '200'))
+KUBE_SCAN_CACHE_TTL          = int(os.environ.get('KUBE_SCAN_CACHE_TTL', str(7 * 24 * 3600)))
+
+# Git smart-HTTP auth / repository cache — see services/pipelines/git_access.py
+GIT_ACCESS_CACHE_TTL = int(os.environ.get('GIT_ACCESS_CACHE_TTL', '60'))
+
+# Batched server-side apply — see services/kubernetes_integration/kube_apply.py
+KUBE_APPLY_BATCHED        = os.environ.get('KUBE_APPLY_BATCHED', 'true').lower() == 'true'
+KUBE_APPLY_BATCH_BYTES    = int(os.environ.get('KUBE_APPLY_BATCH_BYTES', str(1024 * 1024)))
+KUBE_APPLY_MAX_CONCURRENT = int(os.environ.get('KUBE_APPLY_MAX_CONCURRENT', '4'))
+
+# Watch-based Kubernetes state — see services/kubernetes_integration/kube_watch.py
+KUBE_WATCH_ENABLED         = os.environ.get('KUBE_WATCH_ENABLED', 'true').lower() == 'true'
+KUBE_WATCH_IDLE_TIMEOUT    = int(os.environ.get('KUBE_WATCH_IDLE_TIMEOUT', '600'))
+KUBE_WATCH_PUBLISHER_LEASE = int(os.environ.get('KUBE_WATCH_PUBLISHER_LEASE', '30'))
+
+# Batched metric ingestion — see services/monitoring/ingest.py
+METRIC_INGEST_BUFFER_SIZE             = int(os.environ.get('METRIC_INGEST_BUFFER_SIZE', '100000'))
+METRIC_INGEST_BATCH_SIZE              = int(os.environ.get('METRIC_INGEST_BATCH_SIZE', '2000'))
+METRIC_INGEST_FLUSH_INTERVAL          = float(os.environ.get('METRIC_INGEST_FLUSH_INTERVAL', '1.0'))
+METRIC_INGEST_MAX_SAMPLES_PER_REQUEST = int(os.environ.get('METRIC_INGEST_MAX_SAMPLES_PER_REQUEST', '10000'))
+ALERT_RULE_COOLDOWN_SECONDS           = int(os.environ.get('ALERT_RULE_COOLDOWN_SECONDS', '300'))
+
+# Billing — events claimed per flush_usage_events transaction
+BILLING_FLUSH_CHUNK_SIZE = int(os.environ.get('BILLING_FLUSH_CHUNK_SIZE', '5000'))
+
+# Buffered usage recorder — see services/billing/recorder.py
+BILLING_USAGE_ASYNC          = os.environ.get('BILLING_USAGE_ASYNC', 'true').lower() == 'true'
+BILLING_USAGE_BUFFER_SIZE    = int(os.environ.get('BILLING_USAGE_BUFFER_SIZE', '50000'))
+BILLING_USAGE_BATCH_SIZE     = int(os.environ.get('BILLING_USAGE_BATCH_SIZE', '500'))
+BILLING_USAGE_FLUSH_INTERVAL = float(os.environ.get('BILLING_USAGE_FLUSH_INTERVAL', '0.5'))
+BILLING_USAGE_SPILL_PATH     = os.environ.get('BILLING_USAGE_SPILL_PATH', str(BASE_DIR / 'billing_usage_spill.jsonl'))
+
+# Asynchronous provisioning jobs — see services/provisioning/jobs.py
+PROVISIONING_JOB_WORKERS    = int(os.environ.get('PROVISIONING_JOB_WORKERS', '4'))
+PROVISIONING_POLL_INITIAL   = float(os.environ.get('PROVISIONING_POLL_INITIAL', '1.0'))
+PROVISIONING_POLL_MAX       = float(os.environ.get('PROVISIONING_POLL_MAX', '30.0'))
+PROVISIONING_VM_TIMEOUT     = int(os.environ.get('PROVISIONING_VM_TIMEOUT', '600'))
+PROVISIONING_VOLUME_TIMEOUT = int(os.environ.get('PROVISIONING_VOLUME_TIMEOUT', '300'))
+PROVISIONING_CREATE_LEASE   = float(os.environ.get('PROVISIONING_CREATE_LEASE', '120'))
+# Batch status polling — see services/provisioning/reconciler.py
+PROVISIONING_BATCH_POLL         = os.environ.get('PROVISIONING_BATCH_POLL', 'true').lower() == 'true'
+PROVISIONING_RECONCILE_INTERVAL = float(os.environ.get('PROVISIONING_RECONCILE_INTERVAL', '5.0'))
+PROVISIONING_RECONCILE_LOCK_TTL = int(os.environ.get('PROVISIONING_RECONCILE_LOCK_TTL', '300'))
+# Object uploads — see services/storage/uploads.py
+STORAGE_SLO_THRESHOLD     = int(os.environ.get('STORAGE_SLO_THRESHOLD', str(256 * 1024 ** 2)))
+STORAGE_SEGMENT_SIZE      = int(os.environ.get('STORAGE_SEGMENT_SIZE', str(64 * 1024 ** 2)))
+STORAGE_UPLOAD_WORKERS    = int(os.environ.get('STORAGE_UPLOAD_WORKERS', '4'))
+STORAGE_UPLOAD_CHUNK_SIZE = int(os.environ.get('STORAGE_UPLOAD_CHUNK_SIZE', str(1024 ** 2)))
+STORAGE_MIN_PART_SIZE     = int(os.environ.get('STORAGE_MIN_PART_SIZE', str(5 * 1024 ** 2)))
+STORAGE_MAX_MANIFEST_SEGMENTS = int(os.environ.get('STORAGE_MAX_MANIFEST_SEGMENTS', '1000'))   # Swift max_manifest_segments
+
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
     {'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator'},
@@ -3,3 +3,12 @@ from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'atonixcorp.settings')
 application = get_wsgi_application()
+
+# Start the provisioning engine and the contact import worker in every server
+# process so work left behind by a previous process is picked up (see
+# services/provisioning/jobs.py and services/marketing/service.py).
+from services.marketing.service import start_import_worker  # noqa: E402
+from services.provisioning.jobs import get_engine  # noqa: E402
+
+get_engine().start()
+start_import_worker()
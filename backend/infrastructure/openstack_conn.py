@@ -2,12 +2,18 @@
 #
 # All OpenStack API calls route through get_connection().
 # Credentials are read exclusively from environment variables (never hard-coded).
-# A module-level cache reuses the connection within the same process lifetime
-# to avoid redundant Keystone authentication on every request.
+# A process-wide ConnectionPool reuses authenticated connections keyed by
+# (project, region, credential source) so that only the first request for a
+# given project pays the Keystone round-trip and service-catalog discovery.
+# WorkspaceService.get_connection() shares the same pool.
 
 import os
 import logging
-import functools
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Hashable
+
 import openstack
 import openstack.exceptions
 
@@ -27,6 +33,160 @@ def _env(key: str, default: str | None = None) -> str | None:
     return os.environ.get(key, default)
 
 
+# ── Connection pool ────────────────────────────────────────────────────────────
+
+class ConnectionPool:
+    """
+    Thread-safe LRU cache of authenticated OpenStack connections.
+
+    - Keys are opaque hashables, normally (project, region, credential source).
+    - A per-key lock ensures that concurrent misses for the same key trigger a
+      single Keystone authentication instead of a stampede.
+    - Entries whose token expires within ``refresh_margin`` seconds are
+      dropped on checkout and rebuilt transparently.
+    - When more than ``max_size`` keys are held, the least recently used
+      connection is evicted.
+
+    Dropped connections are never closed: callers may still hold one
+    mid-request, and closing it would fail their call.  Once the last caller
+    lets go it is garbage-collected.  Per-key locks outlive their entries so
+    a thread that already holds the lock for a key cannot race a second
+    thread that would otherwise get a fresh lock for the same key.
+    """
+
+    def __init__(self, max_size: int = 32, refresh_margin: int = 300):
+        self.max_size = max_size
+        self.refresh_margin = refresh_margin
+        self._entries: "OrderedDict[Hashable, openstack.connection.Connection]" = OrderedDict()
+        self._key_locks: dict[Hashable, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "refreshes": 0,
+            "evictions": 0,
+            "auth_count": 0,
+            "auth_failures": 0,
+            "auth_seconds_total": 0.0,
+            "auth_seconds_last": 0.0,
+        }
+
+    # ── public API ────────────────────────────────────────────────────────────
+
+    def get(
+        self,
+        key: Hashable,
+        factory: Callable[[], openstack.connection.Connection],
+    ) -> openstack.connection.Connection:
+        """Return the pooled connection for ``key``, creating it with ``factory`` on a miss."""
+        conn = self._lookup(key, record=True)
+        if conn is not None:
+            return conn
+
+        with self._key_lock(key):
+            # Another thread may have populated the entry while we waited.
+            conn = self._lookup(key, record=False)
+            if conn is not None:
+                return conn
+
+            started = time.monotonic()
+            try:
+                conn = factory()
+                conn.authorize()
+            except Exception:
+                with self._lock:
+                    self._stats["auth_failures"] += 1
+                raise
+            elapsed = time.monotonic() - started
+
+            with self._lock:
+                self._stats["auth_count"] += 1
+                self._stats["auth_seconds_total"] += elapsed
+                self._stats["auth_seconds_last"] = elapsed
+                self._entries[key] = conn
+                self._entries.move_to_end(key)
+                self._evict_overflow()
+
+        logger.info("OpenStack connection authenticated for %s in %.3fs", key, elapsed)
+        return conn
+
+    def invalidate(self, key: Hashable | None = None) -> None:
+        """Drop one pooled connection (e.g. after a 401), or all of them when key is None."""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def stats(self) -> dict:
+        """Snapshot of pool counters plus the current size."""
+        with self._lock:
+            data = dict(self._stats)
+            data["size"] = len(self._entries)
+            data["max_size"] = self.max_size
+        lookups = data["hits"] + data["misses"]
+        data["hit_ratio"] = round(data["hits"] / lookups, 4) if lookups else 0.0
+        data["auth_seconds_avg"] = (
+            data["auth_seconds_total"] / data["auth_count"] if data["auth_count"] else 0.0
+        )
+        return data
+
+    # ── internals ─────────────────────────────────────────────────────────────
+
+    def _key_lock(self, key: Hashable) -> threading.Lock:
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def _lookup(self, key: Hashable, record: bool):
+        with self._lock:
+            conn = self._entries.get(key)
+            if conn is not None and self._token_expiring(conn):
+                del self._entries[key]
+                self._stats["refreshes"] += 1
+                conn = None
+            if conn is not None:
+                self._entries.move_to_end(key)
+            if record:
+                self._stats["hits" if conn is not None else "misses"] += 1
+        return conn
+
+    def _evict_overflow(self) -> None:
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def _token_expiring(self, conn) -> bool:
+        auth_ref = getattr(getattr(conn.session, "auth", None), "auth_ref", None)
+        if auth_ref is None:
+            return False
+        try:
+            return auth_ref.will_expire_soon(stale_duration=self.refresh_margin)
+        except Exception:
+            return False
+
+
+_pool = ConnectionPool(
+    max_size=int(_env("OS_CONN_POOL_SIZE", "32")),
+    refresh_margin=int(_env("OS_CONN_TOKEN_REFRESH_MARGIN", "300")),
+)
+
+
+def get_pool() -> ConnectionPool:
+    """Return the process-wide OpenStack connection pool."""
+    return _pool
+
+
+def credential_source() -> str:
+    """
+    Identify which credentials the process authenticates with, for use in
+    pool keys. Never includes the password.
+    """
+    auth_url = _env("OS_AUTH_URL")
+    if auth_url:
+        return f"env:{auth_url}:{_env('OS_USERNAME', '')}"
+    return f"cloud:{_env('OS_CLOUD', 'atonix')}"
+
+
 def get_connection() -> openstack.connection.Connection:
     """
     Return an authenticated OpenStack connection.
@@ -38,7 +198,29 @@ def get_connection() -> openstack.connection.Connection:
 
     Falls back gracefully to clouds.yaml / OS_CLOUD if the env vars are absent.
     Raises openstack.exceptions.ConfigException when no valid config is found.
+
+    The connection is served from the shared pool; only the first call per
+    process (or after token expiry) authenticates against Keystone.
+    """
+    return _pool.get(default_scope(), _connect_default)
+
+
+def default_scope() -> tuple:
     """
+    (project, region, credential source) of the default connection.
+
+    Used as its pool key, and by callers that cache per-project data fetched
+    through get_connection().
+    """
+    auth_url = _env("OS_AUTH_URL")
+    return (
+        _env("OS_PROJECT_NAME") if auth_url else None,
+        _env("OS_REGION_NAME", _DEFAULTS["region_name"]) if auth_url else None,
+        credential_source(),
+    )
+
+
+def _connect_default() -> openstack.connection.Connection:
     auth_url = _env("OS_AUTH_URL")
 
     if auth_url:
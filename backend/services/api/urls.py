@@ -6,7 +6,7 @@ from ..onboarding.views import onboarding_checklist, onboarding_checklist_update
 from ..openstack.views import (
     cloud_status,
     servers_list_create, server_detail_delete, server_start, server_stop, server_reboot,
-    flavors_list, images_list,
+    flavors_list, images_list, volume_types_list, catalog_purge,
     networks_list_create, network_delete, subnets_list_create,
     security_groups_list_create, security_group_add_rule,
     floating_ips,
@@ -257,6 +257,8 @@ urlpatterns = [
     # Flavors & Images
     path('cloud/flavors/',                               flavors_list,              name='cloud-flavors'),
     path('cloud/images/',                                images_list,               name='cloud-images'),
+    path('cloud/volume-types/',                          volume_types_list,         name='cloud-volume-types'),
+    path('cloud/catalog/purge/',                         catalog_purge,             name='cloud-catalog-purge'),
 
     # Networks
     path('cloud/networks/',                              networks_list_create,      name='cloud-networks'),
@@ -9,3 +9,5 @@ class ServicesConfig(AppConfig):
     def ready(self):
         """Register signal handlers when app is ready."""
         import services.core.signals  # noqa: F401
+        import services.monitoring.signals  # noqa: F401
+        import services.pipelines.signals  # noqa: F401
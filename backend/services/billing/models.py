@@ -174,7 +174,7 @@ UNIT_PRICES = {
 class UsageRecord(TimeStampedModel):
     owner         = models.ForeignKey(User, on_delete=models.CASCADE, related_name='usage_records')
     service       = models.CharField(max_length=64)
-    resource_id   = models.CharField(max_length=64, blank=True, db_index=True)
+    resource_id   = models.CharField(max_length=128, blank=True, db_index=True)
     metric        = models.CharField(max_length=64, choices=UsageMetric.choices)
     quantity      = models.DecimalField(max_digits=18, decimal_places=4)
     unit          = models.CharField(max_length=32)
@@ -236,6 +236,8 @@ class PlatformUsageEvent(TimeStampedModel):
     Lightweight event emitted by any platform service (compute, storage, etc.)
     when resources are consumed.  Aggregated into UsageRecord + WeeklyBillingSnapshot.
     """
+    # Set by the buffered recorder so a replayed spill file cannot insert an event twice.
+    event_uuid    = models.UUIDField(null=True, blank=True, unique=True, editable=False)
     owner         = models.ForeignKey(User, on_delete=models.CASCADE, related_name='usage_events')
     service       = models.CharField(max_length=64, db_index=True)
     resource_id   = models.CharField(max_length=128, blank=True, db_index=True)
@@ -0,0 +1,296 @@
+# AtonixCorp Cloud – Buffered Usage Recorder
+#
+# record_usage() (billing/service.py) is the entry point for platform
+# services that emit billable events from their own code paths.  Instead of
+# one INSERT into PlatformUsageEvent per event, events are appended to an
+# in-process buffer and written by a background flusher with bulk_create,
+# every ``batch_size`` events or ``flush_interval`` seconds, whichever comes
+# first.  The usage ingest API (billing/viewsets.py) still inserts
+# synchronously (sync=True), because it returns the new row's id.
+#
+# Billing events must never be lost:
+#   - if a batch cannot be written (DB down, connection reset) it is appended
+#     to a JSON-lines spill file and replayed ahead of the next batch;
+#   - if the buffer is full, overflow goes straight to the spill file;
+#   - an atexit hook drains the buffer when the process shuts down.
+#
+# ...nor billed twice:
+#   - every event carries an event_uuid (unique column) and is inserted with
+#     ignore_conflicts, so replaying a spill that was already written – e.g.
+#     after a crash between the INSERT and removing the file – is a no-op;
+#   - the spill file is shared by every process on the host: appends and the
+#     rotation to ``.replaying`` hold an flock on ``<spill>.lock``, and a
+#     whole replay holds ``<spill>.replay.lock``.
+#
+# Rows the DB rejects (IntegrityError / DataError, e.g. the owner was deleted
+# while the event was buffered) are isolated by bisecting the batch and moved
+# to ``<spill>.dead`` so one bad row cannot wedge the replay.
+
+import atexit
+import fcntl
+import json
+import logging
+import os
+import threading
+import uuid
+from collections import deque
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import DatabaseError, DataError, IntegrityError, close_old_connections, transaction
+from django.utils.dateparse import parse_datetime
+
+logger = logging.getLogger(__name__)
+
+_EVENT_FIELDS = (
+    'event_uuid', 'owner_id', 'service', 'resource_id', 'resource_type', 'metric',
+    'quantity', 'unit', 'unit_price', 'cost', 'event_time',
+)
+
+
+def _setting(name: str, default):
+    return getattr(settings, name, default)
+
+
+def _encode(event: dict) -> str:
+    return json.dumps({
+        **event,
+        'quantity':   str(event['quantity']),
+        'unit_price': str(event['unit_price']),
+        'cost':       str(event['cost']),
+        'event_time': event['event_time'].isoformat(),
+        'event_uuid': str(event['event_uuid']) if event.get('event_uuid') else None,
+    })
+
+
+def _decode(line: str) -> dict:
+    raw = json.loads(line)
+    return {
+        **raw,
+        'quantity':   Decimal(raw['quantity']),
+        'unit_price': Decimal(raw['unit_price']),
+        'cost':       Decimal(raw['cost']),
+        'event_time': parse_datetime(raw['event_time']),
+        'event_uuid': uuid.UUID(raw['event_uuid']) if raw.get('event_uuid') else None,
+    }
+
+
+class UsageRecorder:
+    """
+    Bounded FIFO of usage-event field dicts drained by a daemon flusher thread.
+
+    Events are plain dicts keyed by _EVENT_FIELDS so they can be spilled to
+    disk and replayed without touching the ORM.
+    """
+
+    def __init__(self, capacity: int, batch_size: int, flush_interval: float, spill_path: str):
+        self.capacity = capacity
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.spill_path = spill_path
+        self._events: deque = deque()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()      # one writer (flusher, shutdown or caller) at a time
+        self._wakeup = threading.Event()
+        self._worker_started = False
+        self._stats = {'recorded': 0, 'written': 0, 'batches': 0, 'spilled': 0, 'replayed': 0,
+                       'dead_lettered': 0}
+
+    # ── producer side ─────────────────────────────────────────────────────────
+
+    def record(self, event: dict) -> None:
+        """Queue one event; overflow beyond capacity is spilled to disk."""
+        self._ensure_worker()
+        event.setdefault('event_uuid', uuid.uuid4())
+        with self._lock:
+            self._stats['recorded'] += 1
+            if len(self._events) < self.capacity:
+                self._events.append(event)
+                overflow = False
+            else:
+                overflow = True
+            full_batch = len(self._events) >= self.batch_size
+        if overflow:
+            # Only the spill file's flock is needed: never wait behind a
+            # flusher that is stuck on an unavailable DB.
+            self._spill([event])
+        if full_batch:
+            self._wakeup.set()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                **self._stats,
+                'buffered': len(self._events),
+                'capacity': self.capacity,
+                'batch_size': self.batch_size,
+                'spill_pending': os.path.exists(self.spill_path),
+            }
+
+    # ── consumer side ─────────────────────────────────────────────────────────
+
+    def flush(self) -> int:
+        """Synchronously drain spilled and buffered events; returns rows written."""
+        with self._flush_lock:
+            written = self._replay_spill()
+            if written < 0:
+                # DB still unavailable – park everything buffered on disk too.
+                with self._lock:
+                    pending = list(self._events)
+                    self._events.clear()
+                self._spill(pending)
+                return 0
+            while True:
+                with self._lock:
+                    batch = [self._events.popleft() for _ in range(min(self.batch_size, len(self._events)))]
+                if not batch:
+                    return written
+                if not self._write(batch):
+                    self._spill(batch)
+                    continue
+                written += len(batch)
+                with self._lock:
+                    self._stats['written'] += len(batch)
+
+    def close(self) -> None:
+        """Flush-on-shutdown hook."""
+        try:
+            self.flush()
+        except Exception:
+            logger.exception('Usage recorder shutdown flush failed')
+
+    def _write(self, batch: list[dict]) -> bool:
+        """
+        Insert ``batch``; False if the DB is unavailable (retry later).  Rows
+        the DB rejects are dead-lettered and count as handled.
+        """
+        from .models import PlatformUsageEvent
+
+        nested = transaction.get_connection().in_atomic_block
+        try:
+            with transaction.atomic():
+                PlatformUsageEvent.objects.bulk_create(
+                    [PlatformUsageEvent(processed=False, **event) for event in batch],
+                    ignore_conflicts=True,
+                )
+                if nested:
+                    # FK checks are deferred to the outermost commit; run them
+                    # now so a bad row fails this savepoint, not the caller.
+                    transaction.get_connection().check_constraints(
+                        table_names=[PlatformUsageEvent._meta.db_table],
+                    )
+        except (IntegrityError, DataError):
+            if len(batch) == 1:
+                logger.exception('Usage event rejected; moving it to %s.dead', self.spill_path)
+                self._dead_letter(batch)
+                return True
+            mid = len(batch) // 2
+            return self._write(batch[:mid]) and self._write(batch[mid:])
+        except DatabaseError:
+            logger.exception('Usage event batch write failed; spilling %d events to %s', len(batch), self.spill_path)
+            return False
+        with self._lock:
+            self._stats['batches'] += 1
+        return True
+
+    def _file_lock(self, suffix: str):
+        """Exclusive flock on ``<spill_path><suffix>``, shared by all processes on the host."""
+        directory = os.path.dirname(self.spill_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        return _FileLock(self.spill_path + suffix)
+
+    def _append(self, path: str, events: list[dict]) -> None:
+        with self._file_lock('.lock'), open(path, 'a', encoding='utf-8') as fh:
+            fh.writelines(_encode(event) + '\n' for event in events)
+            fh.flush()
+            os.fsync(fh.fileno())
+
+    def _spill(self, events: list[dict]) -> None:
+        if not events:
+            return
+        self._append(self.spill_path, events)
+        with self._lock:
+            self._stats['spilled'] += len(events)
+
+    def _dead_letter(self, events: list[dict]) -> None:
+        self._append(self.spill_path + '.dead', events)
+        with self._lock:
+            self._stats['dead_lettered'] += len(events)
+
+    def _replay_spill(self) -> int:
+        """Write spilled events back; returns rows written, or -1 if the DB is still down."""
+        replaying = self.spill_path + '.replaying'
+        if not os.path.exists(self.spill_path) and not os.path.exists(replaying):
+            return 0
+
+        replayed = 0
+        with self._file_lock('.replay.lock'):
+            while True:
+                # A leftover .replaying (failed or crashed replay) goes first.
+                if not os.path.exists(replaying):
+                    with self._file_lock('.lock'):
+                        if not os.path.exists(self.spill_path):
+                            break
+                        os.replace(self.spill_path, replaying)
+                with open(replaying, encoding='utf-8') as fh:
+                    events = [_decode(line) for line in fh if line.strip()]
+                for i in range(0, len(events), self.batch_size):
+                    if not self._write(events[i:i + self.batch_size]):
+                        return -1       # keep .replaying; written rows are skipped next time
+                os.remove(replaying)
+                replayed += len(events)
+
+        if replayed:
+            with self._lock:
+                self._stats['replayed'] += replayed
+                self._stats['written'] += replayed
+            logger.info('Replayed %d spilled usage events', replayed)
+        return replayed
+
+    def _worker_loop(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('Usage recorder flush failed')
+            finally:
+                close_old_connections()
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._worker_started:
+                return
+            worker = threading.Thread(target=self._worker_loop, name='billing-usage-flusher', daemon=True)
+            worker.start()
+            atexit.register(self.close)
+            self._worker_started = True
+
+
+class _FileLock:
+    def __init__(self, path: str):
+        self.path = path
+
+    def __enter__(self):
+        self._fh = open(self.path, 'a')
+        fcntl.flock(self._fh, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        fcntl.flock(self._fh, fcntl.LOCK_UN)
+        self._fh.close()
+
+
+_recorder = UsageRecorder(
+    capacity=_setting('BILLING_USAGE_BUFFER_SIZE', 50_000),
+    batch_size=_setting('BILLING_USAGE_BATCH_SIZE', 500),
+    flush_interval=_setting('BILLING_USAGE_FLUSH_INTERVAL', 0.5),
+    spill_path=str(_setting('BILLING_USAGE_SPILL_PATH', 'billing_usage_spill.jsonl')),
+)
+
+
+def get_recorder() -> UsageRecorder:
+    """Return the process-wide usage event recorder."""
+    return _recorder
@@ -7,10 +7,13 @@ import random
 import uuid
 from datetime import date, timedelta, datetime
 from decimal import Decimal
+from django.conf import settings
 from django.utils import timezone
 from django.db.models import Sum, Avg, Count, Q
 from django.db import transaction
 
+from .recorder import get_recorder
+
 
 def _live() -> bool:
     import os
@@ -103,11 +106,16 @@ def _week_bounds(d: date):
 # ── Usage Ingestion ────────────────────────────────────────────────────────────
 
 def record_usage(owner, service, metric, quantity, unit='',
-                 resource_id='', resource_type='', event_time=None, unit_price=None):
+                 resource_id='', resource_type='', event_time=None, unit_price=None, sync=False):
     """
     Called by any platform service (compute, storage, containers, etc.)
     to record a billable usage event.
 
+    By default the event is handed to the buffered recorder (recorder.py) and
+    written in the background, so the caller's request never waits on a
+    billing INSERT; the returned PlatformUsageEvent is then unsaved. Pass
+    sync=True (or set BILLING_USAGE_ASYNC = False) to insert immediately.
+
     Usage example (from containers or compute service):
         from services.billing.service import record_usage
         record_usage(
@@ -126,8 +134,8 @@ def record_usage(owner, service, metric, quantity, unit='',
         unit = _unit_for(metric)
     if event_time is None:
         event_time = timezone.now()
-    return PlatformUsageEvent.objects.create(
-        owner=owner,
+    fields = dict(
+        owner_id=owner.pk,
         service=service,
         resource_id=resource_id or '',
         resource_type=resource_type or '',
@@ -137,112 +145,235 @@ def record_usage(owner, service, metric, quantity, unit='',
         unit_price=Decimal(str(price)),
         cost=Decimal(str(cost)),
         event_time=event_time,
-        processed=False,
     )
+    if sync or not getattr(settings, 'BILLING_USAGE_ASYNC', True):
+        return PlatformUsageEvent.objects.create(processed=False, **fields)
+    get_recorder().record(fields)
+    return PlatformUsageEvent(processed=False, **fields)
 
 
-def flush_usage_events(owner=None) -> int:
+def flush_usage_events(owner=None, chunk_size: int | None = None) -> int:
     """
     Aggregate unprocessed PlatformUsageEvents into UsageRecord rows.
     Pass owner=None to process all users (for cron jobs).
     Returns number of events processed.
+
+    Events are drained in chunks of BILLING_FLUSH_CHUNK_SIZE. Each chunk is its
+    own transaction: claim the event ids with SELECT ... FOR UPDATE SKIP LOCKED,
+    roll them up per (owner, service, resource, metric, day) in SQL,
+    bulk_create the UsageRecords and mark the events processed with a single
+    UPDATE. Concurrent workers therefore claim disjoint chunks, and an event
+    is only ever marked processed in the same transaction that bills it.
     """
-    from .models import PlatformUsageEvent, UsageRecord
-    qs = PlatformUsageEvent.objects.filter(processed=False)
+    from .models import PlatformUsageEvent
+
+    get_recorder().flush()      # include events still buffered in this process
+    chunk_size = chunk_size or getattr(settings, 'BILLING_FLUSH_CHUNK_SIZE', 5000)
+    pending = PlatformUsageEvent.objects.filter(processed=False)
     if owner:
-        qs = qs.filter(owner=owner)
+        pending = pending.filter(owner=owner)
+
     count = 0
-    with transaction.atomic():
-        for evt in qs.select_related('owner').select_for_update():
-            day_start = evt.event_time.replace(hour=0, minute=0, second=0, microsecond=0)
-            day_end   = day_start + timedelta(days=1)
-            UsageRecord.objects.create(
-                owner=evt.owner,
-                service=evt.service,
-                resource_id=evt.resource_id,
-                metric=evt.metric,
-                quantity=evt.quantity,
-                unit=evt.unit,
-                unit_price=evt.unit_price,
-                cost=evt.cost,
-                period_start=day_start,
-                period_end=day_end,
+    while True:
+        with transaction.atomic():
+            ids = list(
+                pending.order_by('id')
+                .select_for_update(skip_locked=True)
+                .values_list('id', flat=True)[:chunk_size]
             )
-            evt.processed = True
-            evt.save(update_fields=['processed'])
-            count += 1
+            if not ids:
+                break
+            _flush_chunk(ids)
+        count += len(ids)
+        if len(ids) < chunk_size:
+            break
     return count
 
 
+def _flush_chunk(ids: list) -> None:
+    """Roll one claimed chunk of events up into daily UsageRecords (caller holds the locks)."""
+    from django.db.models import Max
+    from django.db.models.functions import TruncDay
+    from .models import PlatformUsageEvent, UsageRecord
+
+    rollup = (
+        PlatformUsageEvent.objects.filter(id__in=ids)
+        .annotate(day=TruncDay('event_time'))
+        .values('owner_id', 'service', 'resource_id', 'metric', 'day')
+        .annotate(
+            total_quantity=Sum('quantity'),
+            total_cost=Sum('cost'),
+            unit=Max('unit'),
+            unit_price=Max('unit_price'),
+        )
+        .order_by()
+    )
+    UsageRecord.objects.bulk_create([
+        UsageRecord(
+            owner_id=row['owner_id'],
+            service=row['service'],
+            resource_id=row['resource_id'],
+            metric=row['metric'],
+            quantity=row['total_quantity'],
+            unit=row['unit'],
+            unit_price=row['unit_price'],
+            cost=row['total_cost'],
+            period_start=row['day'],
+            period_end=row['day'] + timedelta(days=1),
+        )
+        for row in rollup
+    ])
+    PlatformUsageEvent.objects.filter(id__in=ids).update(processed=True)
+
+
 # ── Weekly Snapshot Calculation ────────────────────────────────────────────────
 
-def calculate_weekly_snapshots(owner=None, weeks_back=12) -> int:
+def calculate_weekly_snapshots(owner=None, weeks_back=12, owner_ids=None, flush=True) -> int:
     """
     Aggregate UsageRecord rows into WeeklyBillingSnapshot per user/service/week.
     Falls back to deterministic mock data when no real records exist.
     Should be called every Monday by the management command or Celery beat.
     Returns number of snapshot rows written/updated.
+
+    Pass owner_ids to restrict a run to one shard of users (the management
+    command fans shards out over a process pool); flush=False skips draining
+    pending usage events first.
+
+    Work per chunk of users is one grouped aggregate over UsageRecord bucketed
+    by ISO week, one read of the existing '__total__' snapshots, and bulk
+    upserts. Only dirty (user, week) cells are rewritten: weeks whose records
+    changed since their snapshot was written (newer updated_at, or a different
+    set of services / record count per service, which catches deletions),
+    weeks that gained their first records (mock → real), and weeks that lost
+    all of them (real → mock). Service rows of a rewritten week that are no
+    longer in the rollup are deleted.
     """
-    from .models import UsageRecord, WeeklyBillingSnapshot
     from django.contrib.auth.models import User
-    from django.db.models import Sum as DSum
 
-    flush_usage_events(owner)
+    if flush:
+        flush_usage_events(owner)
 
-    owners = [owner] if owner else list(User.objects.filter(is_active=True))
-    today  = date.today()
-    count  = 0
+    if owner is not None:
+        owner_ids = [owner.pk]
+    elif owner_ids is None:
+        owner_ids = list(User.objects.filter(is_active=True).order_by('id').values_list('id', flat=True))
 
-    for u in owners:
-        for w in range(weeks_back, -1, -1):
-            week_start, week_end = _week_bounds(today - timedelta(weeks=w))
-            iso_year, iso_week, _ = week_start.isocalendar()
+    today = date.today()
+    weeks = [_week_bounds(today - timedelta(weeks=w)) for w in range(weeks_back, -1, -1)]
+    count = 0
+    for i in range(0, len(owner_ids), _SNAPSHOT_OWNER_CHUNK):
+        count += _snapshot_owner_chunk(owner_ids[i:i + _SNAPSHOT_OWNER_CHUNK], weeks)
+    return count
 
-            records = UsageRecord.objects.filter(
-                owner=u,
-                period_start__date__gte=week_start,
-                period_start__date__lte=week_end,
-            )
-            if records.exists():
-                by_service = list(
-                    records.values('service')
-                    .annotate(total_cost=DSum('cost'), total_units=DSum('quantity'), record_count=Count('id'))
+
+_SNAPSHOT_OWNER_CHUNK = 500
+_SNAPSHOT_UPDATE_FIELDS = [
+    'week_end', 'week_number', 'year', 'total_cost', 'total_units', 'record_count', 'is_mock', 'updated_at',
+]
+
+
+def _snapshot_owner_chunk(owner_ids: list, weeks: list) -> int:
+    from django.db.models import DateField, Max
+    from django.db.models.functions import TruncWeek
+    from .models import UsageRecord, WeeklyBillingSnapshot
+
+    first_monday, last_sunday = weeks[0][0], weeks[-1][1]
+
+    # (owner_id, week_start) → {'services': [row, ...], 'last_change': datetime}
+    usage: dict[tuple, dict] = {}
+    rollup = (
+        UsageRecord.objects.filter(
+            owner_id__in=owner_ids,
+            period_start__date__gte=first_monday,
+            period_start__date__lte=last_sunday,
+        )
+        .annotate(week_start=TruncWeek('period_start', output_field=DateField()))
+        .values('owner_id', 'week_start', 'service')
+        .annotate(
+            total_cost=Sum('cost'), total_units=Sum('quantity'),
+            record_count=Count('id'), last_change=Max('updated_at'),
+        )
+        .order_by()
+    )
+    for row in rollup:
+        cell = usage.setdefault((row['owner_id'], row['week_start']), {'services': [], 'last_change': row['last_change']})
+        cell['services'].append(row)
+        cell['last_change'] = max(cell['last_change'], row['last_change'])
+
+    # (owner_id, week_start) → {'services': {service: record_count}, 'updated_at', 'is_mock'}
+    existing: dict[tuple, dict] = {}
+    for oid, week_start, service, record_count, updated_at, is_mock in WeeklyBillingSnapshot.objects.filter(
+        owner_id__in=owner_ids, week_start__gte=first_monday, week_start__lte=last_sunday,
+    ).values_list('owner_id', 'week_start', 'service', 'record_count', 'updated_at', 'is_mock'):
+        prev = existing.setdefault((oid, week_start), {'services': {}, 'updated_at': None, 'is_mock': True})
+        if service == '__total__':
+            prev.update(updated_at=updated_at, is_mock=is_mock)
+        else:
+            prev['services'][service] = record_count
+
+    snapshots, stale = [], {}
+    for oid in owner_ids:
+        for week_start, week_end in weeks:
+            cell = usage.get((oid, week_start))
+            prev = existing.get((oid, week_start))
+            if prev is None or prev['updated_at'] is None:
+                dirty = True
+            elif cell:
+                dirty = (
+                    prev['is_mock']
+                    or cell['last_change'] > prev['updated_at']
+                    or prev['services'] != {r['service']: r['record_count'] for r in cell['services']}
                 )
-                total_cost = sum(float(r['total_cost']) for r in by_service)
-                is_mock = False
             else:
-                service_costs = _mock_weekly_cost_by_service(week_start)
+                dirty = not prev['is_mock']
+            if not dirty:
+                continue
+
+            if cell:
+                by_service = cell['services']
+            else:
                 by_service = [
-                    {'service': svc, 'total_cost': Decimal(str(cost)),
-                     'total_units': Decimal('0'), 'record_count': 0}
-                    for svc, cost in service_costs.items()
+                    {'service': svc, 'total_cost': Decimal(str(cost)), 'total_units': Decimal('0'), 'record_count': 0}
+                    for svc, cost in _mock_weekly_cost_by_service(week_start).items()
                 ]
-                total_cost = sum(service_costs.values())
-                is_mock = True
-
-            with transaction.atomic():
-                for row in by_service:
-                    WeeklyBillingSnapshot.objects.update_or_create(
-                        owner=u, week_start=week_start, service=row['service'],
-                        defaults=dict(
-                            week_end=week_end, week_number=iso_week, year=iso_year,
-                            total_cost=Decimal(str(round(float(row['total_cost']), 4))),
-                            total_units=Decimal(str(row.get('total_units', 0))),
-                            record_count=row.get('record_count', 0),
-                            is_mock=is_mock,
-                        ),
-                    )
-                    count += 1
-                WeeklyBillingSnapshot.objects.update_or_create(
-                    owner=u, week_start=week_start, service='__total__',
-                    defaults=dict(
-                        week_end=week_end, week_number=iso_week, year=iso_year,
-                        total_cost=Decimal(str(round(total_cost, 4))),
-                        total_units=Decimal('0'), record_count=0, is_mock=is_mock,
-                    ),
-                )
-                count += 1
-    return count
+            total_cost = sum(float(r['total_cost']) for r in by_service)
+            record_count = sum(r['record_count'] for r in by_service)
+            by_service = by_service + [
+                {'service': '__total__', 'total_cost': total_cost, 'total_units': Decimal('0'),
+                 'record_count': record_count},
+            ]
+
+            iso_year, iso_week, _ = week_start.isocalendar()
+            for row in by_service:
+                snapshots.append(WeeklyBillingSnapshot(
+                    owner_id=oid, week_start=week_start, week_end=week_end,
+                    week_number=iso_week, year=iso_year, service=row['service'],
+                    total_cost=Decimal(str(round(float(row['total_cost']), 4))),
+                    total_units=Decimal(str(row.get('total_units') or 0)),
+                    record_count=row.get('record_count', 0),
+                    is_mock=not cell,
+                ))
+            if prev is not None:
+                # Services that dropped out of the week (e.g. mock rows once
+                # real usage arrives) are not touched by the upsert below.
+                for service in set(prev['services']) - {row['service'] for row in by_service}:
+                    stale.setdefault((week_start, service), []).append(oid)
+
+    if not snapshots:
+        return 0
+    with transaction.atomic():
+        WeeklyBillingSnapshot.objects.bulk_create(
+            snapshots,
+            batch_size=1000,
+            update_conflicts=True,
+            unique_fields=['owner', 'week_start', 'service'],
+            update_fields=_SNAPSHOT_UPDATE_FIELDS,
+        )
+        for (week_start, service), oids in stale.items():
+            WeeklyBillingSnapshot.objects.filter(
+                week_start=week_start, service=service, owner_id__in=oids,
+            ).delete()
+    return len(snapshots)
 
 
 def get_weekly_snapshots(owner, weeks=12) -> list:
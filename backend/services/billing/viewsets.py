@@ -201,6 +201,7 @@ class UsageIngestViewSet(viewsets.ViewSet):
             resource_type=d.get('resource_type', ''),
             event_time=d.get('event_time'),
             unit_price=float(d['unit_price']) if d.get('unit_price') is not None else None,
+            sync=True,
         )
         return Response({
             'id':         evt.id,
@@ -14,10 +14,7 @@ from decimal import Decimal
 from django.utils import timezone
 from django.db.models import Sum, Count, Q
 
-from ..core.models import (
-    Instance, StorageBucket, StorageVolume, FileShare,
-    LoadBalancer, KubernetesCluster, ServerlessFunction,
-)
+from .costing import CostingEngine
 
 
 class BillingService:
@@ -95,7 +92,7 @@ class BillingService:
                 hours = 0
 
         hourly_rate = Decimal(
-            self.PRICING['compute']['instance'].get(instance.flavor.instance_type, 0.1)
+            self.PRICING['compute']['instance'].get(instance.flavor.name, 0.1)
         )
         cost = hourly_rate * Decimal(str(hours))
 
@@ -120,7 +117,7 @@ class BillingService:
 
         # Get pricing based on storage class
         monthly_rate = Decimal(
-            self.PRICING['storage']['bucket'].get(bucket.default_storage_class, 0.023)
+            self.PRICING['storage']['bucket']['standard']
         )
 
         # Prorate for number of days
@@ -210,7 +207,7 @@ class BillingService:
             Decimal: Cost in USD (based on invocation count and compute time)
         """
         # Estimate average invocations per day
-        daily_invocations = max(1, function.invocations / max(1, days))
+        daily_invocations = max(1, function.invocation_count / max(1, days))
 
         # Invocation cost
         invocation_rate = Decimal(self.PRICING['compute']['serverless']['invocation'])
@@ -237,104 +234,13 @@ class BillingService:
 
         Returns:
             Dict with cost breakdown by service
-        """
-        if not year:
-            year = self.current_time.year
-        if not month:
-            month = self.current_time.month
-
-        # Calculate number of days in month
-        if month == 12:
-            next_month = datetime(year + 1, 1, 1)
-        else:
-            next_month = datetime(year, month + 1, 1)
-        current_month = datetime(year, month, 1)
-        days_in_month = (next_month - current_month).days
-
-        costs = {
-            'compute': {
-                'instances': Decimal('0'),
-                'kubernetes': Decimal('0'),
-                'serverless': Decimal('0'),
-                'subtotal': Decimal('0'),
-            },
-            'storage': {
-                'buckets': Decimal('0'),
-                'volumes': Decimal('0'),
-                'snapshots': Decimal('0'),
-                'subtotal': Decimal('0'),
-            },
-            'networking': {
-                'load_balancers': Decimal('0'),
-                'nat_gateways': Decimal('0'),
-                'vpn': Decimal('0'),
-                'subtotal': Decimal('0'),
-            },
-            'total': Decimal('0'),
-        }
-
-        # Calculate instance costs
-        instances = Instance.objects.filter(owner=user).exclude(status='terminated')
-        for instance in instances:
-            cost = self.calculate_instance_cost(instance, days_in_month * 24)
-            costs['compute']['instances'] += cost
-
-        # Calculate storage bucket costs
-        buckets = StorageBucket.objects.filter(owner=user).exclude(status='deleted')
-        for bucket in buckets:
-            cost = self.calculate_storage_bucket_cost(bucket, days_in_month)
-            costs['storage']['buckets'] += cost
-
-        # Calculate volume costs
-        volumes = StorageVolume.objects.filter(owner=user).exclude(status='deleted')
-        for volume in volumes:
-            cost = self.calculate_volume_cost(volume, days_in_month)
-            costs['storage']['volumes'] += cost
-
-        # Calculate load balancer costs
-        load_balancers = LoadBalancer.objects.filter(owner=user)
-        for lb in load_balancers:
-            cost = self.calculate_load_balancer_cost(lb, days_in_month)
-            costs['networking']['load_balancers'] += cost
-
-        # Calculate Kubernetes costs
-        clusters = KubernetesCluster.objects.filter(owner=user).exclude(status='deleted')
-        for cluster in clusters:
-            cost = self.calculate_kubernetes_cluster_cost(cluster, days_in_month)
-            costs['compute']['kubernetes'] += cost
-
-        # Calculate serverless costs
-        functions = ServerlessFunction.objects.filter(owner=user)
-        for function in functions:
-            cost = self.calculate_serverless_function_cost(function, days_in_month)
-            costs['compute']['serverless'] += cost
-
-        # Calculate subtotals
-        costs['compute']['subtotal'] = (
-            costs['compute']['instances'] +
-            costs['compute']['kubernetes'] +
-            costs['compute']['serverless']
-        )
 
-        costs['storage']['subtotal'] = (
-            costs['storage']['buckets'] +
-            costs['storage']['volumes'] +
-            costs['storage']['snapshots']
-        )
-
-        costs['networking']['subtotal'] = (
-            costs['networking']['load_balancers'] +
-            costs['networking']['nat_gateways'] +
-            costs['networking']['vpn']
-        )
-
-        costs['total'] = (
-            costs['compute']['subtotal'] +
-            costs['storage']['subtotal'] +
-            costs['networking']['subtotal']
-        )
-
-        return costs
+        Costs come from the set-based CostingEngine (six grouped queries)
+        rather than per-resource loops over the calculate_*_cost methods.
+        """
+        return CostingEngine(self.PRICING).monthly_costs(
+            [user.pk], year or self.current_time.year, month or self.current_time.month,
+        )[user.pk]
 
     def estimate_monthly_cost(self, user):
         """
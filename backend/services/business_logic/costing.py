@@ -0,0 +1,179 @@
+"""
+Set-based Costing Engine
+
+Computes monthly cost breakdowns for many users at once:
+- One grouped aggregate query per resource type (six in total), regardless
+  of how many users or resources exist
+- Each grouped row is joined against the pricing table (BillingService.PRICING)
+  by its price key (flavor, storage class, volume type)
+- Produces the same breakdown shape as BillingService.calculate_user_monthly_cost
+"""
+
+from datetime import datetime
+from decimal import Decimal
+
+from django.db.models import Count, F, Sum, Value
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from ..core.models import (
+    Instance, StorageBucket, StorageVolume,
+    LoadBalancer, KubernetesCluster, ServerlessFunction,
+)
+
+# Serverless compute is billed on an assumed 100ms average execution.
+SERVERLESS_AVG_EXECUTION_SECONDS = Decimal('0.1')
+PROVISIONED_IOPS_RATE = Decimal('0.065')
+
+
+def days_in_month(year, month):
+    """Number of days in the given month."""
+    if month == 12:
+        next_month = datetime(year + 1, 1, 1)
+    else:
+        next_month = datetime(year, month + 1, 1)
+    return (next_month - datetime(year, month, 1)).days
+
+
+def empty_breakdown():
+    """Zeroed cost breakdown in the shape returned by calculate_user_monthly_cost."""
+    return {
+        'compute': {
+            'instances': Decimal('0'),
+            'kubernetes': Decimal('0'),
+            'serverless': Decimal('0'),
+            'subtotal': Decimal('0'),
+        },
+        'storage': {
+            'buckets': Decimal('0'),
+            'volumes': Decimal('0'),
+            'snapshots': Decimal('0'),
+            'subtotal': Decimal('0'),
+        },
+        'networking': {
+            'load_balancers': Decimal('0'),
+            'nat_gateways': Decimal('0'),
+            'vpn': Decimal('0'),
+            'subtotal': Decimal('0'),
+        },
+        'total': Decimal('0'),
+    }
+
+
+class CostingEngine:
+    """Compute per-user, per-service monthly costs with grouped SQL aggregates."""
+
+    def __init__(self, pricing=None):
+        if pricing is None:
+            from .billing import BillingService
+            pricing = BillingService.PRICING
+        self.pricing = pricing
+
+    def monthly_costs(self, user_ids=None, year=None, month=None):
+        """
+        Calculate monthly cost breakdowns for many users.
+
+        Args:
+            user_ids: Iterable of user ids (default: every user owning a resource)
+            year: Year (default current)
+            month: Month (default current)
+
+        Returns:
+            Dict of {user_id: breakdown}; requested users without resources get
+            a zeroed breakdown
+        """
+        now = timezone.now()
+        days = Decimal(days_in_month(year or now.year, month or now.month))
+        scope = {} if user_ids is None else {'owner_id__in': list(user_ids)}
+
+        costs = {}
+        if user_ids is not None:
+            costs = {uid: empty_breakdown() for uid in scope['owner_id__in']}
+
+        def add(owner_id, service, item, amount):
+            costs.setdefault(owner_id, empty_breakdown())[service][item] += amount
+
+        compute = self.pricing['compute']
+        storage = self.pricing['storage']
+        networking = self.pricing['networking']
+        hours = days * 24
+
+        # Instances: flavor rate × hours in month
+        rows = (
+            Instance.objects.filter(**scope).exclude(status='terminated')
+            .values('owner_id', 'flavor__name').annotate(n=Count('pk')).order_by()
+        )
+        for row in rows:
+            rate = Decimal(compute['instance'].get(row['flavor__name'], 0.1))
+            add(row['owner_id'], 'compute', 'instances', rate * hours * row['n'])
+
+        # Buckets: storage-class rate × GB stored, prorated by day
+        rows = (
+            StorageBucket.objects.filter(**scope).exclude(status='deleted')
+            .values('owner_id').annotate(size_bytes=Sum('total_size_bytes')).order_by()
+        )
+        bucket_rate = Decimal(storage['bucket']['standard'])
+        for row in rows:
+            size_gb = Decimal(str((row['size_bytes'] or 0) / (1024 ** 3)))
+            add(row['owner_id'], 'storage', 'buckets', bucket_rate * size_gb / 30 * days)
+
+        # Volumes: volume-type rate × GB, plus provisioned IOPS on io1/io2
+        rows = (
+            StorageVolume.objects.filter(**scope).exclude(status='deleted')
+            .values('owner_id', 'volume_type')
+            .annotate(size_gb=Sum('size_gb'), iops=Sum('iops')).order_by()
+        )
+        for row in rows:
+            rate = Decimal(storage['volume'].get(row['volume_type'], 0.1))
+            cost = rate * Decimal(row['size_gb'] or 0) / 30 * days
+            if row['volume_type'] in ('io1', 'io2') and row['iops']:
+                cost += PROVISIONED_IOPS_RATE * Decimal(row['iops']) * days
+            add(row['owner_id'], 'storage', 'volumes', cost)
+
+        # Load balancers: flat hourly rate
+        rows = LoadBalancer.objects.filter(**scope).values('owner_id').annotate(n=Count('pk')).order_by()
+        lb_rate = Decimal(networking['load_balancer'])
+        for row in rows:
+            add(row['owner_id'], 'networking', 'load_balancers', lb_rate * 24 * days * row['n'])
+
+        # Kubernetes: per-cluster base rate + per-node rate
+        rows = (
+            KubernetesCluster.objects.filter(**scope).exclude(status='deleted')
+            .values('owner_id').annotate(n=Count('pk'), nodes=Sum('node_count')).order_by()
+        )
+        base_rate = Decimal(compute['kubernetes']['base'])
+        node_rate = Decimal(compute['kubernetes']['node'])
+        for row in rows:
+            add(row['owner_id'], 'compute', 'kubernetes',
+                base_rate * hours * row['n'] + node_rate * hours * (row['nodes'] or 0))
+
+        # Serverless: invocations (at least one a day) × (request rate + GB-second rate)
+        billed = Greatest('invocation_count', Value(int(days)))
+        rows = (
+            ServerlessFunction.objects.filter(**scope).values('owner_id')
+            .annotate(invocations=Sum(billed), mb_invocations=Sum(billed * F('memory_mb'))).order_by()
+        )
+        invocation_rate = Decimal(compute['serverless']['invocation'])
+        gb_second_rate = Decimal(compute['serverless']['compute'])
+        for row in rows:
+            gb_seconds = Decimal(row['mb_invocations'] or 0) / 1024 * SERVERLESS_AVG_EXECUTION_SECONDS
+            add(row['owner_id'], 'compute', 'serverless',
+                invocation_rate * Decimal(row['invocations'] or 0) + gb_second_rate * gb_seconds)
+
+        for breakdown in costs.values():
+            _total(breakdown)
+        return costs
+
+
+def _total(costs):
+    costs['compute']['subtotal'] = (
+        costs['compute']['instances'] + costs['compute']['kubernetes'] + costs['compute']['serverless']
+    )
+    costs['storage']['subtotal'] = (
+        costs['storage']['buckets'] + costs['storage']['volumes'] + costs['storage']['snapshots']
+    )
+    costs['networking']['subtotal'] = (
+        costs['networking']['load_balancers'] + costs['networking']['nat_gateways'] + costs['networking']['vpn']
+    )
+    costs['total'] = costs['compute']['subtotal'] + costs['storage']['subtotal'] + costs['networking']['subtotal']
+    return costs
@@ -29,6 +29,7 @@ from ..core.models import (
     EncryptionKey, BackupPolicy, Backup,
     StorageMetric,
 )
+from ..storage import counters as bucket_counters
 from .exceptions import (
     StorageError, BucketError, BucketNotFoundError,
     VolumeError, VolumeNotFoundError,
@@ -180,13 +181,17 @@ class StorageService:
             raise BucketNotFoundError("Bucket not found")
 
         # Check if bucket has objects
-        object_count = S3Object.objects.filter(bucket=bucket).count()
-        if object_count > 0 and not force:
-            raise ResourceInUseError(f"Bucket contains {object_count} objects. Set force=True to delete.")
+        if not force and S3Object.objects.filter(bucket=bucket).exists():
+            raise ResourceInUseError(
+                f"Bucket contains {bucket.total_objects} objects. Set force=True to delete."
+            )
 
         # Delete all objects if force=True
         if force:
             S3Object.objects.filter(bucket=bucket).delete()
+            bucket.total_objects = 0
+            bucket.total_size_bytes = 0
+            bucket.save(update_fields=StorageBucket.COUNTER_FIELDS)
 
         bucket.status = 'deleting'
         bucket.save()
@@ -232,10 +237,8 @@ class StorageService:
             metadata=object_data.get('metadata', {}),
         )
 
-        # Update bucket storage size
-        bucket.total_size_bytes += obj.size_bytes
-        bucket.object_count = S3Object.objects.filter(bucket=bucket).count()
-        bucket.save()
+        # Update bucket counters
+        bucket_counters.apply_delta(bucket.pk, objects=1, size_bytes=obj.size_bytes)
 
         self._audit_log(user, 'object_uploaded', obj.id, {'bucket': bucket.bucket_name, 'key': obj.key})
         return obj
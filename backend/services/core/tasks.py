@@ -447,17 +447,16 @@ def evaluate_scaling_policies():
 # ========== BILLING ==========
 
 def calculate_daily_costs(user_id=None):
-    """Calculate resource costs for one or all users."""
-    from django.contrib.auth.models import User
-    from ..business_logic.billing import BillingService
-    service = BillingService()
-    users = User.objects.filter(id=user_id) if user_id else User.objects.all()
-    for user in users:
-        try:
-            costs = service.calculate_user_monthly_cost(user)
-            logger.info(f"Daily cost for user {user.id}: ${costs['total']}")
-        except Exception as exc:
-            logger.error(f"Error calculating costs for user {user.id}: {exc}")
+    """Calculate resource costs for one or all users (grouped queries, not a per-user loop)."""
+    from ..business_logic.costing import CostingEngine
+    user_ids = [user_id] if user_id else None
+    try:
+        all_costs = CostingEngine().monthly_costs(user_ids)
+    except Exception as exc:
+        logger.error(f"Error calculating daily costs: {exc}")
+        return
+    for uid, costs in all_costs.items():
+        logger.info(f"Daily cost for user {uid}: ${costs['total']}")
 
 
 def generate_monthly_invoice(user_id):
@@ -6,14 +6,15 @@
 import os
 import hashlib
 import hmac
+import json
 import time
 import logging
 from datetime import datetime, timedelta
-from urllib.parse import urlencode
-from typing import Optional
+from urllib.parse import quote, urlencode
+from typing import Iterable, Optional
 
 import openstack
-from openstack.exceptions import SDKException, ResourceNotFound
+from openstack.exceptions import SDKException, ResourceNotFound, raise_from_response
 
 logger = logging.getLogger(__name__)
 
@@ -27,6 +28,9 @@ OS_REGION      = os.environ.get('OS_REGION_NAME', 'us-east-1')
 SWIFT_BASE_URL = os.environ.get('SWIFT_URL', 'https://storage.atonixcorp.com/v1')
 SWIFT_TEMP_KEY = os.environ.get('SWIFT_TEMP_KEY', 'atonix-temp-url-key')
 
+# Large-object segments live in "<bucket>_segments", as openstacksdk does.
+SEGMENTS_SUFFIX = '_segments'
+
 # Storage-class → Swift policy mapping
 POLICY_MAP = {
     'standard':            'hot',
@@ -105,18 +109,30 @@ def delete_swift_container(bucket_name: str) -> dict:
     if conn is None:
         return {'success': True, 'deleted': bucket_name, 'mock': True}
 
+    result = {'success': True, 'deleted': bucket_name}
     try:
         # Delete all objects first
         for obj in conn.object_store.objects(container=bucket_name):
             conn.object_store.delete_object(obj, container=bucket_name)
         conn.object_store.delete_container(bucket_name)
-        return {'success': True, 'deleted': bucket_name}
     except ResourceNotFound:
-        return {'success': True, 'deleted': bucket_name, 'note': 'not found on Swift'}
+        result['note'] = 'not found on Swift'
     except SDKException as exc:
         logger.error('Swift delete container error: %s', exc)
         return {'success': False, 'error': str(exc)}
 
+    # Then the large-object segments its manifests pointed at.
+    segments = segment_container(bucket_name)
+    try:
+        for obj in conn.object_store.objects(container=segments):
+            conn.object_store.delete_object(obj, container=segments)
+        conn.object_store.delete_container(segments)
+    except ResourceNotFound:
+        pass
+    except SDKException as exc:
+        logger.warning('Swift segment container cleanup failed for %s: %s', segments, exc)
+    return result
+
 
 def get_swift_container_stats(bucket_name: str) -> dict:
     """Return object count and total bytes for a Swift container."""
@@ -197,6 +213,121 @@ def upload_swift_object(bucket_name: str, object_key: str, data: bytes,
         return {'success': False, 'error': str(exc)}
 
 
+# ── Streaming / Large Objects (SLO) ───────────────────────────────────────────
+# These take an explicit ``conn`` (from open_connection()), served from the
+# process-wide OpenStack connection pool so uploads – and every part of a
+# multipart upload – reuse one Keystone token; ``conn=None`` means no
+# cluster — mock mode.
+
+def _connect() -> openstack.connection.Connection:
+    return openstack.connect(
+        auth_url=OS_AUTH_URL,
+        project_name=OS_PROJECT,
+        username=OS_USERNAME,
+        password=OS_PASSWORD,
+        user_domain_name=OS_DOMAIN,
+        project_domain_name=OS_DOMAIN,
+        region_name=OS_REGION,
+    )
+
+
+def open_connection() -> Optional[openstack.connection.Connection]:
+    """Pooled connection for streaming calls, or None in dev."""
+    from infrastructure.openstack_conn import get_pool
+
+    try:
+        return get_pool().get(('swift', OS_PROJECT, OS_REGION, f'env:{OS_AUTH_URL}:{OS_USERNAME}'), _connect)
+    except Exception as exc:
+        logger.warning('OpenStack connection failed: %s', exc)
+        return None
+
+
+def _object_path(container: str, name: str) -> str:
+    return f'{quote(container)}/{quote(name)}'
+
+
+def put_object_stream(conn, bucket_name: str, object_key: str, chunks: Iterable[bytes],
+                      content_type: str = 'application/octet-stream',
+                      container: str = None) -> str:
+    """
+    PUT an object from an iterable of byte chunks (chunked transfer encoding,
+    nothing buffered).  Returns Swift's ETag, or '' in mock mode after
+    draining ``chunks``.
+    """
+    if conn is None:
+        for _ in chunks:
+            pass
+        return ''
+    resp = conn.object_store.put(
+        _object_path(container or bucket_name, object_key),
+        headers={'Content-Type': content_type},
+        data=iter(chunks),
+    )
+    raise_from_response(resp)
+    return resp.headers.get('Etag', '').strip('"')
+
+
+def segment_container(bucket_name: str) -> str:
+    return f'{bucket_name}{SEGMENTS_SUFFIX}'
+
+
+def ensure_segment_container(conn, bucket_name: str) -> None:
+    if conn is not None:
+        conn.object_store.create_container(name=segment_container(bucket_name))
+
+
+def put_slo_manifest(conn, bucket_name: str, object_key: str, segments: list,
+                     content_type: str = 'application/octet-stream') -> str:
+    """
+    Write a Static Large Object manifest stitching ``segments``
+    ([{'path', 'etag', 'size_bytes'}], in order) into ``object_key``.
+    """
+    if conn is None:
+        return ''
+    manifest = [
+        {'path': f"/{segment_container(bucket_name)}/{seg['path']}",
+         'etag': seg['etag'], 'size_bytes': seg['size_bytes']}
+        for seg in segments
+    ]
+    resp = conn.object_store.put(
+        _object_path(bucket_name, object_key),
+        params={'multipart-manifest': 'put'},
+        headers={'Content-Type': content_type},
+        data=json.dumps(manifest),
+    )
+    raise_from_response(resp)
+    return resp.headers.get('Etag', '').strip('"')
+
+
+def slo_segments(conn, bucket_name: str, object_key: str) -> list[str]:
+    """
+    Segment paths (relative to the bucket's segment container) of the SLO
+    currently stored at ``object_key``; [] if it is missing or not an SLO.
+    """
+    if conn is None:
+        return []
+    path = _object_path(bucket_name, object_key)
+    resp = conn.object_store.head(path)
+    if resp.status_code == 404 or resp.headers.get('X-Static-Large-Object', '').lower() != 'true':
+        return []
+    raise_from_response(resp)
+    resp = conn.object_store.get(path, params={'multipart-manifest': 'get'})
+    raise_from_response(resp)
+    prefix = f'/{segment_container(bucket_name)}/'
+    return [seg['name'][len(prefix):] for seg in resp.json() if seg.get('name', '').startswith(prefix)]
+
+
+def delete_segments(conn, bucket_name: str, paths: Iterable[str]) -> None:
+    """Best-effort removal of uploaded segments (abort / failed complete / delete)."""
+    if conn is None:
+        return
+    for path in paths:
+        try:
+            conn.object_store.delete_object(path, container=segment_container(bucket_name))
+        except SDKException as exc:
+            logger.warning('Swift segment cleanup failed for %s: %s', path, exc)
+
+
 def delete_swift_object(bucket_name: str, object_key: str) -> dict:
     """Delete an object from a Swift container."""
     conn = _get_connection()
@@ -204,12 +335,16 @@ def delete_swift_object(bucket_name: str, object_key: str) -> dict:
         return {'success': True, 'deleted': object_key, 'mock': True}
 
     try:
+        # An SLO's segments are separate objects: delete them too, once the
+        # manifest that references them is gone.
+        segments = slo_segments(conn, bucket_name, object_key)
         conn.object_store.delete_object(object_key, container=bucket_name)
-        return {'success': True, 'deleted': object_key}
     except ResourceNotFound:
         return {'success': True, 'deleted': object_key, 'note': 'already gone'}
     except SDKException as exc:
         return {'success': False, 'error': str(exc)}
+    delete_segments(conn, bucket_name, segments)
+    return {'success': True, 'deleted': object_key}
 
 
 # ── TempURL (Pre-Signed URL) ───────────────────────────────────────────────────
@@ -0,0 +1,69 @@
+"""
+KubeMonitorConsumer
+===================
+WebSocket feed of a KubeConfig's namespace, served from the watch store
+(kube_watch.py) instead of polling the monitor endpoint.
+
+Security model:
+  - The connection is authenticated via Django's AuthMiddlewareStack.
+  - The KubeConfig must be owned by the connecting user.
+
+Protocol (server → client JSON):
+    { "type": "snapshot", "data": <monitor payload, as GET …/monitor/> }
+    { "type": "delta", "resource": "pods", "event": "MODIFIED", "object": {…} }
+"""
+
+from asgiref.sync import sync_to_async
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
+from django.db import close_old_connections
+
+from .kube_monitor import get_monitor_data
+from .kube_watch import get_watch_manager
+
+
+class KubeMonitorConsumer(AsyncJsonWebsocketConsumer):
+
+    async def connect(self):
+        self.namespace = None
+        self.group_name = None
+        user = self.scope.get('user')
+        if not user or not user.is_authenticated:
+            await self.close(code=4001)
+            return
+
+        namespace = await self._get_namespace(user)
+        if namespace is None:
+            await self.close(code=4003)
+            return
+
+        self.namespace = namespace
+        watcher = await sync_to_async(get_watch_manager().subscribe)(namespace)
+        self.group_name = watcher.group
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
+        await self.accept()
+        await self.send_json({'type': 'snapshot', 'data': await sync_to_async(get_monitor_data)(namespace)})
+
+    async def disconnect(self, close_code):
+        if self.group_name:
+            await self.channel_layer.group_discard(self.group_name, self.channel_name)
+        if self.namespace:
+            get_watch_manager().unsubscribe(self.namespace)
+
+    async def kube_delta(self, event):
+        await self.send_json({
+            'type':     'delta',
+            'resource': event['resource'],
+            'event':    event['event'],
+            'object':   event['object'],
+        })
+
+    async def _get_namespace(self, user):
+        from .models import KubeConfig
+
+        @sync_to_async
+        def _fetch():
+            close_old_connections()
+            cfg = KubeConfig.objects.filter(pk=self.scope['url_route']['kwargs']['config_id'], owner=user).first()
+            return cfg.derive_namespace() if cfg else None
+
+        return await _fetch()
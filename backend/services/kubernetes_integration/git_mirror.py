@@ -0,0 +1,230 @@
+"""
+Git Mirror Cache
+────────────────
+Persistent bare mirrors of GitOps repositories, plus read-only trees
+materialized per commit SHA, so a scan and the apply that follows download
+the repository at most once — and later syncs fetch only new objects.
+
+Layout under KUBE_GIT_CACHE_DIR:
+
+    mirrors/<key>.git     bare repo per (provider, repo); fetched per branch
+    trees/<sha>/          `git archive <sha>` extracted once, shared by scan
+                          and apply of that commit
+    locks/<name>.lock     flock files: exclusive per mirror while fetching /
+                          materializing, shared per tree while it is in use
+
+Credentials are passed as the fetch URL on each call and never stored in the
+mirror's config.
+
+Eviction is LRU by disk usage: after each materialization, entries are removed
+oldest-access-first until the cache fits KUBE_GIT_CACHE_MAX_BYTES.  Entries
+currently locked (a fetch in progress, a tree being scanned or applied) are
+skipped.
+"""
+
+import fcntl
+import hashlib
+import logging
+import os
+import re
+import shutil
+import subprocess
+import tarfile
+import tempfile
+from contextlib import contextmanager
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+_SHA_RE = re.compile(r'^[0-9a-f]{40}$')
+
+
+class GitMirrorError(Exception):
+    pass
+
+
+def _dir_size(path: str) -> int:
+    total = 0
+    for root, _dirs, files in os.walk(path):
+        for fname in files:
+            try:
+                total += os.lstat(os.path.join(root, fname)).st_size
+            except OSError:
+                pass
+    return total
+
+
+class MirrorCache:
+    """Bare mirrors + per-commit trees with flock-based locking and LRU eviction."""
+
+    def __init__(self, root: str, max_bytes: int):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.mirrors_dir = os.path.join(root, 'mirrors')
+        self.trees_dir = os.path.join(root, 'trees')
+        self.locks_dir = os.path.join(root, 'locks')
+
+    # ── Paths / locks ─────────────────────────────────────────────────────────
+
+    @staticmethod
+    def mirror_key(provider: str, repo: str) -> str:
+        return hashlib.sha1(f'{provider}:{repo}'.encode()).hexdigest()
+
+    def mirror_path(self, provider: str, repo: str) -> str:
+        return os.path.join(self.mirrors_dir, f'{self.mirror_key(provider, repo)}.git')
+
+    def tree_path(self, sha: str) -> str:
+        return os.path.join(self.trees_dir, sha)
+
+    @contextmanager
+    def _lock(self, name: str, shared: bool = False, blocking: bool = True):
+        """flock on locks/<name>.lock; yields False if non-blocking and busy."""
+        os.makedirs(self.locks_dir, exist_ok=True)
+        fd = os.open(os.path.join(self.locks_dir, f'{name}.lock'), os.O_CREAT | os.O_RDWR, 0o600)
+        flags = (fcntl.LOCK_SH if shared else fcntl.LOCK_EX) | (0 if blocking else fcntl.LOCK_NB)
+        try:
+            try:
+                fcntl.flock(fd, flags)
+            except BlockingIOError:
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+        finally:
+            os.close(fd)
+
+    def _git(self, mirror: str, *args, timeout: int = 300) -> str:
+        try:
+            result = subprocess.run(
+                ['git', '--git-dir', mirror, *args],
+                check=True, capture_output=True, timeout=timeout,
+            )
+        except subprocess.CalledProcessError as exc:
+            raise GitMirrorError(f'git {args[0]} failed: {exc.stderr.decode(errors="replace")}') from exc
+        except FileNotFoundError:
+            raise GitMirrorError('git binary not found on PATH')
+        return result.stdout.decode(errors='replace').strip()
+
+    # ── Mirrors ───────────────────────────────────────────────────────────────
+
+    def resolve(self, provider: str, repo: str, url: str, branch: str, commit_sha: str = '') -> str:
+        """
+        Make sure the mirror holds ``branch`` (and ``commit_sha`` if given)
+        and return the commit SHA to materialize.
+
+        A known commit needs no network round-trip at all; otherwise only the
+        branch is fetched, transferring objects the mirror does not yet have.
+        """
+        mirror = self.mirror_path(provider, repo)
+        with self._lock(os.path.basename(mirror)):
+            if not os.path.isdir(mirror):
+                os.makedirs(self.mirrors_dir, exist_ok=True)
+                self._git(mirror, 'init', '--bare', '--quiet')
+            os.utime(mirror)
+
+            if commit_sha and _SHA_RE.match(commit_sha) and self._has_commit(mirror, commit_sha):
+                return commit_sha
+
+            self._git(mirror, 'fetch', '--quiet', '--prune', url,
+                      f'+refs/heads/{branch}:refs/heads/{branch}')
+            if commit_sha:
+                if not self._has_commit(mirror, commit_sha):
+                    raise GitMirrorError(f'commit {commit_sha} not found on branch {branch}')
+                return self._git(mirror, 'rev-parse', f'{commit_sha}^{{commit}}')
+            return self._git(mirror, 'rev-parse', f'refs/heads/{branch}')
+
+    def _has_commit(self, mirror: str, sha: str) -> bool:
+        try:
+            self._git(mirror, 'cat-file', '-e', f'{sha}^{{commit}}', timeout=10)
+            return True
+        except GitMirrorError:
+            return False
+
+    # ── Trees ─────────────────────────────────────────────────────────────────
+
+    def materialize(self, provider: str, repo: str, sha: str) -> str:
+        """Extract commit ``sha`` to trees/<sha>/ once; returns the tree path."""
+        tree = self.tree_path(sha)
+        if os.path.isdir(tree):
+            os.utime(tree)
+            return tree
+
+        mirror = self.mirror_path(provider, repo)
+        with self._lock(os.path.basename(mirror)):
+            if os.path.isdir(tree):
+                return tree
+            os.makedirs(self.trees_dir, exist_ok=True)
+            staging = tempfile.mkdtemp(prefix=f'.{sha}-', dir=self.trees_dir)
+            try:
+                proc = subprocess.Popen(
+                    ['git', '--git-dir', mirror, 'archive', '--format=tar', sha],
+                    stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                )
+                with tarfile.open(fileobj=proc.stdout, mode='r|') as archive:
+                    archive.extractall(staging, filter='data')
+                _, stderr = proc.communicate(timeout=300)
+                if proc.returncode:
+                    raise GitMirrorError(f'git archive failed: {stderr.decode(errors="replace")}')
+                os.rename(staging, tree)
+            except BaseException:
+                shutil.rmtree(staging, ignore_errors=True)
+                raise
+        logger.info('Materialized %s@%s into %s', repo, sha[:12], tree)
+        self.evict()
+        return tree
+
+    @contextmanager
+    def lease(self, sha: str):
+        """Hold a shared lock on a tree so eviction leaves it alone while in use."""
+        with self._lock(f'tree-{sha}', shared=True):
+            yield self.tree_path(sha)
+
+    # ── Eviction ──────────────────────────────────────────────────────────────
+
+    def usage(self) -> list[tuple[float, int, str, str]]:
+        """(last access, bytes, lock name, path) for every cached mirror and tree."""
+        entries = []
+        for parent, is_tree in ((self.mirrors_dir, False), (self.trees_dir, True)):
+            if not os.path.isdir(parent):
+                continue
+            for name in os.listdir(parent):
+                if name.startswith('.'):
+                    continue
+                path = os.path.join(parent, name)
+                lock_name = f'tree-{name}' if is_tree else name
+                entries.append((os.stat(path).st_mtime, _dir_size(path), lock_name, path))
+        return entries
+
+    def evict(self) -> int:
+        """Remove least recently used entries until under max_bytes; returns bytes freed."""
+        entries = sorted(self.usage())
+        total = sum(size for _, size, _, _ in entries)
+        freed = 0
+        for _, size, lock_name, path in entries:
+            if total - freed <= self.max_bytes:
+                break
+            with self._lock(lock_name, blocking=False) as acquired:
+                if not acquired:
+                    continue                      # in use – try the next one
+                shutil.rmtree(path, ignore_errors=True)
+            freed += size
+            logger.info('Evicted %s (%d bytes) from git cache', path, size)
+        return freed
+
+
+_cache: MirrorCache | None = None
+
+
+def get_mirror_cache() -> MirrorCache | None:
+    """Process-wide mirror cache, or None when KUBE_GIT_CACHE_ENABLED is off."""
+    global _cache
+    if not getattr(settings, 'KUBE_GIT_CACHE_ENABLED', True):
+        return None
+    root = str(getattr(settings, 'KUBE_GIT_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'atonix_git_cache')))
+    max_bytes = getattr(settings, 'KUBE_GIT_CACHE_MAX_BYTES', 5 * 1024 ** 3)
+    if _cache is None or _cache.root != root or _cache.max_bytes != max_bytes:
+        _cache = MirrorCache(root, max_bytes)
+    return _cache
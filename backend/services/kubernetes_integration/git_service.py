@@ -7,6 +7,10 @@ under a configured path.
 In a production deployment this would use a real Git library (GitPython or
 shell calls to git).  Here we wrap everything with a clean interface so the
 rest of the platform stays decoupled from the VCS implementation.
+
+When the mirror cache is enabled (see git_mirror.py) clone() fetches into a
+persistent bare mirror and checks out a shared, read-only tree for the exact
+commit instead of a fresh shallow clone per call.
 """
 
 import os
@@ -14,6 +18,9 @@ import re
 import subprocess
 import tempfile
 import logging
+from contextlib import ExitStack
+
+from .git_mirror import GitMirrorError, get_mirror_cache
 
 logger = logging.getLogger(__name__)
 
@@ -40,14 +47,24 @@ class GitService:
         self.path         = path.strip('/')
         self.access_token = access_token
         self._workdir: str | None = None
+        self._commit: str = ''
+        self._lease: ExitStack | None = None
 
     # ── Public API ────────────────────────────────────────────────────────────
 
-    def clone(self) -> str:
+    def clone(self, commit_sha: str = '') -> str:
         """
-        Clone the repository into a temporary directory.
-        Returns the absolute path to the cloned directory.
+        Check out the branch head — or ``commit_sha`` if given — and return
+        the absolute path to the working tree.
+
+        With the mirror cache the tree is shared and must be treated as
+        read-only; without it a temporary shallow clone of the branch head is
+        made (``commit_sha`` is then ignored).
         """
+        cache = get_mirror_cache()
+        if cache is not None:
+            return self._checkout_cached(cache, commit_sha)
+
         clone_url = self._build_clone_url()
         self._workdir = tempfile.mkdtemp(prefix='atonix_kube_')
         try:
@@ -69,6 +86,8 @@ class GitService:
 
     def get_current_commit(self) -> str:
         """Return the HEAD commit SHA of the cloned repo."""
+        if self._commit:
+            return self._commit
         if not self._workdir:
             return ''
         try:
@@ -110,14 +129,37 @@ class GitService:
             return fh.read()
 
     def cleanup(self):
-        """Remove the temporary clone directory."""
+        """Remove the temporary clone directory (or release the cached tree)."""
         import shutil
+        if self._lease is not None:
+            self._lease.close()
+            self._lease = None
+            self._workdir = None
+            return
         if self._workdir and os.path.isdir(self._workdir):
             shutil.rmtree(self._workdir, ignore_errors=True)
             self._workdir = None
 
     # ── Private helpers ───────────────────────────────────────────────────────
 
+    def _checkout_cached(self, cache, commit_sha: str) -> str:
+        try:
+            sha = cache.resolve(self.provider, self.repo, self._build_clone_url(),
+                                self.branch, commit_sha)
+            lease = ExitStack()
+            tree = lease.enter_context(cache.lease(sha))
+            try:
+                cache.materialize(self.provider, self.repo, sha)
+            except BaseException:
+                lease.close()
+                raise
+        except GitMirrorError as exc:
+            message = str(exc).replace(self.access_token, '***') if self.access_token else str(exc)
+            raise GitServiceError(message) from exc
+        self._lease, self._workdir, self._commit = lease, tree, sha
+        logger.info('Checked out %s@%s from mirror cache', self.repo, sha[:12])
+        return tree
+
     def _build_clone_url(self) -> str:
         base_map = {
             'github':    'https://github.com',
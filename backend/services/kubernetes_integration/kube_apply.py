@@ -7,17 +7,28 @@ and recording results in a KubeSyncRun.
 In a production cluster this invokes `kubectl` (or the Python kubernetes
 client).  The logic is cleanly abstracted so the client lib can be swapped
 without touching the views.
+
+By default (KUBE_APPLY_BATCHED) all selected files are streamed into a few
+`kubectl apply --server-side -f - -o json` invocations, chunked by
+KUBE_APPLY_BATCH_BYTES, instead of one kubectl process per file; per-object
+results are read back from the JSON output.  Applies to different namespaces
+run concurrently up to KUBE_APPLY_MAX_CONCURRENT; applies to the same
+namespace are serialized.
 """
 
+import json
 import os
 import subprocess
 import logging
+import threading
 from datetime import datetime, timezone
 
+from django.conf import settings
 from django.utils import timezone as dj_tz
 
 from .models import KubeConfig, KubeSyncRun
-from .manifest_parser import parse_manifest_file, build_summary
+from .manifest_parser import build_summary
+from .scan_engine import parse_contents
 
 logger = logging.getLogger(__name__)
 
@@ -91,6 +102,126 @@ def _kubectl_apply(file_path: str, namespace: str,
         return False, str(exc)
 
 
+# ─────────────────────────────────────────────────────────────────────────────
+# Batched server-side apply
+# ─────────────────────────────────────────────────────────────────────────────
+
+FIELD_MANAGER = 'atonixcorp'
+
+_apply_slots = threading.BoundedSemaphore(getattr(settings, 'KUBE_APPLY_MAX_CONCURRENT', 4))
+_namespace_locks: dict[str, threading.Lock] = {}
+_namespace_locks_guard = threading.Lock()
+
+
+def _namespace_lock(namespace: str) -> threading.Lock:
+    with _namespace_locks_guard:
+        return _namespace_locks.setdefault(namespace, threading.Lock())
+
+
+def _chunk_files(patched: dict[str, str], max_bytes: int) -> list[list[str]]:
+    """Group files into chunks of at most ``max_bytes`` (a file is never split)."""
+    chunks: list[list[str]] = []
+    size = 0
+    for rel_path, content in patched.items():
+        length = len(content.encode('utf-8'))
+        if not chunks or (chunks[-1] and size + length > max_bytes):
+            chunks.append([])
+            size = 0
+        chunks[-1].append(rel_path)
+        size += length
+    return chunks
+
+
+def _decode_objects(stdout: str) -> list[dict]:
+    """Objects from `-o json` output: a List, a single object, or several concatenated."""
+    decoder = json.JSONDecoder()
+    objects, pos, text = [], 0, stdout.strip()
+    while pos < len(text):
+        obj, end = decoder.raw_decode(text, pos)
+        pos = end
+        while pos < len(text) and text[pos].isspace():
+            pos += 1
+        if obj.get('kind') == 'List':
+            objects.extend(obj.get('items', []))
+        else:
+            objects.append(obj)
+    return objects
+
+
+def _kubectl_apply_stream(manifest: str, namespace: str,
+                          kubeconfig_path: str | None = None,
+                          dry_run: bool = False) -> tuple[set[tuple[str, str]], str]:
+    """
+    Server-side apply a multi-document stream in one kubectl call.
+
+    Returns ({(kind, name) applied}, stderr).  kubectl keeps going past
+    failing objects, so a non-zero exit still yields the objects that
+    succeeded.
+    """
+    cmd = ['kubectl', 'apply', '--server-side', f'--field-manager={FIELD_MANAGER}',
+           '-f', '-', '--namespace', namespace, '-o', 'json']
+    if dry_run:
+        cmd += ['--dry-run=server']
+    if kubeconfig_path:
+        cmd = ['kubectl', '--kubeconfig', kubeconfig_path] + cmd[1:]
+    try:
+        result = subprocess.run(cmd, input=manifest.encode(), capture_output=True, timeout=300)
+    except FileNotFoundError:
+        return set(), 'kubectl binary not found — please install kubectl'
+    except Exception as exc:
+        return set(), str(exc)
+
+    stderr = result.stderr.decode(errors='replace').strip()
+    try:
+        objects = _decode_objects(result.stdout.decode(errors='replace'))
+    except (ValueError, AttributeError):
+        logger.warning('Unparseable kubectl apply output for %s', namespace)
+        objects = []
+    applied = {(o.get('kind', ''), (o.get('metadata') or {}).get('name', '')) for o in objects}
+    return applied, stderr
+
+
+def _apply_batched(patched: dict[str, str], parsed_by_path: dict[str, dict], namespace: str,
+                   dry_run: bool = False) -> dict[str, tuple[bool, str, list[dict]]]:
+    """
+    Apply every file through chunked server-side apply.
+
+    Files that failed to parse, or contain no resources, are reported as
+    failed and kept out of the stream: their per-object results could not be
+    told apart from an empty success.
+
+    Returns {rel_path: (all objects applied, log text, resources applied)}.
+    """
+    results = {}
+    streamable = {}
+    for rel_path, content in patched.items():
+        parsed = parsed_by_path[rel_path]
+        if parsed.get('error') or not parsed.get('resources'):
+            results[rel_path] = (False, parsed.get('error') or 'no Kubernetes resources found', [])
+        else:
+            streamable[rel_path] = content
+    if not streamable:
+        return results
+
+    max_bytes = getattr(settings, 'KUBE_APPLY_BATCH_BYTES', 1024 * 1024)
+    # Queue on the namespace first so a waiting apply does not hold one of
+    # the concurrency slots other namespaces could use.
+    with _namespace_lock(namespace), _apply_slots:
+        for chunk in _chunk_files(streamable, max_bytes):
+            stream = '\n---\n'.join(streamable[rel_path] for rel_path in chunk)
+            applied, stderr = _kubectl_apply_stream(stream, namespace, dry_run=dry_run)
+            for rel_path in chunk:
+                resources = parsed_by_path[rel_path]['resources']
+                done = [r for r in resources if (r['kind'], r['name']) in applied]
+                missing = [f"{r['kind']}/{r['name']}" for r in resources if r not in done]
+                if missing:
+                    log = f"failed: {', '.join(missing)}" + (f' — {stderr}' if stderr else '')
+                else:
+                    log = f'{len(done)} object(s) serverside-applied'
+                results[rel_path] = (not missing, log, done)
+    return results
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # Public entry point
 # ─────────────────────────────────────────────────────────────────────────────
@@ -102,13 +233,16 @@ def execute_apply(
     commit_sha: str,
     triggered_by: str = 'manual',
     dry_run: bool = False,
+    batched: bool | None = None,
 ) -> KubeSyncRun:
     """
     Apply each selected YAML file to the cluster.
 
     1. Create a KubeSyncRun record.
     2. Ensure the project namespace exists.
-    3. For each file: inject namespace, apply to cluster, record result.
+    3. For each file: inject namespace, apply to cluster, record result —
+       batched into a few server-side applies unless ``batched`` is False
+       (default: KUBE_APPLY_BATCHED).
     4. Update KubeSyncRun and KubeConfig state.
 
     Returns the completed KubeSyncRun.
@@ -135,27 +269,56 @@ def execute_apply(
     ns_log = _ensure_namespace(namespace)
     log_lines.append(f'[namespace] {ns_log}')
 
+    # Read every selected file, then run the governance scan in one batch —
+    # files the scan of this commit already parsed come from the blob cache.
+    raw_files: dict[str, bytes] = {}
     for rel_path in selected_files:
         abs_path = os.path.join(workdir, rel_path)
-        if not os.path.isfile(abs_path):
+        if os.path.isfile(abs_path):
+            with open(abs_path, 'rb') as fh:
+                raw_files[rel_path] = fh.read()
+    parsed_list, _stats = parse_contents(list(raw_files.items()))
+    parsed_by_path = dict(zip(raw_files, parsed_list))
+
+    if batched is None:
+        batched = getattr(settings, 'KUBE_APPLY_BATCHED', True)
+    batch_results = {}
+    if batched:
+        batch_results = _apply_batched(
+            {rel_path: _inject_namespace(raw.decode('utf-8', errors='replace'), namespace)
+             for rel_path, raw in raw_files.items()},
+            parsed_by_path, namespace, dry_run=dry_run,
+        )
+
+    for rel_path in selected_files:
+        if rel_path not in raw_files:
             log_lines.append(f'[skip] {rel_path} — file not found in workdir')
             has_errors = True
             continue
 
-        # Read, inject namespace
-        with open(abs_path, 'r', encoding='utf-8', errors='replace') as fh:
-            content = fh.read()
-
         # Governance scan before apply
-        parsed = parse_manifest_file(content, rel_path)
+        parsed = parsed_by_path[rel_path]
         governance_issues.extend(parsed.get('warnings', []))
 
+        if batched:
+            ok, out, applied = batch_results[rel_path]
+            log_lines.append(f'[{"ok" if ok else "err"}] {rel_path}: {out}')
+            resources_created.extend(applied)
+            if ok:
+                files_applied.append(rel_path)
+            else:
+                has_errors = True
+            continue
+
+        # Read, inject namespace
+        content = raw_files[rel_path].decode('utf-8', errors='replace')
         patched = _inject_namespace(content, namespace)
 
-        # Write patched content to a temp file
+        # Write patched content to a temp file (outside workdir, which may be
+        # a shared cached tree)
         import tempfile, os as _os
         with tempfile.NamedTemporaryFile(
-            mode='w', suffix='.yaml', delete=False, dir=workdir
+            mode='w', suffix='.yaml', delete=False
         ) as tmp:
             tmp.write(patched)
             tmp_path = tmp.name
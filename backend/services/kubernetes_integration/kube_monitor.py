@@ -4,38 +4,100 @@ Kubernetes Monitor Service
 Queries the cluster for workloads, pods, networking, and events
 scoped to a project's namespace.
 
+All resource kinds are fetched with a single `kubectl get a,b,c,...`
+(falling back to concurrent per-kind calls if the combined call fails, e.g.
+when the cluster lacks one of the APIs), and each (kubeconfig, namespace)
+snapshot is cached for KUBE_MONITOR_CACHE_TTL seconds so a dashboard polled
+by many users costs one cluster query per interval.
+
 Falls back to rich mock data when kubectl is unavailable,
 so the dashboard is always usable in development.
 """
 
+import hashlib
 import subprocess
 import json
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone, timedelta
 import random
 
+from django.conf import settings
+from django.core.cache import cache
+
 logger = logging.getLogger(__name__)
 
+# Resource name → `kind` reported on items of a combined List.
+MONITORED_KINDS = {
+    'deployments':  'Deployment',
+    'pods':         'Pod',
+    'services':     'Service',
+    'ingresses':    'Ingress',
+    'statefulsets': 'StatefulSet',
+    'daemonsets':   'DaemonSet',
+    'jobs':         'Job',
+    'cronjobs':     'CronJob',
+    'events':       'Event',
+}
+
+_snapshot_locks: dict[str, threading.Lock] = {}
+_snapshot_locks_guard = threading.Lock()
+
 
 # ─────────────────────────────────────────────────────────────────────────────
 # Kubectl helper
 # ─────────────────────────────────────────────────────────────────────────────
 
-def _kubectl_get(resource: str, namespace: str,
-                 kubeconfig: str | None = None) -> list[dict]:
-    """Run `kubectl get <resource> -n <ns> -o json` and return items list."""
+def _kubectl_items(resource: str, namespace: str,
+                   kubeconfig: str | None = None) -> list[dict]:
+    """Run `kubectl get <resource> -n <ns> -o json` and return items; raises on failure."""
     cmd = ['kubectl', 'get', resource, '-n', namespace, '-o', 'json']
     if kubeconfig:
         cmd = ['kubectl', '--kubeconfig', kubeconfig] + cmd[1:]
+    result = subprocess.run(cmd, capture_output=True, timeout=30, check=True)
+    return json.loads(result.stdout).get('items', [])
+
+
+def _kubectl_get(resource: str, namespace: str,
+                 kubeconfig: str | None = None) -> list[dict]:
+    """Run `kubectl get <resource> -n <ns> -o json` and return items list."""
     try:
-        result = subprocess.run(cmd, capture_output=True, timeout=30, check=True)
-        data = json.loads(result.stdout)
-        return data.get('items', [])
+        return _kubectl_items(resource, namespace, kubeconfig)
     except Exception as exc:
         logger.debug('kubectl get %s failed: %s', resource, exc)
         return []
 
 
+def _kubectl_get_all(namespace: str, kubeconfig: str | None = None) -> dict[str, list[dict]]:
+    """
+    Fetch every MONITORED_KINDS resource in the namespace.
+
+    One `kubectl get deployments,pods,...` call, split by item kind.  If
+    kubectl rejects it (typically one API not served by the cluster), the
+    kinds are fetched concurrently one by one so a single missing API only
+    blanks its own section.  When kubectl is missing, times out or returns
+    garbage, every kind is empty: per-kind retries would only fail the same
+    way nine more times.
+    """
+    try:
+        items = _kubectl_items(','.join(MONITORED_KINDS), namespace, kubeconfig)
+    except subprocess.CalledProcessError as exc:
+        logger.debug('combined kubectl get failed (%s); fetching kinds separately', exc)
+    except (OSError, subprocess.TimeoutExpired, ValueError) as exc:
+        logger.debug('kubectl get failed: %s', exc)
+        return {resource: [] for resource in MONITORED_KINDS}
+    else:
+        by_kind = {kind: [] for kind in MONITORED_KINDS.values()}
+        for item in items:
+            by_kind.setdefault(item.get('kind', ''), []).append(item)
+        return {resource: by_kind[kind] for resource, kind in MONITORED_KINDS.items()}
+
+    with ThreadPoolExecutor(max_workers=len(MONITORED_KINDS)) as pool:
+        results = pool.map(lambda r: _kubectl_get(r, namespace, kubeconfig), MONITORED_KINDS)
+        return dict(zip(MONITORED_KINDS, results))
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # Formatters (raw k8s object → clean dict)
 # ─────────────────────────────────────────────────────────────────────────────
@@ -121,6 +183,20 @@ def _fmt_event(e: dict) -> dict:
     }
 
 
+# Resource name → formatter, for snapshots and watch deltas alike.
+FORMATTERS = {
+    'deployments':  _fmt_deployment,
+    'statefulsets': _fmt_deployment,
+    'daemonsets':   _fmt_deployment,
+    'jobs':         _fmt_deployment,
+    'cronjobs':     _fmt_deployment,
+    'pods':         _fmt_pod,
+    'services':     _fmt_service,
+    'ingresses':    _fmt_ingress,
+    'events':       _fmt_event,
+}
+
+
 def _age(ts: str | None) -> str:
     if not ts:
         return 'unknown'
@@ -213,25 +289,60 @@ def uuid_suffix():
 # Public entry point
 # ─────────────────────────────────────────────────────────────────────────────
 
+def _snapshot_key(namespace: str, kubeconfig: str | None) -> str:
+    digest = hashlib.sha1(f'{kubeconfig or ""}\0{namespace}'.encode()).hexdigest()
+    return f'kube_monitor:snapshot:{digest}'
+
+
 def get_monitor_data(namespace: str, kubeconfig: str | None = None) -> dict:
     """
     Fetch live monitor data for the given namespace.
     Falls back to mock data when kubectl is unavailable.
+
+    With KUBE_WATCH_ENABLED the data is read from the namespace's watch store
+    (see kube_watch.py) once it has synced.  Otherwise — and until then —
+    snapshots are fetched with kubectl and cached per (kubeconfig, namespace)
+    for KUBE_MONITOR_CACHE_TTL seconds; concurrent misses in one process
+    share a single cluster query.
     """
-    # Try live
-    deployments = _kubectl_get('deployments', namespace, kubeconfig)
-    if not deployments and not _kubectl_get('pods', namespace, kubeconfig):
+    if getattr(settings, 'KUBE_WATCH_ENABLED', False):
+        from .kube_watch import get_watch_manager
+        store = get_watch_manager().get_store(namespace, kubeconfig)
+        if store is not None:
+            return format_monitor_data(namespace, store.snapshot())
+
+    ttl = getattr(settings, 'KUBE_MONITOR_CACHE_TTL', 5)
+    key = _snapshot_key(namespace, kubeconfig)
+    data = cache.get(key)
+    if data is not None:
+        return data
+
+    with _snapshot_locks_guard:
+        lock = _snapshot_locks.setdefault(key, threading.Lock())
+    with lock:
+        data = cache.get(key)
+        if data is None:
+            data = format_monitor_data(namespace, _kubectl_get_all(namespace, kubeconfig))
+            if ttl:
+                cache.set(key, data, timeout=ttl)
+    return data
+
+
+def format_monitor_data(namespace: str, found: dict[str, list[dict]]) -> dict:
+    """Shape raw objects keyed by MONITORED_KINDS resource into the monitor payload."""
+    deployments = found['deployments']
+    pods        = found['pods']
+    if not deployments and not pods:
         logger.info('kubectl unavailable or empty ns — returning mock data for %s', namespace)
         return _mock_monitor(namespace)
 
-    pods       = _kubectl_get('pods',       namespace, kubeconfig)
-    services   = _kubectl_get('services',   namespace, kubeconfig)
-    ingresses  = _kubectl_get('ingresses',  namespace, kubeconfig)
-    stateful   = _kubectl_get('statefulsets', namespace, kubeconfig)
-    daemonsets = _kubectl_get('daemonsets', namespace, kubeconfig)
-    jobs       = _kubectl_get('jobs',       namespace, kubeconfig)
-    cronjobs   = _kubectl_get('cronjobs',   namespace, kubeconfig)
-    events     = _kubectl_get('events',     namespace, kubeconfig)
+    services   = found['services']
+    ingresses  = found['ingresses']
+    stateful   = found['statefulsets']
+    daemonsets = found['daemonsets']
+    jobs       = found['jobs']
+    cronjobs   = found['cronjobs']
+    events     = found['events']
 
     all_pods_parsed = [_fmt_pod(p) for p in pods]
     ready_pods = sum(1 for p in all_pods_parsed if p['ready'])
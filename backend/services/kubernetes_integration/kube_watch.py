@@ -0,0 +1,392 @@
+"""
+Kubernetes Watch Store
+──────────────────────
+Informer-style, in-memory mirror of a namespace's monitored resources, kept
+current by long-lived watches instead of a kubectl run per request.
+
+For each resource kind in MONITORED_KINDS a watcher thread:
+  1. lists the kind through the API (`kubectl get --raw <path>`), replacing
+     its slice of the store and remembering the list's resourceVersion;
+  2. watches from that resourceVersion (`?watch=1&resourceVersion=…`), applying
+     ADDED / MODIFIED / DELETED events and advancing the resourceVersion on
+     every event and BOOKMARK;
+  3. when the watch times out it resumes from the last resourceVersion; when
+     the server answers 410 Gone (version too old) it relists.
+
+get_monitor_data() reads from the store once every kind has synced, and each
+change is published to the Channels group of the watched namespace so
+dashboards (KubeMonitorConsumer) receive deltas instead of polling.
+
+Every process that serves the namespace keeps its own watcher (HTTP reads are
+served from the local store), but only one of them publishes: the holder of
+a per-group lease in the shared cache (KUBE_WATCH_PUBLISHER_LEASE seconds,
+renewed while it keeps publishing, released when its watcher stops).  Other
+processes take over on their next change once the lease lapses.
+
+Watchers are started lazily and stopped after KUBE_WATCH_IDLE_TIMEOUT seconds
+without reads or WebSocket subscribers.
+"""
+
+import hashlib
+import json
+import logging
+import subprocess
+import threading
+import time
+import uuid
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .kube_monitor import FORMATTERS, MONITORED_KINDS
+
+logger = logging.getLogger(__name__)
+
+# Resource name → namespaced API collection path.
+API_PATHS = {
+    'deployments':  '/apis/apps/v1/namespaces/{ns}/deployments',
+    'pods':         '/api/v1/namespaces/{ns}/pods',
+    'services':     '/api/v1/namespaces/{ns}/services',
+    'ingresses':    '/apis/networking.k8s.io/v1/namespaces/{ns}/ingresses',
+    'statefulsets': '/apis/apps/v1/namespaces/{ns}/statefulsets',
+    'daemonsets':   '/apis/apps/v1/namespaces/{ns}/daemonsets',
+    'jobs':         '/apis/batch/v1/namespaces/{ns}/jobs',
+    'cronjobs':     '/apis/batch/v1/namespaces/{ns}/cronjobs',
+    'events':       '/api/v1/namespaces/{ns}/events',
+}
+
+# Server-side watch timeout; the watch then resumes from the last resourceVersion.
+WATCH_TIMEOUT_SECONDS = 300
+# How long to wait before re-checking an API the cluster does not serve.
+UNAVAILABLE_RECHECK_SECONDS = 300
+
+
+def group_name(namespace: str, kubeconfig: str | None) -> str:
+    """Channels group receiving deltas for one (kubeconfig, namespace)."""
+    digest = hashlib.sha1(f'{kubeconfig or ""}\0{namespace}'.encode()).hexdigest()[:20]
+    return f'kube_watch_{digest}'
+
+
+def _object_key(obj: dict) -> str:
+    meta = obj.get('metadata', {})
+    return meta.get('uid') or meta.get('name', '')
+
+
+class _Gone(Exception):
+    """The watch's resourceVersion is too old; a relist is required."""
+
+
+class _Unavailable(Exception):
+    """The cluster does not serve this API (or kubectl is missing)."""
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Store
+# ─────────────────────────────────────────────────────────────────────────────
+
+class KubeStore:
+    """Thread-safe {resource: {uid: object}} map with per-resource versions."""
+
+    def __init__(self):
+        self._objects: dict[str, dict[str, dict]] = {r: {} for r in MONITORED_KINDS}
+        self._versions: dict[str, str] = {r: '' for r in MONITORED_KINDS}
+        self._synced: set[str] = set()
+        self._lock = threading.Lock()
+
+    @property
+    def synced(self) -> bool:
+        with self._lock:
+            return len(self._synced) == len(MONITORED_KINDS)
+
+    def resource_version(self, resource: str) -> str:
+        with self._lock:
+            return self._versions[resource]
+
+    def replace(self, resource: str, items: list[dict], resource_version: str) -> None:
+        with self._lock:
+            self._objects[resource] = {_object_key(obj): obj for obj in items}
+            self._versions[resource] = resource_version
+            self._synced.add(resource)
+
+    def apply(self, resource: str, event_type: str, obj: dict) -> bool:
+        """Apply one watch event; returns True if the store changed."""
+        version = obj.get('metadata', {}).get('resourceVersion', '')
+        with self._lock:
+            if version:
+                self._versions[resource] = version
+            if event_type in ('ADDED', 'MODIFIED'):
+                self._objects[resource][_object_key(obj)] = obj
+                return True
+            if event_type == 'DELETED':
+                return self._objects[resource].pop(_object_key(obj), None) is not None
+        return False
+
+    def snapshot(self) -> dict[str, list[dict]]:
+        with self._lock:
+            return {resource: list(objs.values()) for resource, objs in self._objects.items()}
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Watcher
+# ─────────────────────────────────────────────────────────────────────────────
+
+class KubeWatcher:
+    """List-then-watch threads for every monitored kind in one namespace."""
+
+    def __init__(self, namespace: str, kubeconfig: str | None = None, on_delta=None):
+        self.namespace = namespace
+        self.kubeconfig = kubeconfig
+        self.group = group_name(namespace, kubeconfig)
+        self.store = KubeStore()
+        self.on_delta = on_delta
+        self.token = uuid.uuid4().hex
+        self.lease_until = 0.0                    # monotonic; publisher lease held locally until then
+        self._stop = threading.Event()
+        self._procs: dict[str, subprocess.Popen] = {}
+        self._procs_lock = threading.Lock()
+
+    def start(self) -> None:
+        for resource in MONITORED_KINDS:
+            threading.Thread(
+                target=self._run, args=(resource,),
+                name=f'kube-watch-{self.namespace}-{resource}', daemon=True,
+            ).start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        release_publisher(self)
+        with self._procs_lock:
+            procs = list(self._procs.values())
+        for proc in procs:
+            try:
+                proc.terminate()
+            except Exception:
+                pass
+
+    @property
+    def stopped(self) -> bool:
+        return self._stop.is_set()
+
+    # ── kubectl plumbing ─────────────────────────────────────────────────────
+
+    def _cmd(self, path: str) -> list[str]:
+        cmd = ['kubectl', 'get', '--raw', path]
+        if self.kubeconfig:
+            cmd = ['kubectl', '--kubeconfig', self.kubeconfig] + cmd[1:]
+        return cmd
+
+    def _path(self, resource: str, **query) -> str:
+        path = API_PATHS[resource].format(ns=self.namespace)
+        return f'{path}?{urlencode(query)}' if query else path
+
+    def list_kind(self, resource: str) -> None:
+        try:
+            result = subprocess.run(self._cmd(self._path(resource)), capture_output=True, timeout=30, check=True)
+        except FileNotFoundError as exc:
+            raise _Unavailable('kubectl not installed') from exc
+        except subprocess.CalledProcessError as exc:
+            stderr = (exc.stderr or b'').decode(errors='replace')
+            if 'NotFound' in stderr or 'could not find the requested resource' in stderr:
+                raise _Unavailable(stderr.strip()) from exc
+            raise
+        data = json.loads(result.stdout)
+        self.store.replace(resource, data.get('items', []), data.get('metadata', {}).get('resourceVersion', ''))
+
+    def watch_kind(self, resource: str) -> None:
+        """Stream watch events until the server closes the watch; raises _Gone on 410."""
+        path = self._path(
+            resource, watch=1, allowWatchBookmarks='true', timeoutSeconds=WATCH_TIMEOUT_SECONDS,
+            resourceVersion=self.store.resource_version(resource),
+        )
+        proc = subprocess.Popen(self._cmd(path), stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        with self._procs_lock:
+            self._procs[resource] = proc
+        try:
+            for line in proc.stdout:
+                if self._stop.is_set():
+                    return
+                if line.strip():
+                    self.handle_event(resource, json.loads(line))
+        finally:
+            with self._procs_lock:
+                self._procs.pop(resource, None)
+            if proc.poll() is None:
+                proc.terminate()
+            proc.wait()
+
+    def handle_event(self, resource: str, event: dict) -> None:
+        event_type, obj = event.get('type', ''), event.get('object') or {}
+        if event_type == 'ERROR':
+            if obj.get('code') == 410:
+                raise _Gone(obj.get('message', ''))
+            raise RuntimeError(obj.get('message', 'watch error'))
+        if self.store.apply(resource, event_type, obj) and self.on_delta:
+            try:
+                self.on_delta(self, resource, event_type, obj)
+            except Exception:
+                logger.exception('Kubernetes delta publish failed for %s', self.group)
+
+    def _run(self, resource: str) -> None:
+        backoff, relist = 1.0, True
+        while not self._stop.is_set():
+            try:
+                if relist:
+                    self.list_kind(resource)
+                    relist = False
+                self.watch_kind(resource)
+                backoff = 1.0
+            except _Gone:
+                relist = True
+            except _Unavailable as exc:
+                # Serve the kind as empty so the namespace still counts as synced.
+                logger.info('kube watch: %s unavailable in %s (%s)', resource, self.namespace, exc)
+                self.store.replace(resource, [], '')
+                self._stop.wait(UNAVAILABLE_RECHECK_SECONDS)
+                relist = True
+            except Exception:
+                logger.warning('kube watch: %s in %s failed; retrying in %.0fs',
+                               resource, self.namespace, backoff, exc_info=True)
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, 60.0)
+                relist = True
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Process-wide manager
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _publisher_key(group: str) -> str:
+    return f'{group}:publisher'
+
+
+def acquire_publisher(watcher: KubeWatcher) -> bool:
+    """True if this watcher holds (or just took / renewed) its group's publisher lease."""
+    now = time.monotonic()
+    if watcher.lease_until > now:
+        return True
+    lease = getattr(settings, 'KUBE_WATCH_PUBLISHER_LEASE', 30)
+    key = _publisher_key(watcher.group)
+    if cache.add(key, watcher.token, timeout=lease) or (
+            cache.get(key) == watcher.token and cache.touch(key, timeout=lease)):
+        # Re-check the shared lease after half its lifetime at the latest.
+        watcher.lease_until = now + lease / 2
+        return True
+    return False
+
+
+def release_publisher(watcher: KubeWatcher) -> None:
+    watcher.lease_until = 0.0
+    key = _publisher_key(watcher.group)
+    try:
+        if cache.get(key) == watcher.token:
+            cache.delete(key)
+    except Exception:
+        logger.warning('Could not release kube watch publisher lease for %s', watcher.group, exc_info=True)
+
+
+def publish_delta(watcher: KubeWatcher, resource: str, event_type: str, obj: dict) -> None:
+    """Send one formatted change to the watcher's Channels group, if this process publishes it."""
+    from asgiref.sync import async_to_sync
+    from channels.layers import get_channel_layer
+
+    if not acquire_publisher(watcher):
+        return
+    layer = get_channel_layer()
+    if layer is None:
+        return
+    async_to_sync(layer.group_send)(watcher.group, {
+        'type':     'kube.delta',
+        'resource': resource,
+        'event':    event_type,
+        'object':   FORMATTERS[resource](obj),
+    })
+
+
+class WatchManager:
+    """Starts watchers on demand and stops them once nobody reads or subscribes."""
+
+    def __init__(self, idle_timeout: float, on_delta=publish_delta):
+        self.idle_timeout = idle_timeout
+        self.on_delta = on_delta
+        self._watchers: dict[tuple, KubeWatcher] = {}
+        self._last_used: dict[tuple, float] = {}
+        self._subscribers: dict[tuple, int] = {}
+        self._lock = threading.Lock()
+        self._reaper_started = False
+
+    def watcher(self, namespace: str, kubeconfig: str | None = None) -> KubeWatcher:
+        """Return the running watcher for (kubeconfig, namespace), starting it if needed."""
+        key = (kubeconfig, namespace)
+        with self._lock:
+            self._ensure_reaper()
+            self._last_used[key] = time.monotonic()
+            watcher = self._watchers.get(key)
+            if watcher is None or watcher.stopped:
+                watcher = KubeWatcher(namespace, kubeconfig, on_delta=self.on_delta)
+                self._watchers[key] = watcher
+                watcher.start()
+            return watcher
+
+    def get_store(self, namespace: str, kubeconfig: str | None = None) -> KubeStore | None:
+        """The namespace's store if fully synced, else None (the watcher is started)."""
+        store = self.watcher(namespace, kubeconfig).store
+        return store if store.synced else None
+
+    def subscribe(self, namespace: str, kubeconfig: str | None = None) -> KubeWatcher:
+        watcher = self.watcher(namespace, kubeconfig)
+        with self._lock:
+            key = (kubeconfig, namespace)
+            self._subscribers[key] = self._subscribers.get(key, 0) + 1
+        return watcher
+
+    def unsubscribe(self, namespace: str, kubeconfig: str | None = None) -> None:
+        key = (kubeconfig, namespace)
+        with self._lock:
+            self._subscribers[key] = max(self._subscribers.get(key, 0) - 1, 0)
+            self._last_used[key] = time.monotonic()
+
+    def reap(self, now: float | None = None) -> int:
+        """Stop idle, unsubscribed watchers; returns how many were stopped."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            idle = [
+                key for key in self._watchers
+                if not self._subscribers.get(key) and now - self._last_used.get(key, 0) > self.idle_timeout
+            ]
+            stopped = [self._watchers.pop(key) for key in idle]
+            for key in idle:
+                self._last_used.pop(key, None)
+                self._subscribers.pop(key, None)
+        for watcher in stopped:
+            watcher.stop()
+        return len(stopped)
+
+    def stop_all(self) -> None:
+        with self._lock:
+            watchers = list(self._watchers.values())
+            self._watchers.clear()
+        for watcher in watchers:
+            watcher.stop()
+
+    def _reap_loop(self):
+        while True:
+            time.sleep(max(self.idle_timeout / 2, 1.0))
+            try:
+                self.reap()
+            except Exception:
+                logger.exception('kube watch reaper failed')
+
+    def _ensure_reaper(self):
+        if self._reaper_started:
+            return
+        threading.Thread(target=self._reap_loop, name='kube-watch-reaper', daemon=True).start()
+        self._reaper_started = True
+
+
+_manager = WatchManager(idle_timeout=getattr(settings, 'KUBE_WATCH_IDLE_TIMEOUT', 600))
+
+
+def get_watch_manager() -> WatchManager:
+    """Return the process-wide watch manager."""
+    return _manager
@@ -19,11 +19,17 @@ from typing import Any
 try:
     import yaml
     YAML_AVAILABLE = True
+    # LibYAML's C loader is several times faster; same safe-load semantics.
+    _SafeLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
 except ImportError:
     YAML_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
+# Bump whenever parsing or governance rules change: cached scan results
+# (see scan_engine.py) are keyed by it.
+RULES_VERSION = 2
+
 
 # ─────────────────────────────────────────────────────────────────────────────
 # Governance rule helpers
@@ -123,20 +129,21 @@ def parse_manifest_file(content: str, file_path: str) -> dict:
         'path': str,
         'resources': [{'kind': str, 'name': str, 'namespace': str}],
         'warnings': [str],
+        'error': str | None,     # set when the file could not be parsed
     }
     """
     resources: list[dict] = []
     warnings:  list[str]  = []
 
     if not YAML_AVAILABLE:
-        warnings.append(f'{file_path}: PyYAML not installed — cannot parse')
-        return {'path': file_path, 'resources': resources, 'warnings': warnings}
+        error = f'{file_path}: PyYAML not installed — cannot parse'
+        return {'path': file_path, 'resources': resources, 'warnings': [error], 'error': error}
 
     try:
-        docs = list(yaml.safe_load_all(content))
+        docs = list(yaml.load_all(content, Loader=_SafeLoader))
     except yaml.YAMLError as exc:
-        warnings.append(f'{file_path}: YAML parse error — {exc}')
-        return {'path': file_path, 'resources': resources, 'warnings': warnings}
+        error = f'{file_path}: YAML parse error — {exc}'
+        return {'path': file_path, 'resources': resources, 'warnings': [error], 'error': error}
 
     for doc in docs:
         if not isinstance(doc, dict):
@@ -154,7 +161,7 @@ def parse_manifest_file(content: str, file_path: str) -> dict:
         if pod_spec:
             warnings.extend(_check_pod_spec_governance(pod_spec, f'{kind}/{name}'))
 
-    return {'path': file_path, 'resources': resources, 'warnings': warnings}
+    return {'path': file_path, 'resources': resources, 'warnings': warnings, 'error': None}
 
 
 def build_summary(parsed_files: list[dict]) -> dict:
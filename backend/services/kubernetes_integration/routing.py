@@ -0,0 +1,9 @@
+from django.urls import path
+from . import consumers
+
+websocket_urlpatterns = [
+    path(
+        'ws/kubernetes/<str:config_id>/monitor/',
+        consumers.KubeMonitorConsumer.as_asgi(),
+    ),
+]
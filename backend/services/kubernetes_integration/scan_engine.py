@@ -0,0 +1,124 @@
+"""
+Manifest Scan Engine
+────────────────────
+Parses and governance-checks many manifest files at once:
+
+• Results are cached per (git blob SHA, path) in the shared Django cache, so
+  a file unchanged between commits — or between a scan and the apply of the
+  same commit — is never parsed twice.
+• Misses are parsed in a process pool when there are enough of them to pay
+  for it (KUBE_SCAN_PARALLEL_THRESHOLD), inline otherwise.
+• parse_manifest_file uses the LibYAML C loader when PyYAML was built with it.
+
+The blob SHA is computed exactly as git does (sha1 of "blob <len>\\0<bytes>"),
+so it works on any materialized tree, with or without a .git directory.
+"""
+
+import hashlib
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .manifest_parser import RULES_VERSION, parse_manifest_file
+
+logger = logging.getLogger(__name__)
+
+_KEY_PREFIX = 'kube_manifest'
+
+_pool: ProcessPoolExecutor | None = None
+_pool_lock = threading.Lock()
+
+
+def _setting(name: str, default):
+    return getattr(settings, name, default)
+
+
+def blob_sha(data: bytes) -> str:
+    """Git blob SHA-1 of ``data``."""
+    return hashlib.sha1(b'blob %d\0' % len(data) + data).hexdigest()
+
+
+def _cache_key(sha: str, rel_path: str) -> str:
+    path_hash = hashlib.sha1(rel_path.encode()).hexdigest()[:16]
+    return f'{_KEY_PREFIX}:v{RULES_VERSION}:{sha}:{path_hash}'
+
+
+def _parse_job(item: tuple[str, str]) -> dict:
+    content, rel_path = item
+    return parse_manifest_file(content, rel_path)
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn: never fork a threaded web worker; the parser needs no Django.
+            _pool = ProcessPoolExecutor(
+                max_workers=_setting('KUBE_SCAN_WORKERS', min(os.cpu_count() or 1, 8)),
+                mp_context=multiprocessing.get_context('spawn'),
+            )
+        return _pool
+
+
+def _reset_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def _parse_many(items: list[tuple[str, str]]) -> list[dict]:
+    threshold = _setting('KUBE_SCAN_PARALLEL_THRESHOLD', 200)
+    workers = _setting('KUBE_SCAN_WORKERS', min(os.cpu_count() or 1, 8))
+    if len(items) < threshold or workers <= 1:
+        return [_parse_job(item) for item in items]
+    chunksize = max(1, len(items) // (workers * 4))
+    try:
+        return list(_get_pool().map(_parse_job, items, chunksize=chunksize))
+    except BrokenProcessPool:
+        logger.warning('Manifest parse pool broke; parsing %d files inline', len(items))
+        _reset_pool()
+        return [_parse_job(item) for item in items]
+
+
+def parse_contents(files: list[tuple[str, bytes]]) -> tuple[list[dict], dict]:
+    """
+    Parse ``(rel_path, raw bytes)`` pairs, reusing cached results.
+
+    Returns (parsed files in input order, {'hits': n, 'misses': n}).
+    """
+    keys = [_cache_key(blob_sha(data), rel_path) for rel_path, data in files]
+    cached = cache.get_many(keys)
+
+    misses = [i for i, key in enumerate(keys) if key not in cached]
+    parsed = _parse_many([
+        (files[i][1].decode('utf-8', errors='replace'), files[i][0]) for i in misses
+    ])
+    fresh = {keys[i]: result for i, result in zip(misses, parsed)}
+    if fresh:
+        cache.set_many(fresh, timeout=_setting('KUBE_SCAN_CACHE_TTL', 7 * 24 * 3600))
+
+    results = [cached.get(key) or fresh[key] for key in keys]
+    return results, {'hits': len(files) - len(misses), 'misses': len(misses)}
+
+
+def scan_manifests(workdir: str, rel_paths: list[str]) -> tuple[list[dict], dict]:
+    """Parse the given files of a checked-out tree; see parse_contents()."""
+    files = []
+    for rel_path in rel_paths:
+        with open(os.path.join(workdir, rel_path), 'rb') as fh:
+            files.append((rel_path, fh.read()))
+    return parse_contents(files)
+
+
+def parse_cached(content: str, rel_path: str) -> dict:
+    """Single-file parse_manifest_file() through the blob cache."""
+    results, _stats = parse_contents([(rel_path, content.encode('utf-8'))])
+    return results[0]
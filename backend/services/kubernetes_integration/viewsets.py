@@ -32,7 +32,8 @@ from .serializers import (
     KubeSyncRunSerializer, ScanResultSerializer,
 )
 from .git_service import GitService, GitServiceError
-from .manifest_parser import parse_manifest_file, build_summary
+from .manifest_parser import build_summary
+from .scan_engine import scan_manifests
 from .kube_apply import execute_apply
 from .kube_monitor import get_monitor_data
 
@@ -141,17 +142,14 @@ class KubeConfigViewSet(viewsets.ModelViewSet):
             access_token=token,
         )
         try:
-            git.clone()
+            workdir    = git.clone()
             commit_sha = git.get_current_commit()
             yaml_files = git.list_yaml_files()
 
-            parsed_files = []
-            all_warnings = []
-            for rel_path in yaml_files:
-                content = git.read_file(rel_path)
-                parsed  = parse_manifest_file(content, rel_path)
-                parsed_files.append(parsed)
-                all_warnings.extend(parsed.get('warnings', []))
+            parsed_files, cache_stats = scan_manifests(workdir, yaml_files)
+            all_warnings = [w for parsed in parsed_files for w in parsed.get('warnings', [])]
+            logger.info('Scanned %d manifests for KubeConfig %s (%d cached)',
+                        len(parsed_files), pk, cache_stats['hits'])
 
             summary = build_summary(parsed_files)
 
@@ -212,7 +210,9 @@ class KubeConfigViewSet(viewsets.ModelViewSet):
             access_token=token,
         )
         try:
-            workdir = git.clone()
+            # Materialize the exact commit the scan reviewed (reused from the
+            # mirror cache when scan already checked it out).
+            workdir = git.clone(commit_sha=commit_sha)
             if not commit_sha:
                 commit_sha = git.get_current_commit()
 
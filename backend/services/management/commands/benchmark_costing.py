@@ -0,0 +1,167 @@
+"""
+benchmark_costing – Management command
+======================================
+Compares the set-based CostingEngine with the per-user, per-resource loop it
+replaced (one BillingService.calculate_*_cost call per resource, as
+calculate_daily_costs used to run for every user).
+
+Synthetic users and resources are created inside a transaction that is rolled
+back at the end, so the command is safe to run against a dev database.
+
+Usage:
+    python manage.py benchmark_costing                  # 10,000 users
+    python manage.py benchmark_costing --users 1000 --resources-per-user 3
+"""
+
+import time
+import uuid
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+
+def legacy_monthly_cost(service, user, days):
+    """The pre-CostingEngine calculate_user_monthly_cost loop, kept for comparison."""
+    from services.business_logic.costing import _total, empty_breakdown
+    from services.core.models import (
+        Instance, StorageBucket, StorageVolume, LoadBalancer, KubernetesCluster, ServerlessFunction,
+    )
+
+    costs = empty_breakdown()
+    for instance in Instance.objects.filter(owner=user).exclude(status='terminated'):
+        costs['compute']['instances'] += service.calculate_instance_cost(instance, days * 24)
+    for bucket in StorageBucket.objects.filter(owner=user).exclude(status='deleted'):
+        costs['storage']['buckets'] += service.calculate_storage_bucket_cost(bucket, days)
+    for volume in StorageVolume.objects.filter(owner=user).exclude(status='deleted'):
+        costs['storage']['volumes'] += service.calculate_volume_cost(volume, days)
+    for lb in LoadBalancer.objects.filter(owner=user):
+        costs['networking']['load_balancers'] += service.calculate_load_balancer_cost(lb, days)
+    for cluster in KubernetesCluster.objects.filter(owner=user).exclude(status='deleted'):
+        costs['compute']['kubernetes'] += service.calculate_kubernetes_cluster_cost(cluster, days)
+    for function in ServerlessFunction.objects.filter(owner=user):
+        costs['compute']['serverless'] += service.calculate_serverless_function_cost(function, days)
+    return _total(costs)
+
+
+class _QueryCounter:
+    """connection.execute_wrapper hook counting queries (no 9,000-query cap, no SQL kept)."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class Command(BaseCommand):
+    help = 'Benchmark set-based monthly costing against the per-user loop.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10_000, help='Synthetic users to create (default: 10000).')
+        parser.add_argument(
+            '--resources-per-user', type=int, default=2,
+            help='Resources of each type per user (default: 2).',
+        )
+
+    def handle(self, *args, **options):
+        from services.business_logic.billing import BillingService
+        from services.business_logic.costing import CostingEngine, days_in_month
+
+        n_users = options['users']
+        per_user = options['resources_per_user']
+
+        with transaction.atomic():
+            self.stdout.write(f'Seeding {n_users} users × {per_user} resources of each type…')
+            users = self._seed(n_users, per_user)
+            user_ids = [u.pk for u in users]
+
+            service = BillingService()
+            now = service.current_time
+            days = days_in_month(now.year, now.month)
+
+            legacy_q, engine_q = _QueryCounter(), _QueryCounter()
+            with connection.execute_wrapper(legacy_q):
+                started = time.perf_counter()
+                legacy = {u.pk: legacy_monthly_cost(service, u, days) for u in users}
+                legacy_s = time.perf_counter() - started
+
+            with connection.execute_wrapper(engine_q):
+                started = time.perf_counter()
+                engine = CostingEngine().monthly_costs(user_ids, now.year, now.month)
+                engine_s = time.perf_counter() - started
+
+            mismatches = sum(
+                1 for uid in user_ids
+                if abs(legacy[uid]['total'] - engine[uid]['total']) > Decimal('0.01')
+            )
+            transaction.set_rollback(True)
+
+        self.stdout.write(f'  per-user loop   {legacy_s:8.2f}s  {legacy_q.count:>8} queries')
+        self.stdout.write(f'  CostingEngine   {engine_s:8.2f}s  {engine_q.count:>8} queries')
+        self.stdout.write(f'  speed-up        {legacy_s / max(engine_s, 1e-9):8.1f}x')
+        if mismatches:
+            self.stdout.write(self.style.ERROR(f'  {mismatches} user totals differ by more than $0.01'))
+        else:
+            self.stdout.write(self.style.SUCCESS('  totals match for every user'))
+
+    def _seed(self, n_users, per_user):
+        from services.core.models import (
+            Flavor, Image, Instance, StorageBucket, StorageVolume,
+            LoadBalancer, KubernetesCluster, ServerlessFunction,
+        )
+
+        run = uuid.uuid4().hex[:8]
+        flavor = Flavor.objects.filter(name='m5.large').first() or Flavor.objects.create(
+            flavor_id=f'bench-{run}', name='m5.large', vcpus=2, memory_mb=8192, disk_gb=100,
+            network_bandwidth_gbps=1.0, hourly_cost_usd=0.096,
+        )
+        image = Image.objects.first() or Image.objects.create(
+            image_id=f'bench-{run}', name=f'bench-{run}', os_type='linux', os_name='ubuntu',
+            os_version='22.04', size_gb=30, is_public=True,
+        )
+        users = User.objects.bulk_create(
+            [User(username=f'bench-{run}-{i}') for i in range(n_users)], batch_size=2000,
+        )
+        if users and users[0].pk is None:     # backends without RETURNING
+            users = list(User.objects.filter(username__startswith=f'bench-{run}-').order_by('id'))
+
+        def rid(kind, u, j):
+            return f'{kind}-{run}-{u.pk}-{j}'
+
+        pairs = [(u, j) for u in users for j in range(per_user)]
+        Instance.objects.bulk_create([
+            Instance(resource_id=rid('inst', u, j), instance_id=rid('i', u, j), name='bench', owner=u,
+                     flavor=flavor, image=image, status='running')
+            for u, j in pairs
+        ], batch_size=2000)
+        StorageBucket.objects.bulk_create([
+            StorageBucket(resource_id=rid('bkt', u, j), bucket_id=rid('b', u, j), bucket_name=rid('bench', u, j),
+                          name='bench', owner=u, total_size_bytes=(j + 1) * 50 * 1024 ** 3)
+            for u, j in pairs
+        ], batch_size=2000)
+        StorageVolume.objects.bulk_create([
+            StorageVolume(resource_id=rid('vol', u, j), volume_id=rid('v', u, j), name='bench', owner=u,
+                          size_gb=100, volume_type='io1' if j % 2 else 'gp3', iops=1000 if j % 2 else None,
+                          availability_zone='az-1')
+            for u, j in pairs
+        ], batch_size=2000)
+        LoadBalancer.objects.bulk_create([
+            LoadBalancer(resource_id=rid('lb', u, j), lb_id=rid('l', u, j), name='bench', owner=u, vpc_id='vpc-bench',
+                         dns_name=f"{rid('lb', u, j)}.bench.local")
+            for u, j in pairs
+        ], batch_size=2000)
+        KubernetesCluster.objects.bulk_create([
+            KubernetesCluster(resource_id=rid('k8s', u, j), cluster_id=rid('k', u, j), name='bench', owner=u,
+                              node_count=3, status='running')
+            for u, j in pairs
+        ], batch_size=2000)
+        ServerlessFunction.objects.bulk_create([
+            ServerlessFunction(resource_id=rid('fn', u, j), function_id=rid('f', u, j), name='bench', owner=u,
+                               runtime='python3.11', handler='main.handler', code_uri='s3://bench/code.zip',
+                               invocation_count=j * 10_000)
+            for u, j in pairs
+        ], batch_size=2000)
+        return users
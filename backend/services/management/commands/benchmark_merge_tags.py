@@ -0,0 +1,136 @@
+"""
+benchmark_merge_tags – Management command
+=========================================
+Benchmarks precompiled merge-tag rendering (marketing.service.CompiledTemplate)
+against the per-recipient regex renderer it replaced, over a large synthetic
+HTML newsletter.
+
+Both renderers get the same contacts and tokens; outputs are compared for
+an evenly spaced sample of recipients.
+
+Usage:
+    python manage.py benchmark_merge_tags                   # 100,000 renders
+    python manage.py benchmark_merge_tags --renders 20000 --sections 40
+"""
+
+import re
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+
+_SECTION = """\
+<tr><td style="padding:24px;font-family:Helvetica,Arial,sans-serif;">
+  <h2 style="margin:0 0 12px;color:#1a1a2e;">{title}</h2>
+  <p style="margin:0 0 12px;line-height:1.5;color:#333;">Hi {{{{ first_name }}}}, {body}</p>
+  <a href="https://www.example.com/articles/{slug}?utm_source=newsletter&utm_medium=email"
+     style="display:inline-block;padding:10px 18px;background:#4f46e5;color:#fff;border-radius:4px;">Read more</a>
+</td></tr>
+"""
+
+_TEXT = 'Hi {{ first_name }} {{ last_name }},\nYour plan: {{ plan }}\nView online: {{ webview_url }}\n'
+
+
+def _newsletter(sections: int) -> str:
+    lorem = ('Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do eiusmod tempor '
+             'incididunt ut labore et dolore magna aliqua. ') * 4
+    rows = ''.join(
+        _SECTION.format(title=f'Story {i}', body=lorem, slug=f'story-{i}') for i in range(sections)
+    )
+    return (
+        '<!DOCTYPE html><html><head><meta charset="utf-8"><title>News</title></head><body>'
+        '<table width="100%" cellpadding="0" cellspacing="0">'
+        '<tr><td>Hello {{ full_name }} ({{ email }}) — {{ company }}</td></tr>'
+        f'{rows}</table></body></html>'
+    )
+
+
+def legacy_render_template(html, text, contact, campaign_id, unsubscribe_token):
+    """The per-recipient renderer replaced by CompiledTemplate (for comparison)."""
+    from services.marketing.service import TRACKING_BASE, UNSUBSCRIBE_BASE
+
+    unsub_url = f'{UNSUBSCRIBE_BASE}/{unsubscribe_token}'
+    ctx = {
+        'first_name':     contact.get('first_name', ''),
+        'last_name':      contact.get('last_name', ''),
+        'email':          contact.get('email', ''),
+        'full_name':      f"{contact.get('first_name','')} {contact.get('last_name','')}".strip(),
+        'unsubscribe_url': unsub_url,
+        'webview_url':    f'{TRACKING_BASE}/web/{campaign_id}',
+    }
+    ctx.update(contact.get('custom_fields', {}))
+
+    def replace_tag(m):
+        key = m.group(1).strip()
+        return str(ctx.get(key, m.group(0)))
+
+    rendered_html = re.sub(r'\{\{\s*(\w+)\s*\}\}', replace_tag, html)
+    rendered_text = re.sub(r'\{\{\s*(\w+)\s*\}\}', replace_tag, text)
+
+    pixel = (
+        f'<img src="{TRACKING_BASE}/open/{campaign_id}/{unsubscribe_token}" '
+        f'width="1" height="1" alt="" style="display:none;" />'
+    )
+    rendered_html = rendered_html.replace('</body>', f'{pixel}</body>')
+    if '</body>' not in rendered_html:
+        rendered_html += pixel
+
+    if 'unsubscribe' not in rendered_html.lower():
+        footer = (
+            f'<p style="text-align:center;font-size:12px;color:#999;margin-top:32px;">'
+            f'You received this email because you subscribed to our list. '
+            f'<a href="{unsub_url}" style="color:#999;">Unsubscribe</a></p>'
+        )
+        rendered_html = rendered_html.replace('</body>', f'{footer}</body>')
+        if '</body>' not in html:
+            rendered_html += footer
+
+    return rendered_html, rendered_text
+
+
+class Command(BaseCommand):
+    help = 'Benchmark precompiled merge-tag rendering against the regex renderer.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--renders', type=int, default=100_000, help='Recipients to render (default: 100000).')
+        parser.add_argument('--sections', type=int, default=20, help='Article blocks in the newsletter (default: 20).')
+
+    def handle(self, *args, **options):
+        from services.marketing.service import compile_template
+
+        n = options['renders']
+        html = _newsletter(options['sections'])
+        campaign_id = f'cmp-{uuid.uuid4().hex[:12]}'
+        contacts = [
+            {'first_name': f'First{i}', 'last_name': f'Last{i}', 'email': f'user{i}@example.com',
+             'custom_fields': {'company': f'Company {i % 97}', 'plan': ('free', 'pro', 'team')[i % 3]}}
+            for i in range(n)
+        ]
+        tokens = [uuid.uuid4().hex for _ in range(n)]
+        self.stdout.write(f'Newsletter body: {len(html):,} bytes; {n:,} renders')
+
+        started = time.perf_counter()
+        for c, t in zip(contacts, tokens):
+            legacy_render_template(html, _TEXT, c, campaign_id, t)
+        legacy_s = time.perf_counter() - started
+
+        started = time.perf_counter()
+        template = compile_template(html, _TEXT)
+        for c, t in zip(contacts, tokens):
+            template.render(c, campaign_id, t)
+        compiled_s = time.perf_counter() - started
+
+        sample = range(0, n, max(n // 1000, 1))
+        identical = all(
+            legacy_render_template(html, _TEXT, contacts[i], campaign_id, tokens[i])
+            == template.render(contacts[i], campaign_id, tokens[i])
+            for i in sample
+        )
+
+        self.stdout.write(f'  regex per recipient  {legacy_s:8.2f}s  {legacy_s / n * 1e6:8.1f} µs/render')
+        self.stdout.write(f'  precompiled          {compiled_s:8.2f}s  {compiled_s / n * 1e6:8.1f} µs/render')
+        self.stdout.write(f'  speed-up             {legacy_s / max(compiled_s, 1e-9):7.1f}x')
+        if identical:
+            self.stdout.write(self.style.SUCCESS(f'  output identical to the regex renderer ({len(sample)} sampled)'))
+        else:
+            self.stdout.write(self.style.ERROR('  output differs from the regex renderer'))
@@ -8,6 +8,7 @@ Usage:
     python manage.py billing_weekly_calculation --weeks-back 24
     python manage.py billing_weekly_calculation --user john@example.com
     python manage.py billing_weekly_calculation --flush-only
+    python manage.py billing_weekly_calculation --workers 8
 
 Schedule (cron):
     0 2 * * 1    # Every Monday at 02:00 UTC
@@ -20,10 +21,28 @@ Schedule (cron):
     # }
 """
 
+from concurrent.futures import ProcessPoolExecutor
+
 from django.core.management.base import BaseCommand, CommandError
 from django.contrib.auth.models import User
 
 
+def _init_worker():
+    """Process-pool initializer: make Django usable and drop inherited DB connections."""
+    import django
+    from django.apps import apps
+    from django.db import connections
+
+    if not apps.ready:
+        django.setup()
+    connections.close_all()
+
+
+def _snapshot_shard(owner_ids, weeks_back):
+    from services.billing import service as svc
+    return svc.calculate_weekly_snapshots(owner_ids=owner_ids, weeks_back=weeks_back, flush=False)
+
+
 class Command(BaseCommand):
     help = 'Calculate weekly billing snapshots across all (or a single) user account(s).'
 
@@ -40,6 +59,10 @@ class Command(BaseCommand):
             '--flush-only', action='store_true', default=False,
             help='Only flush pending PlatformUsageEvents into UsageRecords; skip snapshot calculation.',
         )
+        parser.add_argument(
+            '--workers', type=int, default=1,
+            help='Worker processes to shard users across for snapshot calculation (default: 1).',
+        )
 
     def handle(self, *args, **options):
         from services.billing import service as svc
@@ -47,6 +70,7 @@ class Command(BaseCommand):
         weeks_back  = options['weeks_back']
         user_filter = options['user']
         flush_only  = options['flush_only']
+        workers     = max(options['workers'], 1)
 
         # Resolve user if provided
         owner = None
@@ -71,7 +95,10 @@ class Command(BaseCommand):
 
         # Step 2 – calculate snapshots
         self.stdout.write(f'Calculating weekly snapshots ({weeks_back} weeks back)…')
-        count = svc.calculate_weekly_snapshots(owner=owner, weeks_back=weeks_back)
+        if owner is None and workers > 1:
+            count = self._calculate_sharded(weeks_back, workers)
+        else:
+            count = svc.calculate_weekly_snapshots(owner=owner, weeks_back=weeks_back, flush=False)
         self.stdout.write(self.style.SUCCESS(
             f'  Written/updated {count} snapshot rows across '
             f'{"all users" if owner is None else owner.username}.'
@@ -92,3 +119,17 @@ class Command(BaseCommand):
                 self.stdout.write('─────────────────────────────────────────────────')
 
         self.stdout.write(self.style.SUCCESS('Weekly billing calculation complete.'))
+
+    def _calculate_sharded(self, weeks_back, workers):
+        """Fan active users out over a process pool, one shard per worker."""
+        from django.db import connections
+
+        owner_ids = list(User.objects.filter(is_active=True).order_by('id').values_list('id', flat=True))
+        shards = [owner_ids[i::workers] for i in range(workers) if owner_ids[i::workers]]
+        if not shards:
+            return 0
+        self.stdout.write(f'  Sharding {len(owner_ids)} users across {len(shards)} worker process(es)…')
+
+        connections.close_all()     # never share a DB socket with forked children
+        with ProcessPoolExecutor(max_workers=len(shards), initializer=_init_worker) as pool:
+            return sum(pool.map(_snapshot_shard, shards, [weeks_back] * len(shards)))
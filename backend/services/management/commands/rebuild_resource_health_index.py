@@ -0,0 +1,45 @@
+"""
+rebuild_resource_health_index – Management command
+==================================================
+Re-derives ResourceHealthIndex rows from the source resource tables.
+
+The index is normally maintained by post_save / post_delete signals.  Run
+this once after deploying the release that added the index (migration 0030)
+to backfill existing resources, and after bulk changes that bypassed
+signals (queryset.update(), raw SQL, data migrations).
+
+Usage:
+    python manage.py rebuild_resource_health_index
+    python manage.py rebuild_resource_health_index --user john@example.com
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from django.contrib.auth.models import User
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the resource health index for all (or a single) user account(s).'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user', type=str, default=None,
+            help='Limit the rebuild to a single user (email or username).',
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=2000,
+            help='Rows read and upserted per batch (default: 2000).',
+        )
+
+    def handle(self, *args, **options):
+        from services.monitoring import health_index
+
+        owner = None
+        user_filter = options['user']
+        if user_filter:
+            owner = (User.objects.filter(email=user_filter).first()
+                     or User.objects.filter(username=user_filter).first())
+            if owner is None:
+                raise CommandError(f'User "{user_filter}" not found.')
+
+        written = health_index.rebuild(owner=owner, chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f'Indexed {written} resource(s).'))
@@ -0,0 +1,48 @@
+"""
+reconcile_bucket_counters – Management command
+==============================================
+Recomputes StorageBucket.total_objects / total_size_bytes from the S3Object
+table and corrects any drift.
+
+The counters are normally maintained incrementally on every object write
+(storage/counters.py); this job catches writes that bypassed that path
+(bulk imports, queryset.update(), raw SQL).
+
+Usage:
+    python manage.py reconcile_bucket_counters
+    python manage.py reconcile_bucket_counters --bucket my-bucket
+
+Schedule (cron):
+    30 * * * *    # Hourly
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = 'Recompute bucket object / size counters and correct drift.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--bucket', type=str, default=None,
+            help='Limit the run to a single bucket (bucket name).',
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=500,
+            help='Buckets aggregated and locked per transaction (default: 500).',
+        )
+
+    def handle(self, *args, **options):
+        from services.storage import counters
+        from services.storage.models import StorageBucket
+
+        bucket_ids = None
+        if options['bucket']:
+            bucket_ids = list(
+                StorageBucket.objects.filter(bucket_name=options['bucket']).values_list('pk', flat=True)
+            )
+            if not bucket_ids:
+                raise CommandError(f'Bucket "{options["bucket"]}" not found.')
+
+        corrected = counters.reconcile(bucket_ids=bucket_ids, chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f'Corrected {corrected} bucket(s).'))
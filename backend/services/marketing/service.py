@@ -1,12 +1,29 @@
 # AtonixCorp Cloud – Email Marketing Service
 # Handles campaign sending via Django's email backend (SMTP).
 # Falls back to a mock dry-run when MARKETING_SMTP_HOST is not configured.
+#
+# Campaign sends are a streamed pipeline:
+#   - the audience is de-duplicated by email in the database and read with
+#     iterator() in chunks of MARKETING_SEND_CHUNK_SIZE contacts;
+#   - each chunk is rendered and sent by MARKETING_SEND_WORKERS threads, each
+#     holding its own SMTP connection, with sends to any one recipient domain
+#     spaced to at most MARKETING_DOMAIN_RATE per second;
+#   - the chunk's SendEvents are bulk-inserted once it is sent.  Those 'sent'
+#     events are the checkpoint: a resumed send skips every contact that
+#     already has one, so a crash costs at most one chunk of re-sends.
 
 import logging
 import os
 import re
+import socket
+import threading
+import time
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
+from functools import lru_cache
+from itertools import islice
+from queue import Empty, Queue
 from typing import Optional
 
 logger = logging.getLogger(__name__)
@@ -22,6 +39,11 @@ UNSUBSCRIBE_BASE = os.environ.get('UNSUBSCRIBE_BASE_URL',
 TRACKING_BASE    = os.environ.get('TRACKING_BASE_URL',
                                   'https://app.atonixcorp.com/t')
 
+SEND_WORKERS    = int(os.environ.get('MARKETING_SEND_WORKERS', '8'))
+SEND_CHUNK_SIZE = int(os.environ.get('MARKETING_SEND_CHUNK_SIZE', '1000'))
+DOMAIN_RATE     = float(os.environ.get('MARKETING_DOMAIN_RATE', '20'))   # msgs/s per domain; 0 = unlimited
+SEND_LOCK_TTL   = 600
+
 
 def _live() -> bool:
     return bool(SMTP_HOST and SMTP_USER and SMTP_PASS)
@@ -41,6 +63,103 @@ def _get_connection():
 
 
 # ── Merge Tags ────────────────────────────────────────────────────────────────
+#
+# A body is compiled once per campaign into a flat list of parts: static
+# chunks, with merge-tag, tracking-pixel and footer slots at precomputed
+# indices.  Rendering for one recipient fills the slots and joins the list —
+# no regex or full-body scans per contact.
+
+_TAG_RE = re.compile(r'\{\{\s*(\w+)\s*\}\}')
+_PIXEL  = object()
+_FOOTER = object()
+
+
+def _compile_parts(body: str, markers: tuple = ()) -> tuple[list, list]:
+    """
+    Split ``body`` into parts plus [(index, key, raw)] slots; ``markers``
+    (_PIXEL / _FOOTER) become slots before every '</body>', or at the end if
+    there is none.
+    """
+    parts, slots = [], []
+
+    def add_text(text):
+        pos = 0
+        for m in _TAG_RE.finditer(text):
+            parts.append(text[pos:m.start()])
+            slots.append((len(parts), m.group(1), m.group(0)))
+            parts.append(m.group(0))
+            pos = m.end()
+        parts.append(text[pos:])
+
+    def add_markers():
+        for marker in markers:
+            slots.append((len(parts), marker, ''))
+            parts.append('')
+
+    chunks = body.split('</body>') if markers else [body]
+    for i, chunk in enumerate(chunks):
+        if i:
+            add_markers()
+            parts.append('</body>')
+        add_text(chunk)
+    if markers and len(chunks) == 1:
+        add_markers()
+    return parts, slots
+
+
+class CompiledTemplate:
+    """
+    An HTML + text body compiled for per-recipient rendering.
+
+    Whether the unsubscribe footer is added is decided once from the
+    template (does it mention "unsubscribe" anywhere?) rather than per
+    recipient.
+    """
+
+    def __init__(self, html: str, text: str):
+        markers = (_PIXEL,) if 'unsubscribe' in html.lower() else (_PIXEL, _FOOTER)
+        self._html_parts, self._html_slots = _compile_parts(html, markers)
+        self._text_parts, self._text_slots = _compile_parts(text)
+
+    @staticmethod
+    def _fill(parts: list, slots: list, ctx: dict) -> str:
+        out = parts.copy()
+        for index, key, raw in slots:
+            out[index] = ctx.get(key, raw)
+        return ''.join(out)
+
+    def render(self, contact: dict, campaign_id: str, unsubscribe_token: str) -> tuple[str, str]:
+        unsub_url = f'{UNSUBSCRIBE_BASE}/{unsubscribe_token}'
+        first_name = contact.get('first_name', '')
+        last_name = contact.get('last_name', '')
+        ctx = {
+            'first_name':     first_name,
+            'last_name':      last_name,
+            'email':          contact.get('email', ''),
+            'full_name':      f'{first_name} {last_name}'.strip(),
+            'unsubscribe_url': unsub_url,
+            'webview_url':    f'{TRACKING_BASE}/web/{campaign_id}',
+        }
+        ctx.update(contact.get('custom_fields', {}))
+        ctx = {k: str(v) for k, v in ctx.items()}
+        ctx[_PIXEL] = (
+            f'<img src="{TRACKING_BASE}/open/{campaign_id}/{unsubscribe_token}" '
+            f'width="1" height="1" alt="" style="display:none;" />'
+        )
+        ctx[_FOOTER] = (
+            f'<p style="text-align:center;font-size:12px;color:#999;margin-top:32px;">'
+            f'You received this email because you subscribed to our list. '
+            f'<a href="{unsub_url}" style="color:#999;">Unsubscribe</a></p>'
+        )
+        return (self._fill(self._html_parts, self._html_slots, ctx),
+                self._fill(self._text_parts, self._text_slots, ctx))
+
+
+@lru_cache(maxsize=64)
+def compile_template(html: str, text: str) -> CompiledTemplate:
+    """Compiled form of a campaign body; cached, so repeat calls are free."""
+    return CompiledTemplate(html, text)
+
 
 def render_template(html: str, text: str, contact: dict,
                     campaign_id: str, unsubscribe_token: str) -> tuple[str, str]:
@@ -50,63 +169,97 @@ def render_template(html: str, text: str, contact: dict,
                {{ unsubscribe_url }}, {{ webview_url }}, and any custom_field key.
     Also injects open-tracking pixel and wraps links with click-tracking.
     """
-    unsub_url = f'{UNSUBSCRIBE_BASE}/{unsubscribe_token}'
-    ctx = {
-        'first_name':     contact.get('first_name', ''),
-        'last_name':      contact.get('last_name', ''),
-        'email':          contact.get('email', ''),
-        'full_name':      f"{contact.get('first_name','')} {contact.get('last_name','')}".strip(),
-        'unsubscribe_url': unsub_url,
-        'webview_url':    f'{TRACKING_BASE}/web/{campaign_id}',
-    }
-    ctx.update(contact.get('custom_fields', {}))
+    return compile_template(html, text).render(contact, campaign_id, unsubscribe_token)
 
-    def replace_tag(m):
-        key = m.group(1).strip()
-        return str(ctx.get(key, m.group(0)))
 
-    rendered_html = re.sub(r'\{\{\s*(\w+)\s*\}\}', replace_tag, html)
-    rendered_text = re.sub(r'\{\{\s*(\w+)\s*\}\}', replace_tag, text)
+# ── Sending ───────────────────────────────────────────────────────────────────
 
-    # Tracking pixel
-    pixel = (
-        f'<img src="{TRACKING_BASE}/open/{campaign_id}/{unsubscribe_token}" '
-        f'width="1" height="1" alt="" style="display:none;" />'
-    )
-    rendered_html = rendered_html.replace('</body>', f'{pixel}</body>')
-    if '</body>' not in rendered_html:
-        rendered_html += pixel
+class DomainThrottle:
+    """Spaces sends to each recipient domain at most ``rate`` per second."""
+
+    def __init__(self, rate: float, clock=time.monotonic, sleep=time.sleep):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._clock = clock
+        self._sleep = sleep
+        self._next_slot: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def wait(self, email: str) -> None:
+        if not self.interval:
+            return
+        domain = email.rpartition('@')[2].lower()
+        with self._lock:
+            now = self._clock()
+            slot = max(now, self._next_slot.get(domain, now))
+            self._next_slot[domain] = slot + self.interval
+        if slot > now:
+            self._sleep(slot - now)
+
+
+class _ConnectionPool:
+    """One SMTP connection per sender thread, opened on first use."""
+
+    def __init__(self):
+        self._local = threading.local()
+        self._opened = []
+        self._lock = threading.Lock()
+
+    def get(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = _get_connection()
+            conn.open()
+            self._local.conn = conn
+            with self._lock:
+                self._opened.append(conn)
+        return conn
 
-    # Unsubscribe footer if not already present
-    if 'unsubscribe' not in rendered_html.lower():
-        footer = (
-            f'<p style="text-align:center;font-size:12px;color:#999;margin-top:32px;">'
-            f'You received this email because you subscribed to our list. '
-            f'<a href="{unsub_url}" style="color:#999;">Unsubscribe</a></p>'
-        )
-        rendered_html = rendered_html.replace('</body>', f'{footer}</body>')
-        if '</body>' not in html:
-            rendered_html += footer
+    def close(self):
+        for conn in self._opened:
+            try:
+                conn.close()
+            except Exception:
+                logger.warning('Closing marketing SMTP connection failed', exc_info=True)
+        self._opened.clear()
 
-    return rendered_html, rendered_text
 
+def _audience(campaign):
+    """
+    Subscribed contacts of the campaign's lists, one per email address (the
+    lowest id wins), de-duplicated by the database, in id order.
+    """
+    from django.db.models import Min
+    from .models import Contact
+
+    subscribed = Contact.objects.filter(contact_list__campaigns=campaign, status='subscribed')
+    first_ids = subscribed.order_by().values('email').annotate(first_id=Min('id')).values('first_id')
+    return Contact.objects.filter(pk__in=first_ids).order_by('pk')
+
+
+def _sent_emails(campaign):
+    """Emails already delivered by an earlier (possibly interrupted) real send."""
+    from .models import SendEvent
+    return (SendEvent.objects
+            .filter(campaign=campaign, event='sent', metadata__dry_run=False)
+            .values('contact__email'))
 
-# ── Sending ───────────────────────────────────────────────────────────────────
 
 def send_campaign(campaign_id: str, dry_run: bool = False) -> dict:
     """
-    Primary send function. Pulls the Campaign from the DB, iterates over all
-    contacts in linked lists, renders per-contact content, and sends via SMTP.
+    Primary send function. Streams the campaign's de-duplicated audience in
+    chunks, renders per-contact content and sends via a pool of SMTP
+    connections. Contacts already sent to by an earlier run are skipped, so
+    calling this again resumes an interrupted send.
 
     Returns: {sent, skipped, failed, errors[]}
     """
     from .models import Campaign, CampaignAnalytics, SendEvent
+    from django.core.cache import cache
     from django.core.mail import EmailMultiAlternatives
+    from django.db.models import F
 
     try:
-        campaign = Campaign.objects.prefetch_related(
-            'contact_lists__contacts'
-        ).get(resource_id=campaign_id)
+        campaign = Campaign.objects.select_related('template').get(resource_id=campaign_id)
     except Campaign.DoesNotExist:
         return {'success': False, 'error': 'Campaign not found.'}
 
@@ -118,69 +271,86 @@ def send_campaign(campaign_id: str, dry_run: bool = False) -> dict:
     if not html_body:
         return {'success': False, 'error': 'Campaign has no HTML body.'}
 
-    # Gather unique subscribed contacts
-    seen      = set()
-    contacts  = []
-    for lst in campaign.contact_lists.all():
-        for c in lst.contacts.filter(status='subscribed'):
-            if c.email not in seen:
-                seen.add(c.email)
-                contacts.append(c)
+    # One sender per campaign at a time, across workers.
+    lock_key = f'marketing:send:{campaign_id}'
+    if not cache.add(lock_key, 1, timeout=SEND_LOCK_TTL):
+        return {'success': False, 'error': 'Campaign is already being sent.'}
+
+    template = compile_template(html_body, text_body)
+    live = _live() and not dry_run
+    pool = _ConnectionPool()
+    throttle = DomainThrottle(DOMAIN_RATE)
+    from_email = f'{campaign.from_name} <{campaign.from_email}>'
+    reply_to = [campaign.reply_to] if campaign.reply_to else []
+
+    def deliver(contact):
+        """Render and send to one contact; returns (contact, token, error)."""
+        token = uuid.uuid4().hex
+        try:
+            rendered_html, rendered_text = template.render(
+                {
+                    'first_name':   contact.first_name,
+                    'last_name':    contact.last_name,
+                    'email':        contact.email,
+                    'custom_fields': contact.custom_fields,
+                },
+                campaign_id,
+                token,
+            )
+            if not live:
+                logger.debug('DRY-RUN: would send to %s', contact.email)
+            else:
+                throttle.wait(contact.email)
+                msg = EmailMultiAlternatives(
+                    subject=campaign.subject,
+                    body=rendered_text or '',
+                    from_email=from_email,
+                    to=[contact.email],
+                    reply_to=reply_to,
+                    connection=pool.get(),
+                )
+                msg.attach_alternative(rendered_html, 'text/html')
+                msg.extra_headers['List-Unsubscribe'] = (
+                    f'<{UNSUBSCRIBE_BASE}/{token}>'
+                )
+                msg.send()
+            return contact, token, None
+        except Exception as exc:
+            logger.error('Failed to send to %s: %s', contact.email, exc)
+            return contact, token, exc
 
-    sent = skipped = failed = 0
+    sent = failed = 0
     errors = []
-
-    conn = _get_connection() if (_live() and not dry_run) else None
+    skipped = _audience(campaign).filter(email__in=_sent_emails(campaign)).count()
+    pending = (
+        _audience(campaign)
+        .exclude(email__in=_sent_emails(campaign))
+        .only('id', 'email', 'first_name', 'last_name', 'custom_fields')
+        .iterator(chunk_size=SEND_CHUNK_SIZE)
+    )
 
     try:
-        if conn:
-            conn.open()
-
-        for contact in contacts:
-            token = uuid.uuid4().hex
-            try:
-                rendered_html, rendered_text = render_template(
-                    html_body, text_body,
-                    {
-                        'first_name':   contact.first_name,
-                        'last_name':    contact.last_name,
-                        'email':        contact.email,
-                        'custom_fields': contact.custom_fields,
-                    },
-                    campaign_id,
-                    token,
-                )
-                if dry_run or not conn:
-                    logger.debug('DRY-RUN: would send to %s', contact.email)
-                else:
-                    msg = EmailMultiAlternatives(
-                        subject=campaign.subject,
-                        body=rendered_text or '',
-                        from_email=f'{campaign.from_name} <{campaign.from_email}>',
-                        to=[contact.email],
-                        reply_to=[campaign.reply_to] if campaign.reply_to else [],
-                        connection=conn,
-                    )
-                    msg.attach_alternative(rendered_html, 'text/html')
-                    msg.extra_headers['List-Unsubscribe'] = (
-                        f'<{UNSUBSCRIBE_BASE}/{token}>'
-                    )
-                    msg.send()
-
-                SendEvent.objects.create(
-                    campaign=campaign,
-                    contact=contact,
-                    event='sent',
-                    metadata={'token': token, 'dry_run': dry_run},
-                )
-                sent += 1
-            except Exception as exc:
-                failed += 1
-                errors.append({'email': contact.email, 'error': str(exc)})
-                logger.error('Failed to send to %s: %s', contact.email, exc)
+        with ThreadPoolExecutor(max_workers=SEND_WORKERS if live else 1,
+                                thread_name_prefix='campaign-send') as executor:
+            while chunk := list(islice(pending, SEND_CHUNK_SIZE)):
+                events = []
+                for contact, token, exc in executor.map(deliver, chunk):
+                    if exc is None:
+                        events.append(SendEvent(
+                            campaign=campaign,
+                            contact=contact,
+                            event='sent',
+                            metadata={'token': token, 'dry_run': not live},
+                        ))
+                    else:
+                        errors.append({'email': contact.email, 'error': str(exc)})
+                SendEvent.objects.bulk_create(events)
+                sent += len(events)
+                failed += len(chunk) - len(events)
+                cache.touch(lock_key, SEND_LOCK_TTL)
     finally:
-        if conn:
-            conn.close()
+        pool.close()
+        cache.delete(lock_key)
 
     # Update campaign status + analytics
     from django.utils import timezone as tz
@@ -190,21 +360,73 @@ def send_campaign(campaign_id: str, dry_run: bool = False) -> dict:
         campaign.save(update_fields=['status', 'sent_at', 'updated_at'])
 
     analytics, _ = CampaignAnalytics.objects.get_or_create(campaign=campaign)
-    analytics.total_sent   += sent
-    analytics.last_synced_at = tz.now()
-    analytics.save()
+    CampaignAnalytics.objects.filter(pk=analytics.pk).update(
+        total_sent=F('total_sent') + sent,
+        last_synced_at=tz.now(),
+    )
 
     return {
         'success': True,
         'sent':    sent,
         'skipped': skipped,
         'failed':  failed,
-        'total':   len(contacts),
+        'total':   sent + failed + skipped,
         'errors':  errors[:20],
         'dry_run': dry_run,
     }
 
 
+# ── Background sends ──────────────────────────────────────────────────────────
+#
+# The send endpoint only queues the campaign; a per-process daemon worker runs
+# send_campaign() outside the request.  Progress shows in the campaign's
+# analytics, and a send interrupted by a restart is resumed by sending again
+# (contacts already sent to are skipped).
+
+_SEND_QUEUE: Queue = Queue()
+_SEND_WORKER_STARTED = False
+_SEND_LOCK = threading.Lock()
+
+
+def _send_worker_loop():
+    from django.db import close_old_connections
+
+    while True:
+        campaign_id = _SEND_QUEUE.get()
+        try:
+            close_old_connections()
+            result = send_campaign(campaign_id)
+            if result.get('success'):
+                logger.info('Campaign %s sent: %d sent, %d skipped, %d failed', campaign_id,
+                            result['sent'], result['skipped'], result['failed'])
+            else:
+                logger.warning('Campaign %s not sent: %s', campaign_id, result.get('error'))
+        except Exception:
+            logger.exception('Campaign send worker error')
+        finally:
+            close_old_connections()
+            _SEND_QUEUE.task_done()
+
+
+def _ensure_send_worker():
+    global _SEND_WORKER_STARTED
+    with _SEND_LOCK:
+        if _SEND_WORKER_STARTED:
+            return
+        worker = threading.Thread(target=_send_worker_loop, name='campaign-send-worker', daemon=True)
+        worker.start()
+        _SEND_WORKER_STARTED = True
+
+
+def enqueue_campaign_send(campaign) -> dict:
+    """Queue a background send of ``campaign`` once the current transaction commits."""
+    from django.db import transaction
+
+    _ensure_send_worker()
+    transaction.on_commit(lambda: _SEND_QUEUE.put(campaign.resource_id))
+    return {'success': True, 'campaign_id': campaign.resource_id, 'status': 'sending'}
+
+
 def send_test_email(campaign_id: str, to_email: str) -> dict:
     """Send a preview/test email to a single address."""
     from .models import Campaign
@@ -248,6 +470,107 @@ def send_test_email(campaign_id: str, to_email: str) -> dict:
 
 
 # ── CSV Import ────────────────────────────────────────────────────────────────
+#
+# Contacts are imported from a CSV stream in batches of MARKETING_IMPORT_BATCH_SIZE
+# rows: each batch is validated, de-duplicated by email and written with one
+# bulk upsert on (contact_list, email), so memory stays bounded whatever the
+# file size.  Uploaded files are spooled to disk and imported by a background
+# worker that records progress in the list's metadata['csv_import'].
+#
+# A list runs one import at a time: a new upload is rejected while the
+# list's import is queued or running.  Import state is written by updating
+# only the csv_import key, under a row lock, so it never clobbers other
+# metadata changed meanwhile.
+#
+# Each import records the worker process that owns it, and that worker keeps
+# a heartbeat in the shared cache.  When a worker starts it takes over imports
+# left queued / running by a worker whose heartbeat has lapsed: they are
+# re-queued from their spool file when it is still on disk, otherwise marked
+# failed.
+
+IMPORT_BATCH_SIZE   = int(os.environ.get('MARKETING_IMPORT_BATCH_SIZE', '2000'))
+IMPORT_INLINE_BYTES = int(os.environ.get('MARKETING_IMPORT_INLINE_BYTES', str(256 * 1024)))
+IMPORT_SPOOL_DIR    = os.environ.get('MARKETING_IMPORT_DIR', '')
+
+_BUILTIN_COLUMNS = ('email', 'first_name', 'last_name', 'first name', 'last name')
+
+_IMPORT_QUEUE: Queue = Queue()
+_IMPORT_WORKER_STARTED = False
+_IMPORT_LOCK = threading.Lock()
+_IMPORT_WORKER_ID = f'{socket.gethostname()}:{os.getpid()}'
+IMPORT_HEARTBEAT = 20      # seconds between worker heartbeats; lapsed after 3 missed
+
+
+def _contact_from_row(lst, row: dict):
+    """Validated, unsaved Contact for one CSV row, or None if the email is invalid."""
+    from .models import Contact
+
+    email = (row.get('email') or row.get('Email') or '').strip().lower()
+    if not email or '@' not in email:
+        return None
+    # Any extra columns go to custom_fields
+    extra = {k: v for k, v in row.items() if (k or '').lower() not in _BUILTIN_COLUMNS}
+    return Contact(
+        contact_list=lst,
+        email=email,
+        first_name=(row.get('first_name') or row.get('First Name') or '').strip(),
+        last_name=(row.get('last_name') or row.get('Last Name') or '').strip(),
+        status='subscribed',
+        custom_fields=extra,
+    )
+
+
+def _upsert_batch(lst, rows: list, first_row: int, update_fields: list, stats: dict) -> None:
+    from .models import Contact
+
+    batch, valid = {}, 0
+    for offset, row in enumerate(rows):
+        contact = _contact_from_row(lst, row)
+        if contact is None:
+            stats['skipped'] += 1
+            if len(stats['errors']) < 20:
+                stats['errors'].append({'row': first_row + offset, 'error': 'Invalid email', 'data': str(row)})
+            continue
+        batch[contact.email] = contact          # last row for an email wins
+        valid += 1
+    if batch:
+        existing = set(
+            Contact.objects.filter(contact_list=lst, email__in=list(batch)).values_list('email', flat=True)
+        )
+        Contact.objects.bulk_create(
+            batch.values(), update_conflicts=True,
+            unique_fields=['contact_list', 'email'], update_fields=update_fields,
+        )
+        # Counted per row, as before: a repeated email is an update.
+        created = len(batch) - len(existing)
+        stats['created'] += created
+        stats['updated'] += valid - created
+    stats['rows'] += len(rows)
+
+
+def import_contacts_stream(lst, text_stream, progress=None) -> dict:
+    """
+    Upsert contacts from a CSV text stream into ``lst``.
+    Expected header: email[,first_name,last_name,...]; extra columns go to
+    custom_fields.  ``progress(stats)`` is called after every batch.
+    Returns: {created, updated, skipped, rows, errors}
+    """
+    import csv
+
+    reader = csv.DictReader(text_stream)
+    extra_columns = [c for c in (reader.fieldnames or []) if (c or '').lower() not in _BUILTIN_COLUMNS]
+    update_fields = ['first_name', 'last_name', 'status', 'updated_at']
+    if extra_columns:
+        update_fields.append('custom_fields')
+
+    stats = {'created': 0, 'updated': 0, 'skipped': 0, 'rows': 0, 'errors': []}
+    while rows := list(islice(reader, IMPORT_BATCH_SIZE)):
+        # Header is row 1, so data row i (0-based) is line i + 2.
+        _upsert_batch(lst, rows, stats['rows'] + 2, update_fields, stats)
+        if progress:
+            progress(stats)
+    return stats
+
 
 def import_contacts_csv(contact_list_id: str, csv_text: str,
                          owner) -> dict:
@@ -256,51 +579,212 @@ def import_contacts_csv(contact_list_id: str, csv_text: str,
     Expected header: email[,first_name,last_name,...]
     Returns: {created, updated, skipped, errors}
     """
-    import csv, io
-    from .models import ContactList, Contact
+    import io
+    from .models import ContactList
 
     try:
         lst = ContactList.objects.get(resource_id=contact_list_id, owner=owner)
     except ContactList.DoesNotExist:
         return {'success': False, 'error': 'Contact list not found.'}
 
-    reader  = csv.DictReader(io.StringIO(csv_text.strip()))
-    created = updated = skipped = 0
-    errors  = []
+    stats = import_contacts_stream(lst, io.StringIO(csv_text.strip()))
+    return {
+        'success': True,
+        'created': stats['created'],
+        'updated': stats['updated'],
+        'skipped': stats['skipped'],
+        'errors':  stats['errors'],
+    }
+
+
+_ACTIVE_IMPORT = ('queued', 'running')
 
-    for i, row in enumerate(reader):
-        email = (row.get('email') or row.get('Email') or '').strip().lower()
-        if not email or '@' not in email:
-            errors.append({'row': i + 2, 'error': 'Invalid email', 'data': str(row)})
-            skipped += 1
+
+def _persist_import_state(lst, state: dict) -> None:
+    """Store ``state`` as the list's metadata['csv_import'], leaving other keys as they are in the DB."""
+    from django.db import transaction
+    from django.utils import timezone as tz
+    from .models import ContactList
+
+    with transaction.atomic():
+        rows = ContactList.objects.select_for_update().filter(pk=lst.pk)
+        current = rows.values_list('metadata', flat=True).first()
+        metadata = dict(current or {}, csv_import=state)
+        rows.update(metadata=metadata, updated_at=tz.now())
+    lst.metadata = metadata
+
+
+def _spool_path(import_id: str) -> str:
+    import tempfile
+    return os.path.join(IMPORT_SPOOL_DIR or tempfile.gettempdir(), f'contacts-{import_id}.csv')
+
+
+def _heartbeat_key(worker: str) -> str:
+    return f'marketing:import-worker:{worker}'
+
+
+def _heartbeat() -> None:
+    from django.core.cache import cache
+    cache.set(_heartbeat_key(_IMPORT_WORKER_ID), 1, timeout=IMPORT_HEARTBEAT * 3)
+
+
+def _remove_spool(path: str) -> None:
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+def recover_contact_imports() -> int:
+    """
+    Take over imports left non-terminal by workers that are gone; returns how
+    many were re-queued or failed.
+    """
+    from django.core.cache import cache
+    from django.db import transaction
+    from django.utils import timezone as tz
+    from .models import ContactList
+
+    recovered = 0
+    candidates = ContactList.objects.filter(metadata__csv_import__status__in=_ACTIVE_IMPORT)
+    for lst in candidates.only('pk', 'metadata'):
+        worker = lst.metadata['csv_import'].get('worker')
+        if worker == _IMPORT_WORKER_ID or (worker and cache.get(_heartbeat_key(worker))):
             continue
+        with transaction.atomic():
+            lst = ContactList.objects.select_for_update().get(pk=lst.pk)
+            state = (lst.metadata or {}).get('csv_import') or {}
+            if state.get('status') not in _ACTIVE_IMPORT or state.get('worker') != worker:
+                continue      # finished or taken over meanwhile
+            path = _spool_path(state['import_id'])
+            if os.path.exists(path):
+                state.update(status='queued', worker=_IMPORT_WORKER_ID, started_at=None, bytes_read=0,
+                             rows=0, created=0, updated=0, skipped=0, errors=[])
+                _persist_import_state(lst, state)
+                transaction.on_commit(lambda lst=lst, state=state, path=path: _IMPORT_QUEUE.put(
+                    {'import_id': state['import_id'], 'list_pk': lst.pk, 'path': path, 'state': dict(state)}))
+            else:
+                state.update(status='failed', error='The import was interrupted; upload the file again.',
+                             completed_at=tz.now().isoformat())
+                _persist_import_state(lst, state)
+        logger.warning('Contact import %s orphaned by worker %s: %s', state['import_id'], worker or 'unknown',
+                       're-queued' if state['status'] == 'queued' else 'marked failed')
+        recovered += 1
+    return recovered
+
+
+def _run_import(payload: dict) -> None:
+    import io
+    from django.db import close_old_connections
+    from django.utils import timezone as tz
+    from .models import ContactList
 
-        defaults = {
-            'first_name': (row.get('first_name') or row.get('First Name') or '').strip(),
-            'last_name':  (row.get('last_name')  or row.get('Last Name')  or '').strip(),
-            'status':     'subscribed',
-        }
-        # Any extra columns go to custom_fields
-        extra = {k: v for k, v in row.items()
-                 if k.lower() not in ('email', 'first_name', 'last_name',
-                                      'first name', 'last name')}
-        if extra:
-            defaults['custom_fields'] = extra
-
-        obj, was_created = Contact.objects.update_or_create(
-            contact_list=lst, email=email, defaults=defaults)
-        if was_created:
-            created += 1
-        else:
-            updated += 1
+    close_old_connections()
+    path = payload['path']
+    try:
+        lst = ContactList.objects.get(pk=payload['list_pk'])
+    except ContactList.DoesNotExist:
+        logger.warning('Contact import %s: list was deleted', payload['import_id'])
+        _remove_spool(path)
+        return
 
-    return {
-        'success': True,
-        'created': created,
-        'updated': updated,
-        'skipped': skipped,
-        'errors':  errors[:20],
+    state = {**payload['state'], 'status': 'running', 'started_at': tz.now().isoformat()}
+    _persist_import_state(lst, state)
+    try:
+        with open(path, 'rb') as raw:
+            def progress(stats):
+                state.update(stats, bytes_read=raw.tell())
+                _persist_import_state(lst, state)
+                _heartbeat()
+
+            text = io.TextIOWrapper(raw, encoding='utf-8-sig', errors='replace', newline='')
+            stats = import_contacts_stream(lst, text, progress)
+        state.update(stats, status='completed', bytes_read=state['total_bytes'])
+    except Exception as exc:
+        logger.exception('Contact import %s failed', payload['import_id'])
+        state.update(status='failed', error=str(exc))
+    finally:
+        state['completed_at'] = tz.now().isoformat()
+        _persist_import_state(lst, state)
+        _remove_spool(path)
+        close_old_connections()
+
+
+def _import_worker_loop():
+    from django.db import close_old_connections
+
+    try:
+        _heartbeat()
+        recover_contact_imports()
+    except Exception:
+        logger.exception('Contact import recovery failed')
+    finally:
+        close_old_connections()
+    while True:
+        _heartbeat()
+        try:
+            payload = _IMPORT_QUEUE.get(timeout=IMPORT_HEARTBEAT)
+        except Empty:
+            continue
+        try:
+            _run_import(payload)
+        except Exception:
+            logger.exception('Contact import worker error')
+        finally:
+            _IMPORT_QUEUE.task_done()
+
+
+def _ensure_import_worker():
+    global _IMPORT_WORKER_STARTED
+    with _IMPORT_LOCK:
+        if _IMPORT_WORKER_STARTED:
+            return
+        worker = threading.Thread(target=_import_worker_loop, name='contact-import-worker', daemon=True)
+        worker.start()
+        _IMPORT_WORKER_STARTED = True
+
+
+def start_import_worker() -> None:
+    """Start this process's import worker (recovering orphaned imports) if not running yet."""
+    _ensure_import_worker()
+
+
+def enqueue_contact_import(lst, chunks) -> dict:
+    """
+    Spool an uploaded CSV (an iterable of byte chunks) to disk and queue it
+    for a background import into ``lst``; returns the queued job state, or
+    None if the list already has an import queued or running.
+    """
+    from django.db import transaction
+    from django.utils import timezone as tz
+    from .models import ContactList
+
+    _ensure_import_worker()
+    import_id = f'imp-{uuid.uuid4().hex[:12]}'
+    with open(_spool_path(import_id), 'xb') as spool:
+        for chunk in chunks:
+            spool.write(chunk)
+    state = {
+        'import_id':    import_id,
+        'worker':       _IMPORT_WORKER_ID,
+        'status':       'queued',
+        'queued_at':    tz.now().isoformat(),
+        'started_at':   None,
+        'completed_at': None,
+        'total_bytes':  os.path.getsize(spool.name),
+        'bytes_read':   0,
+        'rows': 0, 'created': 0, 'updated': 0, 'skipped': 0, 'errors': [],
     }
+    with transaction.atomic():
+        current = ContactList.objects.select_for_update().filter(pk=lst.pk) \
+            .values_list('metadata', flat=True).first() or {}
+        if (current.get('csv_import') or {}).get('status') in _ACTIVE_IMPORT:
+            _remove_spool(spool.name)
+            return None
+        _persist_import_state(lst, state)
+        transaction.on_commit(lambda: _IMPORT_QUEUE.put(
+            {'import_id': state['import_id'], 'list_pk': lst.pk, 'path': spool.name, 'state': state}))
+    return state
 
 
 # ── Aggregate Stats ───────────────────────────────────────────────────────────
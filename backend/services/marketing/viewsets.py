@@ -47,15 +47,20 @@ class CampaignViewSet(viewsets.ModelViewSet):
 
     @action(detail=True, methods=['post'])
     def send(self, request, resource_id=None):
-        """Kick off a bulk send for this campaign."""
+        """
+        Queue a bulk send for this campaign, or resume an interrupted one.
+        The send runs in the background; follow it through analytics.
+        """
         campaign = self.get_object()
-        if campaign.status not in ('draft', 'scheduled'):
+        if campaign.status not in ('draft', 'scheduled', 'sending'):
             return Response({'error': 'Campaign cannot be sent in this state.'},
                             status=status.HTTP_400_BAD_REQUEST)
+        if not (campaign.html_body or (campaign.template and campaign.template.html_body)):
+            return Response({'error': 'Campaign has no HTML body.'},
+                            status=status.HTTP_400_BAD_REQUEST)
         campaign.status = 'sending'
         campaign.save(update_fields=['status', 'updated_at'])
-        result = svc.send_campaign(campaign.resource_id)
-        return Response(result)
+        return Response(svc.enqueue_campaign_send(campaign), status=status.HTTP_202_ACCEPTED)
 
     @action(detail=True, methods=['post'], url_path='send_test')
     def send_test(self, request, resource_id=None):
@@ -131,12 +136,35 @@ class ContactListViewSet(viewsets.ModelViewSet):
 
     @action(detail=True, methods=['post'], url_path='import_csv')
     def import_csv(self, request, resource_id=None):
+        """
+        Import contacts from an uploaded ``file`` or a ``csv`` text field.
+        Small inline CSV is imported immediately; uploads and large text are
+        imported in the background (poll import_status); 409 while the list
+        already has a background import in progress.
+        """
+        upload   = request.FILES.get('file')
         csv_text = request.data.get('csv') or ''
-        if not csv_text:
-            return Response({'error': 'csv field is required.'},
+        if not upload and not csv_text:
+            return Response({'error': 'file or csv field is required.'},
                             status=status.HTTP_400_BAD_REQUEST)
-        result = svc.import_contacts_csv(resource_id, csv_text, request.user)
-        return Response(result)
+        if not upload and len(csv_text) <= svc.IMPORT_INLINE_BYTES:
+            result = svc.import_contacts_csv(resource_id, csv_text, request.user)
+            return Response(result)
+        lst = self.get_object()
+        chunks = upload.chunks() if upload else [csv_text.encode('utf-8')]
+        state = svc.enqueue_contact_import(lst, chunks)
+        if state is None:
+            return Response({'error': 'An import is already in progress for this list.'},
+                            status=status.HTTP_409_CONFLICT)
+        return Response(state, status=status.HTTP_202_ACCEPTED)
+
+    @action(detail=True, methods=['get'], url_path='import_status')
+    def import_status(self, request, resource_id=None):
+        lst = self.get_object()
+        state = (lst.metadata or {}).get('csv_import')
+        if not state:
+            return Response({'error': 'No import yet.'}, status=404)
+        return Response(state)
 
     @action(detail=True, methods=['get'], url_path='export_csv')
     def export_csv(self, request, resource_id=None):
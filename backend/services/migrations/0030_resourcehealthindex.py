@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-17 09:12
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('services', '0029_change_domain_email_to_emailfield'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResourceHealthIndex',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('resource_type', models.CharField(max_length=16)),
+                ('resource_key', models.CharField(max_length=64)),
+                ('name', models.CharField(blank=True, max_length=255)),
+                ('status', models.CharField(blank=True, max_length=32)),
+                ('health', models.CharField(choices=[('green', 'Healthy'), ('yellow', 'Degraded'), ('red', 'Critical')], default='yellow', max_length=8)),
+                ('detail', models.CharField(blank=True, max_length=255)),
+                ('resource_created_at', models.DateTimeField(blank=True, null=True)),
+                ('indexed_at', models.DateTimeField(auto_now=True)),
+                ('owner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='resource_health_index', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [
+                    models.Index(fields=['owner', '-id'], name='rhi_owner_id_idx'),
+                    models.Index(fields=['owner', 'health'], name='rhi_owner_health_idx'),
+                    models.Index(fields=['owner', 'resource_type', '-id'], name='rhi_owner_type_idx'),
+                ],
+                'constraints': [
+                    models.UniqueConstraint(fields=('resource_type', 'resource_key'), name='uniq_resource_health_key'),
+                ],
+            },
+        ),
+    ]
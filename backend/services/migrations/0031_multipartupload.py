@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-17 14:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('services', '0030_resourcehealthindex'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MultipartUpload',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('upload_id', models.CharField(db_index=True, max_length=64, unique=True)),
+                ('object_key', models.CharField(max_length=1024)),
+                ('content_type', models.CharField(default='application/octet-stream', max_length=150)),
+                ('storage_class', models.CharField(default='standard', max_length=50)),
+                ('status', models.CharField(choices=[('active', 'Active'), ('completed', 'Completed'), ('aborted', 'Aborted')], default='active', max_length=20)),
+                ('parts', models.JSONField(default=dict)),
+                ('bucket', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='multipart_uploads', to='services.storagebucket')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 16:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('services', '0031_multipartupload'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='platformusageevent',
+            name='event_uuid',
+            field=models.UUIDField(blank=True, editable=False, null=True, unique=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 18:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('services', '0032_platformusageevent_event_uuid'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='usagerecord',
+            name='resource_id',
+            field=models.CharField(blank=True, db_index=True, max_length=128),
+        ),
+    ]
@@ -31,6 +31,7 @@ from .compute.models import (
 from .storage.models import (
     StorageBucket,
     S3Object,
+    MultipartUpload,
     StorageVolume,
     StorageSnapshot,
     FileShare,
@@ -74,6 +75,7 @@ from .monitoring.models import (
     Incident,
     IncidentUpdate,
     PlatformActivityEvent,
+    ResourceHealthIndex,
     ServiceLevelObjective,
     TraceSpan,
     DDoSProtectionRule,
@@ -160,7 +162,7 @@ __all__ = [
     'ServerlessFunction', 'ServerlessFunctionTrigger',
     'AutoScalingGroup', 'ScalingPolicy',
     # Storage
-    'StorageBucket', 'S3Object', 'StorageVolume', 'StorageSnapshot',
+    'StorageBucket', 'S3Object', 'MultipartUpload', 'StorageVolume', 'StorageSnapshot',
     'FileShare', 'FileShareMount', 'EncryptionKey',
     'BackupPolicy', 'Backup', 'StorageMetric',
     'Volume', 'Bucket',
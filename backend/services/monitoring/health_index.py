@@ -0,0 +1,219 @@
+# AtonixCorp Cloud – Resource Health Index
+#
+# Maintains ResourceHealthIndex, a denormalized one-row-per-resource table
+# behind the resource health dashboard, so the endpoint never has to load
+# every Instance / database / bucket / volume / VPC / project into Python.
+#
+#   - index_resource() / unindex_resource() are wired to post_save /
+#     post_delete of every indexed model (monitoring/signals.py);
+#   - rebuild() re-derives the rows from scratch (management command
+#     `rebuild_resource_health_index`).  There is no data migration for it:
+#     it needs the live models, so run the command once after deploying the
+#     index, and again after a bulk import that bypassed signals;
+#   - get_summary() / list_page() serve the dashboard with one aggregate
+#     query and one keyset-paginated query respectively.
+
+import logging
+
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from .models import ResourceHealthIndex
+
+logger = logging.getLogger(__name__)
+
+
+def _detail(*parts) -> str:
+    return ' · '.join(str(p) for p in parts if p not in (None, ''))[:255]
+
+
+def _instance_row(inst) -> dict:
+    return {
+        'status': inst.status,
+        'health': 'green' if inst.status in ('ACTIVE', 'running') else ('red' if inst.status in ('ERROR', 'DELETED', 'error', 'terminated') else 'yellow'),
+        'detail': _detail(inst.flavor, getattr(inst, 'region', '')),
+    }
+
+
+def _database_row(db) -> dict:
+    return {
+        'status': db.status,
+        'health': 'green' if db.status == 'available' else ('red' if db.status in ('failed', 'deleted') else 'yellow'),
+        'detail': _detail(f'{db.engine} {db.version}'.strip(), db.region),
+    }
+
+
+def _bucket_row(bkt) -> dict:
+    return {
+        'status': bkt.status,
+        'health': 'green' if bkt.status == 'running' else 'yellow',
+        'detail': _detail(bkt.region, f'{round(bkt.total_size_gb, 2)}GB used'),
+    }
+
+
+def _volume_row(vol) -> dict:
+    return {
+        'status': vol.status,
+        'health': 'green' if vol.status == 'available' else ('red' if vol.status == 'error' else 'yellow'),
+        'detail': _detail(f'{vol.size_gb}GB', vol.region),
+    }
+
+
+def _vpc_row(vpc) -> dict:
+    return {
+        'status': vpc.status,
+        'health': 'green' if vpc.status in ('available', 'active', 'running') else ('red' if vpc.status in ('error', 'failed') else 'yellow'),
+        'detail': _detail(vpc.cidr_block, vpc.region),
+    }
+
+
+def _project_row(proj) -> dict:
+    return {
+        'status': 'active', 'health': 'green', 'detail': 'CI/CD project',
+    }
+
+
+def indexed_models() -> dict:
+    """{model class: (resource_type, key field, row builder)} for every indexed model."""
+    from ..compute.models import Instance
+    from ..database.models import ManagedDatabase
+    from ..networking.models import VPC
+    from ..pipelines.models import Project
+    from ..storage.models import StorageBucket, StorageVolume
+
+    return {
+        Instance:        ('instance', 'resource_id', _instance_row),
+        ManagedDatabase: ('database', 'pk',          _database_row),
+        StorageBucket:   ('bucket',   'resource_id', _bucket_row),
+        StorageVolume:   ('volume',   'resource_id', _volume_row),
+        VPC:             ('vpc',      'resource_id', _vpc_row),
+        Project:         ('project',  'pk',          _project_row),
+    }
+
+
+def _key(instance, key_field: str) -> str:
+    return str(getattr(instance, key_field) or '')
+
+
+def build_row(instance) -> dict:
+    resource_type, key_field, builder = indexed_models()[type(instance)]
+    row = builder(instance)
+    row.update(
+        resource_type=resource_type,
+        resource_key=_key(instance, key_field),
+        owner_id=instance.owner_id,
+        name=(instance.name or '')[:255],
+        resource_created_at=getattr(instance, 'created_at', None),
+    )
+    return row
+
+
+# ── Incremental maintenance ───────────────────────────────────────────────────
+
+def index_resource(instance) -> None:
+    """Insert or refresh the index row for one resource."""
+    row = build_row(instance)
+    if not row['resource_key']:
+        return
+    ResourceHealthIndex.objects.update_or_create(
+        resource_type=row.pop('resource_type'),
+        resource_key=row.pop('resource_key'),
+        defaults=row,
+    )
+
+
+def unindex_resource(instance) -> None:
+    """Drop the index row for one deleted resource."""
+    resource_type, key_field, _ = indexed_models()[type(instance)]
+    ResourceHealthIndex.objects.filter(
+        resource_type=resource_type, resource_key=_key(instance, key_field),
+    ).delete()
+
+
+def rebuild(owner=None, chunk_size: int = 2000) -> int:
+    """Re-derive the index from the source tables; returns the number of rows written."""
+    # Every row upserted (or re-indexed by a signal) during this run gets a
+    # newer indexed_at, so anything older afterwards has no source resource.
+    run_started = timezone.now()
+    written = 0
+    for model, (resource_type, key_field, _) in indexed_models().items():
+        qs = model.objects.all()
+        if owner is not None:
+            qs = qs.filter(owner=owner)
+        if resource_type == 'instance':
+            qs = qs.select_related('flavor')
+
+        batch = []
+        for obj in qs.iterator(chunk_size=chunk_size):
+            row = build_row(obj)
+            if not row['resource_key']:
+                continue
+            batch.append(ResourceHealthIndex(**row))
+            if len(batch) >= chunk_size:
+                written += _upsert(batch)
+                batch = []
+        written += _upsert(batch)
+
+        # Drop rows whose source resource no longer exists.
+        stale = ResourceHealthIndex.objects.filter(resource_type=resource_type, indexed_at__lt=run_started)
+        if owner is not None:
+            stale = stale.filter(owner=owner)
+        stale.delete()
+    return written
+
+
+def _upsert(batch: list) -> int:
+    if not batch:
+        return 0
+    ResourceHealthIndex.objects.bulk_create(
+        batch,
+        update_conflicts=True,
+        unique_fields=['resource_type', 'resource_key'],
+        update_fields=['owner', 'name', 'status', 'health', 'detail', 'resource_created_at', 'indexed_at'],
+    )
+    return len(batch)
+
+
+# ── Read side ─────────────────────────────────────────────────────────────────
+
+def get_summary(owner) -> dict:
+    """Health counts for an owner in a single aggregate query."""
+    return ResourceHealthIndex.objects.filter(owner=owner).aggregate(
+        total=Count('id'),
+        healthy=Count('id', filter=Q(health='green')),
+        degraded=Count('id', filter=Q(health='yellow')),
+        critical=Count('id', filter=Q(health='red')),
+    )
+
+
+def list_page(owner, cursor: int | None = None, limit: int = 100,
+              resource_type: str = '', health: str = '') -> tuple[list[dict], int | None]:
+    """
+    One keyset-paginated page of index rows, newest first.
+
+    Returns (rows, next_cursor); pass next_cursor back to fetch the next page.
+    """
+    qs = ResourceHealthIndex.objects.filter(owner=owner)
+    if resource_type:
+        qs = qs.filter(resource_type=resource_type)
+    if health:
+        qs = qs.filter(health=health)
+    if cursor:
+        qs = qs.filter(id__lt=cursor)
+
+    rows = list(qs.order_by('-id').values(
+        'id', 'resource_type', 'resource_key', 'name', 'status', 'health', 'detail', 'resource_created_at',
+    )[:limit + 1])
+    next_cursor = rows[limit - 1]['id'] if len(rows) > limit else None
+    return [
+        {
+            'type':       r['resource_type'],
+            'id':         r['resource_key'],
+            'name':       r['name'],
+            'status':     r['status'],
+            'health':     r['health'],
+            'detail':     r['detail'],
+            'created_at': r['resource_created_at'] and r['resource_created_at'].isoformat(),
+        }
+        for r in rows[:limit]
+    ], next_cursor
@@ -0,0 +1,168 @@
+# AtonixCorp Cloud – Batched Metric Ingestion
+#
+# Agents push thousands of samples per call.  Samples are validated, appended
+# to a bounded in-process buffer and written by a background flusher in
+# batches: one bulk INSERT into MetricSnapshot plus one alert-rule evaluation
+# pass per batch, instead of several DB round-trips per sample.
+#
+# When the buffer is full, offer() accepts only what fits and the caller is
+# expected to surface back-pressure (HTTP 429 + Retry-After) to the agent.
+# An atexit hook drains what is still buffered when the process shuts down.
+
+import atexit
+import logging
+import threading
+from collections import deque
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+logger = logging.getLogger(__name__)
+
+
+def _setting(name: str, default):
+    return getattr(settings, name, default)
+
+
+class SampleError(ValueError):
+    """A pushed metric sample is malformed."""
+
+
+def parse_sample(raw: dict, owner_id: int) -> dict:
+    """Validate one raw sample from an agent and normalise it into a row dict."""
+    if not isinstance(raw, dict):
+        raise SampleError('each sample must be an object')
+    try:
+        value = float(raw.get('value', 0))
+    except (TypeError, ValueError):
+        raise SampleError(f"invalid value: {raw.get('value')!r}")
+
+    ts = raw.get('timestamp')
+    if isinstance(ts, (int, float)):
+        ts = datetime.fromtimestamp(ts, tz=dt_timezone.utc)
+    elif isinstance(ts, str) and ts:
+        parsed = parse_datetime(ts)
+        if parsed is None:
+            raise SampleError(f'invalid timestamp: {ts!r}')
+        ts = parsed if timezone.is_aware(parsed) else timezone.make_aware(parsed, dt_timezone.utc)
+    else:
+        ts = timezone.now()
+
+    return {
+        'owner_id':    owner_id,
+        'resource_id': str(raw.get('resource_id', 'unknown'))[:64],
+        'service':     str(raw.get('service', 'unknown'))[:64],
+        'metric':      str(raw.get('metric', 'cpu_percent'))[:64],
+        'value':       value,
+        'unit':        str(raw.get('unit', ''))[:32],
+        'region':      str(raw.get('region', ''))[:64],
+        'timestamp':   ts,
+    }
+
+
+class MetricBuffer:
+    """
+    Bounded FIFO of parsed samples drained by a daemon flusher thread.
+
+    The flusher wakes every ``flush_interval`` seconds, or as soon as a full
+    batch is waiting, and hands batches of at most ``batch_size`` rows to
+    service.write_metric_batch().  A batch that fails to write goes back to
+    the head of the buffer and is retried on the next cycle; while the
+    database stays down the buffer fills and offer() rejects new samples.
+    """
+
+    def __init__(self, capacity: int, batch_size: int, flush_interval: float):
+        self.capacity = capacity
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._rows: deque = deque()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._worker_started = False
+        self._stats = {'accepted': 0, 'rejected': 0, 'written': 0, 'failed_batches': 0, 'batches': 0}
+
+    # ── producer side ─────────────────────────────────────────────────────────
+
+    def offer(self, rows: list[dict]) -> int:
+        """Append as many rows as fit; returns the number accepted."""
+        self._ensure_worker()
+        with self._lock:
+            room = max(0, self.capacity - len(self._rows))
+            accepted = rows[:room]
+            self._rows.extend(accepted)
+            self._stats['accepted'] += len(accepted)
+            self._stats['rejected'] += len(rows) - len(accepted)
+            full_batch = len(self._rows) >= self.batch_size
+        if full_batch:
+            self._wakeup.set()
+        return len(accepted)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                **self._stats,
+                'buffered': len(self._rows),
+                'capacity': self.capacity,
+                'batch_size': self.batch_size,
+            }
+
+    # ── consumer side ─────────────────────────────────────────────────────────
+
+    def flush(self) -> int:
+        """
+        Synchronously drain the buffer; returns the number of rows written.
+        Stops at the first failed batch, leaving it at the head of the buffer.
+        """
+        from .service import write_metric_batch
+
+        written = 0
+        while True:
+            with self._lock:
+                batch = [self._rows.popleft() for _ in range(min(self.batch_size, len(self._rows)))]
+            if not batch:
+                return written
+            try:
+                write_metric_batch(batch)
+            except Exception:
+                logger.exception('Metric batch write failed; retrying %d samples next cycle', len(batch))
+                with self._lock:
+                    self._rows.extendleft(reversed(batch))
+                    self._stats['failed_batches'] += 1
+                return written
+            written += len(batch)
+            with self._lock:
+                self._stats['written'] += len(batch)
+                self._stats['batches'] += 1
+
+    def _worker_loop(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            finally:
+                close_old_connections()
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._worker_started:
+                return
+            worker = threading.Thread(target=self._worker_loop, name='metric-ingest-flusher', daemon=True)
+            worker.start()
+            atexit.register(self.flush)
+            self._worker_started = True
+
+
+_buffer = MetricBuffer(
+    capacity=_setting('METRIC_INGEST_BUFFER_SIZE', 100_000),
+    batch_size=_setting('METRIC_INGEST_BATCH_SIZE', 2_000),
+    flush_interval=_setting('METRIC_INGEST_FLUSH_INTERVAL', 1.0),
+)
+
+
+def get_buffer() -> MetricBuffer:
+    """Return the process-wide metric ingestion buffer."""
+    return _buffer
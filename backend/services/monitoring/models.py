@@ -281,6 +281,45 @@ class PlatformActivityEvent(TimeStampedModel):
         return f"[{self.severity.upper()}] {self.event_type} by {self.actor or 'system'}"
 
 
+# ── Resource Health Index ─────────────────────────────────────────────────────
+
+class ResourceHealthIndex(models.Model):
+    """
+    Denormalized, one-row-per-resource health view served by the resource
+    health dashboard.  Maintained incrementally by post_save / post_delete
+    signals on the indexed models (see monitoring/health_index.py).
+    """
+
+    HEALTH_CHOICES = [
+        ('green',  'Healthy'),
+        ('yellow', 'Degraded'),
+        ('red',    'Critical'),
+    ]
+
+    owner         = models.ForeignKey(User, on_delete=models.CASCADE, related_name='resource_health_index')
+    resource_type = models.CharField(max_length=16)     # instance | database | bucket | volume | vpc | project
+    resource_key  = models.CharField(max_length=64)     # resource_id, or pk for models without one
+    name          = models.CharField(max_length=255, blank=True)
+    status        = models.CharField(max_length=32, blank=True)
+    health        = models.CharField(max_length=8, choices=HEALTH_CHOICES, default='yellow')
+    detail        = models.CharField(max_length=255, blank=True)
+    resource_created_at = models.DateTimeField(null=True, blank=True)
+    indexed_at    = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['resource_type', 'resource_key'], name='uniq_resource_health_key'),
+        ]
+        indexes = [
+            models.Index(fields=['owner', '-id'], name='rhi_owner_id_idx'),
+            models.Index(fields=['owner', 'health'], name='rhi_owner_health_idx'),
+            models.Index(fields=['owner', 'resource_type', '-id'], name='rhi_owner_type_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.resource_type}:{self.resource_key} [{self.health}]'
+
+
 # ── SLO / SLA ─────────────────────────────────────────────────────────────────
 
 class ServiceLevelObjective(ResourceModel):
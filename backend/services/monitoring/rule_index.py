@@ -0,0 +1,185 @@
+# AtonixCorp Cloud – Alert Rule Index
+#
+# In-process index of enabled AlertRules used by metric ingestion.
+#
+#   owner_id → (service, metric) → [CompiledRule, ...]
+#
+# Each owner's rules are loaded once, with comparators precompiled, and kept
+# fresh by AlertRule / MonitoringAlert signals (services/monitoring/signals.py).
+# Signals also bump a per-owner version in the shared Django cache so that
+# other worker processes notice the change on their next batch.
+#
+# The index also carries the firing state needed to keep a flapping metric
+# from writing thousands of alert rows:
+#   - for-duration: a rule fires only once its condition has held for
+#     ``duration_mins`` on a resource (0 fires immediately).  The start of
+#     each pending breach is kept in the shared cache, keyed by rule and
+#     resource, so it survives index reloads and every worker times the same
+#     breach;
+#   - dedupe:       a rule with an unresolved (firing or silenced) alert does
+#                   not fire again;
+#   - cooldown:     after firing, a rule stays quiet for ALERT_RULE_COOLDOWN_SECONDS.
+
+import hashlib
+import operator
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable
+
+from django.conf import settings
+from django.core.cache import cache
+
+_COMPARATORS: dict[str, Callable[[float, float], bool]] = {
+    'gt':  operator.gt,
+    'gte': operator.ge,
+    'lt':  operator.lt,
+    'lte': operator.le,
+    'eq':  operator.eq,
+}
+
+_VERSION_KEY = 'monitoring:alert-rules:version:{owner_id}'
+_PENDING_KEY = 'monitoring:alert-rules:pending:{rule_id}:{resource}'
+
+
+@dataclass
+class CompiledRule:
+    pk: int
+    owner_id: int
+    service: str
+    metric: str
+    condition: str
+    threshold: float
+    resource_filter: str
+    for_duration: timedelta
+    breached: Callable[[float], bool]
+    firing: bool = False
+    last_fired_at: datetime | None = None
+
+    def matches(self, resource_id: str) -> bool:
+        return not self.resource_filter or self.resource_filter == resource_id
+
+    def pending_key(self, resource_id: str) -> str:
+        """Shared-cache key holding when a breach of this rule on ``resource_id`` began."""
+        digest = hashlib.sha1(resource_id.encode()).hexdigest()[:20]
+        return _PENDING_KEY.format(rule_id=self.pk, resource=digest)
+
+    def pending_timeout(self) -> int:
+        # Long enough to outlive the for-duration; a breach that stops
+        # reporting does not linger forever.
+        return int(self.for_duration.total_seconds() * 2) + 3600
+
+
+def compile_rule(rule, firing: bool = False) -> CompiledRule:
+    compare = _COMPARATORS.get(rule.condition)
+    threshold = rule.threshold
+    return CompiledRule(
+        pk=rule.pk,
+        owner_id=rule.owner_id,
+        service=rule.service,
+        metric=rule.metric,
+        condition=rule.condition,
+        threshold=threshold,
+        resource_filter=rule.resource_id_filter,
+        for_duration=timedelta(minutes=max(rule.duration_mins, 0)),
+        breached=(lambda value: compare(value, threshold)) if compare else (lambda value: False),
+        firing=firing,
+        last_fired_at=rule.last_fired_at,
+    )
+
+
+class _OwnerRules:
+    __slots__ = ('version', 'by_key')
+
+    def __init__(self, version, by_key):
+        self.version = version
+        self.by_key = by_key
+
+
+class RuleIndex:
+    """Thread-safe, lazily populated per-owner rule index."""
+
+    def __init__(self):
+        self._owners: dict[int, _OwnerRules] = {}
+        self._lock = threading.Lock()
+
+    def rules_for(self, owner_ids) -> dict[int, dict[tuple, list[CompiledRule]]]:
+        """Return {owner_id: {(service, metric): [CompiledRule]}} for the given owners."""
+        owner_ids = set(owner_ids)
+        versions = _current_versions(owner_ids)
+        with self._lock:
+            stale = {
+                oid for oid in owner_ids
+                if oid not in self._owners or self._owners[oid].version != versions.get(oid)
+            }
+        if stale:
+            loaded = _load(stale)
+            with self._lock:
+                for oid in stale:
+                    self._owners[oid] = _OwnerRules(versions.get(oid), loaded.get(oid, {}))
+        with self._lock:
+            return {oid: self._owners[oid].by_key for oid in owner_ids if oid in self._owners}
+
+    def invalidate(self, owner_id: int) -> None:
+        """Forget one owner locally and tell other processes to reload it."""
+        with self._lock:
+            self._owners.pop(owner_id, None)
+        key = _VERSION_KEY.format(owner_id=owner_id)
+        if not cache.add(key, 1, timeout=None):
+            try:
+                cache.incr(key)
+            except ValueError:
+                cache.set(key, 1, timeout=None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._owners.clear()
+
+
+def _current_versions(owner_ids) -> dict:
+    keys = {_VERSION_KEY.format(owner_id=oid): oid for oid in owner_ids}
+    return {keys[k]: v for k, v in cache.get_many(list(keys)).items()}
+
+
+def _load(owner_ids) -> dict:
+    from .models import AlertRule, MonitoringAlert
+
+    firing = set(
+        MonitoringAlert.objects.filter(
+            owner_id__in=owner_ids, state__in=('firing', 'silenced'), rule__is_enabled=True,
+        ).values_list('rule_id', flat=True).distinct()
+    )
+    index: dict[int, dict[tuple, list[CompiledRule]]] = {}
+    for rule in AlertRule.objects.filter(owner_id__in=owner_ids, is_enabled=True):
+        compiled = compile_rule(rule, firing=rule.pk in firing)
+        index.setdefault(rule.owner_id, {}).setdefault((rule.service, rule.metric), []).append(compiled)
+    return index
+
+
+def pending_starts(keys) -> dict:
+    """{pending key: first breach timestamp} for the given keys that are set."""
+    return cache.get_many(list(keys)) if keys else {}
+
+
+def save_pending(started: dict, timeouts: dict, cleared) -> None:
+    """
+    Persist for-duration bookkeeping: drop ``cleared`` keys, then record the
+    ``started`` breach starts without overwriting a start another worker
+    recorded first.
+    """
+    if cleared:
+        cache.delete_many(list(cleared))
+    for key, since in started.items():
+        cache.add(key, since, timeout=timeouts[key])
+
+
+def cooldown() -> timedelta:
+    return timedelta(seconds=getattr(settings, 'ALERT_RULE_COOLDOWN_SECONDS', 300))
+
+
+_index = RuleIndex()
+
+
+def get_index() -> RuleIndex:
+    """Return the process-wide alert rule index."""
+    return _index
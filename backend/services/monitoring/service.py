@@ -6,6 +6,7 @@ import logging
 import os
 import random
 import math
+import threading
 from datetime import datetime, timedelta, timezone
 
 logger = logging.getLogger(__name__)
@@ -119,50 +120,129 @@ def get_metric_series(owner, resource_id: str, metric: str,
 def ingest_metric(owner, resource_id: str, service: str,
                   metric: str, value: float, unit: str = '') -> dict:
     """Store a single metric snapshot and evaluate alert rules."""
-    from .models import MetricSnapshot
     from django.utils import timezone
 
-    snap = MetricSnapshot.objects.create(
-        owner=owner,
-        resource_id=resource_id,
-        service=service,
-        metric=metric,
-        value=value,
-        unit=unit,
-        timestamp=timezone.now(),
-    )
-    _evaluate_rules(owner, resource_id, service, metric, value)
-    return {'id': snap.id, 'stored': True}
+    snaps = write_metric_batch([{
+        'owner_id':    owner.pk,
+        'resource_id': resource_id,
+        'service':     service,
+        'metric':      metric,
+        'value':       value,
+        'unit':        unit,
+        'timestamp':   timezone.now(),
+    }])
+    return {'id': snaps[0].id, 'stored': True}
 
 
-def _evaluate_rules(owner, resource_id, service, metric, value):
-    """Check if any enabled alert rules are breached; fire alert if so."""
+def write_metric_batch(rows: list[dict]) -> list:
+    """
+    Persist a batch of metric rows with one bulk INSERT and evaluate alert
+    rules against the whole batch.  Rows may span several owners.
+    """
+    from .models import MetricSnapshot
+    from django.db import transaction
+
+    with transaction.atomic():
+        snaps = MetricSnapshot.objects.bulk_create(
+            [MetricSnapshot(**row) for row in rows], batch_size=1000,
+        )
+        _evaluate_rules_batch(rows)
+    return snaps
+
+
+_EVAL_LOCK = threading.Lock()
+
+
+def _evaluate_rules_batch(rows: list[dict]):
+    """
+    Check enabled alert rules against every row of a batch and fire alerts.
+
+    Rules come from the in-process RuleIndex (no per-batch rule query).
+    for-duration, dedupe and cooldown are applied so a flapping metric opens
+    at most one alert per rule.
+    """
     from .models import AlertRule, MonitoringAlert
+    from .rule_index import cooldown, get_index, pending_starts, save_pending
+    from django.db import transaction
     from django.utils import timezone
 
-    from django.db.models import Q
-    rules = AlertRule.objects.filter(
-        owner=owner, metric=metric, service=service, is_enabled=True
-    ).filter(
-        Q(resource_id_filter='') | Q(resource_id_filter=resource_id)
-    )
-    for rule in rules:
-        op = rule.condition
-        breached = (
-            (op == 'gt'  and value >  rule.threshold) or
-            (op == 'gte' and value >= rule.threshold) or
-            (op == 'lt'  and value <  rule.threshold) or
-            (op == 'lte' and value <= rule.threshold) or
-            (op == 'eq'  and value == rule.threshold)
-        )
-        if breached:
-            MonitoringAlert.objects.create(
-                rule=rule, owner=owner, state='firing',
-                value=value,
-                message=f'{metric} is {value} (threshold {op} {rule.threshold})',
-            )
-            rule.last_fired_at = timezone.now()
-            rule.save(update_fields=['last_fired_at'])
+    if not rows:
+        return
+
+    owner_ids = {r['owner_id'] for r in rows}
+    index = get_index().rules_for(owner_ids)
+    if not any(index.values()):
+        return
+
+    def candidates(row):
+        for rule in index.get(row['owner_id'], {}).get((row['service'], row['metric']), ()):
+            if rule.matches(row['resource_id']):
+                yield rule
+
+    # for-duration start times live in the shared cache: one read per batch.
+    timed = {
+        rule.pending_key(row['resource_id']): rule
+        for row in rows for rule in candidates(row) if rule.for_duration
+    }
+    pending = pending_starts(timed)
+    started, cleared = {}, set()
+
+    now = timezone.now()
+    quiet = cooldown()
+    alerts, fired = [], set()
+    with _EVAL_LOCK:
+        for row in rows:
+            resource_id = row['resource_id']
+            for rule in candidates(row):
+                key = rule.pending_key(resource_id) if rule.for_duration else None
+                if not rule.breached(row['value']):
+                    if key and pending.pop(key, None) is not None:
+                        started.pop(key, None)
+                        cleared.add(key)
+                    continue
+                if key:
+                    if key not in pending:
+                        pending[key] = started[key] = row['timestamp']
+                    if row['timestamp'] - pending[key] < rule.for_duration:
+                        continue
+                if rule.firing or (rule.last_fired_at and now - rule.last_fired_at < quiet):
+                    continue
+                rule.firing = True
+                rule.last_fired_at = now
+                if key:
+                    pending.pop(key, None)
+                    started.pop(key, None)
+                    cleared.add(key)
+                fired.add(rule.pk)
+                alerts.append(MonitoringAlert(
+                    rule_id=rule.pk, owner_id=rule.owner_id, state='firing',
+                    value=row['value'],
+                    message=(
+                        f"{row['metric']} is {row['value']} on {resource_id} "
+                        f"(threshold {rule.condition} {rule.threshold})"
+                    ),
+                ))
+
+    # Clears are written first, so a breach that ended and restarted within
+    # the batch replaces the old start.
+    save_pending(started, {key: timed[key].pending_timeout() for key in started}, cleared)
+
+    if not alerts:
+        return
+    try:
+        MonitoringAlert.objects.bulk_create(alerts)
+        AlertRule.objects.filter(pk__in=fired).update(last_fired_at=now)
+    except Exception:
+        # In-memory firing state no longer matches the DB – reload next batch.
+        for owner_id in owner_ids:
+            get_index().invalidate(owner_id)
+        raise
+    # bulk_create / update() send no signals: once the alerts are committed,
+    # bump the owners' versions so other workers reload firing /
+    # last_fired_at instead of opening their own alert for the same breach.
+    # Bumping earlier would let them reload the pre-commit state.
+    for owner_id in {alert.owner_id for alert in alerts}:
+        transaction.on_commit(lambda owner_id=owner_id: get_index().invalidate(owner_id))
 
 
 def create_incident(owner, service: str, severity: str, title: str,
@@ -325,6 +405,30 @@ def get_dev_overview(owner):
     }
 
 
+def _recent_per_group(qs, group_field: str, order_field: str, fields: tuple, limit: int = 5) -> dict:
+    """
+    Return {group_id: [row, ...]} holding the ``limit`` most recent rows of
+    each group, fetched in one query with a ROW_NUMBER() window.
+    """
+    from django.db.models import F, Window
+    from django.db.models.functions import RowNumber
+
+    rows = (
+        qs.annotate(_rn=Window(
+            RowNumber(),
+            partition_by=[F(group_field)],
+            order_by=F(order_field).desc(),
+        ))
+        .filter(_rn__lte=limit)
+        .order_by(group_field, f'-{order_field}')
+        .values(group_field, *fields)
+    )
+    grouped: dict = {}
+    for row in rows:
+        grouped.setdefault(row.pop(group_field), []).append(row)
+    return grouped
+
+
 def get_pipeline_health(owner, hours=24, project_id=None):
     """Pipeline health stats per project or overall."""
     from ..pipelines.models import Pipeline, Project
@@ -337,28 +441,34 @@ def get_pipeline_health(owner, hours=24, project_id=None):
     if project_id:
         projects_qs = projects_qs.filter(id=project_id)
 
+    in_window = Q(pipelines__started_at__gte=since)
+    projects = list(projects_qs.annotate(
+        total_runs=Count('pipelines', filter=in_window),
+        n_success=Count('pipelines', filter=in_window & Q(pipelines__status='success')),
+        n_failed=Count('pipelines', filter=in_window & Q(pipelines__status='failed')),
+        n_running=Count('pipelines', filter=in_window & Q(pipelines__status='running')),
+        n_cancelled=Count('pipelines', filter=in_window & Q(pipelines__status='cancelled')),
+    ).values('id', 'name', 'total_runs', 'n_success', 'n_failed', 'n_running', 'n_cancelled'))
+
+    recent = _recent_per_group(
+        Pipeline.objects.filter(project__in=[p['id'] for p in projects], started_at__gte=since),
+        'project_id', 'started_at',
+        ('id', 'pipeline_name', 'branch', 'status', 'triggered_by', 'started_at', 'finished_at'),
+    ) if projects else {}
+
     result = []
-    for project in projects_qs:
-        runs = Pipeline.objects.filter(project=project, started_at__gte=since)
-        total   = runs.count()
-        success = runs.filter(status='success').count()
-        failed  = runs.filter(status='failed').count()
-        running = runs.filter(status='running').count()
-        cancelled = runs.filter(status='cancelled').count()
-        recent = runs.order_by('-started_at').values(
-            'id', 'pipeline_name', 'branch', 'status',
-            'triggered_by', 'started_at', 'finished_at'
-        )[:5]
+    for project in projects:
+        total, success = project['total_runs'], project['n_success']
         result.append({
-            'project_id':    project.id,
-            'project_name':  project.name,
+            'project_id':    project['id'],
+            'project_name':  project['name'],
             'total_runs':    total,
             'success':       success,
-            'failed':        failed,
-            'running':       running,
-            'cancelled':     cancelled,
+            'failed':        project['n_failed'],
+            'running':       project['n_running'],
+            'cancelled':     project['n_cancelled'],
             'success_rate':  round((success / total * 100) if total else 0, 1),
-            'recent_runs': list(recent),
+            'recent_runs':   recent.get(project['id'], []),
         })
     return result
 
@@ -367,6 +477,7 @@ def get_deployment_health(owner, hours=24, project_id=None):
     """Deployment health stats."""
     from ..containers.models import Container, ContainerDeployment
     from django.utils import timezone as tz
+    from django.db.models import Count, Q
     now = tz.now()
     since = now - timedelta(hours=hours)
 
@@ -374,54 +485,66 @@ def get_deployment_health(owner, hours=24, project_id=None):
     if project_id:
         containers_qs = containers_qs.filter(project_id=project_id)
 
+    in_window = Q(deployments__started_at__gte=since)
+    containers = list(containers_qs.annotate(
+        total_deploys=Count('deployments', filter=in_window),
+        n_success=Count('deployments', filter=in_window & Q(deployments__status='success')),
+        n_failed=Count('deployments', filter=in_window & Q(deployments__status='failed')),
+        n_running=Count('deployments', filter=in_window & Q(deployments__status='running')),
+    ).values('id', 'name', 'image', 'total_deploys', 'n_success', 'n_failed', 'n_running'))
+
+    recent = _recent_per_group(
+        ContainerDeployment.objects.filter(container__in=[c['id'] for c in containers], started_at__gte=since),
+        'container_id', 'started_at',
+        ('id', 'image_tag', 'trigger', 'status', 'started_at', 'ended_at'),
+    ) if containers else {}
+
     result = []
-    for container in containers_qs:
-        deploys = ContainerDeployment.objects.filter(
-            container=container, started_at__gte=since
-        )
-        total   = deploys.count()
-        success = deploys.filter(status='success').count()
-        failed  = deploys.filter(status='failed').count()
-        running = deploys.filter(status='running').count()
-        recent  = deploys.order_by('-started_at').values(
-            'id', 'image_tag', 'trigger', 'status', 'started_at', 'ended_at'
-        )[:5]
+    for container in containers:
+        total, success = container['total_deploys'], container['n_success']
         result.append({
-            'container_id':   container.id,
-            'container_name': container.name,
-            'image':          container.image,
+            'container_id':   container['id'],
+            'container_name': container['name'],
+            'image':          container['image'],
             'total_deploys':  total,
             'success':        success,
-            'failed':         failed,
-            'running':        running,
+            'failed':         container['n_failed'],
+            'running':        container['n_running'],
             'success_rate':   round((success / total * 100) if total else 0, 1),
-            'recent_deploys': list(recent),
+            'recent_deploys': recent.get(container['id'], []),
         })
     return result
 
 
 def get_project_health(owner):
     """Per-project health summary aggregating pipelines, deployments, alerts."""
-    from ..pipelines.models import Pipeline, Project
-    from ..containers.models import ContainerDeployment, Container
+    from ..pipelines.models import Project
+    from ..containers.models import ContainerDeployment
     from django.utils import timezone as tz
-    from django.db.models import Count
+    from django.db.models import Count, Q
     now = tz.now()
     since_7d = now - timedelta(days=7)
 
+    # Deployment stats are owner-wide, so they are the same for every project.
+    dep = ContainerDeployment.objects.filter(
+        container__owner=owner, started_at__gte=since_7d,
+    ).aggregate(
+        total=Count('id'),
+        success=Count('id', filter=Q(status='success')),
+        failed=Count('id', filter=Q(status='failed')),
+    )
+    dep_total, dep_success, dep_failed = dep['total'], dep['success'], dep['failed']
+
+    in_window = Q(pipelines__started_at__gte=since_7d)
+    projects = Project.objects.filter(owner=owner).annotate(
+        pl_total=Count('pipelines', filter=in_window),
+        pl_success=Count('pipelines', filter=in_window & Q(pipelines__status='success')),
+        pl_failed=Count('pipelines', filter=in_window & Q(pipelines__status='failed')),
+    ).values('id', 'name', 'pl_total', 'pl_success', 'pl_failed')
+
     result = []
-    for project in Project.objects.filter(owner=owner):
-        pl_runs     = Pipeline.objects.filter(project=project, started_at__gte=since_7d)
-        pl_total    = pl_runs.count()
-        pl_success  = pl_runs.filter(status='success').count()
-        pl_failed   = pl_runs.filter(status='failed').count()
-
-        dep_runs    = ContainerDeployment.objects.filter(
-            container__owner=owner, started_at__gte=since_7d
-        )
-        dep_total   = dep_runs.count()
-        dep_success = dep_runs.filter(status='success').count()
-        dep_failed  = dep_runs.filter(status='failed').count()
+    for project in projects:
+        pl_total, pl_success = project['pl_total'], project['pl_success']
 
         combined_total   = pl_total + dep_total
         combined_success = pl_success + dep_success
@@ -439,13 +562,13 @@ def get_project_health(owner):
             health_status = 'critical'
 
         result.append({
-            'project_id':       project.id,
-            'project_name':     project.name,
+            'project_id':       project['id'],
+            'project_name':     project['name'],
             'health_score':     health_score,
             'health_status':    health_status,
             'pipelines_7d':     pl_total,
             'pipeline_success': pl_success,
-            'pipeline_failed':  pl_failed,
+            'pipeline_failed':  project['pl_failed'],
             'deploys_7d':       dep_total,
             'deploy_success':   dep_success,
             'deploy_failed':    dep_failed,
@@ -581,78 +704,23 @@ def get_kubernetes_health(owner):
     return result
 
 
-def get_resource_health(owner):
-    """Unified resource health index — all resource types, one health colour each."""
-    from ..compute.models import Instance
-    from ..storage.models import StorageBucket, StorageVolume
-    from ..networking.models import VPC
-    from ..database.models import ManagedDatabase
-    from ..pipelines.models import Project
-
-    resources = []
-
-    # Compute instances
-    for inst in Instance.objects.filter(owner=owner):
-        health = 'green' if inst.status == 'ACTIVE' else ('red' if inst.status in ('ERROR', 'DELETED') else 'yellow')
-        resources.append({
-            'type': 'instance', 'id': inst.resource_id,
-            'name': inst.name, 'status': inst.status, 'health': health,
-            'detail': f'{inst.flavor} · {inst.region}', 'created_at': inst.created_at and inst.created_at.isoformat(),
-        })
-
-    # Databases
-    for db in ManagedDatabase.objects.filter(owner=owner):
-        health = 'green' if db.status == 'available' else ('red' if db.status in ('failed', 'deleted') else 'yellow')
-        resources.append({
-            'type': 'database', 'id': db.resource_id,
-            'name': db.name, 'status': db.status, 'health': health,
-            'detail': f'{db.engine} {db.engine_version} · {db.region}', 'created_at': db.created_at and db.created_at.isoformat(),
-        })
-
-    # Storage buckets
-    for bkt in StorageBucket.objects.filter(owner=owner):
-        health = 'green' if bkt.status == 'running' else 'yellow'
-        resources.append({
-            'type': 'bucket', 'id': bkt.resource_id,
-            'name': bkt.name, 'status': bkt.status, 'health': health,
-            'detail': f'{bkt.region} · {round(bkt.total_size_gb, 2)}GB used', 'created_at': bkt.created_at and bkt.created_at.isoformat(),
-        })
-
-    # Volumes
-    for vol in StorageVolume.objects.filter(owner=owner):
-        health = 'green' if vol.status == 'available' else ('red' if vol.status == 'error' else 'yellow')
-        resources.append({
-            'type': 'volume', 'id': vol.resource_id,
-            'name': vol.name, 'status': vol.status, 'health': health,
-            'detail': f'{vol.size_gb}GB · {vol.region}', 'created_at': vol.created_at and vol.created_at.isoformat(),
-        })
-
-    # VPCs
-    for vpc in VPC.objects.filter(owner=owner):
-        health = 'green' if vpc.status in ('available', 'active', 'running') else ('red' if vpc.status in ('error', 'failed') else 'yellow')
-        resources.append({
-            'type': 'vpc', 'id': vpc.resource_id,
-            'name': vpc.name, 'status': vpc.status, 'health': health,
-            'detail': f'{vpc.cidr_block} · {vpc.region}', 'created_at': vpc.created_at and vpc.created_at.isoformat(),
-        })
-
-    # Projects
-    for proj in Project.objects.filter(owner=owner):
-        resources.append({
-            'type': 'project', 'id': str(proj.id),
-            'name': proj.name, 'status': 'active', 'health': 'green',
-            'detail': f'CI/CD project', 'created_at': proj.created_at and proj.created_at.isoformat(),
-        })
+def get_resource_health(owner, cursor: int | None = None, limit: int = 100,
+                        resource_type: str = '', health: str = ''):
+    """
+    Unified resource health index — all resource types, one health colour each.
 
-    # Aggregate health summary
-    total   = len(resources)
-    healthy  = sum(1 for r in resources if r['health'] == 'green')
-    degraded = sum(1 for r in resources if r['health'] == 'yellow')
-    critical = sum(1 for r in resources if r['health'] == 'red')
+    Served from ResourceHealthIndex (see health_index.py): one aggregate query
+    for the summary plus one keyset-paginated page of resources.
+    """
+    from .health_index import get_summary, list_page
 
+    resources, next_cursor = list_page(
+        owner, cursor=cursor, limit=limit, resource_type=resource_type, health=health,
+    )
     return {
-        'summary': {'total': total, 'healthy': healthy, 'degraded': degraded, 'critical': critical},
+        'summary': get_summary(owner),
         'resources': resources,
+        'next_cursor': next_cursor,
     }
 
 
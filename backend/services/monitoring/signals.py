@@ -0,0 +1,42 @@
+# AtonixCorp Cloud – Monitoring signal handlers
+#
+# Keep the in-process alert rule index (rule_index.py) and the resource
+# health index (health_index.py) in step with the DB.
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import health_index
+from .models import AlertRule, MonitoringAlert
+from .rule_index import get_index
+
+
+@receiver(post_save, sender=AlertRule)
+@receiver(post_delete, sender=AlertRule)
+def on_alert_rule_changed(sender, instance, **kwargs):
+    get_index().invalidate(instance.owner_id)
+
+
+@receiver(post_save, sender=MonitoringAlert)
+@receiver(post_delete, sender=MonitoringAlert)
+def on_alert_changed(sender, instance, **kwargs):
+    # Resolving an alert re-arms its rule.
+    get_index().invalidate(instance.owner_id)
+
+
+# ── Resource health index ─────────────────────────────────────────────────────
+# Keep ResourceHealthIndex (health_index.py) in step with the indexed models.
+
+def on_indexed_resource_saved(sender, instance, **kwargs):
+    health_index.index_resource(instance)
+
+
+def on_indexed_resource_deleted(sender, instance, **kwargs):
+    health_index.unindex_resource(instance)
+
+
+for _model in health_index.indexed_models():
+    post_save.connect(on_indexed_resource_saved, sender=_model,
+                      dispatch_uid=f'resource-health-index-save:{_model._meta.label}')
+    post_delete.connect(on_indexed_resource_deleted, sender=_model,
+                        dispatch_uid=f'resource-health-index-delete:{_model._meta.label}')
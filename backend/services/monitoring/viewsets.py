@@ -1,5 +1,6 @@
 # AtonixCorp Cloud – Monitoring ViewSets
 
+import json
 import logging
 from rest_framework import viewsets, status, permissions
 from rest_framework.decorators import action, api_view, permission_classes
@@ -61,6 +62,61 @@ class MetricViewSet(viewsets.ViewSet):
         )
         return Response(result)
 
+    @action(detail=False, methods=['post'], url_path='ingest-batch')
+    def ingest_batch(self, request):
+        """
+        POST /metrics/ingest-batch/ – push many metric samples at once.
+
+        Body: {"samples": [{resource_id, service, metric, value, unit, timestamp}, ...]}
+        (a bare JSON array is also accepted), or application/x-ndjson with one
+        sample per line.  Samples are buffered and written in bulk; the
+        response is 202, or 429 with Retry-After when the buffer is full and
+        some samples were not accepted.
+        """
+        from django.conf import settings
+        from .ingest import SampleError, get_buffer, parse_sample
+
+        max_samples = getattr(settings, 'METRIC_INGEST_MAX_SAMPLES_PER_REQUEST', 10_000)
+        if request.content_type.startswith('application/x-ndjson'):
+            try:
+                raw_samples = [json.loads(line) for line in request.stream if line.strip()]
+            except ValueError:
+                return Response({'detail': 'Invalid NDJSON body.'}, status=status.HTTP_400_BAD_REQUEST)
+        else:
+            payload = request.data
+            raw_samples = payload.get('samples', []) if isinstance(payload, dict) else payload
+        if not isinstance(raw_samples, list):
+            return Response({'detail': 'samples must be a list.'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(raw_samples) > max_samples:
+            return Response(
+                {'detail': f'At most {max_samples} samples per request.'},
+                status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            )
+
+        try:
+            rows = [parse_sample(raw, request.user.pk) for raw in raw_samples]
+        except SampleError as exc:
+            return Response({'detail': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        buffer = get_buffer()
+        accepted = buffer.offer(rows)
+        body = {
+            'accepted': accepted,
+            'rejected': len(rows) - accepted,
+            'buffered': buffer.stats()['buffered'],
+        }
+        if accepted < len(rows):
+            resp = Response(body, status=status.HTTP_429_TOO_MANY_REQUESTS)
+            resp['Retry-After'] = str(max(1, int(buffer.flush_interval)))
+            return resp
+        return Response(body, status=status.HTTP_202_ACCEPTED)
+
+    @action(detail=False, methods=['get'], url_path='ingest-stats')
+    def ingest_stats(self, request):
+        """GET /metrics/ingest-stats/ – ingestion buffer counters."""
+        from .ingest import get_buffer
+        return Response(get_buffer().stats())
+
     @action(detail=False, methods=['get'], url_path='available')
     def available(self, request):
         """GET /metrics/available/ – list of metric names."""
@@ -268,8 +324,21 @@ class DevMonitoringViewSet(viewsets.ViewSet):
 
     @action(detail=False, methods=['get'], url_path='resource-health')
     def resource_health(self, request):
-        """GET /monitoring/dev/resource-health/ — unified health index for all resources."""
-        data = svc.get_resource_health(request.user)
+        """
+        GET /monitoring/dev/resource-health/ — unified health index for all resources.
+
+        Query params: ?cursor=<next_cursor>&limit=100&type=instance&health=red
+        """
+        try:
+            cursor = int(request.query_params.get('cursor') or 0) or None
+            limit = min(max(int(request.query_params.get('limit', 100)), 1), 500)
+        except ValueError:
+            return Response({'detail': 'cursor and limit must be integers.'}, status=status.HTTP_400_BAD_REQUEST)
+        data = svc.get_resource_health(
+            request.user, cursor=cursor, limit=limit,
+            resource_type=request.query_params.get('type', ''),
+            health=request.query_params.get('health', ''),
+        )
         return Response(data)
 
 
@@ -0,0 +1,175 @@
+# AtonixCorp – OpenStack Catalog Cache
+#
+# Read-through cache for slow-changing OpenStack catalogs: flavors (Nova),
+# images (Glance), networks (Neutron) and volume types (Cinder).
+#
+#   - Entries live in the configured Django cache (Redis in production) and
+#     are keyed by catalog and scope — the (project, region, credentials) the
+#     listing was made with — so tenants and regions never share results.
+#   - An entry is fresh for OPENSTACK_CATALOG_CACHE_TTL seconds.  After that it
+#     is still served for up to OPENSTACK_CATALOG_STALE_TTL seconds while a
+#     single background thread (one per key across workers, via cache.add)
+#     refetches it: stale-while-revalidate.
+#   - Only a cold miss calls OpenStack on the request path; concurrent misses
+#     in one process share a single fetch.  Fetches are serialised on a fixed
+#     set of striped locks, so the lock table stays bounded however many
+#     scopes and generations pass through.
+#   - Each entry carries an ETag (hash of its data) for conditional GETs.
+#   - purge() drops one scope's entry, or bumps a per-catalog generation
+#     number to invalidate the catalog in every scope at once.
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.core.cache import cache
+
+import infrastructure.openstack.compute as osc
+import infrastructure.openstack.networking.network as osn
+import infrastructure.openstack.storage.volume as osv
+from infrastructure.openstack_conn import default_scope
+
+logger = logging.getLogger(__name__)
+
+_KEY_PREFIX = "openstack:catalog"
+
+# catalog name → loader(conn) returning JSON-serialisable data
+CATALOGS = {
+    "flavors":      lambda conn: osc.list_flavors(conn=conn),
+    "images":       lambda conn: osc.list_images(conn=conn),
+    "networks":     lambda conn: osn.list_networks(conn=conn),
+    "volume_types": lambda conn: osv.list_volume_types(conn=conn),
+}
+
+_FETCH_LOCK_STRIPES = 64
+_fetch_locks = [threading.Lock() for _ in range(_FETCH_LOCK_STRIPES)]
+
+
+def _ttl() -> int:
+    return getattr(settings, "OPENSTACK_CATALOG_CACHE_TTL", 3600)
+
+
+def _stale_ttl() -> int:
+    return getattr(settings, "OPENSTACK_CATALOG_STALE_TTL", 86400)
+
+
+@dataclass
+class CatalogEntry:
+    data: list
+    etag: str
+    fetched_at: float
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.fetched_at
+
+    @property
+    def is_stale(self) -> bool:
+        return self.age >= _ttl()
+
+
+def compute_etag(data) -> str:
+    """Strong ETag for a catalog payload (stable across processes)."""
+    body = json.dumps(data, sort_keys=True, default=str, separators=(",", ":"))
+    return '"%s"' % hashlib.sha256(body.encode()).hexdigest()[:32]
+
+
+# ── Keys ──────────────────────────────────────────────────────────────────────
+
+def _generation_key(catalog: str) -> str:
+    return f"{_KEY_PREFIX}:gen:{catalog}"
+
+
+def _entry_key(catalog: str, scope: tuple, generation: int) -> str:
+    digest = hashlib.sha1(repr(tuple(scope)).encode()).hexdigest()
+    return f"{_KEY_PREFIX}:{catalog}:{generation}:{digest}"
+
+
+def _current_key(catalog: str, scope: tuple) -> str:
+    return _entry_key(catalog, scope, cache.get(_generation_key(catalog), 0))
+
+
+def _fetch_lock(key: str) -> threading.Lock:
+    # Keys sharing a stripe only wait for each other's cold fetch.
+    return _fetch_locks[hash(key) % _FETCH_LOCK_STRIPES]
+
+
+# ── Fetch / store ─────────────────────────────────────────────────────────────
+
+def _store(key: str, data) -> CatalogEntry:
+    entry = CatalogEntry(data=data, etag=compute_etag(data), fetched_at=time.time())
+    cache.set(key, entry, timeout=_ttl() + _stale_ttl())
+    return entry
+
+
+def _refresh(catalog: str, key: str, conn) -> None:
+    try:
+        _store(key, CATALOGS[catalog](conn))
+        logger.info("Refreshed OpenStack %s catalog", catalog)
+    except Exception:
+        # Keep serving the stale copy; the next request past the TTL retries.
+        logger.exception("Background refresh of OpenStack %s catalog failed", catalog)
+    finally:
+        cache.delete(f"{key}:refreshing")
+
+
+def get(catalog: str, scope: tuple | None = None, conn=None) -> CatalogEntry:
+    """
+    Return the cached catalog for ``scope``, fetching it on a cold miss.
+
+    Args:
+        catalog: One of CATALOGS.
+        scope:   Identity of the project the listing belongs to; defaults to
+                 the env-configured connection's (project, region, credentials).
+                 Pass (openstack_project, openstack_region) with a
+                 workspace-scoped ``conn``.
+        conn:    Connection to list with (None → get_connection()).
+    """
+    if catalog not in CATALOGS:
+        raise KeyError(f"Unknown OpenStack catalog: {catalog}")
+    scope = default_scope() if scope is None else scope
+    key = _current_key(catalog, scope)
+
+    entry = cache.get(key)
+    if entry is None:
+        with _fetch_lock(key):
+            entry = cache.get(key)
+            if entry is None:
+                entry = _store(key, CATALOGS[catalog](conn))
+        return entry
+
+    if entry.is_stale and cache.add(f"{key}:refreshing", 1, timeout=60):
+        threading.Thread(
+            target=_refresh, args=(catalog, key, conn),
+            name=f"catalog-refresh-{catalog}", daemon=True,
+        ).start()
+    return entry
+
+
+def purge(catalog: str | None = None, scope: tuple | None = None) -> list[str]:
+    """
+    Invalidate cached catalogs; returns the catalog names purged.
+
+    With ``scope`` only that project's entries are dropped; without it the
+    catalog's generation is bumped, orphaning every scope's entry (they age
+    out of the cache on their own).
+    """
+    names = [catalog] if catalog else list(CATALOGS)
+    for name in names:
+        if name not in CATALOGS:
+            raise KeyError(f"Unknown OpenStack catalog: {name}")
+    for name in names:
+        if scope is not None:
+            cache.delete(_current_key(name, scope))
+            continue
+        gen_key = _generation_key(name)
+        cache.add(gen_key, 0, timeout=None)
+        try:
+            cache.incr(gen_key)
+        except ValueError:          # evicted between add() and incr()
+            cache.set(gen_key, 1, timeout=None)
+    return names
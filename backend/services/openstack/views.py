@@ -13,10 +13,12 @@
 #   POST    cloud/servers/<id>/stop/      Stop a server
 #   POST    cloud/servers/<id>/reboot/    Reboot a server
 #
-#   GET     cloud/flavors/                List flavors
-#   GET     cloud/images/                 List images
+#   GET     cloud/flavors/                List flavors            (cached, ETag)
+#   GET     cloud/images/                 List images             (cached, ETag)
+#   GET     cloud/volume-types/           List volume types       (cached, ETag)
+#   POST    cloud/catalog/purge/          Purge catalog caches    (admin)
 #
-#   GET     cloud/networks/               List networks
+#   GET     cloud/networks/               List networks           (cached, ETag)
 #   POST    cloud/networks/               Create a network
 #   DELETE  cloud/networks/<id>/          Delete a network
 #   GET     cloud/networks/<id>/subnets/  List subnets for a network
@@ -45,15 +47,18 @@
 import logging
 
 from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import IsAuthenticated
+from django.utils.http import parse_etags
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status as http_status
 
-from infrastructure.openstack_conn import is_openstack_configured
+from infrastructure.openstack_conn import default_scope, is_openstack_configured
 import infrastructure.openstack.compute as osc
 import infrastructure.openstack.networking.network as osn
 import infrastructure.openstack.storage.volume as osv
 
+from . import catalog_cache
+
 logger = logging.getLogger(__name__)
 
 
@@ -76,6 +81,22 @@ def _openstack_error(exc: Exception) -> Response:
     return Response({"detail": msg, "source": "openstack"}, status=code)
 
 
+def _catalog_response(request, catalog: str) -> Response:
+    """
+    Serve a catalog from the cache with an ETag; 304 when the client's
+    If-None-Match already names the current version.
+    """
+    entry = catalog_cache.get(catalog)
+    client_etags = parse_etags(request.headers.get("If-None-Match", ""))
+    if "*" in client_etags or entry.etag in {tag.removeprefix("W/") for tag in client_etags}:
+        response = Response(status=http_status.HTTP_304_NOT_MODIFIED)
+    else:
+        response = Response(entry.data)
+    response["ETag"] = entry.etag
+    response["Cache-Control"] = "private, no-cache"
+    return response
+
+
 # ── Status / health ────────────────────────────────────────────────────────────
 
 @api_view(["GET"])
@@ -208,7 +229,7 @@ def server_reboot(request, server_id: str):
 def flavors_list(request):
     """GET /api/services/cloud/flavors/"""
     try:
-        return Response(osc.list_flavors())
+        return _catalog_response(request, "flavors")
     except Exception as exc:
         return _openstack_error(exc)
 
@@ -220,11 +241,44 @@ def flavors_list(request):
 def images_list(request):
     """GET /api/services/cloud/images/"""
     try:
-        return Response(osc.list_images())
+        return _catalog_response(request, "images")
     except Exception as exc:
         return _openstack_error(exc)
 
 
+# ── Volume Types ──────────────────────────────────────────────────────────────
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def volume_types_list(request):
+    """GET /api/services/cloud/volume-types/"""
+    try:
+        return _catalog_response(request, "volume_types")
+    except Exception as exc:
+        return _openstack_error(exc)
+
+
+# ── Catalog cache ─────────────────────────────────────────────────────────────
+
+@api_view(["POST"])
+@permission_classes([IsAdminUser])
+def catalog_purge(request):
+    """
+    POST /api/services/cloud/catalog/purge/
+    Body: { "catalog": "flavors" }  (optional; omit to purge every catalog)
+
+    Drops cached flavors / images / networks / volume types for all projects
+    and regions, e.g. right after publishing a new image or flavor.
+    """
+    catalog = request.data.get("catalog") or None
+    if catalog is not None and catalog not in catalog_cache.CATALOGS:
+        return Response(
+            {"detail": f"catalog must be one of: {', '.join(catalog_cache.CATALOGS)}."},
+            status=http_status.HTTP_400_BAD_REQUEST,
+        )
+    return Response({"purged": catalog_cache.purge(catalog)})
+
+
 # ── Networks ──────────────────────────────────────────────────────────────────
 
 @api_view(["GET", "POST"])
@@ -237,7 +291,7 @@ def networks_list_create(request):
     """
     try:
         if request.method == "GET":
-            return Response(osn.list_networks())
+            return _catalog_response(request, "networks")
         name = request.data.get("name")
         if not name:
             return Response({"detail": "name is required."}, status=http_status.HTTP_400_BAD_REQUEST)
@@ -245,6 +299,7 @@ def networks_list_create(request):
             name=name,
             shared=request.data.get("shared", False),
         )
+        catalog_cache.purge("networks", scope=default_scope())
         return Response(net, status=http_status.HTTP_201_CREATED)
     except Exception as exc:
         return _openstack_error(exc)
@@ -256,6 +311,7 @@ def network_delete(request, network_id: str):
     """DELETE /api/services/cloud/networks/<network_id>/"""
     try:
         osn.delete_network(network_id)
+        catalog_cache.purge("networks", scope=default_scope())
         return Response(status=http_status.HTTP_204_NO_CONTENT)
     except Exception as exc:
         return _openstack_error(exc)
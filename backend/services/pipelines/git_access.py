@@ -0,0 +1,122 @@
+"""
+Git access cache.
+
+Short-lived cache of what the git smart-HTTP view (git_http.py) needs per
+request, so the several requests of one `git fetch` / `git push` — and CI
+runners polling repositories — do not each hit the database:
+
+    token    → GitUser(id, username)
+    ns/repo  → RepoAccess(id, disk_path, visibility, owner_id, project_owner_id)
+
+Entries live in the shared Django cache for GIT_ACCESS_CACHE_TTL seconds.
+Signals (pipelines/signals.py) keep them honest: deleting or rotating a
+Token drops its entry once the change commits, and any Repository /
+Project change or user rename bumps a generation number that orphans every
+cached repository (renames and moves change the keys themselves, so
+per-key deletes are not enough).
+Unknown repositories are cached too; creating one bumps the generation.
+
+With these records the authorization decision is a pure comparison of ids.
+"""
+
+import hashlib
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.authtoken.models import Token
+
+_KEY_PREFIX = 'git:access'
+_REPO_GENERATION_KEY = f'{_KEY_PREFIX}:repo-gen'
+_MISSING = 'missing'
+
+
+@dataclass(frozen=True)
+class GitUser:
+    id: int
+    username: str
+
+
+@dataclass(frozen=True)
+class RepoAccess:
+    id: str
+    disk_path: str
+    visibility: str
+    owner_id: int | None
+    project_owner_id: int | None
+
+    def is_owner(self, user: GitUser | None) -> bool:
+        return user is not None and user.id in (self.owner_id, self.project_owner_id)
+
+
+def _ttl() -> int:
+    return getattr(settings, 'GIT_ACCESS_CACHE_TTL', 60)
+
+
+def _token_cache_key(token_key: str) -> str:
+    # Never put the raw token into the cache key.
+    return f'{_KEY_PREFIX}:token:{hashlib.sha256(token_key.encode()).hexdigest()}'
+
+
+def _repo_cache_key(ns: str, name: str) -> str:
+    generation = cache.get(_REPO_GENERATION_KEY, 0)
+    digest = hashlib.sha1(f'{ns}/{name}'.encode()).hexdigest()
+    return f'{_KEY_PREFIX}:repo:{generation}:{digest}'
+
+
+# ── Tokens ────────────────────────────────────────────────────────────────────
+
+def lookup_token(token_key: str) -> GitUser | None:
+    """User owning ``token_key``, or None if the token does not exist."""
+    key = _token_cache_key(token_key)
+    user = cache.get(key)
+    if user is None:
+        row = (
+            Token.objects.filter(key=token_key)
+            .values_list('user_id', 'user__username')
+            .first()
+        )
+        if row is None:
+            return None
+        user = GitUser(id=row[0], username=row[1])
+        cache.set(key, user, timeout=_ttl())
+    return user
+
+
+def invalidate_token(token_key: str) -> None:
+    cache.delete(_token_cache_key(token_key))
+
+
+# ── Repositories ──────────────────────────────────────────────────────────────
+
+def resolve_repo(ns: str, repo: str) -> RepoAccess | None:
+    """
+    Access record for namespace/repo(.git); the namespace is a project_key
+    or the owner's username, matched in that order.
+    """
+    from .models import Repository
+
+    name = repo.removesuffix('.git')
+    key = _repo_cache_key(ns, name)
+    cached = cache.get(key)
+    if cached is not None:
+        return None if cached == _MISSING else cached
+
+    fields = ('id', 'disk_path', 'visibility', 'owner_id', 'project__owner')
+    qs = Repository.objects.filter(repo_name=name)
+    row = (
+        qs.filter(project__project_key=ns).values_list(*fields).first()
+        or qs.filter(owner__username=ns).values_list(*fields).first()
+    )
+    access = RepoAccess(*row) if row else None
+    cache.set(key, access or _MISSING, timeout=_ttl())
+    return access
+
+
+def invalidate_repos() -> None:
+    """Orphan every cached repository record."""
+    cache.add(_REPO_GENERATION_KEY, 0, timeout=None)
+    try:
+        cache.incr(_REPO_GENERATION_KEY)
+    except ValueError:          # evicted between add() and incr()
+        cache.set(_REPO_GENERATION_KEY, 1, timeout=None)
@@ -12,14 +12,36 @@ Authorization:
   - Public repos  → read-only without auth
   - Private/team  → requires authenticated user who is project member or owner
   - Push          → always requires auth, requires write permission
+  - Token → user and namespace/repo → repository are cached briefly
+    (git_access.py), so the check itself touches no database
+
+Streaming:
+  - The request body is piped into the CGI's stdin chunk by chunk from a
+    feeder thread (gzip bodies, as sent by git clients, are inflated on the
+    way), so pushes are never held in memory.
+  - The CGI headers are parsed as they arrive and stdout is relayed as a
+    StreamingHttpResponse.  Under ASGI the response iterates asynchronously,
+    each read running in a worker thread, so a long clone does not pin the
+    sync view thread.
 """
 
 import base64
+import logging
 import os
 import subprocess
+import tempfile
+import threading
+import zlib
+
+from asgiref.sync import sync_to_async
 from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
 from django.http import StreamingHttpResponse, HttpResponse
-from rest_framework.authtoken.models import Token
+from django.views.decorators.csrf import csrf_exempt
+
+from . import git_access
+
+logger = logging.getLogger(__name__)
 
 
 # ---------------------------------------------------------------------------
@@ -28,6 +50,8 @@ from rest_framework.authtoken.models import Token
 
 REPOS_ROOT = getattr(settings, 'GIT_REPOS_ROOT', '/repos')
 
+CHUNK_SIZE = 64 * 1024
+
 
 def _authenticate_request(request):
     """Return (user, error_response) from Authorization header."""
@@ -36,54 +60,36 @@ def _authenticate_request(request):
         return None, None  # anonymous
 
     if auth_header.lower().startswith('bearer '):
-        token_key = auth_header[7:].strip()
-        try:
-            token_obj = Token.objects.select_related('user').get(key=token_key)
-            return token_obj.user, None
-        except Token.DoesNotExist:
+        user = git_access.lookup_token(auth_header[7:].strip())
+        if user is None:
             return None, HttpResponse('Unauthorized', status=401)
+        return user, None
 
     if auth_header.lower().startswith('basic '):
         try:
             decoded = base64.b64decode(auth_header[6:]).decode('utf-8')
             _username, token_key = decoded.split(':', 1)
-            token_obj = Token.objects.select_related('user').get(key=token_key)
-            return token_obj.user, None
         except Exception:
             return None, HttpResponse('Unauthorized', status=401)
+        user = git_access.lookup_token(token_key)
+        if user is None:
+            return None, HttpResponse('Unauthorized', status=401)
+        return user, None
 
     return None, HttpResponse('Unsupported auth scheme', status=400)
 
 
 def _resolve_repo(ns, repo):
     """
-    Find the Repository object for namespace/repo.git path.
+    Find the RepoAccess record for namespace/repo.git path.
     Namespace is either a project_key or a username.
     """
-    from .models import Repository
-    from django.contrib.auth.models import User
-
-    name = repo.removesuffix('.git')
-
-    # Try project namespace first
-    qs = Repository.objects.select_related('project', 'owner').filter(repo_name=name)
-
-    # project_key match
-    repo_obj = qs.filter(project__project_key=ns).first()
-    if repo_obj:
-        return repo_obj
-
-    # owner username match
-    repo_obj = qs.filter(owner__username=ns).first()
-    if repo_obj:
-        return repo_obj
-
-    return None
+    return git_access.resolve_repo(ns, repo)
 
 
 def _check_authorization(repo_obj, user, is_write):
     """Return None if allowed, else HttpResponse with error."""
-    visibility = getattr(repo_obj, 'visibility', 'private')
+    visibility = repo_obj.visibility or 'private'
 
     if is_write:
         # Push always requires auth
@@ -94,9 +100,7 @@ def _check_authorization(repo_obj, user, is_write):
                 headers={'WWW-Authenticate': 'Basic realm="AtonixCorp Git"'},
             )
         # Must be owner or project member
-        if repo_obj.owner and repo_obj.owner == user:
-            return None
-        if repo_obj.project and repo_obj.project.owner == user:
+        if repo_obj.is_owner(user):
             return None
         return HttpResponse('Forbidden', status=403)
 
@@ -111,17 +115,82 @@ def _check_authorization(repo_obj, user, is_write):
             status=401,
             headers={'WWW-Authenticate': 'Basic realm="AtonixCorp Git"'},
         )
-    if repo_obj.owner and repo_obj.owner == user:
-        return None
-    if repo_obj.project and repo_obj.project.owner == user:
+    if repo_obj.is_owner(user):
         return None
     return HttpResponse('Forbidden', status=403)
 
 
+# ---------------------------------------------------------------------------
+# Streaming helpers
+# ---------------------------------------------------------------------------
+
+def _feed_stdin(request, stdin, gzipped):
+    """Copy the request body into the CGI's stdin, inflating gzip bodies."""
+    inflater = zlib.decompressobj(16 + zlib.MAX_WBITS) if gzipped else None
+    try:
+        while chunk := request.read(CHUNK_SIZE):
+            stdin.write(inflater.decompress(chunk) if inflater else chunk)
+        if inflater:
+            stdin.write(inflater.flush())
+    except (BrokenPipeError, zlib.error, OSError) as exc:
+        # git exited early or the body is corrupt; git reports the error.
+        logger.warning('git http-backend request body not fully sent: %s', exc)
+    finally:
+        try:
+            stdin.close()
+        except OSError:
+            pass
+
+
+def _read_cgi_headers(stdout):
+    """Read CGI headers up to the blank line; returns [(name, value)] or None at EOF."""
+    headers = []
+    while True:
+        line = stdout.readline()
+        if not line:
+            return None
+        line = line.rstrip(b'\r\n')
+        if not line:
+            return headers
+        key, sep, val = line.decode(errors='replace').partition(':')
+        if sep:
+            headers.append((key.strip(), val.strip()))
+
+
+def _finish(proc, stderr_file):
+    """Reap the CGI, killing it if the client went away mid-stream."""
+    if proc.poll() is None:
+        proc.kill()
+    proc.stdout.close()
+    if proc.wait():
+        stderr_file.seek(0)
+        logger.warning('git http-backend exited with %s: %s', proc.returncode,
+                       stderr_file.read().decode(errors='replace').strip())
+    stderr_file.close()
+
+
+def _stream_stdout(proc, stderr_file):
+    try:
+        while chunk := proc.stdout.read1(CHUNK_SIZE):
+            yield chunk
+    finally:
+        _finish(proc, stderr_file)
+
+
+async def _astream_stdout(proc, stderr_file):
+    read = sync_to_async(proc.stdout.read1, thread_sensitive=False)
+    try:
+        while chunk := await read(CHUNK_SIZE):
+            yield chunk
+    finally:
+        await sync_to_async(_finish, thread_sensitive=False)(proc, stderr_file)
+
+
 # ---------------------------------------------------------------------------
 # Main view
 # ---------------------------------------------------------------------------
 
+@csrf_exempt
 def git_http_backend_view(request, repo_path):
     """
     Entry point for all Git smart-HTTP requests.
@@ -182,55 +251,61 @@ def git_http_backend_view(request, repo_path):
         'GIT_DIR':            disk_path,
         'REMOTE_USER':        user.username if user else '',
     })
-    if 'CONTENT_LENGTH' in request.META:
+    # A gzip body is inflated before it reaches git, so its length is unknown
+    # and git reads stdin to EOF instead.
+    gzipped = request.META.get('HTTP_CONTENT_ENCODING', '').lower() == 'gzip'
+    if 'CONTENT_LENGTH' in request.META and not gzipped:
         env['CONTENT_LENGTH'] = request.META['CONTENT_LENGTH']
 
-    # Spawn git-http-backend
+    # Spawn git-http-backend; stderr goes to a file so it can never fill a
+    # pipe and stall the stream.
     git_backend = shutil_which('git') or 'git'
+    stderr_file = tempfile.TemporaryFile()
     try:
         proc = subprocess.Popen(
             [git_backend, 'http-backend'],
             stdin=subprocess.PIPE,
             stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
+            stderr=stderr_file,
             env=env,
         )
     except FileNotFoundError:
+        stderr_file.close()
         return HttpResponse('git not installed on server', status=500)
 
-    body = request.body if request.method == 'POST' else b''
-    stdout_data, stderr_data = proc.communicate(input=body, timeout=120)
-
-    if proc.returncode != 0:
+    if request.method == 'POST':
+        threading.Thread(
+            target=_feed_stdin, args=(request, proc.stdin, gzipped),
+            name='git-http-stdin', daemon=True,
+        ).start()
+    else:
+        proc.stdin.close()
+
+    headers = _read_cgi_headers(proc.stdout)
+    if headers is None:
+        proc.wait()
+        stderr_file.seek(0)
+        stderr_data = stderr_file.read()
+        stderr_file.close()
+        proc.stdout.close()
         return HttpResponse(
             f'git http-backend error: {stderr_data.decode(errors="replace")}',
             status=500,
         )
 
-    # Parse CGI-style headers from stdout
-    header_end = stdout_data.find(b'\r\n\r\n')
-    if header_end == -1:
-        header_end = stdout_data.find(b'\n\n')
-        sep_len = 2
+    if isinstance(request, ASGIRequest):
+        body = _astream_stdout(proc, stderr_file)
     else:
-        sep_len = 4
-
-    raw_headers = stdout_data[:header_end].decode(errors='replace')
-    body_data   = stdout_data[header_end + sep_len:]
-
-    response = HttpResponse(content=body_data)
-    for line in raw_headers.splitlines():
-        if ':' in line:
-            key, _, val = line.partition(':')
-            k = key.strip()
-            v = val.strip()
-            if k.lower() == 'status':
-                try:
-                    response.status_code = int(v.split()[0])
-                except (ValueError, IndexError):
-                    pass
-            else:
-                response[k] = v
+        body = _stream_stdout(proc, stderr_file)
+    response = StreamingHttpResponse(body)
+    for k, v in headers:
+        if k.lower() == 'status':
+            try:
+                response.status_code = int(v.split()[0])
+            except (ValueError, IndexError):
+                pass
+        else:
+            response[k] = v
 
     return response
 
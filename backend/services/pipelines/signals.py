@@ -0,0 +1,48 @@
+# AtonixCorp Cloud – Pipelines signal handlers
+#
+# Keep the git access cache (git_access.py) in step with tokens, repositories,
+# projects and user renames.
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from . import git_access
+from .models import Project, Repository
+
+# Invalidation runs on commit: a request that fills the cache between the
+# signal and the commit would otherwise cache the old rows again.
+
+
+@receiver(post_save, sender=Token)
+@receiver(post_delete, sender=Token)
+def on_token_changed(sender, instance, **kwargs):
+    key = instance.key
+    transaction.on_commit(lambda: git_access.invalidate_token(key))
+
+
+@receiver(post_save, sender=Repository)
+@receiver(post_delete, sender=Repository)
+@receiver(post_save, sender=Project)
+@receiver(post_delete, sender=Project)
+def on_repository_changed(sender, instance, **kwargs):
+    transaction.on_commit(git_access.invalidate_repos)
+
+
+@receiver(post_save, sender=User)
+def on_user_changed(sender, instance, created, update_fields=None, **kwargs):
+    # Repositories resolve by owner username and tokens cache it, so a rename
+    # invalidates both.  Saves that cannot touch the username (last_login on
+    # every sign-in) are skipped.
+    if created or (update_fields is not None and 'username' not in update_fields):
+        return
+    keys = list(Token.objects.filter(user=instance).values_list('key', flat=True))
+
+    def invalidate():
+        for key in keys:
+            git_access.invalidate_token(key)
+        git_access.invalidate_repos()
+
+    transaction.on_commit(invalidate)
@@ -0,0 +1,416 @@
+# AtonixCorp – Provisioning Job Engine
+#
+# Drives ProvisioningJob rows through OpenStack outside the HTTP request, so a
+# VM boot or volume build never pins a gunicorn worker.
+#
+#   - enqueue() records the job + a "creating" ProvisionedResource and hands
+#     the job to the engine once the request transaction commits;
+#   - a scheduler thread keeps a heap of (due_at, job_id) and advances due
+#     jobs on a small thread pool.  Each step is a single non-blocking
+#     OpenStack call (the create, or one status GET), so a few threads
+#     multiplex hundreds of in-flight jobs;
+#   - between polls a job backs off exponentially, from PROVISIONING_POLL_INITIAL
+#     doubling up to PROVISIONING_POLL_MAX seconds, until its deadline;
+#   - with PROVISIONING_BATCH_POLL, running jobs are not polled one by one:
+#     the status reconciler (reconciler.py) lists servers / volumes once per
+#     (project, region) per tick and feeds the results to apply_status();
+#   - every transition is persisted on the job and its ProvisionedResource and
+#     wakes long-polling status requests (wait_for_change) in this process.
+#
+# Jobs outlive the process that enqueued them:
+#   - a job is claimed with a conditional UPDATE (queued → creating) before
+#     OpenStack is called, so only one worker ever creates it;
+#   - the OpenStack id is persisted on its own as soon as the create returns,
+#     and every created resource is tagged with the job id in its metadata.  A
+#     retried or recovered "creating" job looks the resource up by that tag
+#     instead of creating a duplicate;
+#   - when the engine starts it re-submits jobs left non-terminal by earlier
+#     processes (deploys, worker recycles): queued jobs, "creating" jobs whose
+#     claim is older than PROVISIONING_CREATE_LEASE, and – without batch
+#     polling – running jobs nobody has touched for that long.
+
+import heapq
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Callable
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from services.workspace.models import ProvisioningJob
+from services.workspace.service import WorkspaceService
+
+logger = logging.getLogger(__name__)
+
+
+def _setting(name: str, default):
+    return getattr(settings, name, default)
+
+
+# ── Resource kinds ─────────────────────────────────────────────────────────────
+
+# Metadata key tagging every created resource with the job that created it.
+JOB_METADATA_KEY = "atonixcorp_job"
+
+
+def _create_server(conn, params: dict):
+    server = conn.compute.create_server(**params)
+    return server.id, server.name
+
+
+def _create_volume(conn, params: dict):
+    volume = conn.block_storage.create_volume(**params)
+    return volume.id, volume.name
+
+
+def _find_tagged(resources, job_id: str):
+    for res in resources:
+        if (getattr(res, "metadata", None) or {}).get(JOB_METADATA_KEY) == job_id:
+            return res.id, res.name
+    return None
+
+
+def _find_server(conn, params: dict, job_id: str):
+    query = {"name": f"^{params['name']}$"} if params.get("name") else {}
+    return _find_tagged(conn.compute.servers(details=True, **query), job_id)
+
+
+def _find_volume(conn, params: dict, job_id: str):
+    query = {"name": params["name"]} if params.get("name") else {}
+    return _find_tagged(conn.block_storage.volumes(details=True, **query), job_id)
+
+
+@dataclass(frozen=True)
+class JobKind:
+    create: Callable          # (conn, params) → (openstack_id, name)
+    find: Callable            # (conn, params, job_id) → (openstack_id, name) | None
+    fetch: Callable           # (conn, openstack_id) → resource with .status
+    ready: frozenset
+    failed: frozenset
+    timeout_setting: str
+    default_timeout: int
+
+
+KINDS = {
+    "vm": JobKind(
+        create=_create_server,
+        find=_find_server,
+        fetch=lambda conn, rid: conn.compute.get_server(rid),
+        ready=frozenset({"ACTIVE"}),
+        failed=frozenset({"ERROR"}),
+        timeout_setting="PROVISIONING_VM_TIMEOUT",
+        default_timeout=600,
+    ),
+    "volume": JobKind(
+        create=_create_volume,
+        find=_find_volume,
+        fetch=lambda conn, rid: conn.block_storage.get_volume(rid),
+        ready=frozenset({"available"}),
+        failed=frozenset({"error"}),
+        timeout_setting="PROVISIONING_VOLUME_TIMEOUT",
+        default_timeout=300,
+    ),
+}
+
+
+# ── Engine ─────────────────────────────────────────────────────────────────────
+
+class ProvisioningEngine:
+    """Heap-scheduled, thread-pooled driver for ProvisioningJob state machines."""
+
+    def __init__(self, workers: int, poll_initial: float, poll_max: float,
+                 batch_poll: bool = False, reconcile_interval: float = 5.0,
+                 create_lease: float = 120.0):
+        self.workers = workers
+        self.poll_initial = poll_initial
+        self.poll_max = poll_max
+        self.batch_poll = batch_poll
+        self.reconcile_interval = reconcile_interval
+        self.create_lease = create_lease
+        self._owned: set[str] = set()            # "creating" jobs claimed by this process
+        self._polls: dict[str, int] = {}         # running job id → polls made by this process
+        self._heap: list[tuple[float, str]] = []
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._changed = threading.Condition()
+        self._pool: ThreadPoolExecutor | None = None
+        self._worker_started = False
+
+    # ── scheduling ─────────────────────────────────────────────────────────────
+
+    def submit(self, job_id, delay: float = 0.0) -> None:
+        """Schedule the next step of a job ``delay`` seconds from now."""
+        self._ensure_worker()
+        with self._lock:
+            heapq.heappush(self._heap, (time.monotonic() + delay, str(job_id)))
+        self._wakeup.set()
+
+    def backoff(self, poll_count: int) -> float:
+        return min(self.poll_initial * (2 ** max(poll_count - 1, 0)), self.poll_max)
+
+    def start(self) -> None:
+        """Start the engine threads (and recover orphaned jobs) if not running yet."""
+        self._ensure_worker()
+
+    def recover(self) -> int:
+        """Re-submit jobs left non-terminal by earlier processes; returns how many."""
+        cutoff = timezone.now() - timedelta(seconds=self.create_lease)
+        orphaned = Q(state="queued") | Q(state="creating", updated_at__lt=cutoff)
+        if not self.batch_poll:
+            orphaned |= Q(state="running", updated_at__lt=cutoff)
+        job_ids = list(ProvisioningJob.objects.filter(orphaned).values_list("pk", flat=True))
+        for job_id in job_ids:
+            self.submit(job_id)
+        if job_ids:
+            logger.info("Recovered %d provisioning job(s)", len(job_ids))
+        return len(job_ids)
+
+    def _scheduler_loop(self):
+        try:
+            self.recover()
+        except Exception:
+            logger.exception("Provisioning job recovery failed")
+        finally:
+            close_old_connections()
+        while True:
+            now = time.monotonic()
+            due = []
+            with self._lock:
+                while self._heap and self._heap[0][0] <= now:
+                    due.append(heapq.heappop(self._heap)[1])
+                timeout = (self._heap[0][0] - now) if self._heap else None
+            for job_id in due:
+                self._pool.submit(self._run, job_id)
+            self._wakeup.wait(timeout)
+            self._wakeup.clear()
+
+    def _run(self, job_id: str):
+        delay = None
+        try:
+            delay = self.advance(job_id)
+        except Exception:
+            logger.exception("Provisioning job %s step failed; retrying", job_id)
+            delay = self.poll_max
+        finally:
+            close_old_connections()
+        if delay is not None:
+            self.submit(job_id, delay)
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._worker_started:
+                return
+            self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="provisioning-job")
+            scheduler = threading.Thread(target=self._scheduler_loop, name="provisioning-scheduler", daemon=True)
+            scheduler.start()
+            if self.batch_poll:
+                from .reconciler import run_forever
+                reconciler = threading.Thread(
+                    target=run_forever, args=(self, self.reconcile_interval),
+                    name="provisioning-reconciler", daemon=True,
+                )
+                reconciler.start()
+            self._worker_started = True
+
+    # ── state machine ──────────────────────────────────────────────────────────
+
+    def advance(self, job_id) -> float | None:
+        """
+        Run one step of a job.
+
+        Returns the delay before the next step, or None once the job is terminal.
+        """
+        job = ProvisioningJob.objects.select_related("binding__workspace", "resource").get(pk=job_id)
+        if job.is_terminal:
+            return None
+        kind = KINDS[job.kind]
+        conn = WorkspaceService.get_connection(job.binding)
+        now = timezone.now()
+
+        if job.state in ("queued", "creating"):
+            return self._create(job, kind, conn, now)
+
+        if job.resource is None:
+            self._finish(job, "failed", error="Provisioned resource record was deleted.")
+            return None
+        try:
+            current = str(getattr(kind.fetch(conn, job.resource.resource_id), "status", "") or "")
+        except Exception as exc:
+            # Transient API errors just cost a poll; the deadline still applies.
+            logger.warning("Provisioning job %s poll failed: %s", job.pk, exc)
+            current = ""
+        return self.apply_status(job, current)
+
+    def _create(self, job, kind, conn, now) -> float | None:
+        job_id = str(job.pk)
+        if job_id not in self._owned:
+            # Claim the job; a "creating" job is only taken over once its
+            # previous owner's lease has run out.
+            claimed = ProvisioningJob.objects.filter(pk=job.pk).filter(
+                Q(state="queued")
+                | Q(state="creating", updated_at__lt=now - timedelta(seconds=self.create_lease))
+            ).update(state="creating", progress="creating", updated_at=now)
+            if not claimed:
+                return None
+            self._owned.add(job_id)
+        resumed = job.state == "creating"
+
+        if job.resource is None:
+            self._owned.discard(job_id)
+            self._finish(job, "failed", error="Provisioned resource record was deleted.")
+            return None
+
+        openstack_id, name = job.resource.resource_id, None
+        if not openstack_id and resumed:
+            # An earlier attempt may have created it before failing to record it.
+            openstack_id, name = kind.find(conn, job.params, job_id) or ("", None)
+        if not openstack_id:
+            params = {**job.params, "metadata": {**job.params.get("metadata", {}), JOB_METADATA_KEY: job_id}}
+            try:
+                openstack_id, name = kind.create(conn, params)
+            except Exception as exc:
+                logger.exception("Provisioning job %s create failed", job.pk)
+                self._owned.discard(job_id)
+                self._finish(job, "failed", error=f"OpenStack error: {exc}")
+                return None
+        if openstack_id != job.resource.resource_id:
+            job.resource.resource_id = openstack_id
+            job.resource.resource_name = name or job.resource.resource_name
+            job.resource.save(update_fields=["resource_id", "resource_name", "updated_at"])
+
+        job.state = "running"
+        job.progress = "creating"
+        job.started_at = now
+        job.deadline = now + timedelta(seconds=_setting(kind.timeout_setting, kind.default_timeout))
+        job.save()
+        self._owned.discard(job_id)
+        self._notify()
+        # Batch mode: the reconciler picks up every running job on its next tick.
+        return None if self.batch_poll else self.poll_initial
+
+    def apply_status(self, job, current: str, now=None) -> float | None:
+        """
+        Apply one observed OpenStack status ("" if unknown / unchanged) to a
+        running job; returns the backoff before the next poll, or None once
+        the job is terminal.
+
+        The row is only written when the progress changes or the job ends
+        (plus a heartbeat per half lease when jobs are polled individually,
+        so recover() can tell a live poller from an orphaned job); the poll
+        count is kept in memory in between.
+        """
+        kind = KINDS[job.kind]
+        now = now or timezone.now()
+        if job.resource is None:
+            self._finish(job, "failed", error="Provisioned resource record was deleted.")
+            return None
+        job_id = str(job.pk)
+        job.poll_count = max(job.poll_count, self._polls.get(job_id, 0)) + 1
+        self._polls[job_id] = job.poll_count
+
+        if current in kind.ready:
+            self._finish(job, "succeeded", progress=current, result={
+                "id": job.resource.resource_id, "name": job.resource.resource_name, "status": current,
+            })
+            return None
+        if current in kind.failed:
+            self._finish(job, "failed", progress=current, error=f"OpenStack reported status {current}.")
+            return None
+        if job.deadline and now >= job.deadline:
+            self._finish(job, "failed", progress=current or job.progress,
+                         error=f"Timed out waiting for {job.kind} to become ready.")
+            return None
+
+        heartbeat_due = (not self.batch_poll
+                         and job.updated_at <= now - timedelta(seconds=self.create_lease / 2))
+        if (current and current != job.progress) or heartbeat_due:
+            job.progress = current or job.progress
+            job.save(update_fields=["progress", "poll_count", "updated_at"])
+            self._notify()
+        return self.backoff(job.poll_count)
+
+    def _finish(self, job, state: str, progress: str = "", error: str = "", result: dict | None = None):
+        self._polls.pop(str(job.pk), None)
+        job.state = state
+        job.progress = progress or job.progress
+        job.error = error
+        job.result = result or {}
+        job.finished_at = timezone.now()
+        with transaction.atomic():
+            job.save()
+            if job.resource:
+                job.resource.status = "active" if state == "succeeded" else "error"
+                job.resource.save(update_fields=["status", "updated_at"])
+        self._notify()
+
+    # ── long-poll support ──────────────────────────────────────────────────────
+
+    def _notify(self):
+        with self._changed:
+            self._changed.notify_all()
+
+    def wait_for_change(self, job, since, timeout: float):
+        """
+        Block until ``job`` is updated after ``since`` or is terminal, for at most
+        ``timeout`` seconds; returns the freshest copy of the job.
+
+        Wakes immediately on transitions made in this process and re-reads the
+        row at least once a second to see transitions made by other processes.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            if job.is_terminal or (since is not None and job.updated_at > since):
+                return job
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return job
+            with self._changed:
+                self._changed.wait(min(remaining, 1.0))
+            job = ProvisioningJob.objects.select_related("resource", "binding__workspace").get(pk=job.pk)
+
+
+_engine = ProvisioningEngine(
+    workers=_setting("PROVISIONING_JOB_WORKERS", 4),
+    poll_initial=_setting("PROVISIONING_POLL_INITIAL", 1.0),
+    poll_max=_setting("PROVISIONING_POLL_MAX", 30.0),
+    batch_poll=_setting("PROVISIONING_BATCH_POLL", True),
+    reconcile_interval=_setting("PROVISIONING_RECONCILE_INTERVAL", 5.0),
+    create_lease=_setting("PROVISIONING_CREATE_LEASE", 120.0),
+)
+
+
+def get_engine() -> ProvisioningEngine:
+    """Return the process-wide provisioning engine."""
+    return _engine
+
+
+def enqueue(binding, kind: str, params: dict, resource_name: str, metadata: dict, created_by) -> ProvisioningJob:
+    """
+    Record a provisioning job and its "creating" resource, and schedule the job
+    to start once the surrounding transaction commits.
+    """
+    with transaction.atomic():
+        resource = WorkspaceService.register_resource(
+            binding=binding,
+            resource_type=kind,
+            resource_id="",
+            resource_name=resource_name,
+            status="creating",
+            metadata=metadata,
+            created_by=created_by,
+        )
+        job = ProvisioningJob.objects.create(
+            binding=binding,
+            resource=resource,
+            kind=kind,
+            params=params,
+            created_by=created_by,
+        )
+        transaction.on_commit(lambda: _engine.submit(job.pk))
+    return job
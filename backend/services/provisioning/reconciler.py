@@ -0,0 +1,119 @@
+# AtonixCorp – Provisioning Status Reconciler
+#
+# Batch status polling for running ProvisioningJobs.  Instead of one Nova /
+# Cinder GET per pending resource, each tick:
+#
+#   1. loads every running job and groups it by (OpenStack project, region);
+#   2. per group issues at most one servers(details=True, changes-since=…)
+#      call and one volumes(details=True) call;
+#   3. fans the observed statuses out to ProvisioningEngine.apply_status().
+#
+# API calls per interval are therefore O(projects), not O(pending resources).
+# Servers absent from a changes-since listing have not changed, which
+# apply_status() treats like any other poll (only the deadline advances).
+#
+# Only one process ticks per interval: a per-interval marker in the shared
+# cache keeps every gunicorn worker from listing the same projects, and a lock
+# held for the duration of the tick (released when it ends, with a generous
+# TTL in case the process dies) keeps a slow tick from overlapping the next.
+# The thread runs in every process that starts the engine (wsgi / asgi).
+
+import logging
+import time
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections
+from django.utils import timezone
+
+from services.workspace.models import ProvisioningJob
+from services.workspace.service import WorkspaceService
+
+logger = logging.getLogger(__name__)
+
+_LOCK_KEY = "provisioning:reconciler:lock"
+_TICK_KEY = "provisioning:reconciler:tick"
+
+# Overlap between consecutive changes-since windows, to absorb clock skew
+# between this host and Nova.
+CHANGES_SINCE_SLACK = timedelta(seconds=60)
+
+
+class StatusReconciler:
+    """Batches status polls for running jobs per (project, region)."""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self._since: dict[tuple, object] = {}     # (project, region) → last listing time
+        self.stats = {"ticks": 0, "api_calls": 0, "jobs_polled": 0}
+
+    def tick(self) -> int:
+        """Run one reconciliation pass; returns the number of jobs updated."""
+        running = (
+            ProvisioningJob.objects.filter(state="running")
+            .select_related("binding__workspace", "resource")
+        )
+        groups = defaultdict(list)
+        for job in running:
+            groups[(job.binding.openstack_project, job.binding.openstack_region)].append(job)
+
+        self.stats["ticks"] += 1
+        for key in list(self._since):
+            if key not in groups:
+                del self._since[key]
+        for key, jobs in groups.items():
+            self._reconcile_group(key, jobs)
+        return sum(len(jobs) for jobs in groups.values())
+
+    def _reconcile_group(self, key, jobs):
+        started = timezone.now()
+        kinds = {job.kind for job in jobs}
+        statuses = {}
+        try:
+            conn = WorkspaceService.get_connection(jobs[0].binding)
+            if "vm" in kinds:
+                query = {"details": True}
+                if since := self._since.get(key):
+                    query["changes_since"] = since.isoformat()
+                for server in conn.compute.servers(**query):
+                    statuses[("vm", server.id)] = server.status
+                self.stats["api_calls"] += 1
+            if "volume" in kinds:
+                for volume in conn.block_storage.volumes(details=True):
+                    statuses[("volume", volume.id)] = volume.status
+                self.stats["api_calls"] += 1
+        except Exception as exc:
+            # Treat the whole group as "no news": deadlines still apply.
+            logger.warning("Status reconciliation failed for %s/%s: %s", key[0], key[1], exc)
+            statuses = {}
+        else:
+            self._since[key] = started - CHANGES_SINCE_SLACK
+
+        for job in jobs:
+            current = statuses.get((job.kind, job.resource.resource_id if job.resource else None), "")
+            try:
+                self.engine.apply_status(job, str(current or ""), now=started)
+            except Exception:
+                logger.exception("Applying status to provisioning job %s failed", job.pk)
+        self.stats["jobs_polled"] += len(jobs)
+
+
+def run_forever(engine, interval: float):
+    """Reconciler thread body: tick every ``interval`` seconds, one process at a time."""
+    reconciler = StatusReconciler(engine)
+    lock_ttl = int(getattr(settings, "PROVISIONING_RECONCILE_LOCK_TTL", max(interval * 12, 60)))
+    while True:
+        time.sleep(interval)
+        if not cache.add(_TICK_KEY, 1, timeout=max(int(interval), 1)):
+            continue
+        if not cache.add(_LOCK_KEY, 1, timeout=lock_ttl):
+            continue
+        try:
+            reconciler.tick()
+        except Exception:
+            logger.exception("Provisioning status reconciler tick failed")
+        finally:
+            cache.delete(_LOCK_KEY)
+            close_old_connections()
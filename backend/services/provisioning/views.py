@@ -11,9 +11,18 @@
 #
 # All successful create responses follow:
 #   { "resource": { ... OpenStack attrs ... }, "provisioned": { ... DB record ... } }
+#
+# VM and volume creates are asynchronous (services/provisioning/jobs.py) and
+# answer 202 with:
+#   { "job": { ... ProvisioningJob ... }, "status_url": "/api/.../provision/jobs/<id>/" }
 
 import logging
+import math
 
+from django.db.models import Q
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.request import Request
@@ -26,7 +35,10 @@ from services.workspace.service import (
     WorkspaceInactive,
     BindingNotFound,
 )
-from services.workspace.serializers import ProvisionedResourceSerializer
+from services.workspace.models import ProvisioningJob
+from services.workspace.serializers import ProvisionedResourceSerializer, ProvisioningJobSerializer
+
+from . import jobs
 
 logger = logging.getLogger(__name__)
 
@@ -54,6 +66,16 @@ def _resolve(data: dict):
         return None, _err(str(exc), 404)
 
 
+def _accepted(request: Request, job: ProvisioningJob) -> Response:
+    return Response(
+        {
+            "job": ProvisioningJobSerializer(job).data,
+            "status_url": request.build_absolute_uri(reverse("provision-job-status", args=[job.pk])),
+        },
+        status=status.HTTP_202_ACCEPTED,
+    )
+
+
 # ── Compute ────────────────────────────────────────────────────────────────────
 
 @api_view(["POST"])
@@ -62,6 +84,9 @@ def provision_vm(request: Request) -> Response:
     """
     Create a VM in the workspace's OpenStack project.
 
+    Returns 202 with a provisioning job; poll GET provision/jobs/<id>/ until
+    its state is "succeeded" or "failed".
+
     Body:
         workspace_id    str
         environment_id  str   (dev | staging | prod)
@@ -83,45 +108,27 @@ def provision_vm(request: Request) -> Response:
     if not all([name, flavor_id, image_id]):
         return _err("'name', 'flavor_id', and 'image_id' are required.")
 
-    try:
-        conn = WorkspaceService.get_connection(binding)
-        kwargs = dict(
-            name=name,
-            flavor=flavor_id,
-            image=image_id,
-        )
-        if network_id := request.data.get("network_id"):
-            kwargs["network"] = network_id
-        if key_name := request.data.get("key_name"):
-            kwargs["key_name"] = key_name
-        if user_data := request.data.get("user_data"):
-            kwargs["userdata"] = user_data
-
-        server = conn.compute.create_server(**kwargs)
-        conn.compute.wait_for_server(server, status="ACTIVE", wait=5)
-
-        provisioned = WorkspaceService.register_resource(
-            binding=binding,
-            resource_type="vm",
-            resource_id=server.id,
-            resource_name=server.name,
-            status="active",
-            metadata={"flavor_id": flavor_id, "image_id": image_id},
-            created_by=request.user,
-        )
-
-        return Response(
-            {
-                "resource": dict(server),
-                "provisioned": ProvisionedResourceSerializer(provisioned).data,
-            },
-            status=status.HTTP_201_CREATED,
-        )
-
-    except Exception as exc:
-        logger.exception("provision_vm failed for workspace=%s env=%s",
-                         binding.workspace.workspace_id, binding.environment)
-        return _err(f"OpenStack error: {exc}", 500)
+    kwargs = dict(
+        name=name,
+        flavor=flavor_id,
+        image=image_id,
+    )
+    if network_id := request.data.get("network_id"):
+        kwargs["network"] = network_id
+    if key_name := request.data.get("key_name"):
+        kwargs["key_name"] = key_name
+    if user_data := request.data.get("user_data"):
+        kwargs["userdata"] = user_data
+
+    job = jobs.enqueue(
+        binding=binding,
+        kind="vm",
+        params=kwargs,
+        resource_name=name,
+        metadata={"flavor_id": flavor_id, "image_id": image_id},
+        created_by=request.user,
+    )
+    return _accepted(request, job)
 
 
 # ── Storage ────────────────────────────────────────────────────────────────────
@@ -132,6 +139,9 @@ def provision_volume(request: Request) -> Response:
     """
     Create a block-storage volume.
 
+    Returns 202 with a provisioning job; poll GET provision/jobs/<id>/ until
+    its state is "succeeded" or "failed".
+
     Body:
         workspace_id    str
         environment_id  str
@@ -151,36 +161,24 @@ def provision_volume(request: Request) -> Response:
         return _err("'name' and 'size_gb' are required.")
 
     try:
-        conn = WorkspaceService.get_connection(binding)
-        volume = conn.block_storage.create_volume(
-            name=name,
-            size=int(size_gb),
-            volume_type=request.data.get("volume_type"),
-            description=request.data.get("description", ""),
-        )
-        conn.block_storage.wait_for_status(volume, status="available", wait=30)
-
-        provisioned = WorkspaceService.register_resource(
-            binding=binding,
-            resource_type="volume",
-            resource_id=volume.id,
-            resource_name=volume.name,
-            status="active",
-            metadata={"size_gb": size_gb},
-            created_by=request.user,
-        )
-
-        return Response(
-            {
-                "resource": dict(volume),
-                "provisioned": ProvisionedResourceSerializer(provisioned).data,
-            },
-            status=status.HTTP_201_CREATED,
-        )
-
-    except Exception as exc:
-        logger.exception("provision_volume failed")
-        return _err(f"OpenStack error: {exc}", 500)
+        size = int(size_gb)
+    except (TypeError, ValueError):
+        return _err("'size_gb' must be an integer.")
+
+    job = jobs.enqueue(
+        binding=binding,
+        kind="volume",
+        params={
+            "name": name,
+            "size": size,
+            "volume_type": request.data.get("volume_type"),
+            "description": request.data.get("description", ""),
+        },
+        resource_name=name,
+        metadata={"size_gb": size_gb},
+        created_by=request.user,
+    )
+    return _accepted(request, job)
 
 
 # ── Networking ─────────────────────────────────────────────────────────────────
@@ -356,6 +354,57 @@ def provision_floating_ip(request: Request) -> Response:
         return _err(f"OpenStack error: {exc}", 500)
 
 
+# ── Provisioning jobs ──────────────────────────────────────────────────────────
+
+MAX_LONG_POLL_SECONDS = 30
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def provisioning_job_status(request: Request, job_id) -> Response:
+    """
+    Status of an asynchronous provisioning job.
+
+    Query params:
+        wait    int   (optional) long-poll: hold the request up to this many
+                      seconds (max 30) until the job changes or finishes
+        since   str   (optional) the job's last seen updated_at; with wait,
+                      return as soon as the job is newer than this
+    """
+    user = request.user
+    job = (
+        ProvisioningJob.objects.select_related("resource", "binding__workspace")
+        .filter(pk=job_id)
+        .filter(
+            Q(created_by=user)
+            | Q(binding__workspace__owner=user)
+            | Q(binding__workspace__members=user)
+        )
+        .distinct()
+        .first()
+    )
+    if job is None:
+        return _err("Provisioning job not found.", 404)
+
+    try:
+        wait = float(request.query_params.get("wait", 0))
+        if not math.isfinite(wait):
+            raise ValueError(wait)
+    except ValueError:
+        return _err("'wait' must be a number of seconds.")
+    wait = min(max(wait, 0), MAX_LONG_POLL_SECONDS)
+    try:
+        since = parse_datetime(request.query_params.get("since", ""))
+        if since is not None and timezone.is_naive(since):
+            since = timezone.make_aware(since)
+    except ValueError:
+        return _err("'since' must be an ISO 8601 timestamp.")
+    if wait:
+        job = jobs.get_engine().wait_for_change(job, since or job.updated_at, wait)
+
+    return Response({"job": ProvisioningJobSerializer(job).data})
+
+
 # ── Resource inventory ─────────────────────────────────────────────────────────
 
 @api_view(["GET"])
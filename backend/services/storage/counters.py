@@ -0,0 +1,67 @@
+# AtonixCorp Storage – Bucket Counters
+#
+# StorageBucket.total_objects / total_size_bytes are maintained incrementally:
+# every object create, overwrite and delete applies its delta with F()
+# expressions, so a write never rescans the bucket's S3Object rows.
+#
+#   - apply_delta() is called from the object write paths (storage viewsets,
+#     business_logic.storage);
+#   - reconcile() recomputes the totals with one grouped aggregate per batch
+#     of buckets and corrects drift (writes that bypassed apply_delta: bulk
+#     imports, queryset.update(), raw SQL, races between an overwrite and a
+#     delete).  Run it periodically via `reconcile_bucket_counters`.
+
+import logging
+
+from django.db import transaction
+from django.db.models import Count, F, Sum
+
+from .models import S3Object, StorageBucket
+
+logger = logging.getLogger(__name__)
+
+
+def apply_delta(bucket_id, objects: int = 0, size_bytes: int = 0) -> None:
+    """Atomically add ``objects`` / ``size_bytes`` (either may be negative) to a bucket."""
+    if not objects and not size_bytes:
+        return
+    StorageBucket.objects.filter(pk=bucket_id).update(
+        total_objects=F('total_objects') + objects,
+        total_size_bytes=F('total_size_bytes') + size_bytes,
+    )
+
+
+def reconcile(bucket_ids=None, chunk_size: int = 500) -> int:
+    """Recompute bucket totals from S3Object; returns the number of buckets corrected."""
+    qs = StorageBucket.objects.order_by('pk').values_list('pk', flat=True)
+    if bucket_ids is not None:
+        qs = qs.filter(pk__in=bucket_ids)
+    ids = list(qs)
+    return sum(_reconcile_chunk(ids[i:i + chunk_size]) for i in range(0, len(ids), chunk_size))
+
+
+def _reconcile_chunk(ids: list) -> int:
+    # Lock the bucket rows so apply_delta() calls issued meanwhile wait for
+    # the corrected totals instead of being overwritten by them.
+    with transaction.atomic():
+        buckets = list(
+            StorageBucket.objects.select_for_update()
+            .filter(pk__in=ids).only('pk', 'total_objects', 'total_size_bytes')
+        )
+        actual = {
+            row['bucket_id']: (row['objects'], row['size_bytes'] or 0)
+            for row in S3Object.objects.filter(bucket_id__in=ids)
+            .values('bucket_id')
+            .annotate(objects=Count('pk'), size_bytes=Sum('size_bytes'))
+            .order_by()
+        }
+        drifted = []
+        for bucket in buckets:
+            objects, size_bytes = actual.get(bucket.pk, (0, 0))
+            if (bucket.total_objects, bucket.total_size_bytes) != (objects, size_bytes):
+                logger.info('Bucket %s counters drifted: %s objects / %s bytes, actual %s / %s',
+                            bucket.pk, bucket.total_objects, bucket.total_size_bytes, objects, size_bytes)
+                bucket.total_objects, bucket.total_size_bytes = objects, size_bytes
+                drifted.append(bucket)
+        StorageBucket.objects.bulk_update(drifted, ['total_objects', 'total_size_bytes'])
+    return len(drifted)
@@ -68,9 +68,23 @@ class StorageBucket(ResourceModel):
             models.Index(fields=['owner', 'region']),
         ]
 
+    # Maintained with F() deltas by storage/counters.py.
+    COUNTER_FIELDS = ('total_objects', 'total_size_bytes')
+
     def __str__(self):
         return self.bucket_name
 
+    def save(self, *args, **kwargs):
+        # A full save of an existing bucket writes every column, which would
+        # overwrite counters updated since the instance was loaded.  Leave
+        # them out unless the caller names them in update_fields.
+        if not self._state.adding and kwargs.get('update_fields') is None and not kwargs.get('force_insert'):
+            kwargs['update_fields'] = [
+                f.name for f in self._meta.concrete_fields
+                if not f.primary_key and f.name not in self.COUNTER_FIELDS
+            ]
+        super().save(*args, **kwargs)
+
     @property
     def total_size_gb(self):
         return self.total_size_bytes / (1024 ** 3)
@@ -122,6 +136,41 @@ class S3Object(TimeStampedModel):
         return f"{self.bucket.bucket_name}/{self.object_key}"
 
 
+class MultipartUpload(TimeStampedModel):
+    """
+    A resumable multipart upload (S3 CreateMultipartUpload equivalent).
+
+    Parts are stored as Swift segments and stitched into a Static Large
+    Object on completion; ``parts`` records what has been received so a
+    client can resume after a failure.
+    """
+    STATUS_CHOICES = [
+        ('active', 'Active'),
+        ('completed', 'Completed'),
+        ('aborted', 'Aborted'),
+    ]
+
+    upload_id = models.CharField(max_length=64, unique=True, db_index=True)
+    bucket = models.ForeignKey(StorageBucket, on_delete=models.CASCADE, related_name='multipart_uploads')
+    object_key = models.CharField(max_length=1024)
+    content_type = models.CharField(max_length=150, default='application/octet-stream')
+    storage_class = models.CharField(max_length=50, default='standard')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='active')
+    # part number (str) → {'etag', 'size_bytes', 'path'}
+    parts = models.JSONField(default=dict)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def save(self, *args, **kwargs):
+        if not self.upload_id:
+            self.upload_id = f'mpu-{uuid.uuid4().hex}'
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return f"{self.upload_id} ({self.bucket.bucket_name}/{self.object_key})"
+
+
 # ============================================================================
 # STORAGE - BLOCK STORAGE (EBS-like)
 # ============================================================================
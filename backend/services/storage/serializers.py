@@ -51,7 +51,7 @@ class StorageBucketDetailSerializer(serializers.ModelSerializer):
         ]
 
     def get_object_count(self, obj):
-        return obj.objects.count()
+        return obj.total_objects
 
 
 class StorageBucketCreateSerializer(serializers.ModelSerializer):
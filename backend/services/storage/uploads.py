@@ -0,0 +1,279 @@
+# AtonixCorp Storage – Streaming Object Uploads
+#
+# Object bytes go to Swift without ever being held in memory whole:
+#
+#   - put_object() pipes an upload to Swift in STORAGE_UPLOAD_CHUNK_SIZE
+#     chunks, hashing as it goes.  Objects above STORAGE_SLO_THRESHOLD are
+#     cut into STORAGE_SEGMENT_SIZE segments, uploaded by STORAGE_UPLOAD_WORKERS
+#     threads and stitched together with a Static Large Object manifest; at
+#     most one segment per worker (plus the one being read) is in memory.
+#   - The multipart API (initiate / upload_part / complete / abort) lets a
+#     client upload parts itself, in any order and in parallel, and resume
+#     after a failure: received parts are recorded on the MultipartUpload.
+#
+# Single-stream uploads keep the MD5 of the whole object as ETag.  Multipart
+# uploads use the S3 convention: MD5 of the concatenated part digests,
+# suffixed with "-<part count>".
+#
+# Segments of each upload live under a unique prefix, so concurrent uploads
+# of one key never overwrite each other's segments.  Once a new manifest (or
+# plain object) is in place, the segments of the SLO it replaced are deleted;
+# a failed upload deletes whatever segments it had already written.
+#
+# Multipart state changes (recording a part, complete, abort) happen under a
+# row lock on the MultipartUpload.  Every attempt at a part gets its own
+# segment, so a part that lands after complete / abort never overwrites a
+# segment the manifest uses: it sees the final status under the lock and
+# deletes its own segment.
+
+import hashlib
+import logging
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import transaction
+
+from openstack.exceptions import SDKException
+
+from ..integrations import swift_service
+
+logger = logging.getLogger(__name__)
+
+MAX_PARTS = 10000
+
+
+class UploadError(Exception):
+    pass
+
+
+class InvalidPart(UploadError):
+    """The parts cannot form a valid object (too many, too small)."""
+
+
+def _setting(name: str, default):
+    return getattr(settings, name, default)
+
+
+def _hashed(chunks, md5):
+    """Yield ``chunks`` unchanged, feeding each into ``md5``."""
+    for chunk in chunks:
+        md5.update(chunk)
+        yield chunk
+
+
+def multipart_etag(part_digests: list[bytes]) -> str:
+    return f"{hashlib.md5(b''.join(part_digests)).hexdigest()}-{len(part_digests)}"
+
+
+def _segment_path(upload_id: str, part_number: int) -> str:
+    return f'{upload_id}/{part_number:05d}-{uuid.uuid4().hex[:12]}'
+
+
+def _lock(upload):
+    """Re-read ``upload`` under a row lock (call inside transaction.atomic())."""
+    return type(upload).objects.select_for_update().get(pk=upload.pk)
+
+
+def _max_segments() -> int:
+    # Swift's SLO max_manifest_segments (1000 by default).
+    return _setting('STORAGE_MAX_MANIFEST_SEGMENTS', 1000)
+
+
+def _previous_segments(conn, bucket_name: str, object_key: str) -> list[str]:
+    """Segments of the SLO about to be replaced (best effort: [] on error)."""
+    try:
+        return swift_service.slo_segments(conn, bucket_name, object_key)
+    except SDKException as exc:
+        logger.warning('Could not read the previous manifest of %s/%s: %s', bucket_name, object_key, exc)
+        return []
+
+
+# ── Single request ────────────────────────────────────────────────────────────
+
+def put_object(bucket_name: str, object_key: str, file_obj,
+               content_type: str = 'application/octet-stream') -> tuple[str, int]:
+    """
+    Stream an uploaded file (Django UploadedFile) to Swift; returns
+    (etag, size_bytes).  Large files go up as a parallel SLO upload.
+    """
+    conn = swift_service.open_connection()
+    previous = _previous_segments(conn, bucket_name, object_key)
+    if file_obj.size > _setting('STORAGE_SLO_THRESHOLD', 256 * 1024 ** 2):
+        result = _put_large_object(conn, bucket_name, object_key, file_obj, content_type)
+    else:
+        md5 = hashlib.md5()
+        chunks = _hashed(file_obj.chunks(_setting('STORAGE_UPLOAD_CHUNK_SIZE', 1024 ** 2)), md5)
+        swift_service.put_object_stream(conn, bucket_name, object_key, chunks, content_type)
+        result = md5.hexdigest(), file_obj.size
+    swift_service.delete_segments(conn, bucket_name, previous)
+    return result
+
+
+def _put_large_object(conn, bucket_name, object_key, file_obj, content_type):
+    # Grow segments if needed to stay within the manifest segment limit.
+    segment_size = max(_setting('STORAGE_SEGMENT_SIZE', 64 * 1024 ** 2), -(-file_obj.size // _max_segments()))
+    workers = _setting('STORAGE_UPLOAD_WORKERS', 4)
+    prefix = f'{object_key}/slo-{uuid.uuid4().hex}'
+    slots = threading.BoundedSemaphore(workers)
+    failed = threading.Event()
+    whole = hashlib.md5()
+
+    def upload(path, data):
+        try:
+            etag = swift_service.put_object_stream(
+                conn, bucket_name, path, [data], container=swift_service.segment_container(bucket_name),
+            )
+            return {'path': path, 'etag': etag or hashlib.md5(data).hexdigest(), 'size_bytes': len(data)}
+        except BaseException:
+            failed.set()
+            raise
+        finally:
+            slots.release()
+
+    swift_service.ensure_segment_container(conn, bucket_name)
+    file_obj.seek(0)
+    futures = []
+    try:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='slo-upload') as pool:
+            index = 0
+            while not failed.is_set() and (data := file_obj.read(segment_size)):
+                whole.update(data)
+                slots.acquire()                     # bound segments held in memory
+                futures.append(pool.submit(upload, f'{prefix}/{index:05d}', data))
+                index += 1
+        segments = [f.result() for f in futures]
+        swift_service.put_slo_manifest(conn, bucket_name, object_key, segments, content_type)
+    except BaseException:
+        written = [f.result()['path'] for f in futures if f.done() and f.exception() is None]
+        swift_service.delete_segments(conn, bucket_name, written)
+        raise
+    return whole.hexdigest(), file_obj.size
+
+
+# ── Multipart API ─────────────────────────────────────────────────────────────
+
+def initiate(bucket, object_key: str, content_type: str = 'application/octet-stream',
+             storage_class: str = 'standard'):
+    from .models import MultipartUpload
+
+    swift_service.ensure_segment_container(swift_service.open_connection(), bucket.bucket_name)
+    return MultipartUpload.objects.create(
+        bucket=bucket, object_key=object_key,
+        content_type=content_type, storage_class=storage_class,
+    )
+
+
+def upload_part(upload, part_number: int, stream) -> dict:
+    """
+    Stream one part (a file-like ``stream``) into its segment and record it;
+    re-uploading a part number replaces it.  Returns the part record.
+    """
+    if upload.status != 'active':
+        raise UploadError(f'Upload is {upload.status}.')
+    if not 1 <= part_number <= MAX_PARTS:
+        raise InvalidPart(f'Part number must be between 1 and {MAX_PARTS}.')
+    if str(part_number) not in upload.parts and len(upload.parts) >= _max_segments():
+        raise InvalidPart(f'An upload can have at most {_max_segments()} parts.')
+
+    chunk_size = _setting('STORAGE_UPLOAD_CHUNK_SIZE', 1024 ** 2)
+    md5 = hashlib.md5()
+    size = 0
+
+    def chunks():
+        nonlocal size
+        while chunk := stream.read(chunk_size):
+            size += len(chunk)
+            yield chunk
+
+    conn = swift_service.open_connection()
+    bucket_name = upload.bucket.bucket_name
+    path = _segment_path(upload.upload_id, part_number)
+    swift_service.put_object_stream(
+        conn, bucket_name, path, _hashed(chunks(), md5),
+        container=swift_service.segment_container(bucket_name),
+    )
+    part = {'etag': md5.hexdigest(), 'size_bytes': size, 'path': path}
+
+    # Parts of one upload may arrive concurrently, or race complete / abort:
+    # merge under a row lock.
+    with transaction.atomic():
+        locked = _lock(upload)
+        if locked.status == 'active':
+            replaced = locked.parts.get(str(part_number))
+            locked.parts[str(part_number)] = part
+            locked.save(update_fields=['parts', 'updated_at'])
+    upload.status, upload.parts = locked.status, locked.parts
+    if locked.status != 'active':
+        swift_service.delete_segments(conn, bucket_name, [path])
+        raise UploadError(f'Upload is {locked.status}.')
+    if replaced:
+        swift_service.delete_segments(conn, bucket_name, [replaced['path']])
+    return {'part_number': part_number, **part}
+
+
+def complete(upload, expected_parts: list | None = None) -> tuple[str, int]:
+    """
+    Stitch the recorded parts, in part-number order, into the final object;
+    returns (etag, size_bytes).  ``expected_parts`` ([{'part_number',
+    'etag'}]) — the client's view — must match what was received.
+    """
+    # The lock is held while the manifest is written, so no part can be
+    # recorded and no abort can delete segments meanwhile.
+    with transaction.atomic():
+        locked = _lock(upload)
+        try:
+            return _complete(locked, expected_parts)
+        finally:
+            upload.status, upload.parts = locked.status, locked.parts
+
+
+def _complete(upload, expected_parts):
+    if upload.status != 'active':
+        raise UploadError(f'Upload is {upload.status}.')
+    parts = sorted(((int(n), p) for n, p in upload.parts.items()), key=lambda item: item[0])
+    if not parts:
+        raise UploadError('No parts have been uploaded.')
+    if expected_parts is not None:
+        received = {n: p['etag'] for n, p in parts}
+        for item in expected_parts:
+            number = int(item.get('part_number', 0))
+            if received.get(number) != str(item.get('etag', '')).strip('"'):
+                raise UploadError(f'Part {number} is missing or its ETag does not match.')
+        wanted = {int(item.get('part_number', 0)) for item in expected_parts}
+        parts = [(n, p) for n, p in parts if n in wanted]
+    if len(parts) > _max_segments():
+        raise InvalidPart(f'An upload can have at most {_max_segments()} parts.')
+    min_size = _setting('STORAGE_MIN_PART_SIZE', 5 * 1024 ** 2)
+    for n, p in parts[:-1]:
+        if p['size_bytes'] < min_size:
+            raise InvalidPart(f'Part {n} is smaller than the {min_size}-byte minimum (only the last part may be).')
+
+    conn = swift_service.open_connection()
+    bucket_name = upload.bucket.bucket_name
+    previous = _previous_segments(conn, bucket_name, upload.object_key)
+    swift_service.put_slo_manifest(conn, bucket_name, upload.object_key, [p for _, p in parts], upload.content_type)
+    used = {p['path'] for _, p in parts}
+    unused = [p['path'] for p in upload.parts.values() if p['path'] not in used]
+    swift_service.delete_segments(conn, bucket_name, unused + [path for path in previous if path not in used])
+    upload.status = 'completed'
+    upload.save(update_fields=['status', 'updated_at'])
+    etag = multipart_etag([bytes.fromhex(p['etag']) for _, p in parts])
+    return etag, sum(p['size_bytes'] for _, p in parts)
+
+
+def abort(upload) -> None:
+    with transaction.atomic():
+        locked = _lock(upload)
+        upload.status, upload.parts = locked.status, locked.parts
+        if locked.status != 'active':
+            raise UploadError(f'Upload is {locked.status}.')
+        locked.status = upload.status = 'aborted'
+        locked.save(update_fields=['status', 'updated_at'])
+    # Parts still in flight see 'aborted' when they commit and remove
+    # their own segments.
+    swift_service.delete_segments(
+        swift_service.open_connection(), upload.bucket.bucket_name,
+        [p['path'] for p in locked.parts.values()],
+    )
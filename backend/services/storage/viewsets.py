@@ -1,13 +1,17 @@
 # AtonixCorp Storage Service - ViewSets
 
+import io
 import json
-from django.db.models import Sum
+import logging
+from django.db import transaction
+from openstack.exceptions import SDKException
 from rest_framework import viewsets, status, filters
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django_filters.rest_framework import DjangoFilterBackend
 from ..integrations import swift_service
+from . import counters, uploads
 from .models import (
     StorageBucket, S3Object, StorageVolume, StorageSnapshot,
     FileShare, FileShareMount, EncryptionKey,
@@ -25,6 +29,8 @@ from .serializers import (
     StorageMetricSerializer
 )
 
+logger = logging.getLogger(__name__)
+
 
 # ============================================================================
 # STORAGE BUCKET VIEWSET
@@ -69,7 +75,7 @@ class StorageBucketViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
     @action(detail=True, methods=['get'])
-    def statistics(self, request, pk=None):
+    def statistics(self, request, resource_id=None):
         """Get bucket statistics."""
         bucket = self.get_object()
         return Response({
@@ -81,7 +87,7 @@ class StorageBucketViewSet(viewsets.ModelViewSet):
         })
 
     @action(detail=True, methods=['post'])
-    def enable_versioning(self, request, pk=None):
+    def enable_versioning(self, request, resource_id=None):
         """Enable bucket versioning."""
         bucket = self.get_object()
         bucket.versioning_enabled = True
@@ -89,7 +95,7 @@ class StorageBucketViewSet(viewsets.ModelViewSet):
         return Response({'status': 'Versioning enabled'})
 
     @action(detail=True, methods=['post'])
-    def enable_logging(self, request, pk=None):
+    def enable_logging(self, request, resource_id=None):
         """Enable bucket access logging."""
         bucket = self.get_object()
         log_bucket = request.data.get('log_target_bucket')
@@ -173,13 +179,40 @@ class StorageBucketViewSet(viewsets.ModelViewSet):
         result = swift_service.apply_lifecycle_policy(bucket.bucket_name, rules)
         return Response({'saved': True, 'rules_count': len(rules), 'swift': result})
 
+    def _record_object(self, bucket, object_key, size_bytes, content_type, etag, storage_class):
+        """Create or update the S3Object row and apply the size delta to the bucket."""
+        from .models import S3Object
+
+        # The row lock makes the overwrite delta exact under concurrent PUTs.
+        with transaction.atomic():
+            s3_obj, created = S3Object.objects.select_for_update().get_or_create(
+                bucket=bucket,
+                object_key=object_key,
+                defaults={
+                    'size_bytes':    size_bytes,
+                    'content_type':  content_type,
+                    'etag':          etag,
+                    'storage_class': storage_class,
+                },
+            )
+
+            if created:
+                counters.apply_delta(bucket.pk, objects=1, size_bytes=size_bytes)
+            else:
+                counters.apply_delta(bucket.pk, size_bytes=size_bytes - s3_obj.size_bytes)
+                s3_obj.size_bytes   = size_bytes
+                s3_obj.content_type = content_type
+                s3_obj.etag         = etag
+                s3_obj.save()
+        return created
+
     @action(detail=True, methods=['post'])
-    def upload_object(self, request, pk=None):
+    def upload_object(self, request, resource_id=None):
         """
-        Simulate an object upload – creates an S3Object record and
-        pushes the raw bytes to the Swift container (if available).
+        Upload an object – streams the file to the Swift container (as a
+        Static Large Object above STORAGE_SLO_THRESHOLD) while hashing it,
+        then creates/updates the S3Object record.
         """
-        from .models import S3Object
         import hashlib
 
         bucket     = self.get_object()
@@ -190,51 +223,23 @@ class StorageBucketViewSet(viewsets.ModelViewSet):
             return Response({'error': 'file or object_key required'}, status=status.HTTP_400_BAD_REQUEST)
 
         if file_obj:
-            data         = file_obj.read()
             object_key   = object_key or file_obj.name
             content_type = file_obj.content_type or 'application/octet-stream'
-            size_bytes   = len(data)
-            etag         = hashlib.md5(data).hexdigest()
+            try:
+                etag, size_bytes = uploads.put_object(bucket.bucket_name, object_key, file_obj, content_type)
+            except Exception as exc:
+                return self._upload_error(bucket, exc)
         else:
             # Metadata-only record (client-side upload)
-            data         = b''
             content_type = request.data.get('content_type', 'application/octet-stream')
             size_bytes   = int(request.data.get('size_bytes', 0))
             etag         = request.data.get('etag', hashlib.md5(object_key.encode()).hexdigest())
 
-        s3_obj, created = S3Object.objects.get_or_create(
-            bucket=bucket,
-            object_key=object_key,
-            defaults={
-                'size_bytes':    size_bytes,
-                'content_type':  content_type,
-                'etag':          etag,
-                'storage_class': request.data.get('storage_class', 'standard'),
-            },
+        created = self._record_object(
+            bucket, object_key, size_bytes, content_type, etag,
+            request.data.get('storage_class', 'standard'),
         )
 
-        if not created:
-            s3_obj.size_bytes   = size_bytes
-            s3_obj.content_type = content_type
-            s3_obj.etag         = etag
-            s3_obj.save()
-
-        # Update aggregate counts
-        bucket.total_objects = bucket.s3_objects.count()
-        bucket.total_size_bytes = bucket.s3_objects.aggregate(
-            total=Sum('size_bytes')
-        )['total'] or 0
-        bucket.save(update_fields=['total_objects', 'total_size_bytes'])
-
-        # Forward to Swift
-        if data:
-            swift_service.upload_swift_object(
-                bucket_name=bucket.bucket_name,
-                object_key=object_key,
-                data=data,
-                content_type=content_type,
-            )
-
         return Response({
             'success':   True,
             'object_key': object_key,
@@ -243,6 +248,103 @@ class StorageBucketViewSet(viewsets.ModelViewSet):
             'created':    created,
         }, status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
 
+    def _upload_error(self, bucket, exc):
+        """Map an upload failure to a response: our checks → 4xx, Swift → 400 / 502."""
+        if isinstance(exc, uploads.InvalidPart):
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        if isinstance(exc, uploads.UploadError):
+            return Response({'error': str(exc)}, status=status.HTTP_409_CONFLICT)
+        if getattr(exc, 'status_code', None) in (400, 411, 413, 422):
+            # Swift refused the content itself (e.g. an SLO constraint).
+            return Response({'error': f'Rejected by object storage: {exc}'}, status=status.HTTP_400_BAD_REQUEST)
+        logger.error('Object upload to %s failed: %s', bucket.bucket_name, exc)
+        return Response({'error': f'Upload failed: {exc}'}, status=status.HTTP_502_BAD_GATEWAY)
+
+    # ── Multipart uploads (resumable) ─────────────────────────────────────────
+
+    def _get_upload(self, bucket, upload_id):
+        from .models import MultipartUpload
+        return MultipartUpload.objects.filter(bucket=bucket, upload_id=upload_id).first()
+
+    @action(detail=True, methods=['post'], url_path='multipart')
+    def multipart_initiate(self, request, resource_id=None):
+        """Start a multipart upload; parts are then PUT to .../parts/<n>/."""
+        bucket     = self.get_object()
+        object_key = request.data.get('object_key')
+        if not object_key:
+            return Response({'error': 'object_key required'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            upload = uploads.initiate(
+                bucket, object_key,
+                content_type=request.data.get('content_type', 'application/octet-stream'),
+                storage_class=request.data.get('storage_class', 'standard'),
+            )
+        except SDKException as exc:
+            return self._upload_error(bucket, exc)
+        return Response({'upload_id': upload.upload_id, 'object_key': object_key},
+                        status=status.HTTP_201_CREATED)
+
+    @action(detail=True, methods=['get', 'delete'], url_path=r'multipart/(?P<upload_id>[\w-]+)')
+    def multipart_detail(self, request, resource_id=None, upload_id=None):
+        """GET lists the parts received so far (to resume); DELETE aborts."""
+        bucket = self.get_object()
+        upload = self._get_upload(bucket, upload_id)
+        if upload is None:
+            return Response({'error': 'Upload not found'}, status=status.HTTP_404_NOT_FOUND)
+        if request.method == 'DELETE':
+            try:
+                uploads.abort(upload)
+            except (uploads.UploadError, SDKException) as exc:
+                return self._upload_error(bucket, exc)
+            return Response(status=status.HTTP_204_NO_CONTENT)
+        parts = sorted(
+            ({'part_number': int(n), 'etag': p['etag'], 'size_bytes': p['size_bytes']}
+             for n, p in upload.parts.items()),
+            key=lambda p: p['part_number'],
+        )
+        return Response({
+            'upload_id':  upload.upload_id,
+            'object_key': upload.object_key,
+            'status':     upload.status,
+            'parts':      parts,
+        })
+
+    @action(detail=True, methods=['put'],
+            url_path=r'multipart/(?P<upload_id>[\w-]+)/parts/(?P<part_number>\d+)')
+    def multipart_upload_part(self, request, resource_id=None, upload_id=None, part_number=None):
+        """Upload one part as the raw request body; streamed straight to Swift."""
+        bucket = self.get_object()
+        upload = self._get_upload(bucket, upload_id)
+        if upload is None:
+            return Response({'error': 'Upload not found'}, status=status.HTTP_404_NOT_FOUND)
+        try:
+            part = uploads.upload_part(upload, int(part_number), request.stream or io.BytesIO())
+        except (uploads.UploadError, SDKException) as exc:
+            return self._upload_error(bucket, exc)
+        return Response(part, headers={'ETag': f'"{part["etag"]}"'})
+
+    @action(detail=True, methods=['post'], url_path=r'multipart/(?P<upload_id>[\w-]+)/complete')
+    def multipart_complete(self, request, resource_id=None, upload_id=None):
+        """Assemble the uploaded parts into the object (optionally checking ``parts``)."""
+        bucket = self.get_object()
+        upload = self._get_upload(bucket, upload_id)
+        if upload is None:
+            return Response({'error': 'Upload not found'}, status=status.HTTP_404_NOT_FOUND)
+        try:
+            etag, size_bytes = uploads.complete(upload, request.data.get('parts'))
+        except (uploads.UploadError, SDKException) as exc:
+            return self._upload_error(bucket, exc)
+        created = self._record_object(
+            bucket, upload.object_key, size_bytes, upload.content_type, etag, upload.storage_class,
+        )
+        return Response({
+            'success':    True,
+            'object_key': upload.object_key,
+            'size_bytes': size_bytes,
+            'etag':       etag,
+            'created':    created,
+        }, status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
+
     @action(detail=True, methods=['post'])
     def replicate(self, request, pk=None):
         """Configure cross-region replication for this bucket."""
@@ -344,6 +446,16 @@ class S3ObjectViewSet(viewsets.ModelViewSet):
             return S3ObjectUpdateSerializer
         return S3ObjectListSerializer
 
+    def perform_create(self, serializer):
+        with transaction.atomic():
+            obj = serializer.save()
+            counters.apply_delta(obj.bucket_id, objects=1, size_bytes=obj.size_bytes)
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            instance.delete()
+            counters.apply_delta(instance.bucket_id, objects=-1, size_bytes=-instance.size_bytes)
+
     @action(detail=True, methods=['post'])
     def make_public(self, request, pk=None):
         """Make object publicly accessible."""
@@ -0,0 +1,77 @@
+"""
+Tests for the chunked, set-based billing usage flush.
+
+Covers:
+- Daily roll-up per (owner, service, resource, metric)
+- Idempotency of repeated flushes
+- Long resource ids are kept whole
+- Chunking: constant queries per chunk, every event processed once
+"""
+
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from ..billing import service as svc
+from ..billing.models import PlatformUsageEvent, UsageRecord
+
+
+def _events(user, n, resource_id='vm-1', when=None, quantity=1):
+    when = when or timezone.now().replace(hour=12, minute=0, second=0, microsecond=0)
+    PlatformUsageEvent.objects.bulk_create([
+        PlatformUsageEvent(
+            owner=user, service='compute', resource_id=resource_id, metric='compute_hours',
+            quantity=Decimal(quantity), unit='hours', unit_price=Decimal('0.05'),
+            cost=Decimal(quantity) * Decimal('0.05'), event_time=when + timedelta(seconds=i),
+        )
+        for i in range(n)
+    ])
+
+
+def test_flush_rolls_events_up_per_day(db, user):
+    today = timezone.now().replace(hour=12, minute=0, second=0, microsecond=0)
+    _events(user, 10)
+    _events(user, 4, resource_id='vm-2')
+    _events(user, 3, when=today - timedelta(days=1))
+
+    assert svc.flush_usage_events(user) == 17
+    records = {
+        (r.resource_id, r.period_start.date()): r
+        for r in UsageRecord.objects.filter(owner=user)
+    }
+    assert len(records) == 3
+    vm1 = records[('vm-1', today.date())]
+    assert vm1.quantity == Decimal(10)
+    assert vm1.cost == Decimal('0.5')
+    assert vm1.period_end - vm1.period_start == timedelta(days=1)
+    assert not PlatformUsageEvent.objects.filter(processed=False).exists()
+
+
+def test_long_resource_ids_are_not_truncated(db, user):
+    prefix = 'arn:swift:bucket/' + 'x' * 60
+    _events(user, 2, resource_id=f'{prefix}/a')
+    _events(user, 1, resource_id=f'{prefix}/b')
+
+    svc.flush_usage_events(user)
+    assert sorted(UsageRecord.objects.filter(owner=user).values_list('resource_id', flat=True)) == [
+        f'{prefix}/a', f'{prefix}/b',
+    ]
+
+
+def test_flush_is_idempotent(db, user):
+    _events(user, 5)
+    assert svc.flush_usage_events(user) == 5
+    assert svc.flush_usage_events(user) == 0
+    assert UsageRecord.objects.filter(owner=user).count() == 1
+
+
+def test_flush_chunks_with_constant_queries(db, user):
+    _events(user, 25)
+    with CaptureQueriesContext(connection) as ctx:
+        assert svc.flush_usage_events(user, chunk_size=10) == 25
+    # per chunk: claim, roll-up, bulk insert, update (+ savepoint bookkeeping)
+    assert len(ctx) <= 3 * 6
+    assert UsageRecord.objects.filter(owner=user).aggregate(q=svc.Sum('quantity'))['q'] == 25
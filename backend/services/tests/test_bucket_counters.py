@@ -0,0 +1,102 @@
+"""
+Tests for incremental bucket counters.
+
+Covers:
+- Object create / overwrite / delete adjust the counters without rescanning
+- The statistics endpoint reads the counters only
+- Reconciliation corrects drift
+- Bucket saves (API updates, versioning / logging, delete) never overwrite the counters
+"""
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from ..storage import counters
+from ..storage.models import S3Object, StorageBucket
+
+
+@pytest.fixture
+def bucket(db, user):
+    return StorageBucket.objects.create(name='b', bucket_id='bkt-1', bucket_name='counted', owner=user)
+
+
+@pytest.fixture
+def client(user):
+    client = APIClient()
+    client.force_authenticate(user)
+    return client
+
+
+def _totals(bucket):
+    bucket.refresh_from_db()
+    return bucket.total_objects, bucket.total_size_bytes
+
+
+def _touches_objects(queries):
+    return [q['sql'] for q in queries if 's3object' in q['sql'].lower()]
+
+
+def test_writes_apply_deltas_without_rescanning(client, bucket):
+    url = f'/api/services/buckets/{bucket.resource_id}/upload_object/'
+    with CaptureQueriesContext(connection) as ctx:
+        client.post(url, {'object_key': 'a', 'size_bytes': 100, 'etag': 'e1'})
+        client.post(url, {'object_key': 'b', 'size_bytes': 50, 'etag': 'e2'})
+    assert _totals(bucket) == (2, 150)
+    assert not [sql for sql in _touches_objects(ctx.captured_queries) if 'COUNT(' in sql or 'SUM(' in sql]
+
+    client.post(url, {'object_key': 'a', 'size_bytes': 30, 'etag': 'e3'})
+    assert _totals(bucket) == (2, 80)
+
+    obj = S3Object.objects.get(bucket=bucket, object_key='b')
+    assert client.delete(f'/api/services/s3-objects/{obj.pk}/').status_code == 204
+    assert _totals(bucket) == (1, 30)
+
+
+def test_statistics_reads_counters_only(client, bucket):
+    counters.apply_delta(bucket.pk, objects=4, size_bytes=4 * 1024 ** 2)
+    with CaptureQueriesContext(connection) as ctx:
+        resp = client.get(f'/api/services/buckets/{bucket.resource_id}/statistics/')
+    assert resp.status_code == 200
+    assert resp.data['total_objects'] == 4 and resp.data['average_object_size_mb'] == 1.0
+    assert _touches_objects(ctx.captured_queries) == []
+
+
+def test_reconcile_corrects_drift(bucket, user):
+    other = StorageBucket.objects.create(name='o', bucket_id='bkt-2', bucket_name='other', owner=user)
+    S3Object.objects.bulk_create([
+        S3Object(bucket=bucket, object_key=f'k{i}', size_bytes=10, etag=f'e{i}') for i in range(3)
+    ])
+    counters.apply_delta(other.pk, objects=2, size_bytes=5)
+
+    assert counters.reconcile() == 2
+    assert _totals(bucket) == (3, 30)
+    assert _totals(other) == (0, 0)
+    assert counters.reconcile() == 0
+
+
+def test_stale_bucket_save_keeps_counters(client, bucket):
+    stale = StorageBucket.objects.get(pk=bucket.pk)
+    counters.apply_delta(bucket.pk, objects=3, size_bytes=300)
+
+    stale.acl = 'public-read'
+    stale.save()
+    assert _totals(bucket) == (3, 300) and bucket.acl == 'public-read'
+
+    base = f'/api/services/buckets/{bucket.resource_id}'
+    assert client.patch(f'{base}/', {'log_prefix': 'logs/'}, format='json').status_code == 200
+    assert client.post(f'{base}/enable_versioning/').status_code == 200
+    assert client.post(f'{base}/enable_logging/', {'log_target_bucket': 'logs'}).status_code == 200
+    assert _totals(bucket) == (3, 300)
+    assert bucket.versioning_enabled and bucket.logging_enabled
+
+
+def test_force_delete_resets_counters(bucket, user):
+    from ..business_logic.storage import StorageService
+
+    S3Object.objects.create(bucket=bucket, object_key='k', size_bytes=10, etag='e')
+    counters.apply_delta(bucket.pk, objects=1, size_bytes=10)
+
+    StorageService().delete_bucket(bucket.pk, user, force=True)
+    assert _totals(bucket) == (0, 0) and bucket.status == 'deleted'
@@ -0,0 +1,59 @@
+"""
+Tests for the set-based CostingEngine.
+
+Covers:
+- Parity with the per-resource BillingService calculations
+- Constant query count across many users
+"""
+
+from decimal import Decimal
+
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from ..business_logic.billing import BillingService
+from ..business_logic.costing import CostingEngine, days_in_month
+from ..core.models import StorageVolume
+from ..management.commands.benchmark_costing import Command as BenchmarkCommand, legacy_monthly_cost
+
+
+def _seed(n_users, per_user=2):
+    return BenchmarkCommand()._seed(n_users, per_user)
+
+
+def test_engine_matches_per_resource_costs(db):
+    users = _seed(3)
+    StorageVolume.objects.filter(owner=users[0]).update(status='deleted')
+
+    service = BillingService()
+    now = service.current_time
+    days = days_in_month(now.year, now.month)
+    engine = CostingEngine().monthly_costs([u.pk for u in users], now.year, now.month)
+
+    for u in users:
+        legacy = legacy_monthly_cost(service, u, days)
+        for section in ('compute', 'storage', 'networking'):
+            for item, amount in legacy[section].items():
+                assert abs(engine[u.pk][section][item] - amount) < Decimal('0.0001'), (section, item)
+    assert engine[users[0].pk]['storage']['volumes'] == 0
+
+
+def test_user_monthly_cost_delegates_to_engine(db):
+    user, = _seed(1)
+    costs = BillingService().calculate_user_monthly_cost(user)
+    assert costs['total'] > 0
+    assert costs['total'] == costs['compute']['subtotal'] + costs['storage']['subtotal'] + costs['networking']['subtotal']
+
+
+def test_engine_query_count_is_constant(db, user):
+    users = _seed(25)
+    with CaptureQueriesContext(connection) as ctx:
+        costs = CostingEngine().monthly_costs([u.pk for u in users] + [user.pk])
+    assert len(ctx) == 6
+    assert costs[user.pk]['total'] == 0
+
+
+def test_benchmark_command_runs(db, capsys):
+    call_command('benchmark_costing', users=5, resources_per_user=1)
+    assert 'totals match for every user' in capsys.readouterr().out
@@ -0,0 +1,90 @@
+"""
+Tests for the git smart-HTTP access cache.
+
+Covers:
+- Token → user and namespace/repo lookups are served from cache
+- Token revocation and repository renames invalidate cached entries
+- Authorization on cached records needs no queries
+- Invalidation waits for the commit; user renames invalidate too
+"""
+
+import pytest
+from django.core.cache import cache
+from rest_framework.authtoken.models import Token
+
+from ..pipelines import git_access, git_http
+from ..pipelines.models import Project, Repository
+
+
+@pytest.fixture(autouse=True)
+def clean_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+def test_token_lookup_is_cached_until_revoked(db, user, django_assert_num_queries,
+                                              django_capture_on_commit_callbacks):
+    token = Token.objects.create(user=user)
+    with django_assert_num_queries(1):
+        assert git_access.lookup_token(token.key) == git_access.GitUser(user.id, user.username)
+        assert git_access.lookup_token(token.key).id == user.id
+
+    key = token.key
+    with django_capture_on_commit_callbacks(execute=True):
+        token.delete()
+        assert git_access.lookup_token(key) is not None     # not committed yet
+    assert git_access.lookup_token(key) is None
+
+
+def test_repo_resolution_is_cached_and_invalidated(db, user, django_assert_num_queries,
+                                                   django_capture_on_commit_callbacks):
+    project = Project.objects.create(id='prj-1', owner=user, name='app', project_key='app')
+    Repository.objects.create(id='repo-1', project=project, repo_name='api', disk_path='/repos/app/api.git')
+
+    with django_assert_num_queries(1):
+        access = git_access.resolve_repo('app', 'api.git')
+        assert git_access.resolve_repo('app', 'api.git') == access
+    assert access == git_access.RepoAccess('repo-1', '/repos/app/api.git', 'private', None, user.id)
+
+    # owner-namespace fallback, and unknown repositories are cached as misses
+    with django_assert_num_queries(4):
+        assert git_access.resolve_repo(user.username, 'api') is None
+        assert git_access.resolve_repo('app', 'nope.git') is None
+    with django_assert_num_queries(0):
+        assert git_access.resolve_repo('app', 'nope.git') is None
+
+    Repository.objects.filter(pk='repo-1').update(repo_name='nope')
+    with django_capture_on_commit_callbacks(execute=True):
+        Repository.objects.get(pk='repo-1').save()
+    assert git_access.resolve_repo('app', 'nope.git').id == 'repo-1'
+    assert git_access.resolve_repo('app', 'api.git') is None
+
+
+def test_user_rename_invalidates(db, user, django_capture_on_commit_callbacks):
+    Repository.objects.create(id='repo-2', owner=user, repo_name='dots', disk_path='/repos/dots.git')
+    token = Token.objects.create(user=user)
+    old = user.username
+    assert git_access.resolve_repo(old, 'dots').id == 'repo-2'
+    assert git_access.lookup_token(token.key).username == old
+
+    with django_capture_on_commit_callbacks(execute=True) as callbacks:
+        user.save(update_fields=['last_login'])
+    assert not callbacks
+
+    user.username = 'renamed'
+    with django_capture_on_commit_callbacks(execute=True):
+        user.save()
+    assert git_access.resolve_repo(old, 'dots') is None
+    assert git_access.resolve_repo('renamed', 'dots').id == 'repo-2'
+    assert git_access.lookup_token(token.key).username == 'renamed'
+
+
+def test_authorization_is_in_memory(db, user, django_assert_num_queries):
+    access = git_access.RepoAccess('repo-1', '/repos/x.git', 'private', None, user.id)
+    owner = git_access.GitUser(user.id, user.username)
+    stranger = git_access.GitUser(user.id + 1, 'stranger')
+    with django_assert_num_queries(0):
+        assert git_http._check_authorization(access, owner, is_write=True) is None
+        assert git_http._check_authorization(access, stranger, is_write=False).status_code == 403
+        assert git_http._check_authorization(access, None, is_write=False).status_code == 401
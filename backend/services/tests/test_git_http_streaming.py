@@ -0,0 +1,81 @@
+"""
+Tests for the streaming git smart-HTTP proxy.
+
+Covers:
+- info/refs advertisement relayed as a StreamingHttpResponse
+- gzip-encoded upload-pack request bodies piped into git http-backend
+- asynchronous relaying of CGI stdout (ASGI)
+"""
+
+import asyncio
+import gzip
+import subprocess
+import tempfile
+from unittest import mock
+
+import pytest
+from django.http import StreamingHttpResponse
+from django.test import RequestFactory
+
+from ..pipelines import git_http
+from ..pipelines.git_access import RepoAccess
+
+
+def _pkt(line: str) -> bytes:
+    return f'{len(line) + 4:04x}{line}'.encode()
+
+
+@pytest.fixture
+def bare_repo(tmp_path):
+    work = tmp_path / 'work'
+    subprocess.run(['git', 'init', '-q', '-b', 'main', str(work)], check=True)
+    (work / 'README').write_text('hello\n')
+    git = ['git', '-C', str(work), '-c', 'user.name=t', '-c', 'user.email=t@example.com']
+    subprocess.run(git + ['add', 'README'], check=True)
+    subprocess.run(git + ['commit', '-qm', 'init'], check=True)
+    sha = subprocess.run(git + ['rev-parse', 'HEAD'], check=True, capture_output=True).stdout.decode().strip()
+    bare = tmp_path / 'repos' / 'demo.git'
+    subprocess.run(['git', 'clone', '-q', '--bare', str(work), str(bare)], check=True)
+
+    repo_obj = RepoAccess(id='r1', disk_path=str(bare), visibility='public', owner_id=None, project_owner_id=None)
+    with mock.patch.object(git_http, '_resolve_repo', return_value=repo_obj), \
+            mock.patch.object(git_http, 'REPOS_ROOT', str(tmp_path / 'repos')):
+        yield sha
+
+
+def test_info_refs_is_streamed(bare_repo):
+    request = RequestFactory().get('/repos/team/demo.git/info/refs', {'service': 'git-upload-pack'})
+    response = git_http.git_http_backend_view(request, 'team/demo.git/info/refs')
+
+    assert isinstance(response, StreamingHttpResponse)
+    assert response.status_code == 200
+    assert response['Content-Type'] == 'application/x-git-upload-pack-advertisement'
+    body = b''.join(response.streaming_content)
+    assert b'# service=git-upload-pack' in body
+    assert bare_repo.encode() in body
+
+
+def test_gzip_upload_pack_body(bare_repo):
+    wants = _pkt(f'want {bare_repo}\n') + b'0000' + _pkt('done\n')
+    request = RequestFactory().post(
+        '/repos/team/demo.git/git-upload-pack', data=gzip.compress(wants),
+        content_type='application/x-git-upload-pack-request', HTTP_CONTENT_ENCODING='gzip',
+    )
+    response = git_http.git_http_backend_view(request, 'team/demo.git/git-upload-pack')
+
+    assert response.status_code == 200
+    body = b''.join(response.streaming_content)
+    assert body.startswith(_pkt('NAK\n'))
+    assert b'PACK' in body
+
+
+def test_async_stream_relays_stdout_and_reaps():
+    proc = subprocess.Popen(['printf', 'a%.0sb'], stdout=subprocess.PIPE)
+    stderr_file = tempfile.TemporaryFile()
+
+    async def collect():
+        return b''.join([chunk async for chunk in git_http._astream_stdout(proc, stderr_file)])
+
+    assert asyncio.run(collect()) == b'ab'
+    assert proc.returncode == 0
+    assert stderr_file.closed
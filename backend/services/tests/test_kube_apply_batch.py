@@ -0,0 +1,78 @@
+"""
+Tests for batched server-side apply.
+
+Covers:
+- Decoding `kubectl apply -o json` output (List or concatenated objects)
+- Size-based chunking that never splits a file
+- Per-file results derived from the objects kubectl reports as applied
+- Unparseable or empty files are failed and kept out of the stream
+"""
+
+import json
+import subprocess
+from unittest import mock
+
+from ..kubernetes_integration import kube_apply
+
+
+def _obj(kind, name):
+    return {'apiVersion': 'v1', 'kind': kind, 'metadata': {'name': name, 'namespace': 'ns'}}
+
+
+def test_decode_list_and_concatenated_output():
+    as_list = json.dumps({'kind': 'List', 'items': [_obj('Service', 'a'), _obj('ConfigMap', 'b')]})
+    assert [o['metadata']['name'] for o in kube_apply._decode_objects(as_list)] == ['a', 'b']
+
+    concatenated = json.dumps(_obj('Service', 'a'), indent=2) + '\n' + json.dumps(_obj('ConfigMap', 'b'))
+    assert [o['kind'] for o in kube_apply._decode_objects(concatenated)] == ['Service', 'ConfigMap']
+    assert kube_apply._decode_objects('') == []
+
+
+def test_chunks_respect_size_and_keep_files_whole():
+    patched = {'a.yaml': 'x' * 60, 'b.yaml': 'x' * 30, 'c.yaml': 'x' * 50, 'big.yaml': 'x' * 500}
+    assert kube_apply._chunk_files(patched, 100) == [['a.yaml', 'b.yaml'], ['c.yaml'], ['big.yaml']]
+
+
+def test_batched_apply_reports_per_file_results(settings):
+    settings.KUBE_APPLY_BATCH_BYTES = 1024 * 1024
+    patched = {
+        'svc.yaml': 'kind: Service\nmetadata: {name: api}\n',
+        'app.yaml': 'kind: Deployment\nmetadata: {name: api}\n---\nkind: ConfigMap\nmetadata: {name: cfg}\n',
+    }
+    parsed = {
+        'svc.yaml': {'resources': [{'kind': 'Service', 'name': 'api', 'namespace': ''}]},
+        'app.yaml': {'resources': [{'kind': 'Deployment', 'name': 'api', 'namespace': ''},
+                                   {'kind': 'ConfigMap', 'name': 'cfg', 'namespace': ''}]},
+    }
+    output = json.dumps({'kind': 'List', 'items': [_obj('Service', 'api'), _obj('ConfigMap', 'cfg')]})
+    completed = subprocess.CompletedProcess([], 1, output.encode(), b'Deployment "api" is invalid')
+
+    with mock.patch.object(kube_apply.subprocess, 'run', return_value=completed) as run:
+        results = kube_apply._apply_batched(patched, parsed, 'ns', dry_run=True)
+
+    run.assert_called_once()
+    cmd = run.call_args.args[0]
+    assert cmd[:3] == ['kubectl', 'apply', '--server-side'] and '--dry-run=server' in cmd
+    assert run.call_args.kwargs['input'].decode().count('---') == 2
+
+    ok, _log, applied = results['svc.yaml']
+    assert ok and applied == parsed['svc.yaml']['resources']
+    ok, log, applied = results['app.yaml']
+    assert not ok
+    assert 'Deployment/api' in log and 'is invalid' in log
+    assert applied == [{'kind': 'ConfigMap', 'name': 'cfg', 'namespace': ''}]
+
+
+def test_unparseable_and_empty_files_fail_without_kubectl():
+    patched = {'bad.yaml': 'kind: [unclosed\n', 'empty.yaml': '# nothing here\n'}
+    parsed = {
+        'bad.yaml': {'resources': [], 'error': 'bad.yaml: YAML parse error — ...'},
+        'empty.yaml': {'resources': [], 'error': None},
+    }
+
+    with mock.patch.object(kube_apply.subprocess, 'run') as run:
+        results = kube_apply._apply_batched(patched, parsed, 'ns')
+
+    run.assert_not_called()
+    assert results['bad.yaml'] == (False, 'bad.yaml: YAML parse error — ...', [])
+    assert results['empty.yaml'] == (False, 'no Kubernetes resources found', [])
@@ -0,0 +1,119 @@
+"""
+Tests for the GitOps repository mirror cache.
+
+Covers:
+- Scan and apply of the same commit share one fetch and one tree
+- Apply materializes the exact scanned commit after the branch moved on
+- Only new objects are fetched on later syncs
+- LRU eviction skips trees in use
+"""
+
+import os
+import subprocess
+from unittest import mock
+
+import pytest
+
+from ..kubernetes_integration import git_mirror
+from ..kubernetes_integration.git_mirror import MirrorCache
+from ..kubernetes_integration.git_service import GitService
+
+
+def _git(cwd, *args):
+    return subprocess.run(['git', *args], cwd=cwd, check=True, capture_output=True, text=True).stdout.strip()
+
+
+def _commit(repo, files, message):
+    for rel, content in files.items():
+        path = os.path.join(repo, rel)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as fh:
+            fh.write(content)
+    _git(repo, 'add', '-A')
+    _git(repo, '-c', 'user.name=t', '-c', 'user.email=t@example.com', 'commit', '-qm', message)
+    return _git(repo, 'rev-parse', 'HEAD')
+
+
+@pytest.fixture
+def origin(tmp_path):
+    repo = str(tmp_path / 'origin')
+    os.makedirs(repo)
+    _git(repo, 'init', '-q', '-b', 'main')
+    return repo
+
+
+@pytest.fixture
+def cache(tmp_path, settings):
+    settings.KUBE_GIT_CACHE_ENABLED = True
+    settings.KUBE_GIT_CACHE_DIR = str(tmp_path / 'cache')
+    settings.KUBE_GIT_CACHE_MAX_BYTES = 50 * 1024 ** 2
+    return git_mirror.get_mirror_cache()
+
+
+def _service(origin):
+    git = GitService(provider='github', repo='acme/gitops', branch='main', path='k8s/')
+    git._build_clone_url = lambda: origin
+    return git
+
+
+def test_scan_and_apply_share_tree(origin, cache):
+    sha = _commit(origin, {'k8s/app.yaml': 'kind: Deployment\n'}, 'init')
+
+    scan = _service(origin)
+    tree = scan.clone()
+    assert scan.get_current_commit() == sha
+    assert scan.list_yaml_files() == ['k8s/app.yaml']
+    scan.cleanup()
+    assert os.path.isdir(tree)                       # kept for the apply
+
+    apply = _service(origin)
+    with mock.patch.object(MirrorCache, '_git', wraps=cache._git) as git_calls:
+        assert apply.clone(commit_sha=sha) == tree
+    assert not [c for c in git_calls.call_args_list if 'fetch' in c.args]
+    apply.cleanup()
+
+
+def test_apply_uses_scanned_commit_after_branch_moves(origin, cache):
+    scanned = _commit(origin, {'k8s/app.yaml': 'replicas: 1\n'}, 'v1')
+    scan = _service(origin)
+    scan.clone()
+    scan.cleanup()
+
+    _commit(origin, {'k8s/app.yaml': 'replicas: 2\n'}, 'v2')
+    apply = _service(origin)
+    apply.clone(commit_sha=scanned)
+    assert apply.read_file('k8s/app.yaml') == 'replicas: 1\n'
+    apply.cleanup()
+
+    latest = _service(origin)
+    latest.clone()
+    assert latest.read_file('k8s/app.yaml') == 'replicas: 2\n'
+    latest.cleanup()
+    assert len(os.listdir(cache.mirrors_dir)) == 1
+
+
+def test_eviction_skips_leased_trees(origin, cache):
+    old = _commit(origin, {'k8s/a.yaml': 'x' * 4096}, 'one')
+    new = _commit(origin, {'k8s/b.yaml': 'y' * 4096}, 'two')
+    for sha in (old, new):
+        cache.resolve('github', 'acme/gitops', origin, 'main', sha)
+        cache.materialize('github', 'acme/gitops', sha)
+    os.utime(cache.tree_path(old), (1, 1))           # least recently used
+
+    cache.max_bytes = 1
+    with cache.lease(old):
+        cache.evict()
+        assert os.path.isdir(cache.tree_path(old))
+        assert not os.path.isdir(cache.tree_path(new))
+    cache.evict()
+    assert not os.path.isdir(cache.tree_path(old))
+
+
+def test_disabled_cache_falls_back_to_temp_clone(origin, settings):
+    settings.KUBE_GIT_CACHE_ENABLED = False
+    sha = _commit(origin, {'k8s/app.yaml': 'kind: Service\n'}, 'init')
+    git = _service(origin)
+    workdir = git.clone()
+    assert git.get_current_commit() == sha
+    git.cleanup()
+    assert not os.path.exists(workdir)
@@ -0,0 +1,98 @@
+"""
+Tests for the Kubernetes monitor snapshot.
+
+Covers:
+- Single combined `kubectl get` call split by kind
+- Per-kind fallback only when kubectl rejects the combined call
+- Snapshot caching per (kubeconfig, namespace)
+"""
+
+import json
+import subprocess
+from types import SimpleNamespace
+from unittest import mock
+
+import pytest
+from django.core.cache import cache
+
+from ..kubernetes_integration import kube_monitor
+
+
+@pytest.fixture(autouse=True)
+def clean_cache(settings):
+    settings.KUBE_WATCH_ENABLED = False
+    cache.clear()
+    yield
+    cache.clear()
+
+
+ITEMS = [
+    {'kind': 'Deployment', 'metadata': {'name': 'api'}, 'spec': {'replicas': 2}, 'status': {'readyReplicas': 2}},
+    {'kind': 'Pod', 'metadata': {'name': 'api-1'}, 'status': {'phase': 'Running',
+                                                              'containerStatuses': [{'ready': True}]}},
+    {'kind': 'Service', 'metadata': {'name': 'api'}, 'spec': {'ports': [{'port': 80}]}},
+    {'kind': 'Event', 'metadata': {'name': 'e1'}, 'type': 'Warning', 'reason': 'BackOff'},
+]
+
+
+class FakeKubectl:
+    """subprocess.run stand-in; optionally rejects combined resource lists."""
+
+    def __init__(self, reject_combined=False):
+        self.reject_combined = reject_combined
+        self.calls = []
+
+    def __call__(self, cmd, **kwargs):
+        resource = cmd[cmd.index('get') + 1]
+        self.calls.append(resource)
+        if ',' in resource and self.reject_combined:
+            raise subprocess.CalledProcessError(1, cmd, stderr=b"doesn't have a resource type")
+        kinds = {kube_monitor.MONITORED_KINDS[r] for r in resource.split(',')}
+        items = [item for item in ITEMS if item['kind'] in kinds]
+        return SimpleNamespace(stdout=json.dumps({'kind': 'List', 'items': items}).encode())
+
+
+def test_single_combined_kubectl_call():
+    kubectl = FakeKubectl()
+    with mock.patch.object(kube_monitor.subprocess, 'run', kubectl):
+        data = kube_monitor.get_monitor_data('team-a')
+
+    assert kubectl.calls == [','.join(kube_monitor.MONITORED_KINDS)]
+    assert [d['name'] for d in data['workloads']['deployments']] == ['api']
+    assert [p['name'] for p in data['pods']] == ['api-1']
+    assert [s['name'] for s in data['networking']['services']] == ['api']
+    assert data['health'] == {'status': 'healthy', 'ready_pods': 1, 'total_pods': 1, 'warnings': 1}
+
+
+def test_falls_back_to_per_kind_calls():
+    kubectl = FakeKubectl(reject_combined=True)
+    with mock.patch.object(kube_monitor.subprocess, 'run', kubectl):
+        data = kube_monitor.get_monitor_data('team-a')
+
+    assert sorted(kubectl.calls[1:]) == sorted(kube_monitor.MONITORED_KINDS)
+    assert [d['name'] for d in data['workloads']['deployments']] == ['api']
+
+
+def test_snapshot_cached_per_kubeconfig_and_namespace(settings):
+    settings.KUBE_MONITOR_CACHE_TTL = 30
+    kubectl = FakeKubectl()
+    with mock.patch.object(kube_monitor.subprocess, 'run', kubectl):
+        for _ in range(5):
+            kube_monitor.get_monitor_data('team-a')
+        kube_monitor.get_monitor_data('team-b')
+        kube_monitor.get_monitor_data('team-a', kubeconfig='/etc/kube/other')
+    assert len(kubectl.calls) == 3
+
+
+@pytest.mark.parametrize('error', [FileNotFoundError('kubectl'), subprocess.TimeoutExpired('kubectl', 30)])
+def test_unusable_kubectl_is_not_retried_per_kind(error):
+    with mock.patch.object(kube_monitor.subprocess, 'run', side_effect=error) as run:
+        assert kube_monitor._kubectl_get_all('team-a') == {r: [] for r in kube_monitor.MONITORED_KINDS}
+    run.assert_called_once()
+
+
+def test_kubectl_missing_returns_mock_data():
+    with mock.patch.object(kube_monitor.subprocess, 'run', side_effect=FileNotFoundError('kubectl')):
+        data = kube_monitor.get_monitor_data('team-a')
+    assert data['namespace'] == 'team-a'
+    assert data['workloads']['deployments']
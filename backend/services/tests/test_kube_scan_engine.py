@@ -0,0 +1,72 @@
+"""
+Tests for the manifest scan engine.
+
+Covers:
+- Git-compatible blob SHAs
+- Blob-keyed result caching (unchanged files are not re-parsed)
+- Process-pool parsing yields the same results as the inline path
+"""
+
+import subprocess
+from unittest import mock
+
+import pytest
+from django.core.cache import cache
+
+from ..kubernetes_integration import scan_engine
+from ..kubernetes_integration.manifest_parser import parse_manifest_file
+
+DEPLOYMENT = """\
+apiVersion: apps/v1
+kind: Deployment
+metadata: {name: api}
+spec:
+  template:
+    spec:
+      containers:
+        - {name: app, image: "api:latest"}
+"""
+
+
+@pytest.fixture(autouse=True)
+def clean_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+def test_blob_sha_matches_git():
+    data = DEPLOYMENT.encode()
+    expected = subprocess.run(['git', 'hash-object', '--stdin'], input=data,
+                              capture_output=True, check=True).stdout.decode().strip()
+    assert scan_engine.blob_sha(data) == expected
+
+
+def test_unchanged_files_are_not_reparsed():
+    files = [('k8s/api.yaml', DEPLOYMENT.encode()), ('k8s/svc.yaml', b'kind: Service\nmetadata: {name: api}\n')]
+    first, stats = scan_engine.parse_contents(files)
+    assert stats == {'hits': 0, 'misses': 2}
+    assert first[0] == parse_manifest_file(DEPLOYMENT, 'k8s/api.yaml')
+    assert any('latest' in w for w in first[0]['warnings'])
+
+    files[1] = ('k8s/svc.yaml', b'kind: Service\nmetadata: {name: api-v2}\n')
+    with mock.patch.object(scan_engine, 'parse_manifest_file', wraps=parse_manifest_file) as parse:
+        second, stats = scan_engine.parse_contents(files)
+    assert stats == {'hits': 1, 'misses': 1}
+    assert [c.args[1] for c in parse.call_args_list] == ['k8s/svc.yaml']
+    assert second[1]['resources'] == [{'kind': 'Service', 'name': 'api-v2', 'namespace': ''}]
+
+
+def test_process_pool_matches_inline(settings):
+    files = [(f'k8s/app-{i}.yaml', DEPLOYMENT.replace('name: api', f'name: api-{i}').encode()) for i in range(12)]
+    inline, _ = scan_engine.parse_contents(files)
+    cache.clear()
+
+    settings.KUBE_SCAN_PARALLEL_THRESHOLD = 4
+    settings.KUBE_SCAN_WORKERS = 2
+    try:
+        pooled, stats = scan_engine.parse_contents(files)
+    finally:
+        scan_engine._reset_pool()
+    assert stats['misses'] == 12
+    assert pooled == inline
@@ -0,0 +1,132 @@
+"""
+Tests for the watch-based Kubernetes state store.
+
+Covers:
+- list → watch from resourceVersion, ADDED / MODIFIED / DELETED / BOOKMARK
+- 410 Gone triggers a relist
+- Unserved APIs count as synced-empty
+- get_monitor_data served from a synced store without kubectl
+- Idle watchers are reaped
+- One publisher per group across processes (cache lease)
+"""
+
+import io
+import json
+import subprocess
+from types import SimpleNamespace
+from unittest import mock
+
+import pytest
+
+from ..kubernetes_integration import kube_monitor, kube_watch
+
+
+def _pod(name, version, phase='Running'):
+    return {'metadata': {'name': name, 'uid': f'uid-{name}', 'resourceVersion': version},
+            'status': {'phase': phase, 'containerStatuses': [{'ready': phase == 'Running'}]}}
+
+
+def _watch_stream(*events):
+    body = ''.join(json.dumps(e) + '\n' for e in events).encode()
+    return SimpleNamespace(stdout=io.BytesIO(body), poll=lambda: 0, terminate=lambda: None, wait=lambda: 0)
+
+
+def test_list_then_watch_tracks_resource_version():
+    deltas = []
+    watcher = kube_watch.KubeWatcher('team-a', on_delta=lambda w, *args: deltas.append(args))
+    listing = {'metadata': {'resourceVersion': '100'}, 'items': [_pod('api-1', '90')]}
+
+    with mock.patch.object(kube_watch.subprocess, 'run',
+                           return_value=SimpleNamespace(stdout=json.dumps(listing).encode())):
+        watcher.list_kind('pods')
+    assert watcher.store.resource_version('pods') == '100'
+
+    stream = _watch_stream(
+        {'type': 'ADDED', 'object': _pod('api-2', '101', phase='Pending')},
+        {'type': 'MODIFIED', 'object': _pod('api-2', '102')},
+        {'type': 'DELETED', 'object': _pod('api-1', '103')},
+        {'type': 'BOOKMARK', 'object': {'metadata': {'resourceVersion': '150'}}},
+    )
+    with mock.patch.object(kube_watch.subprocess, 'Popen', return_value=stream) as popen:
+        watcher.watch_kind('pods')
+
+    path = popen.call_args.args[0][-1]
+    assert path.startswith('/api/v1/namespaces/team-a/pods?watch=1')
+    assert 'resourceVersion=100' in path
+    assert watcher.store.resource_version('pods') == '150'
+    assert [p['metadata']['name'] for p in watcher.store.snapshot()['pods']] == ['api-2']
+    assert [(resource, event) for resource, event, _ in deltas] == [
+        ('pods', 'ADDED'), ('pods', 'MODIFIED'), ('pods', 'DELETED'),
+    ]
+
+
+def test_gone_forces_relist():
+    watcher = kube_watch.KubeWatcher('team-a')
+    with pytest.raises(kube_watch._Gone):
+        watcher.handle_event('pods', {'type': 'ERROR', 'object': {'code': 410, 'message': 'too old'}})
+
+
+def test_unserved_api_counts_as_empty():
+    watcher = kube_watch.KubeWatcher('team-a')
+    error = subprocess.CalledProcessError(1, 'kubectl', stderr=b'Error from server (NotFound): the server '
+                                                              b'could not find the requested resource')
+    with mock.patch.object(kube_watch.subprocess, 'run', side_effect=error):
+        with pytest.raises(kube_watch._Unavailable):
+            watcher.list_kind('ingresses')
+
+
+def test_monitor_data_served_from_synced_store(settings):
+    settings.KUBE_WATCH_ENABLED = True
+    manager = kube_watch.WatchManager(idle_timeout=60, on_delta=None)
+    with mock.patch.object(kube_watch.KubeWatcher, 'start'):
+        store = manager.watcher('team-a').store
+    for resource in kube_monitor.MONITORED_KINDS:
+        store.replace(resource, [], '1')
+    store.replace('pods', [_pod('api-1', '5')], '5')
+
+    with mock.patch.object(kube_watch, 'get_watch_manager', return_value=manager), \
+            mock.patch.object(kube_monitor.subprocess, 'run') as run:
+        data = kube_monitor.get_monitor_data('team-a')
+    run.assert_not_called()
+    assert [p['name'] for p in data['pods']] == ['api-1']
+    assert data['health']['ready_pods'] == 1
+
+
+def test_unsynced_store_is_not_served():
+    manager = kube_watch.WatchManager(idle_timeout=60, on_delta=None)
+    with mock.patch.object(kube_watch.KubeWatcher, 'start'):
+        assert manager.get_store('team-a') is None
+
+
+def test_idle_watchers_reaped_unless_subscribed():
+    manager = kube_watch.WatchManager(idle_timeout=60, on_delta=None)
+    with mock.patch.object(kube_watch.KubeWatcher, 'start'):
+        idle = manager.watcher('idle-ns')
+        live = manager.subscribe('live-ns')
+
+    assert manager.reap(now=kube_watch.time.monotonic() + 120) == 1
+    assert idle.stopped and not live.stopped
+
+
+def test_single_publisher_per_group():
+    from django.core.cache import cache
+
+    cache.clear()
+    sent = []
+
+    async def group_send(group, message):
+        sent.append(group)
+
+    layer = SimpleNamespace(group_send=group_send)
+    # Two "processes" watching the same namespace.
+    first, second = kube_watch.KubeWatcher('team-a'), kube_watch.KubeWatcher('team-a')
+    with mock.patch('channels.layers.get_channel_layer', return_value=layer):
+        for watcher in (first, second, first, second):
+            kube_watch.publish_delta(watcher, 'pods', 'MODIFIED', _pod('api', '7'))
+        assert len(sent) == 2
+
+        first.stop()
+        kube_watch.publish_delta(second, 'pods', 'MODIFIED', _pod('api', '8'))
+        assert sent == [first.group] * 3
+    second.stop()
+    cache.clear()
@@ -0,0 +1,136 @@
+"""
+Tests for the batched contact importer.
+
+Covers:
+- Bulk upsert per batch (created / updated / skipped counts, last row wins)
+- Query count per batch, independent of row count
+- Background import of a spooled upload with progress in list metadata
+- Imports orphaned by a dead worker are re-queued or failed on startup
+- Import state updates touch only metadata['csv_import']; one active import per list
+"""
+
+import io
+from unittest import mock
+
+import pytest
+
+from ..marketing import service as svc
+from ..marketing.models import Contact, ContactList
+
+CSV = """\
+email,first_name,last_name,company
+ada@example.com,Ada,Lovelace,Analytical
+not-an-email,Bad,Row,X
+grace@example.com,Grace,Hopper,Navy
+ADA@example.com,Augusta,Lovelace,Analytical
+linus@example.com,Linus,T,Kernel
+"""
+
+
+@pytest.fixture
+def contact_list(db, user):
+    lst = ContactList.objects.create(name='news', owner=user)
+    Contact.objects.create(contact_list=lst, email='grace@example.com', status='unsubscribed')
+    return lst
+
+
+def test_stream_import_upserts_in_batches(contact_list, django_assert_max_num_queries):
+    with mock.patch.object(svc, 'IMPORT_BATCH_SIZE', 2), django_assert_max_num_queries(6):
+        stats = svc.import_contacts_stream(contact_list, io.StringIO(CSV))
+
+    assert stats['rows'] == 5
+    assert (stats['created'], stats['updated'], stats['skipped']) == (2, 2, 1)
+    assert stats['errors'][0]['row'] == 3
+    contacts = {c.email: c for c in contact_list.contacts.all()}
+    assert set(contacts) == {'ada@example.com', 'grace@example.com', 'linus@example.com'}
+    assert contacts['ada@example.com'].first_name == 'Augusta'
+    assert contacts['grace@example.com'].status == 'subscribed'
+    assert contacts['linus@example.com'].custom_fields == {'company': 'Kernel'}
+
+
+def test_sync_import_keeps_response_shape(contact_list):
+    result = svc.import_contacts_csv(contact_list.resource_id, CSV, contact_list.owner)
+    assert result['success'] and result['created'] == 2 and result['updated'] == 2
+
+
+def test_background_import_reports_progress(contact_list, tmp_path, django_capture_on_commit_callbacks):
+    queued = []
+    with mock.patch.object(svc, 'IMPORT_SPOOL_DIR', str(tmp_path)), \
+            mock.patch.object(svc, '_ensure_import_worker'), \
+            mock.patch.object(svc._IMPORT_QUEUE, 'put', side_effect=queued.append), \
+            django_capture_on_commit_callbacks(execute=True):
+        state = svc.enqueue_contact_import(contact_list, [CSV[:50].encode(), CSV[50:].encode()])
+    assert state['status'] == 'queued' and state['total_bytes'] == len(CSV)
+
+    snapshots = []
+    real_persist = svc._persist_import_state
+    with mock.patch.object(svc, 'IMPORT_BATCH_SIZE', 2), \
+            mock.patch('django.db.close_old_connections'), \
+            mock.patch.object(svc, '_persist_import_state',
+                              side_effect=lambda lst, s: (snapshots.append(dict(s)), real_persist(lst, s))):
+        svc._run_import(queued[0])
+
+    assert [s['rows'] for s in snapshots if s['status'] == 'running'] == [0, 2, 4, 5]
+    contact_list.refresh_from_db()
+    final = contact_list.metadata['csv_import']
+    assert final['status'] == 'completed' and final['bytes_read'] == len(CSV)
+    assert (final['created'], final['updated'], final['skipped']) == (2, 2, 1)
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_orphaned_imports_are_recovered(db, user, tmp_path):
+    from django.core.cache import cache
+
+    def orphan(name, import_id, worker, status='running'):
+        lst = ContactList.objects.create(name=name, owner=user)
+        svc._persist_import_state(lst, {'import_id': import_id, 'worker': worker, 'status': status,
+                                        'rows': 3, 'total_bytes': len(CSV)})
+        return lst
+
+    resumable = orphan('a', 'imp-resume', 'gone:1')
+    lost = orphan('b', 'imp-lost', 'gone:2', status='queued')
+    alive = orphan('c', 'imp-alive', 'alive:3')
+    cache.set(svc._heartbeat_key('alive:3'), 1)
+
+    queued = []
+    with mock.patch.object(svc, 'IMPORT_SPOOL_DIR', str(tmp_path)), \
+            mock.patch.object(svc._IMPORT_QUEUE, 'put', side_effect=queued.append), \
+            mock.patch('django.db.transaction.on_commit', side_effect=lambda fn: fn()):
+        (tmp_path / 'contacts-imp-resume.csv').write_text(CSV)
+        assert svc.recover_contact_imports() == 2
+        assert svc.recover_contact_imports() == 0
+    cache.delete(svc._heartbeat_key('alive:3'))
+
+    assert [p['import_id'] for p in queued] == ['imp-resume']
+    assert queued[0]['path'] == str(tmp_path / 'contacts-imp-resume.csv')
+    states = {lst.name: ContactList.objects.get(pk=lst.pk).metadata['csv_import'] for lst in (resumable, lost, alive)}
+    assert (states['a']['status'], states['a']['rows'], states['a']['worker']) == ('queued', 0, svc._IMPORT_WORKER_ID)
+    assert states['b']['status'] == 'failed' and 'interrupted' in states['b']['error']
+    assert states['c'] == {'import_id': 'imp-alive', 'worker': 'alive:3', 'status': 'running',
+                           'rows': 3, 'total_bytes': len(CSV)}
+
+
+def test_import_state_keeps_other_metadata(contact_list):
+    stale = ContactList.objects.get(pk=contact_list.pk)
+    ContactList.objects.filter(pk=contact_list.pk).update(metadata={'segment': 'vip'})
+
+    svc._persist_import_state(stale, {'import_id': 'imp-1', 'status': 'running'})
+
+    contact_list.refresh_from_db()
+    assert contact_list.metadata == {'segment': 'vip', 'csv_import': {'import_id': 'imp-1', 'status': 'running'}}
+
+
+def test_second_import_is_rejected_while_active(contact_list, tmp_path):
+    from rest_framework.test import APIClient
+
+    url = f'/api/services/contact-lists/{contact_list.resource_id}/import_csv/'
+    client = APIClient()
+    client.force_authenticate(contact_list.owner)
+    with mock.patch.object(svc, 'IMPORT_SPOOL_DIR', str(tmp_path)), \
+            mock.patch.object(svc, 'IMPORT_INLINE_BYTES', 0), \
+            mock.patch.object(svc, '_ensure_import_worker'), \
+            mock.patch.object(svc._IMPORT_QUEUE, 'put'):
+        assert client.post(url, {'csv': CSV}).status_code == 202
+        resp = client.post(url, {'csv': CSV})
+    assert resp.status_code == 409
+    assert len(list(tmp_path.iterdir())) == 1          # the rejected upload's spool is removed
@@ -0,0 +1,132 @@
+"""
+Tests for the streamed campaign sender.
+
+Covers:
+- Audience de-duplication across lists
+- Pooled SMTP sends with bulk-inserted SendEvents
+- Resuming a send skips contacts that already have a 'sent' event
+- Sends without SMTP configured are recorded as dry runs
+- Per-domain throttling
+- The send endpoint queues a background send and answers 202
+"""
+
+from unittest import mock
+
+import pytest
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+
+from ..marketing import service as svc
+from ..marketing.models import Campaign, Contact, ContactList, SendEvent
+
+
+@pytest.fixture
+def campaign(db, user):
+    first = ContactList.objects.create(name='a', owner=user)
+    second = ContactList.objects.create(name='b', owner=user)
+    for i in range(12):
+        Contact.objects.create(contact_list=first, email=f'user{i}@example.com', first_name=f'U{i}')
+    for i in range(8, 15):
+        Contact.objects.create(contact_list=second, email=f'user{i}@example.com')
+    Contact.objects.create(contact_list=second, email='gone@example.com', status='unsubscribed')
+    campaign = Campaign.objects.create(
+        name='launch', owner=user, from_name='Acme', from_email='news@acme.test',
+        subject='Hi', html_body='<html><body>Hello {{ first_name }}</body></html>',
+    )
+    campaign.contact_lists.set([first, second])
+    return campaign
+
+
+@pytest.fixture
+def live_smtp():
+    with mock.patch.object(svc, '_live', return_value=True), \
+            mock.patch.object(svc, '_get_connection', side_effect=EmailBackend), \
+            mock.patch.object(svc, 'SEND_CHUNK_SIZE', 4), \
+            mock.patch.object(svc, 'DOMAIN_RATE', 0):
+        mail.outbox = []
+        yield mail.outbox
+
+
+def test_send_deduplicates_and_records_events(campaign, live_smtp, django_assert_max_num_queries):
+    with django_assert_max_num_queries(20):
+        result = svc.send_campaign(campaign.resource_id)
+
+    assert result['success'] and result['sent'] == 15 and result['failed'] == 0
+    recipients = sorted(m.to[0] for m in live_smtp)
+    assert recipients == sorted(f'user{i}@example.com' for i in range(15))
+    assert SendEvent.objects.filter(campaign=campaign, event='sent').count() == 15
+    campaign.refresh_from_db()
+    assert campaign.status == 'sent' and campaign.analytics.total_sent == 15
+
+
+def test_resume_skips_already_sent_contacts(campaign, live_smtp):
+    done = Contact.objects.filter(email__in=['user0@example.com', 'user9@example.com']).order_by('pk')
+    SendEvent.objects.bulk_create([
+        SendEvent(campaign=campaign, contact=c, event='sent', metadata={'token': 't', 'dry_run': False})
+        for c in done
+    ])
+    # A dry run is not a checkpoint.
+    SendEvent.objects.create(campaign=campaign, contact=Contact.objects.get(email='user1@example.com'),
+                             event='sent', metadata={'token': 't', 'dry_run': True})
+
+    result = svc.send_campaign(campaign.resource_id)
+
+    assert result['skipped'] == 2 and result['sent'] == 13
+    sent_to = {m.to[0] for m in live_smtp}
+    assert 'user0@example.com' not in sent_to and 'user9@example.com' not in sent_to
+    assert 'user1@example.com' in sent_to
+
+
+def test_send_without_smtp_is_not_a_checkpoint(campaign):
+    with mock.patch.object(svc, '_live', return_value=False):
+        assert svc.send_campaign(campaign.resource_id)['sent'] == 15
+    assert not SendEvent.objects.filter(campaign=campaign, metadata__dry_run=False).exists()
+
+    with mock.patch.object(svc, '_live', return_value=True), \
+            mock.patch.object(svc, '_get_connection', side_effect=EmailBackend), \
+            mock.patch.object(svc, 'DOMAIN_RATE', 0):
+        mail.outbox = []
+        result = svc.send_campaign(campaign.resource_id)
+    assert result['skipped'] == 0 and len(mail.outbox) == 15
+
+
+def test_concurrent_send_is_refused(campaign, live_smtp):
+    from django.core.cache import cache
+    cache.add(f'marketing:send:{campaign.resource_id}', 1)
+    try:
+        assert svc.send_campaign(campaign.resource_id)['success'] is False
+    finally:
+        cache.delete(f'marketing:send:{campaign.resource_id}')
+    assert live_smtp == []
+
+
+def test_domain_throttle_spaces_sends_per_domain():
+    now = [100.0]
+    slept = []
+    throttle = svc.DomainThrottle(rate=2, clock=lambda: now[0], sleep=slept.append)
+    throttle.wait('a@example.com')
+    throttle.wait('b@EXAMPLE.com')
+    throttle.wait('c@other.test')
+    throttle.wait('d@example.com')
+    assert slept == [0.5, 1.0]
+
+
+def test_send_endpoint_queues_background_send(campaign, django_capture_on_commit_callbacks):
+    from rest_framework.test import APIClient
+
+    client = APIClient()
+    client.force_authenticate(campaign.owner)
+    with mock.patch.object(svc, '_ensure_send_worker'), \
+            mock.patch.object(svc._SEND_QUEUE, 'put') as put, \
+            mock.patch.object(svc, 'send_campaign') as send, \
+            django_capture_on_commit_callbacks(execute=True):
+        resp = client.post(f'/api/services/campaigns/{campaign.resource_id}/send/')
+
+    assert resp.status_code == 202 and resp.data['status'] == 'sending'
+    put.assert_called_once_with(campaign.resource_id)
+    send.assert_not_called()
+    campaign.refresh_from_db()
+    assert campaign.status == 'sending'
+
+    Campaign.objects.filter(pk=campaign.pk).update(html_body='')
+    assert client.post(f'/api/services/campaigns/{campaign.resource_id}/send/').status_code == 400
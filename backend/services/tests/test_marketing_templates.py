@@ -0,0 +1,35 @@
+"""
+Tests for precompiled merge-tag templates.
+
+Compiled rendering must match the per-recipient regex renderer it replaced
+(kept in the benchmark command) for the usual template shapes.
+"""
+
+import pytest
+
+from ..management.commands.benchmark_merge_tags import legacy_render_template
+from ..marketing import service as svc
+
+CONTACT = {
+    'first_name': 'Ada', 'last_name': 'Lovelace', 'email': 'ada@example.com',
+    'custom_fields': {'company': 'Analytical', 'seats': 3},
+}
+
+
+@pytest.mark.parametrize('html, text', [
+    ('<html><body><p>Hi {{ first_name }} of {{company}} ({{ seats }})</p></body></html>', 'Hi {{ full_name }}'),
+    ('<p>No body tag, {{ email }} {{ unknown_tag }}</p>', ''),
+    ('<body>{{ first_name }}<a href="{{ unsubscribe_url }}">Leave</a></body>', '{{ webview_url }}'),
+    ('<body>a</body><body>b {{last_name}}</body>', 'plain'),
+])
+def test_compiled_matches_regex_renderer(html, text):
+    expected = legacy_render_template(html, text, CONTACT, 'cmp-1', 'tok123')
+    assert svc.render_template(html, text, CONTACT, 'cmp-1', 'tok123') == expected
+
+
+def test_templates_are_compiled_once():
+    svc.compile_template.cache_clear()
+    html = '<body>{{ first_name }}</body>'
+    for token in ('a', 'b', 'c'):
+        svc.render_template(html, '', CONTACT, 'cmp-1', token)
+    assert svc.compile_template.cache_info().misses == 1
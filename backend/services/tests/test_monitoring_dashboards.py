@@ -0,0 +1,75 @@
+"""
+Query-count regression tests for the developer monitoring dashboards.
+
+get_pipeline_health / get_deployment_health / get_project_health must issue a
+constant number of queries regardless of how many projects or containers the
+owner has.
+"""
+
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from ..containers.models import Container, ContainerDeployment
+from ..monitoring import service as svc
+from ..pipelines.models import Pipeline, Project, Repository
+
+
+def _seed(user, n_projects):
+    now = timezone.now()
+    for p in range(n_projects):
+        project = Project.objects.create(id=f'prj-{p}', owner=user, name=f'project {p}')
+        repo = Repository.objects.create(id=f'repo-{p}', project=project, repo_name=f'repo-{p}')
+        for i, status in enumerate(['success'] * 6 + ['failed', 'running', 'cancelled']):
+            Pipeline.objects.create(
+                id=f'pl-{p}-{i}', project=project, repo=repo, pipeline_name='build',
+                pipeline_file='.atonix.yml', branch='main', status=status, triggered_by='ci',
+            )
+        container = Container.objects.create(id=f'ctr-{p}', owner=user, name=f'svc-{p}', image='nginx', project_id=project.id)
+        for i, status in enumerate(['success', 'success', 'failed', 'running']):
+            ContainerDeployment.objects.create(
+                id=f'dep-{p}-{i}', container=container, image_tag=f'v{i}', status=status,
+                started_at=now - timedelta(minutes=i),
+            )
+
+
+@pytest.mark.parametrize('n_projects', [2, 12])
+def test_dashboard_query_counts_are_constant(db, user, n_projects):
+    _seed(user, n_projects)
+
+    with CaptureQueriesContext(connection) as ctx:
+        svc.get_pipeline_health(user)
+    assert len(ctx) == 2
+
+    with CaptureQueriesContext(connection) as ctx:
+        svc.get_deployment_health(user)
+    assert len(ctx) == 2
+
+    with CaptureQueriesContext(connection) as ctx:
+        svc.get_project_health(user)
+    assert len(ctx) == 2
+
+
+def test_pipeline_health_values(db, user):
+    _seed(user, 1)
+    [row] = svc.get_pipeline_health(user)
+    assert row['total_runs'] == 9
+    assert (row['success'], row['failed'], row['running'], row['cancelled']) == (6, 1, 1, 1)
+    assert row['success_rate'] == round(6 / 9 * 100, 1)
+    assert len(row['recent_runs']) == 5
+
+
+def test_deployment_and_project_health_values(db, user):
+    _seed(user, 2)
+    deploys = {row['container_id']: row for row in svc.get_deployment_health(user)}
+    assert deploys['ctr-0']['total_deploys'] == 4
+    assert deploys['ctr-0']['failed'] == 1
+    assert [d['image_tag'] for d in deploys['ctr-0']['recent_deploys']] == ['v0', 'v1', 'v2', 'v3']
+
+    projects = {row['project_id']: row for row in svc.get_project_health(user)}
+    assert projects['prj-1']['pipelines_7d'] == 9
+    assert projects['prj-1']['deploys_7d'] == 8      # owner-wide
+    assert projects['prj-1']['deploy_failed'] == 2
@@ -0,0 +1,225 @@
+"""
+Tests for batched metric ingestion.
+
+Covers:
+- Bulk write + batch alert evaluation (write_metric_batch)
+- Alert rule index: freshness via signals, for-duration, dedupe, cooldown
+- for-duration timers shared across index reloads and workers
+- Firing state published to other workers only after commit
+- Buffer back-pressure, synchronous flush and flush at shutdown
+- Failed batches retried in order instead of dropped
+- Sample validation
+"""
+
+from datetime import timedelta
+from unittest import mock
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from ..monitoring import ingest
+from ..monitoring import service as svc
+from ..monitoring.ingest import MetricBuffer, SampleError, parse_sample
+from ..monitoring.models import AlertRule, MetricSnapshot, MonitoringAlert
+from ..monitoring.rule_index import RuleIndex, get_index
+
+
+@pytest.fixture(autouse=True)
+def fresh_rule_index():
+    cache.clear()
+    get_index().clear()
+    yield
+    get_index().clear()
+
+
+def _rows(user, n, value=10.0, metric='cpu_percent', timestamp=None):
+    sample = {'service': 'compute', 'metric': metric, 'value': value}
+    if timestamp is not None:
+        sample['timestamp'] = timestamp.isoformat()
+    return [parse_sample({**sample, 'resource_id': f'vm-{i}'}, user.pk) for i in range(n)]
+
+
+def _rule(user, **kwargs):
+    fields = dict(
+        owner=user, name='cpu high', service='compute', metric='cpu_percent',
+        condition='gt', threshold=90, duration_mins=0,
+    )
+    fields.update(kwargs)
+    return AlertRule.objects.create(**fields)
+
+
+def test_write_metric_batch_uses_constant_queries(db, user):
+    _rule(user)
+    svc.write_metric_batch(_rows(user, 1, value=1.0))      # warm the rule index
+
+    with CaptureQueriesContext(connection) as ctx:
+        svc.write_metric_batch(_rows(user, 500, value=95.0))
+
+    assert MetricSnapshot.objects.filter(owner=user).count() == 501
+    # bulk inserts (split by the backend's parameter limit), one alert insert,
+    # one rule update – versus ~1,500 queries on the per-sample path
+    assert len(ctx) <= 20
+
+
+def test_repeated_breaches_fire_one_alert(db, user):
+    _rule(user)
+    for _ in range(5):
+        svc.write_metric_batch(_rows(user, 100, value=95.0))
+    assert MonitoringAlert.objects.filter(owner=user).count() == 1
+
+
+def test_resolved_alert_rearms_after_cooldown(db, user, settings):
+    settings.ALERT_RULE_COOLDOWN_SECONDS = 0
+    _rule(user)
+    svc.write_metric_batch(_rows(user, 1, value=95.0))
+    alert = MonitoringAlert.objects.get(owner=user)
+    alert.state = 'resolved'
+    alert.save()
+
+    svc.write_metric_batch(_rows(user, 1, value=95.0))
+    assert MonitoringAlert.objects.filter(owner=user, state='firing').count() == 1
+
+
+def test_cooldown_suppresses_refire(db, user):
+    _rule(user)
+    svc.write_metric_batch(_rows(user, 1, value=95.0))
+    alert = MonitoringAlert.objects.get(owner=user)
+    alert.state = 'resolved'
+    alert.save()
+
+    svc.write_metric_batch(_rows(user, 1, value=95.0))
+    assert MonitoringAlert.objects.filter(owner=user).count() == 1
+
+
+def test_for_duration_requires_sustained_breach(db, user):
+    from django.utils import timezone
+
+    _rule(user, duration_mins=5)
+    start = timezone.now()
+    svc.write_metric_batch(_rows(user, 1, value=95.0, timestamp=start))
+    svc.write_metric_batch(_rows(user, 1, value=95.0, timestamp=start + timedelta(minutes=2)))
+    assert not MonitoringAlert.objects.filter(owner=user).exists()
+
+    svc.write_metric_batch(_rows(user, 1, value=95.0, timestamp=start + timedelta(minutes=6)))
+    assert MonitoringAlert.objects.filter(owner=user).count() == 1
+
+
+def test_for_duration_survives_reload_and_is_shared(db, user):
+    from django.utils import timezone
+
+    _rule(user, duration_mins=5)
+    start = timezone.now()
+    svc.write_metric_batch(_rows(user, 1, value=95.0, timestamp=start))
+
+    # Another owner's alert or a rule edit reloads the index; a second
+    # worker sees the breach for the first time.
+    get_index().clear()
+    with mock.patch('services.monitoring.rule_index._index', RuleIndex()):
+        svc.write_metric_batch(_rows(user, 1, value=95.0, timestamp=start + timedelta(minutes=6)))
+    assert MonitoringAlert.objects.filter(owner=user).count() == 1
+
+
+def test_recovery_resets_for_duration(db, user):
+    from django.utils import timezone
+
+    _rule(user, duration_mins=5)
+    start = timezone.now()
+    svc.write_metric_batch(_rows(user, 1, value=95.0, timestamp=start))
+    svc.write_metric_batch(_rows(user, 1, value=10.0, timestamp=start + timedelta(minutes=3)))
+    svc.write_metric_batch(_rows(user, 1, value=95.0, timestamp=start + timedelta(minutes=4)))
+    svc.write_metric_batch(_rows(user, 1, value=95.0, timestamp=start + timedelta(minutes=6)))
+    assert not MonitoringAlert.objects.filter(owner=user).exists()
+
+
+def test_fired_alert_published_on_commit(db, user, django_capture_on_commit_callbacks):
+    _rule(user)
+    other_worker = RuleIndex()
+    other_worker.rules_for({user.pk})
+
+    with django_capture_on_commit_callbacks() as callbacks:
+        svc.write_metric_batch(_rows(user, 1, value=95.0))
+        (compiled,) = other_worker.rules_for({user.pk})[user.pk][('compute', 'cpu_percent')]
+        assert not compiled.firing
+    assert callbacks
+
+
+def test_fired_alert_reaches_other_workers(db, user, django_capture_on_commit_callbacks):
+    rule = _rule(user)
+    other_worker = RuleIndex()
+    other_worker.rules_for({user.pk})
+
+    with django_capture_on_commit_callbacks(execute=True):
+        svc.write_metric_batch(_rows(user, 1, value=95.0))
+
+    (compiled,) = other_worker.rules_for({user.pk})[user.pk][('compute', 'cpu_percent')]
+    assert compiled.firing and compiled.last_fired_at is not None
+    assert compiled.pk == rule.pk
+
+
+def test_rule_changes_refresh_index(db, user):
+    rule = _rule(user, threshold=99)
+    svc.write_metric_batch(_rows(user, 1, value=95.0))
+    assert not MonitoringAlert.objects.exists()
+
+    rule.threshold = 90
+    rule.save()
+    svc.write_metric_batch(_rows(user, 1, value=95.0))
+    assert MonitoringAlert.objects.filter(owner=user).count() == 1
+
+
+def test_resource_filter_is_respected(db, user):
+    _rule(user, condition='gte', threshold=10, resource_id_filter='vm-1')
+    svc.write_metric_batch(_rows(user, 3))
+    assert MonitoringAlert.objects.filter(owner=user).count() == 1
+    assert 'vm-1' in MonitoringAlert.objects.get(owner=user).message
+
+
+def test_ingest_metric_single_sample(db, user):
+    result = svc.ingest_metric(user, 'vm-1', 'compute', 'cpu_percent', 12.5, '%')
+    assert result['stored'] is True
+    assert MetricSnapshot.objects.get(pk=result['id']).value == 12.5
+
+
+def test_buffer_back_pressure_and_flush(db, user):
+    buffer = MetricBuffer(capacity=10, batch_size=100, flush_interval=3600)
+    assert buffer.offer(_rows(user, 8)) == 8
+    assert buffer.offer(_rows(user, 5)) == 2
+    assert buffer.stats()['rejected'] == 3
+
+    assert buffer.flush() == 10
+    assert MetricSnapshot.objects.filter(owner=user).count() == 10
+    assert buffer.stats()['buffered'] == 0
+
+
+def test_failed_batch_is_retried_not_dropped(db, user):
+    buffer = MetricBuffer(capacity=4, batch_size=2, flush_interval=3600)
+    buffer._ensure_worker = mock.Mock()        # flush by hand only
+    rows = _rows(user, 4)
+    buffer.offer(rows)
+
+    with mock.patch.object(svc, 'write_metric_batch', side_effect=RuntimeError('db down')):
+        assert buffer.flush() == 0
+    assert buffer.stats()['buffered'] == 4
+    assert buffer.stats()['failed_batches'] == 1
+    assert buffer.offer(_rows(user, 1)) == 0       # back-pressure while failing
+
+    assert buffer.flush() == 4
+    assert [s.resource_id for s in MetricSnapshot.objects.filter(owner=user).order_by('pk')] == \
+        [r['resource_id'] for r in rows]
+
+
+def test_buffer_flushes_at_shutdown(db, user):
+    buffer = MetricBuffer(capacity=10, batch_size=100, flush_interval=3600)
+    with mock.patch.object(ingest.atexit, 'register') as register:
+        buffer.offer(_rows(user, 1))
+        buffer.offer(_rows(user, 1))
+    register.assert_called_once_with(buffer.flush)
+
+
+def test_parse_sample_rejects_bad_values(user):
+    with pytest.raises(SampleError):
+        parse_sample({'value': 'abc'}, user.pk)
+    with pytest.raises(SampleError):
+        parse_sample({'value': 1, 'timestamp': 'yesterday'}, user.pk)
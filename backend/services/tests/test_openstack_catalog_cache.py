@@ -0,0 +1,119 @@
+"""
+Tests for the OpenStack catalog cache.
+
+Covers:
+- Read-through caching per (project, region) scope
+- Stale-while-revalidate background refresh
+- ETag / If-None-Match on the catalog endpoints
+- Admin purge endpoint
+- Fetch locks stay bounded as scopes come and go
+"""
+
+import time
+from unittest import mock
+
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from ..openstack import catalog_cache
+
+
+@pytest.fixture(autouse=True)
+def clean_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def flavors():
+    """Patch the flavors loader; the returned mock counts Nova listings."""
+    loader = mock.Mock(return_value=[{'id': 'f1', 'name': 'm1.small'}])
+    with mock.patch.dict(catalog_cache.CATALOGS, {'flavors': loader}):
+        yield loader
+
+
+def test_read_through_per_scope(flavors):
+    first = catalog_cache.get('flavors', scope=('proj-a', 'RegionOne'))
+    again = catalog_cache.get('flavors', scope=('proj-a', 'RegionOne'))
+    assert flavors.call_count == 1
+    assert again.data == first.data and again.etag == first.etag
+
+    catalog_cache.get('flavors', scope=('proj-a', 'RegionTwo'))
+    catalog_cache.get('flavors', scope=('proj-b', 'RegionOne'))
+    assert flavors.call_count == 3
+
+
+def test_stale_entry_served_while_revalidating(flavors, settings):
+    settings.OPENSTACK_CATALOG_CACHE_TTL = 60
+    scope = ('proj-a', 'RegionOne')
+    catalog_cache.get('flavors', scope=scope)
+
+    flavors.return_value = [{'id': 'f2', 'name': 'm1.large'}]
+    with mock.patch.object(catalog_cache.time, 'time', return_value=time.time() + 120), \
+            mock.patch.object(catalog_cache.threading, 'Thread') as thread:
+        stale = catalog_cache.get('flavors', scope=scope)
+        catalog_cache.get('flavors', scope=scope)       # refresh already claimed
+    assert stale.data == [{'id': 'f1', 'name': 'm1.small'}]
+    assert thread.call_count == 1
+
+    target, args = thread.call_args.kwargs['target'], thread.call_args.kwargs['args']
+    target(*args)
+    assert catalog_cache.get('flavors', scope=scope).data == [{'id': 'f2', 'name': 'm1.large'}]
+    assert flavors.call_count == 2
+
+
+def test_purge_scope_and_catalog(flavors):
+    catalog_cache.get('flavors', scope=('proj-a', 'RegionOne'))
+    catalog_cache.get('flavors', scope=('proj-b', 'RegionOne'))
+
+    catalog_cache.purge('flavors', scope=('proj-a', 'RegionOne'))
+    catalog_cache.get('flavors', scope=('proj-a', 'RegionOne'))
+    catalog_cache.get('flavors', scope=('proj-b', 'RegionOne'))
+    assert flavors.call_count == 3
+
+    assert catalog_cache.purge() == list(catalog_cache.CATALOGS)
+    catalog_cache.get('flavors', scope=('proj-b', 'RegionOne'))
+    assert flavors.call_count == 4
+
+
+def test_flavors_endpoint_etag(user, flavors):
+    client = APIClient()
+    client.force_authenticate(user)
+
+    resp = client.get(reverse('cloud-flavors'))
+    assert resp.status_code == 200
+    assert resp.json() == [{'id': 'f1', 'name': 'm1.small'}]
+    etag = resp['ETag']
+
+    resp = client.get(reverse('cloud-flavors'), HTTP_IF_NONE_MATCH=etag)
+    assert resp.status_code == 304
+    assert resp['ETag'] == etag
+
+    resp = client.get(reverse('cloud-flavors'), HTTP_IF_NONE_MATCH='"something-else"')
+    assert resp.status_code == 200
+    assert flavors.call_count == 1
+
+
+def test_purge_endpoint_requires_admin(user, admin_user, flavors):
+    client = APIClient()
+    client.force_authenticate(user)
+    assert client.post(reverse('cloud-catalog-purge'), {}, format='json').status_code == 403
+
+    client.force_authenticate(admin_user)
+    assert client.post(reverse('cloud-catalog-purge'), {'catalog': 'bogus'}, format='json').status_code == 400
+
+    client.get(reverse('cloud-flavors'))
+    resp = client.post(reverse('cloud-catalog-purge'), {'catalog': 'flavors'}, format='json')
+    assert resp.status_code == 200
+    assert resp.data == {'purged': ['flavors']}
+    client.get(reverse('cloud-flavors'))
+    assert flavors.call_count == 2
+
+
+def test_fetch_locks_are_bounded():
+    locks = {id(catalog_cache._fetch_lock(f'key-{i}')) for i in range(1000)}
+    assert len(locks) <= catalog_cache._FETCH_LOCK_STRIPES
+    assert catalog_cache._fetch_lock('key-1') is catalog_cache._fetch_lock('key-1')
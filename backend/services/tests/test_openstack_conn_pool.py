@@ -0,0 +1,114 @@
+# AtonixCorp – OpenStack connection pool tests
+#
+# run:  python -m pytest services/tests/test_openstack_conn_pool.py -v
+#
+# Connections are MagicMocks – no live cloud required.
+
+import threading
+import unittest
+from unittest.mock import MagicMock
+
+from infrastructure.openstack_conn import ConnectionPool
+
+
+def _fake_conn(expiring=False):
+    conn = MagicMock()
+    conn.session.auth.auth_ref.will_expire_soon.return_value = expiring
+    return conn
+
+
+class TestConnectionPool(unittest.TestCase):
+
+    def test_hit_reuses_connection(self):
+        pool = ConnectionPool(max_size=4)
+        factory = MagicMock(side_effect=_fake_conn)
+
+        first = pool.get(("proj", "RegionOne", "env"), factory)
+        second = pool.get(("proj", "RegionOne", "env"), factory)
+
+        self.assertIs(first, second)
+        self.assertEqual(factory.call_count, 1)
+        first.authorize.assert_called_once()
+        stats = pool.stats()
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["auth_count"], 1)
+
+    def test_expiring_token_is_refreshed(self):
+        pool = ConnectionPool(max_size=4)
+        stale = _fake_conn(expiring=True)
+        fresh = _fake_conn()
+        factory = MagicMock(side_effect=[stale, fresh])
+
+        pool.get("k", factory)
+        self.assertIs(pool.get("k", factory), fresh)
+        stale.close.assert_not_called()     # may still be in use by a caller
+        self.assertEqual(pool.stats()["refreshes"], 1)
+
+    def test_lru_eviction(self):
+        pool = ConnectionPool(max_size=2)
+        conns = {k: _fake_conn() for k in ("a", "b", "c")}
+
+        pool.get("a", lambda: conns["a"])
+        pool.get("b", lambda: conns["b"])
+        pool.get("a", lambda: conns["a"])       # a is now most recent
+        pool.get("c", lambda: conns["c"])       # evicts b
+
+        for conn in conns.values():
+            conn.close.assert_not_called()
+        self.assertEqual(pool.stats()["evictions"], 1)
+        self.assertEqual(pool.stats()["size"], 2)
+
+    def test_failed_auth_is_not_cached(self):
+        pool = ConnectionPool()
+        broken = _fake_conn()
+        broken.authorize.side_effect = RuntimeError("keystone down")
+
+        with self.assertRaises(RuntimeError):
+            pool.get("k", lambda: broken)
+        self.assertEqual(pool.stats()["size"], 0)
+        self.assertEqual(pool.stats()["auth_failures"], 1)
+
+    def test_concurrent_misses_authenticate_once(self):
+        pool = ConnectionPool()
+        gate = threading.Event()
+        calls = []
+
+        def slow_factory():
+            calls.append(1)
+            gate.wait(1)
+            return _fake_conn()
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(pool.get("k", slow_factory)))
+            for _ in range(8)
+        ]
+        for t in threads:
+            t.start()
+        gate.set()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(len({id(r) for r in results}), 1)
+
+    def test_invalidate(self):
+        pool = ConnectionPool()
+        conn = _fake_conn()
+        pool.get("k", lambda: conn)
+        pool.invalidate("k")
+        conn.close.assert_not_called()
+        self.assertEqual(pool.stats()["size"], 0)
+
+    def test_key_lock_survives_invalidate_and_eviction(self):
+        pool = ConnectionPool(max_size=1)
+        pool.get("a", _fake_conn)
+        lock = pool._key_lock("a")
+
+        pool.invalidate("a")
+        self.assertIs(pool._key_lock("a"), lock)
+        pool.get("a", _fake_conn)
+        pool.get("b", _fake_conn)               # evicts a
+        pool.invalidate()
+        self.assertIs(pool._key_lock("a"), lock)
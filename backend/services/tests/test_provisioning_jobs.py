@@ -0,0 +1,213 @@
+"""
+Tests for asynchronous provisioning jobs.
+
+Covers:
+- 202 + job id from the provisioning endpoints
+- Engine state machine: create → poll with backoff → succeeded / failed / timeout
+- ProvisionedResource status transitions
+- Job status endpoint access control and long-poll parameter validation
+- Claiming, retry without duplicate creates, and recovery after a restart
+"""
+
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest import mock
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from ..provisioning.jobs import ProvisioningEngine
+from ..workspace.models import ProvisioningJob, Workspace, WorkspaceBinding
+from ..workspace.service import WorkspaceService
+
+# The provisioning routes are declared in services/urls.py.
+pytestmark = pytest.mark.urls('services.urls')
+
+
+class FakeCloud:
+    """Minimal stand-in for an openstacksdk Connection: resources report queued statuses."""
+
+    def __init__(self, statuses):
+        self.statuses = list(statuses)
+        self.created = []
+        self.compute = SimpleNamespace(create_server=self._create, get_server=self._get, servers=self._list)
+        self.block_storage = SimpleNamespace(create_volume=self._create, get_volume=self._get, volumes=self._list)
+
+    def _create(self, **kwargs):
+        self.created.append(kwargs)
+        return SimpleNamespace(id=f'os-{122 + len(self.created)}', name=kwargs['name'], metadata=kwargs['metadata'])
+
+    def _list(self, details=True, **query):
+        return [SimpleNamespace(id=f'os-{123 + i}', name=c['name'], metadata=c['metadata'])
+                for i, c in enumerate(self.created)]
+
+    def _get(self, resource_id):
+        status = self.statuses.pop(0) if len(self.statuses) > 1 else self.statuses[0]
+        return SimpleNamespace(id=resource_id, status=status)
+
+
+@pytest.fixture(autouse=True)
+def clean_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def binding(db, user):
+    ws = Workspace.objects.create(workspace_id='devops', display_name='DevOps', owner=user)
+    return WorkspaceBinding.objects.create(workspace=ws, environment='staging', openstack_project='devops-staging')
+
+
+@pytest.fixture
+def client(user):
+    api = APIClient()
+    api.force_authenticate(user)
+    return api
+
+
+@pytest.fixture
+def engine():
+    return ProvisioningEngine(workers=1, poll_initial=1.0, poll_max=8.0)
+
+
+def _create_vm(client):
+    return client.post(reverse('provision-vm'), {
+        'workspace_id': 'devops', 'environment_id': 'staging',
+        'name': 'web-1', 'flavor_id': 'm1.small', 'image_id': 'ubuntu',
+    }, format='json')
+
+
+def _drive(engine, job_id, cloud, max_steps=20):
+    delays = []
+    with mock.patch.object(WorkspaceService, 'get_connection', return_value=cloud):
+        for _ in range(max_steps):
+            delay = engine.advance(job_id)
+            if delay is None:
+                break
+            delays.append(delay)
+    return delays
+
+
+def test_provision_vm_returns_202_without_calling_openstack(client, binding):
+    with mock.patch.object(WorkspaceService, 'get_connection') as get_connection:
+        resp = _create_vm(client)
+    assert resp.status_code == 202
+    get_connection.assert_not_called()
+
+    job = ProvisioningJob.objects.get(pk=resp.data['job']['id'])
+    assert job.state == 'queued'
+    assert job.resource.status == 'creating'
+    assert resp.data['status_url'].endswith(f'/provision/jobs/{job.pk}/')
+
+
+def test_job_runs_to_success_with_backoff(client, binding, engine):
+    job_id = _create_vm(client).data['job']['id']
+    cloud = FakeCloud(['BUILD', 'BUILD', 'BUILD', 'BUILD', 'ACTIVE'])
+
+    delays = _drive(engine, job_id, cloud)
+    assert delays == [1.0, 1.0, 2.0, 4.0, 8.0]
+    assert cloud.created == [{'name': 'web-1', 'flavor': 'm1.small', 'image': 'ubuntu',
+                              'metadata': {'atonixcorp_job': job_id}}]
+
+    job = ProvisioningJob.objects.select_related('resource').get(pk=job_id)
+    assert job.state == 'succeeded'
+    assert job.poll_count == 5
+    assert (job.resource.resource_id, job.resource.status) == ('os-123', 'active')
+
+
+def test_openstack_error_fails_job(client, binding, engine):
+    job_id = _create_vm(client).data['job']['id']
+    _drive(engine, job_id, FakeCloud(['BUILD', 'ERROR']))
+
+    job = ProvisioningJob.objects.select_related('resource').get(pk=job_id)
+    assert job.state == 'failed'
+    assert 'ERROR' in job.error
+    assert job.resource.status == 'error'
+
+
+def test_job_times_out(client, binding, engine):
+    job_id = _create_vm(client).data['job']['id']
+    cloud = FakeCloud(['BUILD'])
+    _drive(engine, job_id, cloud, max_steps=2)
+    ProvisioningJob.objects.filter(pk=job_id).update(deadline=timezone.now() - timedelta(seconds=1))
+
+    _drive(engine, job_id, cloud)
+    job = ProvisioningJob.objects.get(pk=job_id)
+    assert job.state == 'failed'
+    assert 'Timed out' in job.error
+
+
+def test_volume_job(client, binding, engine):
+    resp = client.post(reverse('provision-volume'), {
+        'workspace_id': 'devops', 'environment_id': 'staging', 'name': 'data', 'size_gb': 10,
+    }, format='json')
+    assert resp.status_code == 202
+    _drive(engine, resp.data['job']['id'], FakeCloud(['creating', 'available']))
+    assert ProvisioningJob.objects.get(pk=resp.data['job']['id']).state == 'succeeded'
+
+
+def test_job_status_endpoint(client, binding, engine):
+    job_id = _create_vm(client).data['job']['id']
+    _drive(engine, job_id, FakeCloud(['ACTIVE']))
+
+    resp = client.get(reverse('provision-job-status', args=[job_id]), {'wait': 5})
+    assert resp.status_code == 200
+    assert resp.data['job']['state'] == 'succeeded'
+    assert resp.data['job']['resource']['status'] == 'active'
+
+    stranger = APIClient()
+    stranger.force_authenticate(User.objects.create_user(username='other', password='x'))
+    assert stranger.get(reverse('provision-job-status', args=[job_id])).status_code == 404
+
+
+@pytest.mark.parametrize('params', [
+    {'wait': 'nan'}, {'wait': 'inf'}, {'wait': 'soon'}, {'wait': 1, 'since': '2024-13-45T00:00:00'},
+])
+def test_job_status_rejects_bad_long_poll_params(client, binding, params):
+    job_id = _create_vm(client).data['job']['id']
+    resp = client.get(reverse('provision-job-status', args=[job_id]), params)
+    assert resp.status_code == 400
+
+
+def test_job_status_accepts_naive_since(client, binding, engine):
+    job_id = _create_vm(client).data['job']['id']
+    with mock.patch('services.provisioning.jobs.get_engine', return_value=engine):
+        resp = client.get(reverse('provision-job-status', args=[job_id]),
+                          {'wait': 0.01, 'since': '2024-01-01T00:00:00'})
+    assert resp.status_code == 200 and resp.data['job']['state'] == 'queued'
+
+
+def test_retry_after_failed_save_does_not_create_twice(client, binding, engine):
+    job_id = _create_vm(client).data['job']['id']
+    cloud = FakeCloud(['ACTIVE'])
+    with mock.patch.object(WorkspaceService, 'get_connection', return_value=cloud), \
+            mock.patch('services.workspace.models.ProvisionedResource.save', side_effect=RuntimeError('db gone')):
+        with pytest.raises(RuntimeError):
+            engine.advance(job_id)
+    assert ProvisioningJob.objects.get(pk=job_id).state == 'creating'
+
+    # Another process may not take over while the claim is fresh…
+    assert _drive(ProvisioningEngine(workers=1, poll_initial=1.0, poll_max=8.0), job_id, cloud) == []
+    # …but the owner's retry finds the server it already created.
+    _drive(engine, job_id, cloud)
+    job = ProvisioningJob.objects.select_related('resource').get(pk=job_id)
+    assert len(cloud.created) == 1
+    assert (job.state, job.resource.resource_id) == ('succeeded', 'os-123')
+
+
+def test_recover_resubmits_orphaned_jobs(client, binding, engine):
+    queued = _create_vm(client).data['job']['id']
+    stale = _create_vm(client).data['job']['id']
+    fresh = _create_vm(client).data['job']['id']
+    ProvisioningJob.objects.filter(pk=stale).update(
+        state='creating', updated_at=timezone.now() - timedelta(seconds=engine.create_lease + 1))
+    ProvisioningJob.objects.filter(pk=fresh).update(state='creating', updated_at=timezone.now())
+
+    with mock.patch.object(engine, 'submit') as submit:
+        assert engine.recover() == 2
+    assert {str(c.args[0]) for c in submit.call_args_list} == {queued, stale}
@@ -0,0 +1,176 @@
+"""
+Tests for the batched provisioning status reconciler.
+
+Covers:
+- One servers() / volumes() list call per (project, region) per tick
+- Listed statuses fanned out to every running job
+- changes-since on follow-up listings
+- API errors leave jobs running until their deadline
+- Unchanged statuses are not written back; the tick lock is released
+"""
+
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest import mock
+
+import pytest
+from django.core.cache import cache
+from django.utils import timezone
+
+from ..provisioning import reconciler as reconciler_module
+from ..provisioning.jobs import ProvisioningEngine
+from ..provisioning.reconciler import StatusReconciler
+from ..workspace.models import ProvisioningJob, Workspace, WorkspaceBinding
+from ..workspace.service import WorkspaceService
+
+
+class ListingCloud:
+    """openstacksdk Connection stand-in exposing only the list calls, counting them."""
+
+    def __init__(self, servers=None, volumes=None, fail=False):
+        self.servers = dict(servers or {})
+        self.volumes = dict(volumes or {})
+        self.fail = fail
+        self.calls = []
+        self.compute = SimpleNamespace(servers=self._list_servers)
+        self.block_storage = SimpleNamespace(volumes=self._list_volumes)
+
+    def _list_servers(self, **query):
+        self.calls.append(('servers', query))
+        if self.fail:
+            raise RuntimeError('nova unavailable')
+        return [SimpleNamespace(id=rid, status=status) for rid, status in self.servers.items()]
+
+    def _list_volumes(self, **query):
+        self.calls.append(('volumes', query))
+        if self.fail:
+            raise RuntimeError('cinder unavailable')
+        return [SimpleNamespace(id=rid, status=status) for rid, status in self.volumes.items()]
+
+
+@pytest.fixture
+def engine():
+    return ProvisioningEngine(workers=1, poll_initial=1.0, poll_max=8.0, batch_poll=True)
+
+
+@pytest.fixture
+def bindings(db, user):
+    ws = Workspace.objects.create(workspace_id='devops', display_name='DevOps', owner=user)
+    return [
+        WorkspaceBinding.objects.create(workspace=ws, environment='staging', openstack_project='devops-staging'),
+        WorkspaceBinding.objects.create(workspace=ws, environment='prod', openstack_project='devops-prod'),
+    ]
+
+
+def _running_job(binding, kind, openstack_id, user):
+    resource = WorkspaceService.register_resource(
+        binding=binding, resource_type=kind, resource_id=openstack_id, resource_name=openstack_id,
+        status='creating', metadata={}, created_by=user,
+    )
+    return ProvisioningJob.objects.create(
+        binding=binding, resource=resource, kind=kind, params={}, created_by=user, state='running',
+        deadline=timezone.now() + timedelta(minutes=10),
+    )
+
+
+def _tick(reconciler, clouds):
+    with mock.patch.object(WorkspaceService, 'get_connection',
+                           side_effect=lambda b: clouds[b.openstack_project]):
+        return reconciler.tick()
+
+
+def test_create_step_hands_job_to_reconciler(engine, bindings, user):
+    resource = WorkspaceService.register_resource(
+        binding=bindings[0], resource_type='vm', resource_id='', resource_name='web',
+        status='creating', metadata={}, created_by=user,
+    )
+    job = ProvisioningJob.objects.create(binding=bindings[0], resource=resource, kind='vm',
+                                         params={'name': 'web'}, created_by=user)
+    cloud = SimpleNamespace(compute=SimpleNamespace(create_server=lambda **kw: SimpleNamespace(id='s-1', name='web')))
+    with mock.patch.object(WorkspaceService, 'get_connection', return_value=cloud):
+        assert engine.advance(job.pk) is None
+    assert ProvisioningJob.objects.get(pk=job.pk).state == 'running'
+
+
+def test_one_list_call_per_project_per_tick(engine, bindings, user):
+    staging, prod = bindings
+    for i in range(5):
+        _running_job(staging, 'vm', f'srv-{i}', user)
+    _running_job(staging, 'volume', 'vol-0', user)
+    for i in range(3):
+        _running_job(prod, 'vm', f'prod-{i}', user)
+
+    clouds = {
+        'devops-staging': ListingCloud(
+            servers={'srv-0': 'ACTIVE', 'srv-1': 'ERROR', 'srv-2': 'BUILD', 'unrelated': 'ACTIVE'},
+            volumes={'vol-0': 'available'},
+        ),
+        'devops-prod': ListingCloud(servers={'prod-0': 'ACTIVE', 'prod-1': 'ACTIVE', 'prod-2': 'ACTIVE'}),
+    }
+    reconciler = StatusReconciler(engine)
+    assert _tick(reconciler, clouds) == 9
+
+    assert [name for name, _ in clouds['devops-staging'].calls] == ['servers', 'volumes']
+    assert [name for name, _ in clouds['devops-prod'].calls] == ['servers']
+    assert reconciler.stats['api_calls'] == 3
+
+    states = dict(ProvisioningJob.objects.values_list('resource__resource_id', 'state'))
+    assert states == {
+        'srv-0': 'succeeded', 'srv-1': 'failed', 'srv-2': 'running', 'srv-3': 'running', 'srv-4': 'running',
+        'vol-0': 'succeeded', 'prod-0': 'succeeded', 'prod-1': 'succeeded', 'prod-2': 'succeeded',
+    }
+    assert ProvisioningJob.objects.get(resource__resource_id='srv-2').progress == 'BUILD'
+
+
+def test_follow_up_listing_uses_changes_since(engine, bindings, user):
+    _running_job(bindings[0], 'vm', 'srv-0', user)
+    clouds = {'devops-staging': ListingCloud(servers={'srv-0': 'BUILD'})}
+    reconciler = StatusReconciler(engine)
+
+    _tick(reconciler, clouds)
+    _tick(reconciler, clouds)
+    first, second = (query for _, query in clouds['devops-staging'].calls)
+    assert 'changes_since' not in first
+    assert 'changes_since' in second
+
+
+def test_api_error_only_applies_deadline(engine, bindings, user):
+    alive = _running_job(bindings[0], 'vm', 'srv-0', user)
+    expired = _running_job(bindings[0], 'vm', 'srv-1', user)
+    ProvisioningJob.objects.filter(pk=expired.pk).update(deadline=timezone.now() - timedelta(seconds=1))
+
+    _tick(StatusReconciler(engine), {'devops-staging': ListingCloud(fail=True)})
+    assert ProvisioningJob.objects.get(pk=alive.pk).state == 'running'
+    expired = ProvisioningJob.objects.get(pk=expired.pk)
+    assert expired.state == 'failed'
+    assert 'Timed out' in expired.error
+
+
+def test_unchanged_status_is_not_written(engine, bindings, user):
+    job = _running_job(bindings[0], 'vm', 'srv-0', user)
+    clouds = {'devops-staging': ListingCloud(servers={'srv-0': 'BUILD'})}
+    reconciler = StatusReconciler(engine)
+
+    _tick(reconciler, clouds)
+    written = ProvisioningJob.objects.get(pk=job.pk).updated_at
+    _tick(reconciler, clouds)
+    _tick(reconciler, clouds)
+    job = ProvisioningJob.objects.get(pk=job.pk)
+    assert (job.progress, job.updated_at) == ('BUILD', written)
+
+    clouds['devops-staging'].servers['srv-0'] = 'ACTIVE'
+    _tick(reconciler, clouds)
+    job = ProvisioningJob.objects.get(pk=job.pk)
+    assert (job.state, job.poll_count) == ('succeeded', 4)
+
+
+def test_tick_lock_is_released(engine):
+    cache.clear()
+    with mock.patch.object(reconciler_module.time, 'sleep', side_effect=[None, SystemExit]), \
+            mock.patch.object(StatusReconciler, 'tick') as tick, \
+            pytest.raises(SystemExit):
+        reconciler_module.run_forever(engine, 5.0)
+    tick.assert_called_once()
+    assert cache.get(reconciler_module._LOCK_KEY) is None
+    assert cache.get(reconciler_module._TICK_KEY) == 1
+    cache.clear()
@@ -0,0 +1,91 @@
+"""
+Tests for the materialized resource health index.
+
+Covers:
+- Signal-driven index maintenance (save / status change / delete)
+- Single-query summary and keyset pagination
+- rebuild() repairing rows written without signals
+"""
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from ..core.models import VPC, Flavor, Image
+from ..monitoring import health_index
+from ..monitoring import service as svc
+from ..monitoring.models import ResourceHealthIndex
+from ..pipelines.models import Project
+from .conftest import create_test_instance
+
+
+def _vpcs(user, n, status='available'):
+    return [
+        VPC.objects.create(name=f'vpc-{i}', vpc_id=f'vpc-{i}', owner=user, cidr_block=f'10.{i}.0.0/16', status=status)
+        for i in range(n)
+    ]
+
+
+def test_signals_keep_index_in_step(db, user):
+    vpc, = _vpcs(user, 1)
+    row = ResourceHealthIndex.objects.get(resource_type='vpc', resource_key=vpc.resource_id)
+    assert (row.owner_id, row.health) == (user.pk, 'green')
+
+    vpc.status = 'error'
+    vpc.save()
+    row.refresh_from_db()
+    assert row.health == 'red'
+
+    vpc.delete()
+    assert not ResourceHealthIndex.objects.filter(resource_key=vpc.resource_id).exists()
+
+
+def test_instance_is_indexed(db, user):
+    instance = create_test_instance(
+        user, flavor=Flavor.objects.get(flavor_id='1'), image=Image.objects.get(image_id='1'),
+    )
+    row = ResourceHealthIndex.objects.get(resource_type='instance', resource_key=instance.resource_id)
+    assert row.health == 'green'
+    assert row.name == 'test-instance'
+
+
+def test_summary_is_one_query(db, user):
+    _vpcs(user, 3)
+    VPC.objects.create(name='broken', vpc_id='vpc-broken', owner=user, cidr_block='10.9.0.0/16', status='failed')
+    Project.objects.create(id='prj-1', owner=user, name='web')
+
+    with CaptureQueriesContext(connection) as ctx:
+        summary = health_index.get_summary(user)
+    assert len(ctx) == 1
+    assert summary == {'total': 5, 'healthy': 4, 'degraded': 0, 'critical': 1}
+
+
+def test_keyset_pagination_walks_every_row_once(db, user):
+    _vpcs(user, 7)
+    seen, cursor = [], None
+    while True:
+        data = svc.get_resource_health(user, cursor=cursor, limit=3)
+        seen.extend(r['id'] for r in data['resources'])
+        cursor = data['next_cursor']
+        if cursor is None:
+            break
+    assert len(seen) == len(set(seen)) == 7
+    assert data['summary']['total'] == 7
+
+
+def test_filters_apply_to_page(db, user):
+    _vpcs(user, 2)
+    VPC.objects.create(name='broken', vpc_id='vpc-broken', owner=user, cidr_block='10.9.0.0/16', status='failed')
+    data = svc.get_resource_health(user, health='red')
+    assert [r['name'] for r in data['resources']] == ['broken']
+
+
+def test_rebuild_repairs_index(db, user):
+    vpcs = _vpcs(user, 2)
+    VPC.objects.filter(pk=vpcs[0].pk).update(status='error')     # bypasses signals
+    ResourceHealthIndex.objects.create(
+        resource_type='vpc', resource_key='vpc-gone', owner=user, name='gone', status='available', health='green',
+    )
+
+    assert health_index.rebuild(owner=user) == 2
+    rows = dict(ResourceHealthIndex.objects.filter(owner=user).values_list('resource_key', 'health'))
+    assert rows == {vpcs[0].resource_id: 'red', vpcs[1].resource_id: 'green'}
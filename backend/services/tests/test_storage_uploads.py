@@ -0,0 +1,266 @@
+"""
+Tests for streaming object uploads.
+
+Covers:
+- Single-request uploads stream to Swift and keep the MD5 ETag
+- Large uploads are split into SLO segments plus a manifest
+- Resumable multipart uploads (initiate / parts / resume / complete / abort)
+- Segment clean-up on overwrite and failure; part validation; error mapping
+- Streaming calls share a pooled connection
+- Parts racing complete / abort never overwrite or leak a segment
+- Deleting an SLO object deletes its segments
+"""
+
+import hashlib
+import io
+from types import SimpleNamespace
+from unittest import mock
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from openstack.exceptions import BadRequestException
+from rest_framework.test import APIClient
+
+from infrastructure.openstack_conn import ConnectionPool
+
+from ..integrations import swift_service
+from ..storage import uploads
+from ..storage.models import MultipartUpload, S3Object, StorageBucket
+
+
+class FakeSwift:
+    """Records the streaming calls made by uploads (no OpenStack needed)."""
+
+    def __init__(self):
+        self.objects = {}
+        self.manifests = {}
+        self.deleted = []
+
+    def put_object_stream(self, conn, bucket_name, object_key, chunks, content_type='', container=None):
+        data = b''.join(chunks)
+        self.objects[(container or bucket_name, object_key)] = data
+        return hashlib.md5(data).hexdigest()
+
+    def put_slo_manifest(self, conn, bucket_name, object_key, segments, content_type=''):
+        self.manifests[(bucket_name, object_key)] = [s['path'] for s in segments]
+        return ''
+
+    def slo_segments(self, conn, bucket_name, object_key):
+        return list(self.manifests.get((bucket_name, object_key), []))
+
+    def delete_segments(self, conn, bucket_name, paths):
+        self.deleted.extend(paths)
+
+
+@pytest.fixture
+def swift():
+    fake = FakeSwift()
+    with mock.patch.object(swift_service, 'open_connection', return_value=object()), \
+            mock.patch.object(swift_service, 'ensure_segment_container'), \
+            mock.patch.object(swift_service, 'put_object_stream', side_effect=fake.put_object_stream), \
+            mock.patch.object(swift_service, 'put_slo_manifest', side_effect=fake.put_slo_manifest), \
+            mock.patch.object(swift_service, 'slo_segments', side_effect=fake.slo_segments), \
+            mock.patch.object(swift_service, 'delete_segments', side_effect=fake.delete_segments):
+        yield fake
+
+
+@pytest.fixture
+def bucket(db, user):
+    return StorageBucket.objects.create(name='test-bucket', bucket_id='bkt-1', bucket_name='test-bucket', owner=user)
+
+
+@pytest.fixture
+def client(user):
+    client = APIClient()
+    client.force_authenticate(user)
+    return client
+
+
+def test_upload_streams_with_md5_etag(client, bucket, swift):
+    payload = b'hello object storage ' * 10
+    resp = client.post(f'/api/services/buckets/{bucket.resource_id}/upload_object/',
+                       {'file': SimpleUploadedFile('a.txt', payload, 'text/plain')})
+
+    assert resp.status_code == 201, resp.content
+    assert resp.data['etag'] == hashlib.md5(payload).hexdigest()
+    assert resp.data['size_bytes'] == len(payload)
+    assert swift.objects[('test-bucket', 'a.txt')] == payload
+    bucket.refresh_from_db()
+    assert bucket.total_objects == 1 and bucket.total_size_bytes == len(payload)
+
+
+@pytest.fixture
+def small_segments(settings):
+    settings.STORAGE_SLO_THRESHOLD = 10
+    settings.STORAGE_SEGMENT_SIZE = 16
+    settings.STORAGE_UPLOAD_WORKERS = 2
+
+
+def test_large_upload_is_segmented(swift, small_segments):
+    payload = bytes(range(256)) * 2
+
+    etag, size = uploads.put_object('bkt', 'big.bin', SimpleUploadedFile('big.bin', payload))
+
+    assert (etag, size) == (hashlib.md5(payload).hexdigest(), len(payload))
+    manifest = swift.manifests[('bkt', 'big.bin')]
+    assert len(manifest) == len(payload) // 16 and manifest == sorted(manifest)
+    assert b''.join(swift.objects[('bkt_segments', p)] for p in manifest) == payload
+
+
+def test_overwrite_uses_fresh_segments_and_drops_old_ones(swift, small_segments, settings):
+    payload = bytes(range(256))
+    uploads.put_object('bkt', 'big.bin', SimpleUploadedFile('big.bin', payload))
+    first = swift.manifests[('bkt', 'big.bin')]
+
+    uploads.put_object('bkt', 'big.bin', SimpleUploadedFile('big.bin', payload))
+    second = swift.manifests[('bkt', 'big.bin')]
+    assert not set(first) & set(second)
+    assert swift.deleted == first
+
+    # Segment size grows to respect the manifest segment limit.
+    settings.STORAGE_MAX_MANIFEST_SEGMENTS = 4
+    uploads.put_object('bkt', 'big.bin', SimpleUploadedFile('big.bin', payload))
+    assert len(swift.manifests[('bkt', 'big.bin')]) == 4
+
+
+def test_failed_segment_removes_uploaded_segments(swift, small_segments):
+    real = swift.put_object_stream
+
+    def flaky(conn, bucket, key, chunks, content_type='', container=None):
+        if key.endswith('/00003'):
+            raise BadRequestException('segment rejected')
+        return real(conn, bucket, key, chunks, content_type, container)
+
+    with mock.patch.object(swift_service, 'put_object_stream', side_effect=flaky), \
+            pytest.raises(BadRequestException):
+        uploads.put_object('bkt', 'big.bin', SimpleUploadedFile('big.bin', bytes(range(256))))
+
+    written = [key for (container, key) in swift.objects if container == 'bkt_segments']
+    assert written and sorted(swift.deleted) == sorted(written)
+    assert ('bkt', 'big.bin') not in swift.manifests
+
+
+def test_multipart_resume_and_complete(client, bucket, swift, settings):
+    settings.STORAGE_MIN_PART_SIZE = 50
+    base = f'/api/services/buckets/{bucket.resource_id}/multipart/'
+    resp = client.post(base, {'object_key': 'video.mp4', 'content_type': 'video/mp4'}, format='json')
+    assert resp.status_code == 201
+    upload_id = resp.data['upload_id']
+
+    parts = {1: b'a' * 50, 2: b'b' * 50, 3: b'c' * 10}
+    for number in (3, 1):
+        resp = client.put(f'{base}{upload_id}/parts/{number}/', parts[number],
+                          content_type='application/octet-stream')
+        assert resp.status_code == 200 and resp.data['size_bytes'] == len(parts[number])
+
+    # Resume: the client asks what arrived and sends the rest.
+    listed = client.get(f'{base}{upload_id}/').data['parts']
+    assert [p['part_number'] for p in listed] == [1, 3]
+    client.put(f'{base}{upload_id}/parts/2/', parts[2], content_type='application/octet-stream')
+
+    expected = [{'part_number': n, 'etag': hashlib.md5(d).hexdigest()} for n, d in parts.items()]
+    expected[0]['etag'] = 'bogus'
+    assert client.post(f'{base}{upload_id}/complete/', {'parts': expected}, format='json').status_code == 409
+
+    expected[0]['etag'] = hashlib.md5(parts[1]).hexdigest()
+    resp = client.post(f'{base}{upload_id}/complete/', {'parts': expected}, format='json')
+    assert resp.status_code == 201, resp.content
+    digests = [hashlib.md5(parts[n]).digest() for n in (1, 2, 3)]
+    assert resp.data['etag'] == f"{hashlib.md5(b''.join(digests)).hexdigest()}-3"
+    assert resp.data['size_bytes'] == 110
+
+    manifest = swift.manifests[('test-bucket', 'video.mp4')]
+    assert [path.rsplit('-', 1)[0] for path in manifest] == \
+        [f'{upload_id}/00001', f'{upload_id}/00002', f'{upload_id}/00003']
+    obj = S3Object.objects.get(bucket=bucket, object_key='video.mp4')
+    assert obj.size_bytes == 110 and obj.content_type == 'video/mp4'
+    assert MultipartUpload.objects.get(upload_id=upload_id).status == 'completed'
+    assert client.put(f'{base}{upload_id}/parts/4/', b'x',
+                      content_type='application/octet-stream').status_code == 409
+
+
+def test_multipart_abort_removes_segments(bucket, swift):
+    upload = uploads.initiate(bucket, 'tmp.bin')
+    uploads.upload_part(upload, 1, io.BytesIO(b'data'))
+    with pytest.raises(uploads.UploadError):
+        uploads.upload_part(upload, 0, io.BytesIO(b'data'))
+
+    uploads.abort(upload)
+
+    assert swift.deleted == [upload.parts['1']['path']]
+    upload.refresh_from_db()
+    assert upload.status == 'aborted'
+    with pytest.raises(uploads.UploadError):
+        uploads.complete(upload)
+
+
+def test_multipart_part_validation_and_swift_errors(client, bucket, swift, settings):
+    settings.STORAGE_MIN_PART_SIZE = 20
+    settings.STORAGE_MAX_MANIFEST_SEGMENTS = 2
+    upload = uploads.initiate(bucket, 'clip.mp4')
+    base = f'/api/services/buckets/{bucket.resource_id}/multipart/{upload.upload_id}'
+    for number, data in ((1, b'x' * 10), (2, b'y' * 30)):
+        client.put(f'{base}/parts/{number}/', data, content_type='application/octet-stream')
+
+    resp = client.put(f'{base}/parts/3/', b'z', content_type='application/octet-stream')
+    assert resp.status_code == 400 and 'at most 2 parts' in resp.data['error']
+    resp = client.post(f'{base}/complete/', {}, format='json')
+    assert resp.status_code == 400 and 'Part 1 is smaller' in resp.data['error']
+
+    client.put(f'{base}/parts/1/', b'x' * 20, content_type='application/octet-stream')
+    with mock.patch.object(swift_service, 'put_slo_manifest',
+                           side_effect=BadRequestException('Too many segments', http_status=400)):
+        assert client.post(f'{base}/complete/', {}, format='json').status_code == 400
+    with mock.patch.object(swift_service, 'put_slo_manifest',
+                           side_effect=BadRequestException('Service unavailable', http_status=503)):
+        assert client.post(f'{base}/complete/', {}, format='json').status_code == 502
+    assert client.post(f'{base}/complete/', {}, format='json').status_code == 201
+
+
+def test_reuploaded_part_gets_a_new_segment(bucket, swift):
+    upload = uploads.initiate(bucket, 'tmp.bin')
+    first = uploads.upload_part(upload, 1, io.BytesIO(b'old'))
+    second = uploads.upload_part(upload, 1, io.BytesIO(b'new'))
+
+    assert first['path'] != second['path']
+    assert swift.deleted == [first['path']]
+    assert MultipartUpload.objects.get(pk=upload.pk).parts['1']['path'] == second['path']
+
+
+@pytest.mark.parametrize('finish', ['complete', 'abort'])
+def test_part_landing_after_finish_removes_its_segment(bucket, swift, finish):
+    upload = uploads.initiate(bucket, 'tmp.bin')
+    uploads.upload_part(upload, 1, io.BytesIO(b'data'))
+    stale = MultipartUpload.objects.get(pk=upload.pk)   # another request's copy
+    getattr(uploads, finish)(upload)
+    swift.deleted.clear()
+
+    with pytest.raises(uploads.UploadError):
+        uploads.upload_part(stale, 1, io.BytesIO(b'late'))
+
+    (late,) = [key for key in swift.objects if key[1] != upload.parts['1']['path']]
+    assert swift.deleted == [late[1]]
+    assert MultipartUpload.objects.get(pk=upload.pk).parts == upload.parts
+    with pytest.raises(uploads.UploadError):
+        getattr(uploads, finish)(stale)
+
+
+def test_delete_object_removes_slo_segments():
+    conn = mock.Mock()
+    with mock.patch.object(swift_service, '_get_connection', return_value=conn), \
+            mock.patch.object(swift_service, 'slo_segments', return_value=['a/00000', 'a/00001']):
+        assert swift_service.delete_swift_object('bkt', 'big.iso')['success']
+
+    assert conn.object_store.delete_object.call_args_list == [
+        mock.call('big.iso', container='bkt'),
+        mock.call('a/00000', container='bkt_segments'),
+        mock.call('a/00001', container='bkt_segments'),
+    ]
+
+
+def test_streaming_calls_share_a_pooled_connection():
+    conn = SimpleNamespace(session=SimpleNamespace(auth=None), authorize=mock.Mock())
+    with mock.patch('infrastructure.openstack_conn._pool', ConnectionPool()), \
+            mock.patch.object(swift_service, '_connect', return_value=conn) as connect:
+        assert all(swift_service.open_connection() is conn for _ in range(5))
+    assert connect.call_count == 1 and conn.authorize.call_count == 1
@@ -0,0 +1,106 @@
+"""
+Tests for cached WorkspaceBinding resolution.
+
+Covers:
+- Read-through caching of WorkspaceService.resolve
+- Negative caching and error mapping
+- Signal-driven invalidation
+- Bulk resolve_many
+"""
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from ..workspace import cache as binding_cache
+from ..workspace.models import Workspace, WorkspaceBinding
+from ..workspace.service import (
+    BindingNotFound,
+    WorkspaceInactive,
+    WorkspaceNotFound,
+    WorkspaceService,
+)
+
+
+@pytest.fixture(autouse=True)
+def clean_binding_cache():
+    cache.clear()
+    binding_cache.clear_local()
+    yield
+    cache.clear()
+    binding_cache.clear_local()
+
+
+@pytest.fixture
+def workspace(db, user):
+    ws = Workspace.objects.create(workspace_id='devops', display_name='DevOps', owner=user)
+    WorkspaceBinding.objects.create(workspace=ws, environment='staging', openstack_project='devops-staging')
+    WorkspaceBinding.objects.create(workspace=ws, environment='prod', openstack_project='devops-prod')
+    return ws
+
+
+def test_resolve_is_cached(workspace):
+    with CaptureQueriesContext(connection) as cold:
+        binding = WorkspaceService.resolve('devops', 'staging')
+    assert binding.openstack_project == 'devops-staging'
+    assert binding.workspace.workspace_id == 'devops'
+    assert len(cold) == 1
+
+    with CaptureQueriesContext(connection) as warm:
+        WorkspaceService.resolve('devops', 'staging')
+    assert len(warm) == 0
+
+
+def test_resolve_errors_are_negatively_cached(workspace):
+    with pytest.raises(WorkspaceNotFound):
+        WorkspaceService.resolve('nope', 'dev')
+    with pytest.raises(BindingNotFound):
+        WorkspaceService.resolve('devops', 'dev')
+
+    with CaptureQueriesContext(connection) as ctx:
+        with pytest.raises(BindingNotFound):
+            WorkspaceService.resolve('devops', 'dev')
+    assert len(ctx) == 0
+
+
+def test_binding_save_invalidates(workspace):
+    WorkspaceService.resolve('devops', 'staging')
+    binding = WorkspaceBinding.objects.get(workspace=workspace, environment='staging')
+    binding.openstack_project = 'devops-staging-v2'
+    binding.save()
+
+    assert WorkspaceService.resolve('devops', 'staging').openstack_project == 'devops-staging-v2'
+
+
+def test_new_binding_replaces_negative_entry(workspace):
+    with pytest.raises(BindingNotFound):
+        WorkspaceService.resolve('devops', 'dev')
+    WorkspaceBinding.objects.create(workspace=workspace, environment='dev', openstack_project='devops-dev')
+
+    assert WorkspaceService.resolve('devops', 'dev').openstack_project == 'devops-dev'
+
+
+def test_workspace_deactivation_invalidates(workspace):
+    WorkspaceService.resolve('devops', 'prod')
+    workspace.is_active = False
+    workspace.save()
+
+    with pytest.raises(WorkspaceInactive):
+        WorkspaceService.resolve('devops', 'prod')
+
+
+def test_resolve_many(workspace):
+    keys = [('devops', 'dev'), ('devops', 'staging'), ('devops', 'prod'), ('ghost', 'prod')]
+
+    with CaptureQueriesContext(connection) as cold:
+        result = WorkspaceService.resolve_many(keys)
+    assert len(cold) == 2
+    assert result[('devops', 'dev')] is None
+    assert result[('ghost', 'prod')] is None
+    assert result[('devops', 'staging')].openstack_project == 'devops-staging'
+    assert result[('devops', 'prod')].openstack_project == 'devops-prod'
+
+    with CaptureQueriesContext(connection) as warm:
+        WorkspaceService.resolve_many(keys)
+    assert len(warm) == 0
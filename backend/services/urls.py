@@ -6,7 +6,7 @@ from .onboarding.views import onboarding_checklist, onboarding_checklist_update,
 from .openstack.views import (
     cloud_status,
     servers_list_create, server_detail_delete, server_start, server_stop, server_reboot,
-    flavors_list, images_list,
+    flavors_list, images_list, volume_types_list, catalog_purge,
     networks_list_create, network_delete, subnets_list_create,
     security_groups_list_create, security_group_add_rule,
     floating_ips,
@@ -116,6 +116,7 @@ from .provisioning.views import (
     provision_network,
     provision_kubernetes,
     provision_floating_ip,
+    provisioning_job_status,
     list_provisioned_resources,
     list_workspaces,
 )
@@ -220,7 +221,8 @@ router.register(r'billing/account',         BillingAccountViewSet,   basename='b
 router.register(r'billing/payment-methods', PaymentMethodViewSet,    basename='payment-method')
 router.register(r'billing/invoices',        InvoiceViewSet,          basename='invoice')
 router.register(r'billing/usage',           UsageViewSet,            basename='billing-usage')
-router.register(r'billing/credits',         CreditViewSet,           basename='credit')router.register(r'billing/weekly',          WeeklyBillingViewSet,    basename='billing-weekly')
+router.register(r'billing/credits',         CreditViewSet,           basename='credit')
+router.register(r'billing/weekly',          WeeklyBillingViewSet,    basename='billing-weekly')
 router.register(r'billing/analysis',        SpendingAnalysisViewSet, basename='billing-analysis')
 router.register(r'billing/ingest',          UsageIngestViewSet,      basename='billing-ingest')
 # ============================================================================
@@ -361,6 +363,8 @@ urlpatterns = [
     # Flavors & Images
     path('cloud/flavors/',                               flavors_list,              name='cloud-flavors'),
     path('cloud/images/',                                images_list,               name='cloud-images'),
+    path('cloud/volume-types/',                          volume_types_list,         name='cloud-volume-types'),
+    path('cloud/catalog/purge/',                         catalog_purge,             name='cloud-catalog-purge'),
 
     # Networks
     path('cloud/networks/',                              networks_list_create,      name='cloud-networks'),
@@ -392,6 +396,7 @@ urlpatterns = [
     path('provision/kubernetes/cluster/',  provision_kubernetes,          name='provision-kubernetes'),
     path('provision/floating-ip/',         provision_floating_ip,         name='provision-floating-ip'),
     path('provision/resources/',           list_provisioned_resources,    name='provision-resources-list'),
+    path('provision/jobs/<uuid:job_id>/',  provisioning_job_status,       name='provision-job-status'),
 
     # ── Workspace management ────────────────────────────────────────────────
     path('workspaces/',                    list_workspaces,               name='workspace-list'),
@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+
+
+class WorkspaceConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'services.workspace'
+    verbose_name = 'Workspaces'
+
+    def ready(self):
+        """Register cache invalidation signal handlers."""
+        import services.workspace.signals  # noqa: F401
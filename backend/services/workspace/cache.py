@@ -0,0 +1,136 @@
+# AtonixCorp – Workspace Binding Cache
+#
+# Read-through cache for WorkspaceService.resolve().
+#
+# Two tiers:
+#   1. A tiny in-process TTL map (a few seconds) that absorbs bursts within a
+#      single worker without any network hop.
+#   2. The configured Django cache (Redis in production) shared by all workers.
+#
+# Entries are keyed by (workspace_id, environment).  Values are either a
+# WorkspaceBinding (with its workspace pre-joined) or one of the negative
+# markers below, which are cached with a shorter TTL so that a freshly created
+# binding shows up quickly.
+#
+# Invalidation happens through post_save / post_delete receivers in
+# services.workspace.signals.
+
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Workspace
+
+# ── Negative markers ──────────────────────────────────────────────────────────
+
+MISSING_WORKSPACE = "missing_workspace"
+INACTIVE_WORKSPACE = "inactive_workspace"
+MISSING_BINDING = "missing_binding"
+
+NEGATIVE_MARKERS = (MISSING_WORKSPACE, INACTIVE_WORKSPACE, MISSING_BINDING)
+
+_KEY_PREFIX = "workspace:binding"
+
+_local: dict[tuple[str, str], tuple[float, object]] = {}
+_local_lock = threading.Lock()
+
+
+def _ttl() -> int:
+    return getattr(settings, "WORKSPACE_BINDING_CACHE_TTL", 300)
+
+
+def _negative_ttl() -> int:
+    return getattr(settings, "WORKSPACE_BINDING_NEGATIVE_TTL", 30)
+
+
+def _local_ttl() -> float:
+    return getattr(settings, "WORKSPACE_BINDING_LOCAL_TTL", 5)
+
+
+def _cache_key(workspace_id: str, environment: str) -> str:
+    return f"{_KEY_PREFIX}:{workspace_id}:{environment}"
+
+
+# ── Local tier ────────────────────────────────────────────────────────────────
+
+def _local_get(key: tuple[str, str]):
+    with _local_lock:
+        entry = _local.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del _local[key]
+            return None
+        return value
+
+
+def _local_set(key: tuple[str, str], value) -> None:
+    ttl = min(_local_ttl(), _negative_ttl() if value in NEGATIVE_MARKERS else _ttl())
+    with _local_lock:
+        _local[key] = (time.monotonic() + ttl, value)
+
+
+# ── Public API ────────────────────────────────────────────────────────────────
+
+def get(workspace_id: str, environment: str):
+    """Return the cached binding / negative marker, or None on a miss."""
+    return get_many([(workspace_id, environment)]).get((workspace_id, environment))
+
+
+def get_many(keys) -> dict:
+    """Look up several (workspace_id, environment) pairs; misses are omitted."""
+    found = {}
+    remote_keys = {}
+    for key in keys:
+        value = _local_get(key)
+        if value is not None:
+            found[key] = value
+        else:
+            remote_keys[_cache_key(*key)] = key
+
+    if remote_keys:
+        for cache_key, value in cache.get_many(list(remote_keys)).items():
+            key = remote_keys[cache_key]
+            _local_set(key, value)
+            found[key] = value
+    return found
+
+
+def set(workspace_id: str, environment: str, value) -> None:
+    set_many({(workspace_id, environment): value})
+
+
+def set_many(values: dict) -> None:
+    """Store bindings / negative markers keyed by (workspace_id, environment)."""
+    positive, negative = {}, {}
+    for key, value in values.items():
+        _local_set(key, value)
+        (negative if value in NEGATIVE_MARKERS else positive)[_cache_key(*key)] = value
+    if positive:
+        cache.set_many(positive, timeout=_ttl())
+    if negative:
+        cache.set_many(negative, timeout=_negative_ttl())
+
+
+def invalidate(workspace_id: str, environment: str) -> None:
+    with _local_lock:
+        _local.pop((workspace_id, environment), None)
+    cache.delete(_cache_key(workspace_id, environment))
+
+
+def invalidate_workspace(workspace_id: str) -> None:
+    """Drop every environment of a workspace (activation change, delete, ...)."""
+    environments = [env for env, _ in Workspace.ENVIRONMENT_CHOICES]
+    with _local_lock:
+        for env in environments:
+            _local.pop((workspace_id, env), None)
+    cache.delete_many([_cache_key(workspace_id, env) for env in environments])
+
+
+def clear_local() -> None:
+    """Forget the in-process tier (used by tests)."""
+    with _local_lock:
+        _local.clear()
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-17 10:05
+
+import uuid
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workspace', '0007_devworkspace_context_fields'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProvisioningJob',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('kind', models.CharField(choices=[('vm', 'Virtual Machine'), ('volume', 'Block Storage Volume')], max_length=16)),
+                ('params', models.JSONField(blank=True, default=dict, help_text='OpenStack create arguments')),
+                ('state', models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('succeeded', 'Succeeded'), ('failed', 'Failed')], db_index=True, default='queued', max_length=16)),
+                ('progress', models.CharField(blank=True, help_text='Last OpenStack status seen', max_length=64)),
+                ('poll_count', models.PositiveIntegerField(default=0)),
+                ('error', models.TextField(blank=True)),
+                ('result', models.JSONField(blank=True, default=dict)),
+                ('deadline', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('binding', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='provisioning_jobs', to='workspace.workspacebinding')),
+                ('created_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+                ('resource', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='job', to='workspace.provisionedresource')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['state', 'created_at'], name='workspace_p_state_71587f_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 16:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workspace', '0008_provisioningjob'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='provisioningjob',
+            name='state',
+            field=models.CharField(choices=[('queued', 'Queued'), ('creating', 'Creating'), ('running', 'Running'), ('succeeded', 'Succeeded'), ('failed', 'Failed')], db_index=True, default='queued', max_length=16),
+        ),
+    ]
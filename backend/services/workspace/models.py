@@ -8,6 +8,8 @@
 #       └─ WorkspaceBinding (staging → devops-project-staging)
 #       └─ WorkspaceBinding (prod    → devops-project-prod)
 
+import uuid
+
 from django.db import models
 from django.contrib.auth import get_user_model
 from ..core.base_models import ResourceContextMixin
@@ -135,6 +137,66 @@ class ProvisionedResource(models.Model):
         return f"{self.resource_type}:{self.resource_name} ({self.workspace.workspace_id}/{self.environment})"
 
 
+class ProvisioningJob(models.Model):
+    """
+    One asynchronous provisioning request (see services/provisioning/jobs.py).
+
+    The HTTP endpoint creates the job and returns 202; the provisioning engine
+    then drives it through OpenStack:
+
+        queued ──claim──▶ creating ──create──▶ running ──poll…poll──▶ succeeded
+                                                              └──────▶ failed  (error / timeout)
+
+    The linked ProvisionedResource moves creating → active / error alongside.
+    """
+
+    KIND_CHOICES = [
+        ("vm",     "Virtual Machine"),
+        ("volume", "Block Storage Volume"),
+    ]
+
+    STATE_CHOICES = [
+        ("queued",    "Queued"),
+        ("creating",  "Creating"),
+        ("running",   "Running"),
+        ("succeeded", "Succeeded"),
+        ("failed",    "Failed"),
+    ]
+    TERMINAL_STATES = ("succeeded", "failed")
+
+    id          = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    binding     = models.ForeignKey(WorkspaceBinding, on_delete=models.CASCADE, related_name="provisioning_jobs")
+    resource    = models.OneToOneField(
+        ProvisionedResource, on_delete=models.SET_NULL, null=True, blank=True, related_name="job",
+    )
+    kind        = models.CharField(max_length=16, choices=KIND_CHOICES)
+    params      = models.JSONField(default=dict, blank=True, help_text="OpenStack create arguments")
+    state       = models.CharField(max_length=16, choices=STATE_CHOICES, default="queued", db_index=True)
+    progress    = models.CharField(max_length=64, blank=True, help_text="Last OpenStack status seen")
+    poll_count  = models.PositiveIntegerField(default=0)
+    error       = models.TextField(blank=True)
+    result      = models.JSONField(default=dict, blank=True)
+    deadline    = models.DateTimeField(null=True, blank=True)
+    created_by  = models.ForeignKey(User, on_delete=models.SET_NULL, null=True)
+    created_at  = models.DateTimeField(auto_now_add=True)
+    updated_at  = models.DateTimeField(auto_now=True)
+    started_at  = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes  = [
+            models.Index(fields=["state", "created_at"]),
+        ]
+
+    @property
+    def is_terminal(self) -> bool:
+        return self.state in self.TERMINAL_STATES
+
+    def __str__(self):
+        return f"{self.kind} job {self.id} [{self.state}]"
+
+
 # ---------------------------------------------------------------------------
 # Developer Workspace (browser terminal + web IDE)
 # ---------------------------------------------------------------------------
@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import Workspace, WorkspaceBinding, ProvisionedResource, DevWorkspace
+from .models import Workspace, WorkspaceBinding, ProvisionedResource, ProvisioningJob, DevWorkspace
 
 
 class WorkspaceBindingSerializer(serializers.ModelSerializer):
@@ -44,6 +44,19 @@ class ProvisionedResourceSerializer(serializers.ModelSerializer):
         ]
 
 
+class ProvisioningJobSerializer(serializers.ModelSerializer):
+    resource = ProvisionedResourceSerializer(read_only=True)
+
+    class Meta:
+        model  = ProvisioningJob
+        fields = [
+            "id", "kind", "state", "progress", "poll_count",
+            "error", "result", "resource",
+            "deadline", "created_at", "updated_at", "started_at", "finished_at",
+        ]
+        read_only_fields = fields
+
+
 class DevWorkspaceSerializer(serializers.ModelSerializer):
     terminal_ws_url = serializers.ReadOnlyField()
     owner = serializers.StringRelatedField(read_only=True)
@@ -2,7 +2,7 @@
 #
 # Central service that:
 #   1. Resolves workspace_id + environment → OpenStack project
-#   2. Returns a per-project OpenStack connection
+#   2. Returns a per-project OpenStack connection (pooled per process)
 #   3. Provides resource registration / lookup helpers
 #
 # Usage (in any backend view):
@@ -11,13 +11,18 @@
 #
 #   binding = WorkspaceService.resolve(workspace_id="devops", environment="staging")
 #   conn    = WorkspaceService.get_connection(binding)
+#
+# Binding resolution is read-through cached (see services/workspace/cache.py)
+# and invalidated by signals on Workspace / WorkspaceBinding writes.
 
 import logging
 import os
 
 import openstack
-from django.core.exceptions import ObjectDoesNotExist
 
+from infrastructure.openstack_conn import credential_source, get_pool
+
+from . import cache as binding_cache
 from .models import Workspace, WorkspaceBinding, ProvisionedResource
 
 logger = logging.getLogger(__name__)
@@ -54,25 +59,97 @@ class WorkspaceService:
         """
         Resolve workspace + environment to a WorkspaceBinding.
 
+        Results (including misses) are served from the binding cache; a cold
+        lookup costs a single joined query on the happy path.
+
         Raises:
             WorkspaceNotFound   – workspace_id not in DB
             WorkspaceInactive   – workspace is disabled
             BindingNotFound     – no binding for this environment
         """
-        try:
-            workspace = Workspace.objects.get(workspace_id=workspace_id)
-        except ObjectDoesNotExist:
-            raise WorkspaceNotFound(f"Workspace '{workspace_id}' does not exist.")
+        cached = binding_cache.get(workspace_id, environment)
+        if cached is None:
+            cached = WorkspaceService._load_binding(workspace_id, environment)
+            binding_cache.set(workspace_id, environment, cached)
+        return WorkspaceService._unwrap(cached, workspace_id, environment)
 
-        if not workspace.is_active:
-            raise WorkspaceInactive(f"Workspace '{workspace_id}' is disabled.")
+    @staticmethod
+    def resolve_many(keys) -> dict:
+        """
+        Resolve many (workspace_id, environment) pairs at once, e.g. for a
+        dashboard that renders every environment of every workspace.
+
+        Returns {(workspace_id, environment): WorkspaceBinding | None}; pairs
+        whose workspace is missing/disabled or that have no binding map to
+        None instead of raising.  Cache misses are filled with one query.
+        """
+        keys = list(dict.fromkeys(keys))
+        found = binding_cache.get_many(keys)
+        misses = [key for key in keys if key not in found]
+
+        if misses:
+            workspace_ids = {wid for wid, _ in misses}
+            active = dict(
+                Workspace.objects.filter(workspace_id__in=workspace_ids)
+                .values_list("workspace_id", "is_active")
+            )
+            bindings = {
+                (b.workspace.workspace_id, b.environment): b
+                for b in WorkspaceBinding.objects.select_related("workspace").filter(
+                    workspace__workspace_id__in=workspace_ids,
+                    environment__in={env for _, env in misses},
+                )
+            }
+            loaded = {}
+            for key in misses:
+                wid = key[0]
+                if wid not in active:
+                    loaded[key] = binding_cache.MISSING_WORKSPACE
+                elif not active[wid]:
+                    loaded[key] = binding_cache.INACTIVE_WORKSPACE
+                else:
+                    loaded[key] = bindings.get(key, binding_cache.MISSING_BINDING)
+            binding_cache.set_many(loaded)
+            found.update(loaded)
+
+        return {
+            key: None if found[key] in binding_cache.NEGATIVE_MARKERS else found[key]
+            for key in keys
+        }
+
+    @staticmethod
+    def _load_binding(workspace_id: str, environment: str):
+        """Fetch a binding (or the reason it can't be used) from the DB."""
+        binding = (
+            WorkspaceBinding.objects.select_related("workspace")
+            .filter(workspace__workspace_id=workspace_id, environment=environment)
+            .first()
+        )
+        if binding is not None:
+            return binding if binding.workspace.is_active else binding_cache.INACTIVE_WORKSPACE
 
-        try:
-            return WorkspaceBinding.objects.get(workspace=workspace, environment=environment)
-        except ObjectDoesNotExist:
+        is_active = (
+            Workspace.objects.filter(workspace_id=workspace_id)
+            .values_list("is_active", flat=True)
+            .first()
+        )
+        if is_active is None:
+            return binding_cache.MISSING_WORKSPACE
+        if not is_active:
+            return binding_cache.INACTIVE_WORKSPACE
+        return binding_cache.MISSING_BINDING
+
+    @staticmethod
+    def _unwrap(cached, workspace_id: str, environment: str) -> WorkspaceBinding:
+        if cached == binding_cache.MISSING_WORKSPACE:
+            raise WorkspaceNotFound(f"Workspace '{workspace_id}' does not exist.")
+        if cached == binding_cache.INACTIVE_WORKSPACE:
+            raise WorkspaceInactive(f"Workspace '{workspace_id}' is disabled.")
+        if cached == binding_cache.MISSING_BINDING:
             raise BindingNotFound(
                 f"No OpenStack binding for workspace='{workspace_id}', environment='{environment}'."
             )
+        return cached
 
     # ── OpenStack connection ────────────────────────────────────────────────────
 
@@ -87,7 +164,28 @@ class WorkspaceService:
 
         This is the ONLY place in the backend that creates OpenStack connections
         for provisioning requests.
+
+        Connections are served from the process-wide pool shared with
+        infrastructure.openstack_conn, keyed by (project, region, credential
+        source), so repeated requests for the same project reuse the Keystone
+        token and service catalog.
         """
+        return get_pool().get(
+            WorkspaceService._connection_key(binding),
+            lambda: WorkspaceService._connect(binding),
+        )
+
+    @staticmethod
+    def invalidate_connection(binding: WorkspaceBinding) -> None:
+        """Drop the pooled connection for this binding (e.g. after an auth failure)."""
+        get_pool().invalidate(WorkspaceService._connection_key(binding))
+
+    @staticmethod
+    def _connection_key(binding: WorkspaceBinding) -> tuple:
+        return (binding.openstack_project, binding.openstack_region, credential_source())
+
+    @staticmethod
+    def _connect(binding: WorkspaceBinding) -> openstack.connection.Connection:
         auth_url = os.environ.get("OS_AUTH_URL")
         username = os.environ.get("OS_USERNAME")
         password = os.environ.get("OS_PASSWORD")
@@ -0,0 +1,26 @@
+# AtonixCorp – Workspace signal handlers
+#
+# Keep the binding cache (services/workspace/cache.py) coherent with the DB.
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import cache as binding_cache
+from .models import Workspace, WorkspaceBinding
+
+
+@receiver(post_save, sender=Workspace)
+@receiver(post_delete, sender=Workspace)
+def on_workspace_changed(sender, instance, **kwargs):
+    binding_cache.invalidate_workspace(instance.workspace_id)
+
+
+@receiver(post_save, sender=WorkspaceBinding)
+@receiver(post_delete, sender=WorkspaceBinding)
+def on_binding_changed(sender, instance, **kwargs):
+    try:
+        workspace_id = instance.workspace.workspace_id
+    except Workspace.DoesNotExist:
+        # Cascade from a workspace delete – on_workspace_changed covers it.
+        return
+    binding_cache.invalidate(workspace_id, instance.environment)